@@ -9,6 +9,8 @@ from .compiler import (  # noqa
     compile_graphql_to_gremlin,
     compile_graphql_to_match,
     compile_graphql_to_sql,
+    set_trusted_ir_mode_default,
+    trusted_ir_mode,
 )
 from .exceptions import (  # noqa
     GraphQLCompilationError,
@@ -18,7 +20,14 @@ from .exceptions import (  # noqa
     GraphQLValidationError,
 )
 from .query_formatting import insert_arguments_into_query  # noqa
+from .query_formatting.common import validate_arguments
+from .query_formatting.cypher_formatting import insert_arguments_into_cypher_query_redisgraph
 from .query_formatting.graphql_formatting import pretty_print_graphql  # noqa
+from .query_formatting.neo4j_formatting import make_neo4j_parameter_builder  # noqa
+from .query_formatting.orientdb_formatting import (  # noqa
+    get_orientdb_parameterized_query,
+    make_orientdb_parameter_builder,
+)
 from .schema import (  # noqa
     DIRECTIVES,
     EXTENDED_META_FIELD_DEFINITIONS,
@@ -108,20 +117,29 @@ def graphql_to_gremlin(
 
 
 def graphql_to_redisgraph_cypher(
-    common_schema_info: CommonSchemaInfo, graphql_query: str, parameters: Dict[str, Any]
+    common_schema_info: CommonSchemaInfo,
+    graphql_query: str,
+    parameters: Dict[str, Any],
+    parameter_header: bool = False,
 ) -> CompilationResult:
     """Compile the GraphQL input into a RedisGraph Cypher query and associated metadata.
 
     Note that the corresponding function that would convert GraphQL to Cypher for Neo4j does not
     exist because Neo4j supports query parameters but RedisGraph doesn't. So, for Neo4j we will use
     the Neo4j client's own query parameter handling method but for RedisGraph we'll manually
-    interpolate values in the query string.
+    interpolate values in the query string, or in a CYPHER parameter header for versions of
+    RedisGraph that support one.
 
     See README.md for a more detailed explanation.
 
     Args:
         common_schema_info: GraphQL schema object describing the schema of the graph to be queried
         graphql_query: str, GraphQL query to compile to Cypher
+        parameters: dict, mapping argument name to its value, for every parameter the query expects.
+        parameter_header: bool, if True, the parameters are passed in a CYPHER parameter header
+                          preceding the unchanged compiled query, allowing RedisGraph to reuse its
+                          cached execution plan for the query. See
+                          insert_arguments_into_cypher_query_redisgraph() for details.
 
     Returns:
         CompilationResult object, containing:
@@ -131,6 +149,11 @@ def graphql_to_redisgraph_cypher(
             - input_metadata: dict, name of input variables -> inferred GraphQL type, based on use
     """
     compilation_result = compile_graphql_to_cypher(common_schema_info, graphql_query)
-    return compilation_result._replace(
-        query=insert_arguments_into_query(compilation_result, parameters)
-    )
+    if parameter_header:
+        validate_arguments(compilation_result.input_metadata, parameters)
+        query = insert_arguments_into_cypher_query_redisgraph(
+            compilation_result, parameters, parameter_header=True
+        )
+    else:
+        query = insert_arguments_into_query(compilation_result, parameters)
+    return compilation_result._replace(query=query)
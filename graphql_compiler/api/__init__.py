@@ -1 +1,6 @@
 # Copyright 2019-present Kensho Technologies, LLC.
+# pylint: disable=unused-import
+from graphql_compiler.api.execution import ConnectionPool, PooledQueryExecutor, QueryBackend  # noqa
+
+
+# pylint: enable=unused-import
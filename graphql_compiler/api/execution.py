@@ -0,0 +1,696 @@
+# Copyright 2020-present Kensho Technologies, LLC.
+"""Execute GraphQL queries on a database, over a pool of connections.
+
+PooledQueryExecutor compiles and executes queries on a database described by a QueryBackend:
+    - compiled queries are kept in an LRU cache keyed by the GraphQL query string, together with
+      the function binding arguments to them, so repeated queries are neither compiled again nor
+      have their argument conversions looked up again;
+    - queries are executed on connections taken from a ConnectionPool of bounded size, which may
+      be pre-warmed with open connections, and which checks the health of connections that were
+      idle for a while before reusing them;
+    - queries may be given a timeout, after which the caller stops waiting for their results;
+    - queries failing due to a broken connection are retried on a new connection.
+
+Backends for SQL databases, OrientDB, Neo4j and RedisGraph are provided. They are given
+the engine, driver, or connection factory to use, so this module does not depend on any database
+driver, and any of them can be replaced by a local SQLite engine or a fake client in tests.
+Other databases are supported by subclassing QueryBackend.
+"""
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from functools import partial
+from threading import Condition, Event
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+import sqlalchemy
+
+from ..compiler.common import (
+    CompilationResult,
+    compile_graphql_to_cypher,
+    compile_graphql_to_match,
+    compile_graphql_to_sql,
+)
+from ..compiler.emit_sql import get_fold_strategy
+from ..global_utils import BoundedLRUCache
+from ..post_processing.sql_post_processing import make_fold_output_decoders
+from ..query_formatting.common import insert_arguments_into_query, validate_arguments
+from ..query_formatting.cypher_formatting import insert_arguments_into_cypher_query_redisgraph
+from ..query_formatting.neo4j_formatting import make_neo4j_parameter_builder
+from ..schema.schema_info import CommonSchemaInfo, SQLAlchemySchemaInfo
+
+
+ConnectionPoolMetrics = namedtuple(
+    "ConnectionPoolMetrics",
+    (
+        "max_size",  # int, maximum number of open connections
+        "size",  # int, number of open connections, idle or in use
+        "idle",  # int, number of open connections not in use
+        "discarded",  # int, number of connections closed as broken or unhealthy
+    ),
+)
+
+
+PreparedQuery = namedtuple(
+    "PreparedQuery",
+    (
+        "compilation_result",  # CompilationResult of the query
+        # Callable[[Dict[str, Any]], Any], function validating the arguments of the query and
+        # binding them to it, in the form expected by the backend's execute method
+        "bind_arguments",
+    ),
+)
+
+
+class ConnectionPool(object):
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        close: Callable[[Any], None],
+        check_health: Callable[[Any], bool],
+        max_size: int,
+        prewarm_size: int = 0,
+        health_check_interval: float = 30.0,
+    ) -> None:
+        """Create a thread-safe pool of connections of bounded size.
+
+        Args:
+            connect: function returning a new open connection
+            close: function closing the given connection
+            check_health: function returning whether the given connection is usable. Raising
+                          an error is equivalent to returning False.
+            max_size: int, maximum number of open connections, idle or in use
+            prewarm_size: int, number of connections to open right away, at most max_size
+            health_check_interval: float, number of seconds a connection may stay idle before its
+                                   health is checked on its next use. Connections failing the
+                                   check are closed and replaced by new connections.
+
+        Returns:
+            new ConnectionPool object
+        """
+        if max_size < 1:
+            raise AssertionError(f"Expected a positive pool size, received {max_size}.")
+        if not 0 <= prewarm_size <= max_size:
+            raise AssertionError(
+                f"Expected a number of connections to pre-warm between 0 and the pool size "
+                f"{max_size}, received {prewarm_size}."
+            )
+        self._connect = connect
+        self._close = close
+        self._check_health = check_health
+        self._max_size = max_size
+        self._health_check_interval = health_check_interval
+
+        self._condition = Condition()
+        # Idle connections along with the time they were last used, the most recent one last.
+        self._idle_connections: List[Tuple[Any, float]] = []
+        self._size = 0
+        self._discarded = 0
+        self._closed = False
+
+        for _ in range(prewarm_size):
+            self._idle_connections.append((connect(), time.monotonic()))
+            self._size += 1
+
+    def _is_healthy(self, connection: Any) -> bool:
+        """Return whether the connection passes its health check, treating errors as failures."""
+        try:
+            return bool(self._check_health(connection))
+        except Exception:  # pylint: disable=broad-except
+            return False
+
+    def acquire(self, timeout: Optional[float] = None) -> Any:
+        """Return a connection for exclusive use until released, waiting for one if none is free.
+
+        Args:
+            timeout: optional float, maximum number of seconds to wait for a connection
+
+        Returns:
+            an open connection, which must be given back with release()
+
+        Raises:
+            TimeoutError, if no connection became available within the timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            reserved_slot = False
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise AssertionError("Cannot acquire a connection from a closed pool.")
+                    if self._idle_connections:
+                        connection, last_used_time = self._idle_connections.pop()
+                        break
+                    if self._size < self._max_size:
+                        # Reserve the slot, and open the connection without holding the lock.
+                        self._size += 1
+                        reserved_slot = True
+                        break
+                    remaining_time = None if deadline is None else deadline - time.monotonic()
+                    if remaining_time is not None and remaining_time <= 0:
+                        raise TimeoutError(
+                            f"Timed out waiting for one of the {self._max_size} connections "
+                            f"of the pool."
+                        )
+                    self._condition.wait(remaining_time)
+
+            if reserved_slot:
+                try:
+                    return self._connect()
+                except BaseException:
+                    self._release_slot()
+                    raise
+
+            idle_time = time.monotonic() - last_used_time
+            if idle_time < self._health_check_interval or self._is_healthy(connection):
+                return connection
+            self.release(connection, discard=True)
+
+    def _release_slot(self) -> None:
+        """Free the slot of a connection that was closed or never opened."""
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+    def release(self, connection: Any, discard: bool = False) -> None:
+        """Give back a connection obtained from acquire(), closing it if discard is set."""
+        with self._condition:
+            if not discard and not self._closed:
+                self._idle_connections.append((connection, time.monotonic()))
+                self._condition.notify()
+                return
+            if discard:
+                self._discarded += 1
+
+        try:
+            self._close(connection)
+        except Exception:  # pylint: disable=broad-except
+            pass  # The connection is being discarded, and may already be broken.
+        finally:
+            self._release_slot()
+
+    def close(self) -> None:
+        """Close all idle connections, and those in use once released. Acquiring then fails."""
+        with self._condition:
+            self._closed = True
+            idle_connections = [connection for connection, _ in self._idle_connections]
+            self._idle_connections = []
+            self._size -= len(idle_connections)
+            self._condition.notify_all()
+        for connection in idle_connections:
+            self._close(connection)
+
+    def get_metrics(self) -> ConnectionPoolMetrics:
+        """Return a snapshot of the number of open and idle connections in the pool."""
+        with self._condition:
+            return ConnectionPoolMetrics(
+                max_size=self._max_size,
+                size=self._size,
+                idle=len(self._idle_connections),
+                discarded=self._discarded,
+            )
+
+
+class QueryBackend(object):
+    """Compile queries for a database, and manage connections to it and execute queries on them.
+
+    Subclasses must implement compile, connect, close and execute, and may override the other
+    methods, whose default implementations are suitable for most backends.
+    """
+
+    def compile(self, graphql_query: str) -> CompilationResult:
+        """Compile the GraphQL query to the backend's query language."""
+        raise NotImplementedError()
+
+    def make_argument_binder(
+        self, compilation_result: CompilationResult
+    ) -> Callable[[Dict[str, Any]], Any]:
+        """Return a function validating the arguments of the query, and binding them to it."""
+        return partial(insert_arguments_into_query, compilation_result)
+
+    def connect(self) -> Any:
+        """Open and return a new connection to the database."""
+        raise NotImplementedError()
+
+    def close(self, connection: Any) -> None:
+        """Close the connection."""
+        raise NotImplementedError()
+
+    def check_health(self, connection: Any) -> bool:
+        """Return whether the connection, idle for a while, is still usable."""
+        return True
+
+    def execute(
+        self, connection: Any, compilation_result: CompilationResult, bound_query: Any
+    ) -> List[Dict[str, Any]]:
+        """Execute the query on the connection, and return its results.
+
+        Args:
+            connection: open connection, as returned by connect()
+            compilation_result: CompilationResult of the query
+            bound_query: the query with its arguments, as returned by the argument binder
+
+        Returns:
+            list of dicts, output name -> value, one for each result of the query
+        """
+        raise NotImplementedError()
+
+    def is_connection_error(self, error: Exception) -> bool:
+        """Return whether the error is due to a broken connection, so the query can be retried."""
+        return False
+
+
+class SqlQueryBackend(QueryBackend):
+    def __init__(
+        self, sql_schema_info: SQLAlchemySchemaInfo, engine: Any, trusted: bool = False
+    ) -> None:
+        """Create a backend executing queries on a SQL database through a SQLAlchemy Engine.
+
+        Args:
+            sql_schema_info: SQLAlchemySchemaInfo used to compile queries, whose dialect must
+                             match that of the engine
+            engine: SQLAlchemy Engine whose connections are used to execute queries. Connections
+                    are checked out of the engine's own pool when opened by the executor's pool,
+                    and stay checked out while idle in it.
+            trusted: bool, if True, compile queries in trusted IR mode, skipping checks of the
+                     compiler's internal invariants. See trusted_mode.py for details.
+
+        Returns:
+            new SqlQueryBackend object
+        """
+        self._sql_schema_info = sql_schema_info
+        self._engine = engine
+        self._trusted = trusted
+
+    def compile(self, graphql_query: str) -> CompilationResult:
+        """Compile the GraphQL query to SQL."""
+        return compile_graphql_to_sql(self._sql_schema_info, graphql_query, trusted=self._trusted)
+
+    def connect(self) -> Any:
+        """Check out a new SQLAlchemy Connection from the engine."""
+        return self._engine.connect()
+
+    def close(self, connection: Any) -> None:
+        """Close the SQLAlchemy Connection, returning it to the engine's pool."""
+        connection.close()
+
+    def check_health(self, connection: Any) -> bool:
+        """Return whether a trivial query succeeds on the connection."""
+        connection.execute(sqlalchemy.select([sqlalchemy.literal(1)])).fetchall()
+        return True
+
+    def execute(
+        self, connection: Any, compilation_result: CompilationResult, bound_query: Any
+    ) -> List[Dict[str, Any]]:
+        """Execute the SQLAlchemy query, decoding folded outputs if the fold strategy needs it."""
+        results = [dict(row) for row in connection.execute(bound_query)]
+        output_metadata = compilation_result.output_metadata
+        if any(metadata.folded for metadata in output_metadata.values()):
+            fold_decoders = make_fold_output_decoders(
+                output_metadata, get_fold_strategy(self._sql_schema_info)
+            ).items()
+            for result in results:
+                for out_name, decoder in fold_decoders:
+                    result[out_name] = decoder(result[out_name])
+        return results
+
+    def is_connection_error(self, error: Exception) -> bool:
+        """Return whether SQLAlchemy found the connection to be invalidated by the error."""
+        return isinstance(error, sqlalchemy.exc.DBAPIError) and error.connection_invalidated
+
+
+class OrientDbQueryBackend(QueryBackend):
+    def __init__(
+        self,
+        common_schema_info: CommonSchemaInfo,
+        connect: Callable[[], Any],
+        connection_errors: Tuple[Type[Exception], ...] = (),
+        trusted: bool = False,
+    ) -> None:
+        """Create a backend executing MATCH queries on OrientDB.
+
+        Args:
+            common_schema_info: CommonSchemaInfo used to compile queries
+            connect: function returning a pyorient OrientDB client with an open database
+            connection_errors: tuple of exception types raised by the client when its connection
+                               is broken, e.g. (pyorient.PyOrientConnectionException,)
+            trusted: bool, if True, compile queries in trusted IR mode
+
+        Returns:
+            new OrientDbQueryBackend object
+        """
+        self._common_schema_info = common_schema_info
+        self._connect = connect
+        self._connection_errors = connection_errors
+        self._trusted = trusted
+
+    def compile(self, graphql_query: str) -> CompilationResult:
+        """Compile the GraphQL query to MATCH."""
+        return compile_graphql_to_match(
+            self._common_schema_info, graphql_query, trusted=self._trusted
+        )
+
+    def connect(self) -> Any:
+        """Return a new client with an open database."""
+        return self._connect()
+
+    def close(self, connection: Any) -> None:
+        """Close the client's database."""
+        connection.db_close()
+
+    def check_health(self, connection: Any) -> bool:
+        """Return whether the client can still reach its database."""
+        connection.db_size()
+        return True
+
+    def execute(
+        self, connection: Any, compilation_result: CompilationResult, bound_query: Any
+    ) -> List[Dict[str, Any]]:
+        """Execute the MATCH query, adding null values for optional outputs with no matches."""
+        results = []
+        for row in connection.command(bound_query):
+            result = dict(row.oRecordData)
+            for output_name in compilation_result.output_metadata:
+                result.setdefault(output_name, None)
+            results.append(result)
+        return results
+
+    def is_connection_error(self, error: Exception) -> bool:
+        """Return whether the error is one of the configured connection errors."""
+        return isinstance(error, self._connection_errors)
+
+
+class Neo4jQueryBackend(QueryBackend):
+    def __init__(
+        self,
+        common_schema_info: CommonSchemaInfo,
+        driver: Any,
+        connection_errors: Tuple[Type[Exception], ...] = (),
+        trusted: bool = False,
+    ) -> None:
+        """Create a backend executing Cypher queries on Neo4j, with the driver's query parameters.
+
+        Args:
+            common_schema_info: CommonSchemaInfo used to compile queries
+            driver: Neo4j driver, whose sessions are used as the pooled connections
+            connection_errors: tuple of exception types raised by the driver when its connection
+                               is broken, e.g. (neo4j.exceptions.ServiceUnavailable,)
+            trusted: bool, if True, compile queries in trusted IR mode
+
+        Returns:
+            new Neo4jQueryBackend object
+        """
+        self._common_schema_info = common_schema_info
+        self._driver = driver
+        self._connection_errors = connection_errors
+        self._trusted = trusted
+
+    def compile(self, graphql_query: str) -> CompilationResult:
+        """Compile the GraphQL query to Cypher."""
+        return compile_graphql_to_cypher(
+            self._common_schema_info, graphql_query, trusted=self._trusted
+        )
+
+    def make_argument_binder(
+        self, compilation_result: CompilationResult
+    ) -> Callable[[Dict[str, Any]], Any]:
+        """Return a function building the driver parameters of the query from its arguments."""
+        return make_neo4j_parameter_builder(compilation_result)
+
+    def connect(self) -> Any:
+        """Open a new driver session."""
+        return self._driver.session()
+
+    def close(self, connection: Any) -> None:
+        """Close the driver session."""
+        connection.close()
+
+    def check_health(self, connection: Any) -> bool:
+        """Return whether a trivial query succeeds in the session."""
+        connection.run("RETURN 1").consume()
+        return True
+
+    def execute(
+        self, connection: Any, compilation_result: CompilationResult, bound_query: Any
+    ) -> List[Dict[str, Any]]:
+        """Run the compiled query in the session, with the bound parameters."""
+        return connection.run(compilation_result.query, bound_query).data()
+
+    def is_connection_error(self, error: Exception) -> bool:
+        """Return whether the error is one of the configured connection errors."""
+        return isinstance(error, self._connection_errors)
+
+
+def _decode_redisgraph_value(value: Any) -> Any:
+    """Return the value returned by RedisGraph, with bytes decoded to str."""
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode("utf-8")
+    return value
+
+
+class RedisGraphQueryBackend(QueryBackend):
+    def __init__(
+        self,
+        common_schema_info: CommonSchemaInfo,
+        connect: Callable[[], Any],
+        parameter_header: bool = False,
+        connection_errors: Tuple[Type[Exception], ...] = (),
+        trusted: bool = False,
+    ) -> None:
+        """Create a backend executing Cypher queries on RedisGraph.
+
+        Args:
+            common_schema_info: CommonSchemaInfo used to compile queries
+            connect: function returning a redisgraph Graph client
+            parameter_header: bool, whether to pass arguments in a CYPHER parameter header,
+                              see insert_arguments_into_cypher_query_redisgraph() for details
+            connection_errors: tuple of exception types raised by the client when its connection
+                               is broken, e.g. (redis.exceptions.ConnectionError,)
+            trusted: bool, if True, compile queries in trusted IR mode
+
+        Returns:
+            new RedisGraphQueryBackend object
+        """
+        self._common_schema_info = common_schema_info
+        self._connect = connect
+        self._parameter_header = parameter_header
+        self._connection_errors = connection_errors
+        self._trusted = trusted
+
+    def compile(self, graphql_query: str) -> CompilationResult:
+        """Compile the GraphQL query to Cypher."""
+        return compile_graphql_to_cypher(
+            self._common_schema_info, graphql_query, trusted=self._trusted
+        )
+
+    def make_argument_binder(
+        self, compilation_result: CompilationResult
+    ) -> Callable[[Dict[str, Any]], Any]:
+        """Return a function inserting the arguments into the query, or its parameter header."""
+        parameter_header = self._parameter_header
+
+        def bind_arguments(arguments: Dict[str, Any]) -> str:
+            """Validate the arguments, and return the query with the arguments inserted."""
+            validate_arguments(compilation_result.input_metadata, arguments)
+            return insert_arguments_into_cypher_query_redisgraph(
+                compilation_result, arguments, parameter_header=parameter_header
+            )
+
+        return bind_arguments
+
+    def connect(self) -> Any:
+        """Return a new Graph client."""
+        return self._connect()
+
+    def close(self, connection: Any) -> None:
+        """Disconnect the client's Redis connections."""
+        connection.redis_con.connection_pool.disconnect()
+
+    def check_health(self, connection: Any) -> bool:
+        """Return whether the Redis server answers a ping."""
+        return connection.redis_con.ping()
+
+    def execute(
+        self, connection: Any, compilation_result: CompilationResult, bound_query: Any
+    ) -> List[Dict[str, Any]]:
+        """Execute the query, and decode the column names and values returned as bytes."""
+        query_result = connection.query(bound_query)
+        header = getattr(query_result, "header", None)
+        if header is None:
+            # Clients for RedisGraph 1.x return the column names as the first row of the result
+            # set, and the results as the other rows.
+            raw_column_names = query_result.result_set[0]
+            records = query_result.result_set[1:]
+        else:
+            # Clients for RedisGraph 2.x, which parameter_header requires, return the column
+            # names in the header, as (column type, column name) pairs, and only the results
+            # in the result set.
+            raw_column_names = [column_name for _, column_name in header]
+            records = query_result.result_set
+        column_names = [_decode_redisgraph_value(column_name) for column_name in raw_column_names]
+        return [
+            dict(zip(column_names, (_decode_redisgraph_value(value) for value in record)))
+            for record in records
+        ]
+
+    def is_connection_error(self, error: Exception) -> bool:
+        """Return whether the error is one of the configured connection errors."""
+        return isinstance(error, self._connection_errors)
+
+
+class PooledQueryExecutor(object):
+    def __init__(
+        self,
+        backend: QueryBackend,
+        pool_size: int = 8,
+        prewarm_size: int = 0,
+        health_check_interval: float = 30.0,
+        query_timeout: Optional[float] = None,
+        max_retries: int = 1,
+        compilation_cache_size: int = 256,
+    ) -> None:
+        """Create an executor of GraphQL queries over a pool of connections to the backend.
+
+        Args:
+            backend: QueryBackend used to compile queries, and to open connections and execute
+                     queries on them
+            pool_size: int, maximum number of open connections, and so of concurrent queries
+            prewarm_size: int, number of connections to open right away
+            health_check_interval: float, number of seconds a connection may stay idle before its
+                                   health is checked on its next use
+            query_timeout: optional float, default number of seconds after which to stop waiting
+                           for the results of a query, including the time spent waiting for a
+                           connection. The query is not interrupted on the database, and its
+                           connection only returns to the pool once it completes, so the timeouts
+                           of the database itself should be configured as well.
+            max_retries: int, number of times to retry a query failing due to a broken connection,
+                         each time on a new connection
+            compilation_cache_size: int, maximum number of compiled queries to keep, discarding
+                                    the least recently used ones first
+
+        Returns:
+            new PooledQueryExecutor object
+        """
+        if max_retries < 0:
+            raise AssertionError(
+                f"Expected a non-negative number of retries, received {max_retries}."
+            )
+        if compilation_cache_size < 1:
+            raise AssertionError(
+                f"Expected a positive compilation cache size, received {compilation_cache_size}."
+            )
+        self._backend = backend
+        self._query_timeout = query_timeout
+        self._max_retries = max_retries
+
+        self._pool = ConnectionPool(
+            backend.connect,
+            backend.close,
+            backend.check_health,
+            pool_size,
+            prewarm_size=prewarm_size,
+            health_check_interval=health_check_interval,
+        )
+        # Queries with a timeout are executed in these threads, while the caller waits for them.
+        self._thread_pool = ThreadPoolExecutor(max_workers=pool_size)
+        self._compilation_cache: BoundedLRUCache[str, PreparedQuery] = BoundedLRUCache(
+            compilation_cache_size
+        )
+
+    def _prepare(self, graphql_query: str) -> PreparedQuery:
+        """Return the compiled query and its argument binder, compiling it if not cached."""
+        return self._compilation_cache.get_or_create(graphql_query, self._compile_and_prepare)
+
+    def _compile_and_prepare(self, graphql_query: str) -> PreparedQuery:
+        """Compile the query, and make the function binding its arguments."""
+        compilation_result = self._backend.compile(graphql_query)
+        return PreparedQuery(
+            compilation_result, self._backend.make_argument_binder(compilation_result)
+        )
+
+    def compile(self, graphql_query: str) -> CompilationResult:
+        """Return the CompilationResult of the query, compiling it if not cached."""
+        return self._prepare(graphql_query).compilation_result
+
+    def _execute_on_pool(
+        self,
+        compilation_result: CompilationResult,
+        bound_query: Any,
+        deadline: Optional[float],
+        abandoned: Optional[Event],
+    ) -> List[Dict[str, Any]]:
+        """Execute the bound query on a pooled connection, retrying if the connection breaks."""
+        attempt = 0
+        while True:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+            connection = self._pool.acquire(timeout=timeout)
+            if abandoned is not None and abandoned.is_set():
+                # The caller stopped waiting while the connection was acquired.
+                self._pool.release(connection)
+                raise TimeoutError("The query timed out before it started executing.")
+            try:
+                results = self._backend.execute(connection, compilation_result, bound_query)
+            except Exception as e:
+                is_connection_error = self._backend.is_connection_error(e)
+                self._pool.release(connection, discard=is_connection_error)
+                if not is_connection_error or attempt >= self._max_retries:
+                    raise
+                attempt += 1
+            except BaseException:
+                self._pool.release(connection, discard=True)
+                raise
+            else:
+                self._pool.release(connection)
+                return results
+
+    def execute_query(
+        self, graphql_query: str, arguments: Dict[str, Any], timeout: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Compile and execute the query with the given arguments, and return its results.
+
+        Args:
+            graphql_query: str, GraphQL query
+            arguments: Dict[str, Any], parameter name -> value, for every parameter the query
+                       expects. The arguments are validated before the query is executed.
+            timeout: optional float, number of seconds after which to stop waiting for the results
+                     of the query, overriding the executor's query_timeout
+
+        Returns:
+            list of dicts, output name -> value, one for each result of the query
+
+        Raises:
+            GraphQLInvalidArgumentError, if the arguments are invalid
+            TimeoutError, if the query did not complete within the timeout
+        """
+        prepared_query = self._prepare(graphql_query)
+        bound_query = prepared_query.bind_arguments(arguments)
+        compilation_result = prepared_query.compilation_result
+
+        if timeout is None:
+            timeout = self._query_timeout
+        if timeout is None:
+            return self._execute_on_pool(compilation_result, bound_query, None, None)
+
+        abandoned = Event()
+        future = self._thread_pool.submit(
+            self._execute_on_pool,
+            compilation_result,
+            bound_query,
+            time.monotonic() + timeout,
+            abandoned,
+        )
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            abandoned.set()
+            future.cancel()
+            raise TimeoutError(f"The query did not complete within {timeout} seconds.")
+
+    def get_pool_metrics(self) -> ConnectionPoolMetrics:
+        """Return a snapshot of the number of open and idle connections in the pool."""
+        return self._pool.get_metrics()
+
+    def close(self) -> None:
+        """Close the connections of the pool, once the queries in progress complete."""
+        self._thread_pool.shutdown(wait=True)
+        self._pool.close()
@@ -0,0 +1,8 @@
+# Copyright 2020-present Kensho Technologies, LLC.
+# pylint: disable=unused-import
+from graphql_compiler.api.execution import Neo4jQueryBackend  # noqa
+from graphql_compiler.query_formatting.neo4j_formatting import make_neo4j_parameter_builder  # noqa
+from graphql_compiler.schema.schema_info import create_cypher_schema_info  # noqa
+
+
+# pylint: enable=unused-import
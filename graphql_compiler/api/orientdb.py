@@ -1,6 +1,11 @@
 # Copyright 2019-present Kensho Technologies, LLC.
 # pylint: disable=unused-import
 from graphql_compiler import graphql_to_gremlin, graphql_to_match  # noqa
+from graphql_compiler.api.execution import OrientDbQueryBackend  # noqa
+from graphql_compiler.query_formatting.orientdb_formatting import (  # noqa
+    get_orientdb_parameterized_query,
+    make_orientdb_parameter_builder,
+)
 from graphql_compiler.schema.schema_info import (  # noqa
     create_gremlin_schema_info,
     create_match_schema_info,
@@ -1,6 +1,7 @@
 # Copyright 2019-present Kensho Technologies, LLC.
 # pylint: disable=unused-import
 from graphql_compiler import graphql_to_redisgraph_cypher  # noqa
+from graphql_compiler.api.execution import RedisGraphQueryBackend  # noqa
 from graphql_compiler.schema.schema_info import create_cypher_schema_info  # noqa
 
 
@@ -2,6 +2,8 @@
 # pylint: disable=unused-import
 # TODO: add more functions that help with SQL-related setup
 from graphql_compiler import graphql_to_sql  # noqa
+from graphql_compiler.api.execution import SqlQueryBackend  # noqa
+from graphql_compiler.api.sql.async_execution import AsyncSqlQueryExecutor  # noqa
 from graphql_compiler.schema_generation.sqlalchemy import get_sqlalchemy_schema_info  # noqa
 
 
@@ -0,0 +1,219 @@
+# Copyright 2020-present Kensho Technologies, LLC.
+"""Compile and execute GraphQL queries on SQL databases from asyncio code.
+
+AsyncSqlQueryExecutor never blocks the event loop on compilation or on database I/O:
+    - queries are compiled to precompiled SQL text in a bounded thread pool, and the compilation
+      results are kept in an LRU cache keyed by the GraphQL query string;
+    - arguments are validated and bound on the event loop, which involves no SQL compilation
+      (see insert_arguments_into_precompiled_sql_query);
+    - queries are executed either with an async driver, or with a blocking DBAPI driver whose
+      calls are made in the same bounded thread pool, one batch of rows at a time.
+Results are streamed as an async iterator of dicts, with the folded outputs of queries compiled
+with fold strategies such as the XML PATH strategy for MSSQL decoded to lists as they arrive.
+"""
+import asyncio
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, List, Mapping, Optional
+
+from ...compiler.common import CompilationResult, compile_graphql_to_sql
+from ...compiler.emit_sql import get_fold_strategy
+from ...global_utils import BoundedLRUCache
+from ...post_processing.sql_post_processing import make_fold_output_decoders
+from ...query_formatting.common import insert_arguments_into_query
+from ...schema.schema_info import SQLAlchemySchemaInfo
+
+
+_CachedSqlQuery = namedtuple(
+    "_CachedSqlQuery",
+    (
+        "compilation_result",  # CompilationResult, whose query is a PrecompiledSqlQuery
+        "fold_decoders",  # Dict[str, Callable], output name -> decoder, for folded outputs
+    ),
+)
+
+
+# Function returning the event loop running the calling coroutine. asyncio.get_running_loop was
+# added in Python 3.7; before it, asyncio.get_event_loop returns the running loop when called
+# from a coroutine.
+_get_running_loop = getattr(asyncio, "get_running_loop", asyncio.get_event_loop)
+
+
+def _fetch_dbapi_batch(cursor: Any, batch_size: int) -> List[Any]:
+    """Return the next batch of rows of the cursor, or an empty list if there are none left."""
+    return cursor.fetchmany(batch_size)
+
+
+class AsyncSqlQueryExecutor(object):
+    def __init__(
+        self,
+        sql_schema_info: SQLAlchemySchemaInfo,
+        connect: Optional[Callable[[], Any]] = None,
+        fetch: Optional[Callable[[str, Any], AsyncIterable[Mapping[str, Any]]]] = None,
+        max_workers: int = 4,
+        compilation_cache_size: int = 256,
+        batch_size: int = 1000,
+        post_process_folds: bool = True,
+        trusted: bool = False,
+    ) -> None:
+        """Create an executor of GraphQL queries on the SQL database described by the schema info.
+
+        Exactly one of connect and fetch must be given.
+
+        Args:
+            sql_schema_info: SQLAlchemySchemaInfo used to compile queries. The paramstyle of its
+                             dialect must match the driver used to execute them.
+            connect: optional function returning a DBAPI connection, such as the raw_connection
+                     method of a SQLAlchemy Engine. It is called in a worker thread for each query,
+                     and the connection is closed once the query's results are consumed, which
+                     returns pooled connections to their pool. DBAPI calls for the same query may
+                     be made from different worker threads, one at a time.
+            fetch: optional function for executing queries with an async driver. It is given the
+                   SQL text and DBAPI parameters of a query, and returns an async iterable of its
+                   result rows, each a mapping of column name to value.
+            max_workers: int, maximum number of threads used for compilation and for DBAPI calls
+            compilation_cache_size: int, maximum number of compiled queries to keep, discarding
+                                    the least recently used ones first
+            batch_size: int, number of rows fetched at a time from DBAPI cursors
+            post_process_folds: bool, whether to decode the folded outputs of queries compiled
+                                with fold strategies that do not produce native lists, such as
+                                the XML PATH strategy for MSSQL, while streaming the results
+            trusted: bool, if True, compile queries in trusted IR mode, skipping checks of the
+                     compiler's internal invariants. See trusted_mode.py for details.
+
+        Returns:
+            new AsyncSqlQueryExecutor object
+        """
+        if (connect is None) == (fetch is None):
+            raise AssertionError(
+                f"Exactly one of connect and fetch must be given, received {connect} and {fetch}."
+            )
+        if max_workers < 1:
+            raise AssertionError(f"Expected a positive number of workers, received {max_workers}.")
+        if compilation_cache_size < 1:
+            raise AssertionError(
+                f"Expected a positive compilation cache size, received {compilation_cache_size}."
+            )
+        if batch_size < 1:
+            raise AssertionError(f"Expected a positive batch size, received {batch_size}.")
+
+        self._sql_schema_info = sql_schema_info
+        self._connect = connect
+        self._fetch = fetch
+        self._batch_size = batch_size
+        self._post_process_folds = post_process_folds
+        self._trusted = trusted
+
+        self._thread_pool = ThreadPoolExecutor(max_workers=max_workers)
+        self._compilation_cache: BoundedLRUCache[str, _CachedSqlQuery] = BoundedLRUCache(
+            compilation_cache_size
+        )
+
+    def _get_cached_query(self, graphql_query: str) -> Optional[_CachedSqlQuery]:
+        """Return the cached compilation of the query, marking it as recently used, if any."""
+        return self._compilation_cache.get(graphql_query)
+
+    def _compile_and_cache_query(self, graphql_query: str) -> _CachedSqlQuery:
+        """Compile the query and add it to the cache. Blocking, called in a worker thread."""
+        compilation_result = compile_graphql_to_sql(
+            self._sql_schema_info, graphql_query, trusted=self._trusted, precompile=True
+        )
+        output_metadata = compilation_result.output_metadata
+        fold_decoders = {}
+        if self._post_process_folds and any(
+            metadata.folded for metadata in output_metadata.values()
+        ):
+            fold_decoders = make_fold_output_decoders(
+                output_metadata, get_fold_strategy(self._sql_schema_info)
+            )
+        cached_query = _CachedSqlQuery(compilation_result, fold_decoders)
+
+        self._compilation_cache.put(graphql_query, cached_query)
+        return cached_query
+
+    async def _get_compiled_query(self, graphql_query: str) -> _CachedSqlQuery:
+        """Return the compilation of the query, compiling it in a worker thread if not cached."""
+        cached_query = self._get_cached_query(graphql_query)
+        if cached_query is None:
+            loop = _get_running_loop()
+            cached_query = await loop.run_in_executor(
+                self._thread_pool, self._compile_and_cache_query, graphql_query
+            )
+        return cached_query
+
+    async def compile(self, graphql_query: str) -> CompilationResult:
+        """Return the CompilationResult of the query, whose query is a PrecompiledSqlQuery."""
+        cached_query = await self._get_compiled_query(graphql_query)
+        return cached_query.compilation_result
+
+    async def _iterate_dbapi_results(
+        self, query_string: str, dbapi_parameters: Any
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Execute the query on a new DBAPI connection, and yield its results in batches."""
+        if self._connect is None:
+            raise AssertionError("Expected connect to be set when executing on DBAPI connections.")
+        loop = _get_running_loop()
+        connection = await loop.run_in_executor(self._thread_pool, self._connect)
+        try:
+            cursor = await loop.run_in_executor(self._thread_pool, connection.cursor)
+            await loop.run_in_executor(
+                self._thread_pool, cursor.execute, query_string, dbapi_parameters
+            )
+            column_names = [column_description[0] for column_description in cursor.description]
+            while True:
+                rows = await loop.run_in_executor(
+                    self._thread_pool, _fetch_dbapi_batch, cursor, self._batch_size
+                )
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(zip(column_names, row))
+        finally:
+            await loop.run_in_executor(self._thread_pool, connection.close)
+
+    async def stream_query(
+        self, graphql_query: str, arguments: Dict[str, Any]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Compile and execute the query with the given arguments, and stream its results.
+
+        Args:
+            graphql_query: str, GraphQL query to compile to SQL
+            arguments: Dict[str, Any], parameter name -> value, for every parameter the query
+                       expects. The arguments are validated before the query is executed.
+
+        Yields:
+            Dict[str, Any], each result of the query, with folded outputs decoded if
+            post_process_folds is set
+        """
+        cached_query = await self._get_compiled_query(graphql_query)
+        query_string, dbapi_parameters = insert_arguments_into_query(
+            cached_query.compilation_result, arguments
+        )
+
+        if self._fetch is not None:
+            results = self._fetch(query_string, dbapi_parameters)
+        else:
+            results = self._iterate_dbapi_results(query_string, dbapi_parameters)
+
+        fold_decoders = cached_query.fold_decoders.items()
+        try:
+            async for result in results:
+                decoded_result = dict(result)
+                for out_name, decoder in fold_decoders:
+                    decoded_result[out_name] = decoder(decoded_result[out_name])
+                yield decoded_result
+        finally:
+            # Release the connection right away if the results are not consumed to the end.
+            close_results = getattr(results, "aclose", None)
+            if close_results is not None:
+                await close_results()
+
+    async def execute_query(
+        self, graphql_query: str, arguments: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """Return a list of all results of the query, streamed as in stream_query."""
+        return [result async for result in self.stream_query(graphql_query, arguments)]
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Release the worker threads. No queries may be executed afterward."""
+        self._thread_pool.shutdown(wait=wait)
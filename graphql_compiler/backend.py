@@ -4,10 +4,12 @@ from collections import namedtuple
 from .compiler import (
     emit_cypher,
     emit_gremlin,
+    emit_interpreter,
     emit_match,
     emit_sql,
     ir_lowering_cypher,
     ir_lowering_gremlin,
+    ir_lowering_interpreter,
     ir_lowering_match,
     ir_lowering_sql,
 )
@@ -62,3 +64,10 @@ sql_backend = Backend(
     lower_func=ir_lowering_sql.lower_ir,
     emit_func=emit_sql.emit_code_from_ir,
 )
+
+interpreter_backend = Backend(
+    language="Interpreter",
+    SchemaInfoClass=schema_info.CommonSchemaInfo,
+    lower_func=ir_lowering_interpreter.lower_ir,
+    emit_func=emit_interpreter.emit_code_from_ir,
+)
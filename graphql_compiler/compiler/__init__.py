@@ -2,12 +2,17 @@
 from .common import (  # noqa; noqa
     CYPHER_LANGUAGE,
     GREMLIN_LANGUAGE,
+    INTERPRETER_LANGUAGE,
     MATCH_LANGUAGE,
     SQL_LANGUAGE,
     CompilationResult,
     compile_graphql_to_cypher,
     compile_graphql_to_gremlin,
+    compile_graphql_to_interpreter,
     compile_graphql_to_match,
+    compile_graphql_to_match_with_statistics,
     compile_graphql_to_sql,
+    compile_graphql_to_sql_with_keyset_pagination,
 )
 from .compiler_frontend import OutputMetadata  # noqa
+from .trusted_mode import set_trusted_ir_mode_default, trusted_ir_mode  # noqa
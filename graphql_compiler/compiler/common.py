@@ -1,16 +1,22 @@
 # Copyright 2017-present Kensho Technologies, LLC.
 from collections import namedtuple
-from typing import Union
+from functools import partial
+from typing import Any, Dict, Union
 
 from .. import backend
 from ..backend import Backend
-from ..schema.schema_info import CommonSchemaInfo, SQLAlchemySchemaInfo
+from ..schema.schema_info import CommonSchemaInfo, QueryPlanningSchemaInfo, SQLAlchemySchemaInfo
 from .compiler_frontend import graphql_to_ir
+from .emit_gremlin import parameterize_gremlin_query
+from .emit_sql import emit_keyset_paginated_code_from_ir
+from .sqlalchemy_extensions import precompile_sqlalchemy_query
+from .trusted_mode import trusted_ir_mode
 
 
 # The CompilationResult will have the following types for its members:
-# - query: Union[String, sqlalchemy Query], the resulting compiled query, with placeholders for
-#          parameters.
+# - query: Union[String, sqlalchemy Query, PrecompiledSqlQuery, KeysetPaginatedQuery,
+#          ParameterizedGremlinQuery, InterpreterQuery], the resulting compiled query, with
+#          placeholders for parameters.
 # - language: string, specifying the language to which the query was compiled
 # - output_metadata: dict, output name -> OutputMetadata namedtuple object
 # - input_metadata: dict, name of input variables -> inferred GraphQL type, based on use
@@ -22,72 +28,207 @@ MATCH_LANGUAGE = backend.match_backend.language
 GREMLIN_LANGUAGE = backend.gremlin_backend.language
 SQL_LANGUAGE = backend.sql_backend.language
 CYPHER_LANGUAGE = backend.cypher_backend.language
+INTERPRETER_LANGUAGE = backend.interpreter_backend.language
 
 
 def compile_graphql_to_match(
-    common_schema_info: CommonSchemaInfo, graphql_query: str
+    common_schema_info: CommonSchemaInfo, graphql_query: str, trusted: bool = False
 ) -> CompilationResult:
     """Compile the GraphQL input using the schema into a MATCH query and associated metadata.
 
     Args:
         common_schema_info: GraphQL schema object describing the schema of the graph to be queried
         graphql_query: str, GraphQL query to compile to MATCH
+        trusted: bool, if True, compile the query in trusted IR mode, skipping checks of the
+                 compiler's internal invariants. See trusted_mode.py for details.
 
     Returns:
         CompilationResult object
     """
-    return _compile_graphql_generic(backend.match_backend, common_schema_info, graphql_query)
+    return _compile_graphql_generic(
+        backend.match_backend, common_schema_info, graphql_query, trusted=trusted
+    )
+
+
+def compile_graphql_to_match_with_statistics(
+    query_planning_schema_info: QueryPlanningSchemaInfo,
+    graphql_query: str,
+    parameters: Dict[str, Any],
+    trusted: bool = False,
+) -> CompilationResult:
+    """Compile the GraphQL input into a MATCH query whose start point is chosen using statistics.
+
+    OrientDB starts executing MATCH queries at a location exposed with a "class:" clause. Instead
+    of exposing all locations with filters, the compiled query only exposes the location expected
+    to match the fewest vertices, estimated from the statistics of the schema info and from
+    the selectivity of the filters when given the specified parameters. If the class counts needed
+    for the estimate are not available, the query is compiled as in compile_graphql_to_match().
+
+    The compiled query still returns the correct results when executed with any arguments, but its
+    start point is only chosen for the given ones.
+
+    Args:
+        query_planning_schema_info: QueryPlanningSchemaInfo describing the schema of the graph to be
+                                    queried, and the statistics of the data in it
+        graphql_query: str, GraphQL query to compile to MATCH
+        parameters: dict, parameters with which the query will be executed
+        trusted: bool, if True, compile the query in trusted IR mode, skipping checks of the
+                 compiler's internal invariants. See trusted_mode.py for details.
+
+    Returns:
+        CompilationResult object
+    """
+    match_backend_with_statistics = backend.match_backend._replace(
+        lower_func=partial(
+            backend.match_backend.lower_func,
+            query_planning_schema_info=query_planning_schema_info,
+            parameters=parameters,
+        )
+    )
+    common_schema_info = CommonSchemaInfo(
+        query_planning_schema_info.schema, query_planning_schema_info.type_equivalence_hints
+    )
+    return _compile_graphql_generic(
+        match_backend_with_statistics, common_schema_info, graphql_query, trusted=trusted
+    )
 
 
 def compile_graphql_to_gremlin(
-    common_schema_info: CommonSchemaInfo, graphql_query: str
+    common_schema_info: CommonSchemaInfo,
+    graphql_query: str,
+    trusted: bool = False,
+    parameterized: bool = False,
 ) -> CompilationResult:
     """Compile the GraphQL input using the schema into a Gremlin query and associated metadata.
 
     Args:
         common_schema_info: GraphQL schema object describing the schema of the graph to be queried
         graphql_query: the GraphQL query to compile to Gremlin, as a string
+        trusted: bool, if True, compile the query in trusted IR mode, skipping checks of the
+                 compiler's internal invariants. See trusted_mode.py for details.
+        parameterized: bool, if True, the query of the result is a ParameterizedGremlinQuery,
+                       whose script refers to the arguments through bindings rather than
+                       placeholders for literals. See parameterize_gremlin_query() for details.
 
     Returns:
         CompilationResult object
     """
-    return _compile_graphql_generic(backend.gremlin_backend, common_schema_info, graphql_query)
+    compilation_result = _compile_graphql_generic(
+        backend.gremlin_backend, common_schema_info, graphql_query, trusted=trusted
+    )
+    if parameterized:
+        compilation_result = compilation_result._replace(
+            query=parameterize_gremlin_query(
+                compilation_result.query, compilation_result.input_metadata
+            )
+        )
+    return compilation_result
 
 
 def compile_graphql_to_sql(
-    sql_schema_info: SQLAlchemySchemaInfo, graphql_query: str
+    sql_schema_info: SQLAlchemySchemaInfo,
+    graphql_query: str,
+    trusted: bool = False,
+    precompile: bool = False,
 ) -> CompilationResult:
     """Compile the GraphQL input using the schema into a SQL query and associated metadata.
 
     Args:
         sql_schema_info: SQLAlchemySchemaInfo used to compile the query.
         graphql_query: str, GraphQL query to compile to SQL
+        trusted: bool, if True, compile the query in trusted IR mode, skipping checks of the
+                 compiler's internal invariants. See trusted_mode.py for details.
+        precompile: bool, if True, the query of the result is a PrecompiledSqlQuery containing
+                    the SQL text of the query in the dialect of the schema info, instead of
+                    a SQLAlchemy query. See precompile_sqlalchemy_query() for details.
 
     Returns:
         CompilationResult object
     """
-    return _compile_graphql_generic(backend.sql_backend, sql_schema_info, graphql_query)
+    compilation_result = _compile_graphql_generic(
+        backend.sql_backend, sql_schema_info, graphql_query, trusted=trusted
+    )
+    if precompile:
+        compilation_result = compilation_result._replace(
+            query=precompile_sqlalchemy_query(compilation_result.query, sql_schema_info.dialect)
+        )
+    return compilation_result
+
+
+def compile_graphql_to_sql_with_keyset_pagination(
+    sql_schema_info: SQLAlchemySchemaInfo,
+    graphql_query: str,
+    page_size: int,
+    trusted: bool = False,
+) -> CompilationResult:
+    """Compile the GraphQL input into SQL queries fetching its results one page at a time.
+
+    The statements are compiled once and page through the results in the order of the primary keys
+    of the queried vertices. Use get_keyset_page_query_and_arguments() in emit_sql.py to obtain
+    the statement and arguments fetching the page after the last seen result.
+
+    Args:
+        sql_schema_info: SQLAlchemySchemaInfo used to compile the query.
+        graphql_query: str, GraphQL query to compile to SQL
+        page_size: int, maximum number of results in each page
+        trusted: bool, if True, compile the query in trusted IR mode, skipping checks of the
+                 compiler's internal invariants. See trusted_mode.py for details.
+
+    Returns:
+        CompilationResult object, whose query is a KeysetPaginatedQuery
+    """
+    paginated_sql_backend = backend.sql_backend._replace(
+        emit_func=partial(emit_keyset_paginated_code_from_ir, page_size=page_size)
+    )
+    return _compile_graphql_generic(
+        paginated_sql_backend, sql_schema_info, graphql_query, trusted=trusted
+    )
 
 
 def compile_graphql_to_cypher(
-    common_schema_info: CommonSchemaInfo, graphql_query: str
+    common_schema_info: CommonSchemaInfo, graphql_query: str, trusted: bool = False
 ) -> CompilationResult:
     """Compile the GraphQL input using the schema into a Cypher query and associated metadata.
 
     Args:
         common_schema_info: GraphQL schema object describing the schema of the graph to be queried
         graphql_query: the GraphQL query to compile to Cypher, as a string
+        trusted: bool, if True, compile the query in trusted IR mode, skipping checks of the
+                 compiler's internal invariants. See trusted_mode.py for details.
 
     Returns:
         CompilationResult object
     """
-    return _compile_graphql_generic(backend.cypher_backend, common_schema_info, graphql_query)
+    return _compile_graphql_generic(
+        backend.cypher_backend, common_schema_info, graphql_query, trusted=trusted
+    )
+
+
+def compile_graphql_to_interpreter(
+    common_schema_info: CommonSchemaInfo, graphql_query: str, trusted: bool = False
+) -> CompilationResult:
+    """Compile the GraphQL input into a query executable over an in-memory graph.
+
+    Args:
+        common_schema_info: GraphQL schema object describing the schema of the graph to be queried
+        graphql_query: str, GraphQL query to compile
+        trusted: bool, if True, compile the query in trusted IR mode, skipping checks of the
+                 compiler's internal invariants. See trusted_mode.py for details.
+
+    Returns:
+        CompilationResult object, whose query is an InterpreterQuery. Use execute_query() in
+        the interpreter package to execute it over an InMemoryGraph.
+    """
+    return _compile_graphql_generic(
+        backend.interpreter_backend, common_schema_info, graphql_query, trusted=trusted
+    )
 
 
 def _compile_graphql_generic(
     target_backend: Backend,
     schema_info: Union[CommonSchemaInfo, SQLAlchemySchemaInfo],
     graphql_string: str,
+    trusted: bool = False,
 ) -> CompilationResult:
     """Compile the GraphQL input, lowering and emitting the query using the given functions.
 
@@ -95,10 +236,16 @@ def _compile_graphql_generic(
         target_backend: Backend used to compile the query
         schema_info: target_backend.schemaInfoClass containing all necessary schema information.
         graphql_string: str, GraphQL query to compile to the target language
+        trusted: bool, if True, compile the query in trusted IR mode. Otherwise, the trusted IR mode
+                 setting of the current context is used.
 
     Returns:
         CompilationResult object
     """
+    if trusted:
+        with trusted_ir_mode():
+            return _compile_graphql_generic(target_backend, schema_info, graphql_string)
+
     ir_and_metadata = graphql_to_ir(
         schema_info.schema,
         graphql_string,
@@ -2,26 +2,84 @@
 """Base classes for compiler entity objects like basic blocks and expressions."""
 
 from abc import ABCMeta, abstractmethod
-from typing import Any, Callable, Dict, Optional, Tuple, TypeVar, Union
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, TypeVar, Union
 
-from graphql import is_type
+from graphql import GraphQLList, GraphQLNamedType, GraphQLNonNull, is_type
 import six
 from sqlalchemy.sql.selectable import CTE, Alias
 
 from ..global_utils import is_same_type
+from .trusted_mode import skip_in_trusted_ir_mode
+
+
+def _get_graphql_type_key(graphql_type: Any) -> Hashable:
+    """Return a hashable key for a GraphQL type, equal for types that are is_same_type()."""
+    if isinstance(graphql_type, GraphQLNamedType):
+        return (type(graphql_type), graphql_type.name)
+    elif isinstance(graphql_type, GraphQLList):
+        return (GraphQLList, _get_graphql_type_key(graphql_type.of_type))
+    elif isinstance(graphql_type, GraphQLNonNull):
+        return (GraphQLNonNull, _get_graphql_type_key(graphql_type.of_type))
+    else:
+        raise AssertionError("Unexpected GraphQL type: {}".format(graphql_type))
+
+
+def get_structural_hash_key(value: Any) -> Hashable:
+    """Return a hashable value that is equal for any two structurally-equal CompilerEntity args.
+
+    CompilerEntity constructor arguments may contain GraphQL types, which are compared with
+    is_same_type() rather than "==", as well as unhashable containers like lists and dicts.
+    This function maps such values to hashable equivalents, leaving all other values unchanged.
+
+    Args:
+        value: any value passed as a constructor argument to a CompilerEntity
+
+    Returns:
+        hashable value, such that structurally-equal inputs produce equal outputs
+    """
+    if is_type(value):
+        return _get_graphql_type_key(value)
+    elif isinstance(value, (list, tuple)):
+        return tuple(get_structural_hash_key(element) for element in value)
+    elif isinstance(value, dict):
+        return frozenset(
+            (key, get_structural_hash_key(element)) for key, element in six.iteritems(value)
+        )
+    elif isinstance(value, (set, frozenset)):
+        return frozenset(get_structural_hash_key(element) for element in value)
+    else:
+        return value
 
 
 @six.python_2_unicode_compatible
 @six.add_metaclass(ABCMeta)
 class CompilerEntity(object):
-    """An abstract compiler entity. Can represent things like basic blocks and expressions."""
+    """An abstract compiler entity. Can represent things like basic blocks and expressions.
+
+    CompilerEntity objects are immutable once constructed: compiler passes that need a changed
+    entity construct a new one instead. This allows CompilerEntity objects to be compared and
+    hashed structurally, based on the arguments they were constructed with, and the hash value to
+    be computed at most once per object.
+    """
+
+    __slots__ = ("_print_args", "_print_kwargs", "_cached_hash")
 
-    __slots__ = ("_print_args", "_print_kwargs")
+    # Whether validate() may raise errors caused by invalid queries, rather than by compiler bugs.
+    # The validate() methods of all other entities are skipped in trusted IR mode.
+    _has_user_facing_validation = False
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        """Make the validate() method defined by the subclass, if any, respect trusted IR mode."""
+        super(CompilerEntity, cls).__init_subclass__(**kwargs)  # type: ignore
+        validate_method = cls.__dict__.get("validate", None)
+        if validate_method is not None and not cls._has_user_facing_validation:
+            cls.validate = skip_in_trusted_ir_mode(validate_method)  # type: ignore
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         """Construct a new CompilerEntity."""
         self._print_args = args
         self._print_kwargs = kwargs
+        self._cached_hash: Optional[int] = None
 
     @abstractmethod
     def validate(self) -> None:
@@ -48,9 +106,21 @@ class CompilerEntity(object):
     # pylint: disable=protected-access
     def __eq__(self, other: Any) -> bool:
         """Return True if the CompilerEntity objects are equal, and False otherwise."""
+        if self is other:
+            return True
+
         if type(self) != type(other):
             return False
 
+        # If both hash values have already been computed, differing hashes imply inequality.
+        # This avoids recursively comparing large subtrees of entities that are not equal.
+        if (
+            self._cached_hash is not None
+            and other._cached_hash is not None
+            and self._cached_hash != other._cached_hash
+        ):
+            return False
+
         if len(self._print_args) != len(other._print_args):
             return False
 
@@ -72,11 +142,53 @@ class CompilerEntity(object):
         """Check another object for non-equality against this one."""
         return not self.__eq__(other)
 
+    def __hash__(self) -> int:
+        """Return the structural hash of this CompilerEntity, consistent with its equality."""
+        cached_hash = self._cached_hash
+        if cached_hash is None:
+            cached_hash = hash(
+                (
+                    type(self),
+                    get_structural_hash_key(self._print_args),
+                    get_structural_hash_key(self._print_kwargs),
+                )
+            )
+            self._cached_hash = cached_hash
+        return cached_hash
+
     def to_gremlin(self) -> str:
         """Return the Gremlin unicode string representation of this object."""
         raise NotImplementedError()
 
 
+CompilerEntityT = TypeVar("CompilerEntityT", bound=CompilerEntity)
+
+
+class InterningTable(object):
+    """A table of canonical CompilerEntity objects, used to share structurally-equal entities.
+
+    Interning an entity returns the first interned entity that is equal to it. Since entities are
+    immutable, the canonical entity may be used in place of any entity equal to it. Using intern()
+    as the visitor function of Expression.visit_and_update() or
+    BasicBlock.visit_and_update_expressions() makes all structurally-equal subexpressions refer
+    to the same object, so that comparing them is a simple identity check.
+    """
+
+    __slots__ = ("_canonical_entities",)
+
+    def __init__(self) -> None:
+        """Construct a new empty InterningTable."""
+        self._canonical_entities: Dict[CompilerEntity, CompilerEntity] = {}
+
+    def intern(self, entity: CompilerEntityT) -> CompilerEntityT:
+        """Return the canonical entity equal to the given one, recording it if not yet seen."""
+        return self._canonical_entities.setdefault(entity, entity)  # type: ignore
+
+    def __len__(self) -> int:
+        """Return the number of distinct entities recorded in the table."""
+        return len(self._canonical_entities)
+
+
 AliasType = Union[Alias, CTE]
 AliasesDictType = Dict[Tuple[Tuple[str, ...], Optional[Tuple[Tuple[str, str], ...]],], AliasType]
 
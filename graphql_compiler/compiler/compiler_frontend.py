@@ -66,6 +66,7 @@ from graphql import (
     GraphQLInterfaceType,
     GraphQLList,
     GraphQLObjectType,
+    GraphQLOutputType,
     GraphQLType,
     GraphQLUnionType,
 )
@@ -133,7 +134,7 @@ class OutputMetadata(NamedTuple):
     """Metadata about a query's outputs."""
 
     # The type of the output value.
-    type: GraphQLType
+    type: GraphQLOutputType
 
     # Whether the output is part of an optional traversal, which would allow a value of null.
     optional: bool
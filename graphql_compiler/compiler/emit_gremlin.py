@@ -1,5 +1,47 @@
 # Copyright 2017-present Kensho Technologies, LLC.
 """Convert lowered IR basic blocks to Gremlin query strings."""
+from collections import namedtuple
+from string import Template
+
+from graphql import GraphQLList
+
+from ..global_utils import is_same_type
+from ..schema import GraphQLDecimal
+from .helpers import strip_non_null_from_type
+
+
+# Prefix of the name of the binding holding the value of each argument of a parameterized query.
+# It keeps bindings from shadowing the variables used in the Gremlin code emitted by the compiler.
+GREMLIN_BINDING_NAME_PREFIX = "graphql_arg_"
+
+
+ParameterizedGremlinQuery = namedtuple(
+    "ParameterizedGremlinQuery",
+    (
+        # str, Gremlin script referring to the value of each argument through a binding, instead of
+        # containing it as a literal. It is the same for all argument values, so the Gremlin server
+        # can reuse its compiled form across executions.
+        "script",
+        # Tuple of (str, str, GraphQL type) tuples, the name of each argument of the query,
+        # the name of the binding holding its value, and its type.
+        "bindings",
+    ),
+)
+
+
+def _get_binding_reference(binding_name, argument_type):
+    """Return the Gremlin expression for the value of the argument with the given binding."""
+    stripped_type = strip_non_null_from_type(argument_type)
+    # Decimal values are bound as strings, since the server's serialization format may not be able
+    # to represent them exactly, and converted to BigDecimal in the script instead.
+    if is_same_type(GraphQLDecimal, stripped_type):
+        return "(new BigDecimal({}))".format(binding_name)
+    elif isinstance(stripped_type, GraphQLList) and is_same_type(
+        GraphQLDecimal, strip_non_null_from_type(stripped_type.of_type)
+    ):
+        return "({}.collect{{ new BigDecimal(it) }})".format(binding_name)
+    else:
+        return binding_name
 
 
 ##############
@@ -16,3 +58,31 @@ def emit_code_from_ir(schema_info, ir_blocks):
     non_empty_steps = (step for step in gremlin_steps if step)
 
     return ".".join(non_empty_steps)
+
+
+def parameterize_gremlin_query(query, input_metadata):
+    """Return a ParameterizedGremlinQuery that binds the arguments of the compiled query.
+
+    The arguments of compiled Gremlin queries are referred to as $name placeholders, into which
+    insert_arguments_into_gremlin_query() interpolates literals, producing a different script for
+    every set of argument values. Instead, the parameterized query refers to each argument through
+    a binding sent to the Gremlin server alongside the script.
+
+    Args:
+        query: str, compiled Gremlin query, as in the CompilationResult of the query
+        input_metadata: dict, name of input variables -> inferred GraphQL type, as in the
+                        CompilationResult of the query
+
+    Returns:
+        ParameterizedGremlinQuery object
+    """
+    binding_references = {}
+    bindings = []
+    for argument_name, argument_type in sorted(input_metadata.items()):
+        binding_name = GREMLIN_BINDING_NAME_PREFIX + argument_name
+        binding_references[argument_name] = _get_binding_reference(binding_name, argument_type)
+        bindings.append((argument_name, binding_name, argument_type))
+
+    # Substituting the placeholders also turns each "$$" back into a literal "$".
+    script = Template(query).substitute(binding_references)
+    return ParameterizedGremlinQuery(script=script, bindings=tuple(bindings))
@@ -0,0 +1,609 @@
+# Copyright 2020-present Kensho Technologies, LLC.
+"""Compile IR blocks into a pipeline of operations executable over an in-memory graph.
+
+Instead of query text, the interpreter backend emits an InterpreterQuery: a sequence of
+operations, one per IR block, each consuming and producing an iterator of partial results.
+A partial result is a _Row with the vertex at the current position in the query, and the vertex
+marked at each location visited so far. Since the operations are chained generators, results are
+produced one at a time, without materializing intermediate results.
+
+The operations follow the semantics of the query language shared by all backends:
+    - an @optional traversal without neighbors produces a row with a null current vertex, and
+      all filters, type coercions and traversals within its scope leave such rows unchanged;
+      if neighbors exist, the traversal behaves as a regular traversal;
+    - @recurse produces each distinct vertex within the given depth, including the starting one;
+    - @fold collects the vertices at each location in its scope, over all paths through the scope
+      satisfying its filters, and marks the list of vertices at each location;
+    - comparisons with null values are false, except for equality with null as used by
+      the "is_null" and "is_not_null" filters.
+Vertex properties and query arguments are expected to have the Python types produced by
+deserialization.py, and are compared directly.
+"""
+from collections import namedtuple
+import operator as python_operator
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from graphql import GraphQLList
+
+from ..schema import COUNT_META_FIELD_NAME, TYPENAME_META_FIELD_NAME
+from .blocks import (
+    Backtrack,
+    CoerceType,
+    ConstructResult,
+    EndOptional,
+    Filter,
+    Fold,
+    GlobalOperationsStart,
+    MarkLocation,
+    OutputSource,
+    QueryRoot,
+    Recurse,
+    Traverse,
+    Unfold,
+)
+from .expressions import (
+    BinaryComposition,
+    ContextField,
+    ContextFieldExistence,
+    FoldCountContextField,
+    FoldedContextField,
+    GlobalContextField,
+    Literal,
+    LocalField,
+    OutputContextField,
+    TernaryConditional,
+    UnaryTransformation,
+    Variable,
+)
+from .helpers import FoldScopeLocation, get_edge_direction_and_name, strip_non_null_from_type
+from .subclass import compute_subclass_sets
+
+
+_Row = namedtuple(
+    "_Row",
+    (
+        "vertex",  # Vertex at the current position, or None within an unmatched @optional scope
+        "bindings",  # dict, location -> Vertex or None, or list of Vertex for fold scope locations
+    ),
+)
+
+
+InterpreterQuery = namedtuple(
+    "InterpreterQuery",
+    (
+        # Tuple of functions, each called with an iterator of rows, the graph and the query
+        # arguments, and returning an iterator of rows. The last one returns result dicts.
+        "operations",
+    ),
+)
+
+
+# Type of the functions evaluating expressions, given a row, the graph and the query arguments.
+_Evaluator = Callable[[_Row, Any, Dict[str, Any]], Any]
+# Type of the functions implementing each IR block.
+_Operation = Callable[[Iterator[Any], Any, Dict[str, Any]], Iterator[Any]]
+
+
+def _compare_non_null(compare: Callable[[Any, Any], bool]) -> Callable[[Any, Any], bool]:
+    """Return a comparison that is false if either value is null."""
+
+    def compare_non_null(left: Any, right: Any) -> bool:
+        """Compare the values, unless either of them is null."""
+        return left is not None and right is not None and compare(left, right)
+
+    return compare_non_null
+
+
+def _intersects(left: Any, right: Any) -> bool:
+    """Return True if the two collections have any element in common."""
+    return not set(left).isdisjoint(right)
+
+
+_BINARY_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "=": python_operator.eq,
+    "!=": _compare_non_null(python_operator.ne),
+    ">=": _compare_non_null(python_operator.ge),
+    "<=": _compare_non_null(python_operator.le),
+    ">": _compare_non_null(python_operator.gt),
+    "<": _compare_non_null(python_operator.lt),
+    "contains": _compare_non_null(python_operator.contains),
+    "not_contains": _compare_non_null(lambda left, right: right not in left),
+    "intersects": _compare_non_null(_intersects),
+    "has_substring": _compare_non_null(python_operator.contains),
+    "starts_with": _compare_non_null(lambda left, right: left.startswith(right)),
+    "ends_with": _compare_non_null(lambda left, right: left.endswith(right)),
+}
+
+
+def _get_vertex_field_value(vertex: Any, field_name: str) -> Any:
+    """Return the value of the property or meta field of the vertex, or None if it is null."""
+    if vertex is None:
+        return None
+    if field_name == TYPENAME_META_FIELD_NAME:
+        return vertex.class_name
+    return vertex.properties.get(field_name)
+
+
+def _compile_local_field(expression: LocalField) -> _Evaluator:
+    """Return an evaluator of a field of the vertex at the current position."""
+    field_name = expression.field_name
+    field_type = strip_non_null_from_type(expression.field_type)
+    if isinstance(field_type, GraphQLList) and field_name.startswith(("in_", "out_")):
+        # Vertex fields are used by the "has_edge_degree" filter, and evaluate to
+        # the list of neighbors of the vertex, or to None if there are none.
+        edge_direction, edge_name = get_edge_direction_and_name(field_name)
+
+        def evaluate_vertex_field(row: _Row, graph: Any, parameters: Dict[str, Any]) -> Any:
+            """Return the neighbors of the current vertex, or None if there are none."""
+            neighbors = graph.get_neighbors(row.vertex, edge_name, edge_direction)
+            return neighbors if neighbors else None
+
+        return evaluate_vertex_field
+
+    def evaluate_local_field(row: _Row, graph: Any, parameters: Dict[str, Any]) -> Any:
+        """Return the value of the field at the current vertex."""
+        return _get_vertex_field_value(row.vertex, field_name)
+
+    return evaluate_local_field
+
+
+def _compile_context_field(
+    expression: Union[ContextField, GlobalContextField, OutputContextField]
+) -> _Evaluator:
+    """Return an evaluator of a field of the vertex marked at a location."""
+    vertex_location = expression.location.at_vertex()
+    location_field = expression.location.field
+    if location_field is None:
+        raise AssertionError(f"Expected a location with a field, but got: {expression}")
+    field_name = location_field
+
+    def evaluate_context_field(row: _Row, graph: Any, parameters: Dict[str, Any]) -> Any:
+        """Return the value of the field at the vertex marked at the location."""
+        return _get_vertex_field_value(row.bindings[vertex_location], field_name)
+
+    return evaluate_context_field
+
+
+def _compile_folded_context_field(
+    expression: Union[FoldedContextField, FoldCountContextField]
+) -> _Evaluator:
+    """Return an evaluator of the list of values of a field, or their count, within a fold."""
+    vertex_location = expression.fold_scope_location.at_vertex()
+    location_field = expression.fold_scope_location.field
+    if location_field is None:
+        raise AssertionError(f"Expected a location with a field, but got: {expression}")
+    field_name = location_field
+    if isinstance(expression, FoldCountContextField) or field_name == COUNT_META_FIELD_NAME:
+
+        def evaluate_fold_count(row: _Row, graph: Any, parameters: Dict[str, Any]) -> Any:
+            """Return the number of vertices in the fold."""
+            return len(row.bindings[vertex_location])
+
+        return evaluate_fold_count
+
+    def evaluate_folded_field(row: _Row, graph: Any, parameters: Dict[str, Any]) -> Any:
+        """Return the list of values of the field, over the vertices in the fold."""
+        return [
+            _get_vertex_field_value(vertex, field_name) for vertex in row.bindings[vertex_location]
+        ]
+
+    return evaluate_folded_field
+
+
+def _compile_expression(expression: Any) -> _Evaluator:
+    """Return a function evaluating the expression, given a row, the graph and the arguments."""
+    if isinstance(expression, Literal):
+        value = expression.value
+        return lambda row, graph, parameters: value
+    elif isinstance(expression, Variable):
+        parameter_name = expression.variable_name[1:]
+        return lambda row, graph, parameters: parameters[parameter_name]
+    elif isinstance(expression, LocalField):
+        return _compile_local_field(expression)
+    elif isinstance(expression, (ContextField, GlobalContextField, OutputContextField)):
+        return _compile_context_field(expression)
+    elif isinstance(expression, (FoldedContextField, FoldCountContextField)):
+        return _compile_folded_context_field(expression)
+    elif isinstance(expression, ContextFieldExistence):
+        location = expression.location
+        return lambda row, graph, parameters: row.bindings[location] is not None
+    elif isinstance(expression, UnaryTransformation):
+        if expression.operator != "size":
+            raise NotImplementedError(
+                f"Unary operator {expression.operator} is not supported by the interpreter."
+            )
+        evaluate_inner = _compile_expression(expression.inner_expression)
+
+        def evaluate_size(row: _Row, graph: Any, parameters: Dict[str, Any]) -> Any:
+            """Return the size of the collection, or None if it is null."""
+            value = evaluate_inner(row, graph, parameters)
+            return None if value is None else len(value)
+
+        return evaluate_size
+    elif isinstance(expression, TernaryConditional):
+        evaluate_predicate = _compile_expression(expression.predicate)
+        evaluate_if_true = _compile_expression(expression.if_true)
+        evaluate_if_false = _compile_expression(expression.if_false)
+
+        def evaluate_conditional(row: _Row, graph: Any, parameters: Dict[str, Any]) -> Any:
+            """Evaluate one of the two expressions, depending on the value of the predicate."""
+            if evaluate_predicate(row, graph, parameters):
+                return evaluate_if_true(row, graph, parameters)
+            return evaluate_if_false(row, graph, parameters)
+
+        return evaluate_conditional
+    elif isinstance(expression, BinaryComposition):
+        return _compile_binary_composition(expression)
+    else:
+        raise AssertionError(f"Unexpected expression {expression} in the IR.")
+
+
+def _compile_binary_composition(expression: BinaryComposition) -> _Evaluator:
+    """Return an evaluator of the BinaryComposition, short-circuiting boolean operators."""
+    evaluate_left = _compile_expression(expression.left)
+    evaluate_right = _compile_expression(expression.right)
+
+    if expression.operator == "&&":
+
+        def evaluate_and(row: _Row, graph: Any, parameters: Dict[str, Any]) -> Any:
+            """Return True if both expressions are true."""
+            return bool(evaluate_left(row, graph, parameters)) and bool(
+                evaluate_right(row, graph, parameters)
+            )
+
+        return evaluate_and
+    elif expression.operator == "||":
+
+        def evaluate_or(row: _Row, graph: Any, parameters: Dict[str, Any]) -> Any:
+            """Return True if either expression is true."""
+            return bool(evaluate_left(row, graph, parameters)) or bool(
+                evaluate_right(row, graph, parameters)
+            )
+
+        return evaluate_or
+
+    apply_operator = _BINARY_OPERATORS.get(expression.operator)
+    is_null_check = any(
+        isinstance(operand, Literal) and operand.value is None
+        for operand in (expression.left, expression.right)
+    )
+    if expression.operator == "!=" and is_null_check:
+        # Checks for non-null values, unlike other comparisons, are true for non-null values.
+        apply_operator = python_operator.ne
+    if apply_operator is None:
+        raise NotImplementedError(
+            f"Binary operator {expression.operator} is not supported by the interpreter."
+        )
+    operator_function = apply_operator
+
+    def evaluate_binary_composition(row: _Row, graph: Any, parameters: Dict[str, Any]) -> Any:
+        """Apply the operator to the values of both expressions."""
+        return operator_function(
+            evaluate_left(row, graph, parameters), evaluate_right(row, graph, parameters)
+        )
+
+    return evaluate_binary_composition
+
+
+def _get_index_lookup(
+    predicate: Any,
+) -> Optional[Tuple[str, str, Callable[[Dict[str, Any]], Any]]]:
+    """Return how to look up vertices satisfying the filter predicate in an index, if possible.
+
+    Args:
+        predicate: Expression, the predicate of a Filter block at the root vertex of the query
+
+    Returns:
+        None if the predicate does not compare a property to a runtime argument or literal in a way
+        indexes support. Otherwise, a tuple (property name, operator, function returning the value
+        to compare to given the query arguments), for InMemoryGraph.find_vertices().
+    """
+    if not isinstance(predicate, BinaryComposition):
+        return None
+
+    if predicate.operator == "contains":
+        # "in_collection" filters are represented as the collection containing the local field.
+        collection, field = predicate.left, predicate.right
+        operator = "in_collection"
+    elif predicate.operator in ("=", "<", "<=", ">", ">="):
+        field, value = predicate.left, predicate.right
+        operator = predicate.operator
+        if isinstance(value, LocalField):
+            # Normalize to the local field being on the left side of the comparison.
+            field, value = value, field
+            operator = {"<": ">", "<=": ">=", ">": "<", ">=": "<="}.get(operator, operator)
+        collection = value
+    else:
+        return None
+
+    if not isinstance(field, LocalField) or not isinstance(collection, (Variable, Literal)):
+        return None
+    if isinstance(collection, Literal) and collection.value is None:
+        return None
+    evaluate_value = _compile_expression(collection)
+    return (
+        field.field_name,
+        operator,
+        lambda parameters: evaluate_value(_Row(None, {}), None, parameters),
+    )
+
+
+def _make_query_root_operation(start_classes: Set[str], root_filters: List[Filter]) -> _Operation:
+    """Return the operation producing a row for each vertex at the root of the query."""
+    index_lookups = [
+        lookup
+        for lookup in (_get_index_lookup(root_filter.predicate) for root_filter in root_filters)
+        if lookup is not None
+    ]
+
+    def query_root(rows: Iterator[_Row], graph: Any, parameters: Dict[str, Any]) -> Iterator[_Row]:
+        """Yield a row for each root vertex, using an index to narrow them down if possible."""
+        for row in rows:
+            vertices = None
+            for property_name, operator, get_value in index_lookups:
+                vertices = graph.find_vertices(
+                    start_classes, property_name, operator, get_value(parameters)
+                )
+                if vertices is not None:
+                    break
+            if vertices is None:
+                vertices = graph.get_vertices(start_classes)
+            # The filters are still applied to the vertices found in the index, by the operations
+            # following this one.
+            for vertex in vertices:
+                yield _Row(vertex, row.bindings)
+
+    return query_root
+
+
+def _make_traverse_operation(block: Traverse) -> _Operation:
+    """Return the operation producing a row for each neighbor of the current vertex."""
+    direction, edge_name, optional = block.direction, block.edge_name, block.optional
+
+    def traverse(rows: Iterator[_Row], graph: Any, parameters: Dict[str, Any]) -> Iterator[_Row]:
+        """Yield the rows of the neighbors, or a null row if an optional edge does not exist."""
+        for row in rows:
+            if row.vertex is None:
+                # Within an @optional scope that was not matched.
+                yield row
+                continue
+            neighbors = graph.get_neighbors(row.vertex, edge_name, direction)
+            if optional and not neighbors:
+                yield _Row(None, row.bindings)
+            for neighbor in neighbors:
+                yield _Row(neighbor, row.bindings)
+
+    return traverse
+
+
+def _make_recurse_operation(block: Recurse) -> _Operation:
+    """Return the operation producing a row for each vertex within the depth of recursion."""
+    direction, edge_name, depth = block.direction, block.edge_name, block.depth
+
+    def recurse(rows: Iterator[_Row], graph: Any, parameters: Dict[str, Any]) -> Iterator[_Row]:
+        """Yield the row of each distinct vertex within the depth, including the starting one."""
+        for row in rows:
+            if row.vertex is None:
+                # Within an @optional scope that was not matched.
+                yield row
+                continue
+            seen_vertex_ids = {row.vertex.vertex_id}
+            current_level = [row.vertex]
+            yield row
+            for _ in range(depth):
+                next_level = []
+                for vertex in current_level:
+                    for neighbor in graph.get_neighbors(vertex, edge_name, direction):
+                        if neighbor.vertex_id not in seen_vertex_ids:
+                            seen_vertex_ids.add(neighbor.vertex_id)
+                            next_level.append(neighbor)
+                            yield _Row(neighbor, row.bindings)
+                current_level = next_level
+
+    return recurse
+
+
+def _make_coerce_type_operation(allowed_classes: Set[str]) -> _Operation:
+    """Return the operation discarding rows whose current vertex is not of the allowed classes."""
+
+    def coerce_type(rows: Iterator[_Row], graph: Any, parameters: Dict[str, Any]) -> Iterator[_Row]:
+        """Yield the rows whose current vertex is of an allowed class, or is null."""
+        for row in rows:
+            if row.vertex is None or row.vertex.class_name in allowed_classes:
+                yield row
+
+    return coerce_type
+
+
+def _make_filter_operation(block: Filter, is_global: bool) -> _Operation:
+    """Return the operation discarding rows not satisfying the filter predicate."""
+    evaluate_predicate = _compile_expression(block.predicate)
+
+    def filter_rows(rows: Iterator[_Row], graph: Any, parameters: Dict[str, Any]) -> Iterator[_Row]:
+        """Yield the rows satisfying the predicate, and those within unmatched optional scopes."""
+        for row in rows:
+            if (row.vertex is None and not is_global) or evaluate_predicate(row, graph, parameters):
+                yield row
+
+    return filter_rows
+
+
+def _make_mark_location_operation(block: MarkLocation) -> _Operation:
+    """Return the operation marking the current vertex at the location."""
+    location = block.location
+
+    def mark_location(
+        rows: Iterator[_Row], graph: Any, parameters: Dict[str, Any]
+    ) -> Iterator[_Row]:
+        """Yield the rows, with the location bound to their current vertex."""
+        for row in rows:
+            bindings = dict(row.bindings)
+            bindings[location] = row.vertex
+            yield _Row(row.vertex, bindings)
+
+    return mark_location
+
+
+def _make_backtrack_operation(block: Backtrack) -> _Operation:
+    """Return the operation moving the current position back to an already visited location."""
+    location = block.location
+
+    def backtrack(rows: Iterator[_Row], graph: Any, parameters: Dict[str, Any]) -> Iterator[_Row]:
+        """Yield the rows, with the vertex marked at the location as their current vertex."""
+        for row in rows:
+            yield _Row(row.bindings[location], row.bindings)
+
+    return backtrack
+
+
+def _make_fold_operation(
+    block: Fold, fold_operations: List[_Operation], folded_locations: List[FoldScopeLocation]
+) -> _Operation:
+    """Return the operation binding the lists of vertices at each location within the fold."""
+    direction, edge_name = block.fold_scope_location.get_first_folded_edge()
+
+    def fold(rows: Iterator[_Row], graph: Any, parameters: Dict[str, Any]) -> Iterator[_Row]:
+        """Yield the rows, with each location within the fold bound to its list of vertices."""
+        for row in rows:
+            # Within an unmatched @optional scope, all folded lists are empty.
+            neighbors = (
+                graph.get_neighbors(row.vertex, edge_name, direction)
+                if row.vertex is not None
+                else []
+            )
+            fold_rows: Iterator[_Row] = (_Row(neighbor, row.bindings) for neighbor in neighbors)
+            for operation in fold_operations:
+                fold_rows = operation(fold_rows, graph, parameters)
+
+            bindings = dict(row.bindings)
+            folded_vertices: List[List[Any]] = [[] for _ in folded_locations]
+            for fold_row in fold_rows:
+                for location, vertices in zip(folded_locations, folded_vertices):
+                    vertices.append(fold_row.bindings[location])
+            bindings.update(zip(folded_locations, folded_vertices))
+            yield _Row(row.vertex, bindings)
+
+    return fold
+
+
+def _make_construct_result_operation(block: ConstructResult) -> _Operation:
+    """Return the operation producing a result dict for each row."""
+    output_evaluators = [
+        (output_name, _compile_expression(expression))
+        for output_name, expression in block.fields.items()
+    ]
+
+    def construct_result(
+        rows: Iterator[_Row], graph: Any, parameters: Dict[str, Any]
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield the result dict of each row."""
+        for row in rows:
+            yield {
+                output_name: evaluate(row, graph, parameters)
+                for output_name, evaluate in output_evaluators
+            }
+
+    return construct_result
+
+
+def _get_allowed_classes(class_names: Set[str], subclass_sets: Dict[str, Set[str]]) -> Set[str]:
+    """Return the names of all vertex classes that belong to any of the given classes."""
+    allowed_classes: Set[str] = set()
+    for class_name in class_names:
+        allowed_classes.update(subclass_sets[class_name])
+    return allowed_classes
+
+
+def _compile_blocks(
+    ir_blocks: List[Any], subclass_sets: Dict[str, Set[str]]
+) -> Tuple[List[_Operation], List[FoldScopeLocation]]:
+    """Return the operations implementing the blocks, and the fold scope locations they mark."""
+    operations: List[_Operation] = []
+    marked_fold_scope_locations: List[FoldScopeLocation] = []
+    is_global = False
+    index = 0
+    while index < len(ir_blocks):
+        block = ir_blocks[index]
+        if isinstance(block, QueryRoot):
+            root_filters = []
+            for next_block in ir_blocks[index + 1 :]:
+                if not isinstance(next_block, Filter):
+                    break
+                root_filters.append(next_block)
+            start_classes = _get_allowed_classes(block.start_class, subclass_sets)
+            operations.append(_make_query_root_operation(start_classes, root_filters))
+        elif isinstance(block, Traverse):
+            operations.append(_make_traverse_operation(block))
+        elif isinstance(block, Recurse):
+            operations.append(_make_recurse_operation(block))
+        elif isinstance(block, CoerceType):
+            allowed_classes = _get_allowed_classes(block.target_class, subclass_sets)
+            operations.append(_make_coerce_type_operation(allowed_classes))
+        elif isinstance(block, Filter):
+            operations.append(_make_filter_operation(block, is_global))
+        elif isinstance(block, MarkLocation):
+            if isinstance(block.location, FoldScopeLocation):
+                marked_fold_scope_locations.append(block.location)
+            operations.append(_make_mark_location_operation(block))
+        elif isinstance(block, Backtrack):
+            operations.append(_make_backtrack_operation(block))
+        elif isinstance(block, Fold):
+            unfold_index = index + 1
+            while not isinstance(ir_blocks[unfold_index], Unfold):
+                unfold_index += 1
+            fold_operations, folded_locations = _compile_blocks(
+                ir_blocks[index + 1 : unfold_index], subclass_sets
+            )
+            operations.append(_make_fold_operation(block, fold_operations, folded_locations))
+            index = unfold_index
+        elif isinstance(block, GlobalOperationsStart):
+            is_global = True
+        elif isinstance(block, ConstructResult):
+            operations.append(_make_construct_result_operation(block))
+        elif isinstance(block, (EndOptional, OutputSource)):
+            pass  # These blocks only mark positions in the query, and need no operation.
+        else:
+            raise AssertionError(f"Unexpected block {block} in the IR: {ir_blocks}")
+        index += 1
+
+    return operations, marked_fold_scope_locations
+
+
+##############
+# Public API #
+##############
+
+
+def emit_code_from_ir(schema_info, ir):
+    """Return an InterpreterQuery executing the IR over an in-memory graph.
+
+    Args:
+        schema_info: CommonSchemaInfo containing all relevant schema information
+        ir: IrAndMetadata, as returned by lower_ir in ir_lowering_interpreter
+
+    Returns:
+        InterpreterQuery object
+    """
+    subclass_sets = compute_subclass_sets(
+        schema_info.schema, type_equivalence_hints=schema_info.type_equivalence_hints
+    )
+    operations, _ = _compile_blocks(ir.ir_blocks, subclass_sets)
+    return InterpreterQuery(operations=tuple(operations))
+
+
+def execute_interpreter_query(interpreter_query, graph, arguments):
+    """Lazily yield the results of the InterpreterQuery over the graph, with the given arguments.
+
+    Args:
+        interpreter_query: InterpreterQuery, as returned by emit_code_from_ir
+        graph: InMemoryGraph containing the data to query
+        arguments: dict, mapping argument name to its value, for every parameter the query expects.
+                   The arguments are expected to already be validated.
+
+    Yields:
+        dict, output name -> value, for each result of the query
+    """
+    results = iter((_Row(None, {}),))
+    for operation in interpreter_query.operations:
+        results = operation(results, graph, arguments)
+    yield from results
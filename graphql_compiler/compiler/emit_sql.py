@@ -1,7 +1,9 @@
 # Copyright 2018-present Kensho Technologies, LLC.
 """Transform a SqlNode tree into an executable SQLAlchemy query."""
+from abc import ABCMeta, abstractmethod
 from dataclasses import dataclass
-from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple, Union
+from threading import Lock
+from typing import Any, Dict, Iterator, List, Mapping, NamedTuple, Optional, Set, Tuple, Type, Union
 
 import six
 import sqlalchemy
@@ -40,10 +42,22 @@ from .metadata import LocationInfo
 CTE_DEPTH_NAME = "__cte_depth"
 CTE_KEY_NAME = "__cte_key"
 
+# Formatting strings for the outputs and bound parameters of keyset-paginated queries
+KEYSET_KEY_OUTPUT_FORMAT_STRING = "__keyset_key_{}"
+KEYSET_LAST_KEY_PARAMETER_FORMAT_STRING = "__keyset_last_key_{}"
+
 # Formatting strings for intermediate queries/outputs from folds
 FOLD_OUTPUT_FORMAT_STRING = "fold_output_{}"
 FOLD_SUBQUERY_FORMAT_STRING = "folded_subquery_{}"
 
+# Representations of folded outputs in the results of queries compiled with each fold strategy.
+FOLD_RESULT_ENCODING_NATIVE_LIST = "native_list"  # a list of values, as returned by the DB-API
+FOLD_RESULT_ENCODING_XML_PATH = "xml_path"  # see _get_mssql_xml_path_column
+FOLD_RESULT_ENCODING_JSON_PATH = "json_path"  # see _get_mssql_json_path_column
+
+# Key under which each folded value is found in the JSON objects produced by FOR JSON PATH.
+FOLD_JSON_PATH_VALUE_KEY = "value"
+
 
 def _traverse_and_validate_blocks(ir: IrAndMetadata) -> Iterator[BasicBlock]:
     """Yield all blocks, while validating consistency."""
@@ -201,6 +215,62 @@ class SQLFoldTraversalDescriptor(NamedTuple):
     to_table: Alias
 
 
+class KeysetPaginatedQuery(NamedTuple):
+    """Describes the SQL statements that page through the results of a query in keyset order.
+
+    Results are ordered by the primary keys of all vertices in the query that are outside folds,
+    which together identify each result uniquely. The first page is fetched with first_page_query,
+    and each following page is fetched with next_page_query, binding the key of the last result of
+    the previous page to the last_key_parameter_names parameters. Since each page continues after
+    the last seen key, rather than skipping a number of rows, every page is an index range scan
+    of the same cost, and all pages except the last contain exactly page_size results.
+    """
+
+    # Statement fetching the first page of results.
+    first_page_query: Select
+
+    # Statement fetching the page of results after a given key.
+    next_page_query: Select
+
+    # Names of the outputs containing the key of each result, in the order the results are sorted.
+    key_output_names: Tuple[str, ...]
+
+    # Names of the parameters of next_page_query receiving the key of the last seen result,
+    # in the same order as key_output_names.
+    last_key_parameter_names: Tuple[str, ...]
+
+    # Maximum number of results in each page.
+    page_size: int
+
+
+def get_keyset_page_query_and_arguments(
+    paginated_query: KeysetPaginatedQuery,
+    arguments: Dict[str, Any],
+    last_result: Optional[Mapping[str, Any]] = None,
+) -> Tuple[Select, Dict[str, Any]]:
+    """Return the statement and arguments fetching the page of results after the given result.
+
+    Args:
+        paginated_query: KeysetPaginatedQuery, as returned by emit_keyset_paginated_code_from_ir
+        arguments: Dict[str, Any], parameter name -> value, for every parameter of the query
+        last_result: optional mapping of output name -> value, the last result of the previous
+                     page. If None, the statement and arguments of the first page are returned.
+
+    Returns:
+        tuple (SQLAlchemy Select, dict of parameter name -> value), to be executed after binding
+        the arguments to the statement, e.g. with insert_arguments_into_sql_query
+    """
+    if last_result is None:
+        return paginated_query.first_page_query, arguments
+
+    page_arguments = dict(arguments)
+    for key_output_name, last_key_parameter_name in zip(
+        paginated_query.key_output_names, paginated_query.last_key_parameter_names
+    ):
+        page_arguments[last_key_parameter_name] = last_result[key_output_name]
+    return paginated_query.next_page_query, page_arguments
+
+
 class XMLPathBinaryExpression(BinaryExpression):
     """Special override of BinaryExpression used to trigger `compile_xmlpath` during compile.
 
@@ -271,6 +341,34 @@ def _construct_traversal_joins(traversals: List[SQLFoldTraversalDescriptor]) ->
     return join_clause
 
 
+def _add_correlated_fold_traversals(
+    select_statement: Select, traversals: List[SQLFoldTraversalDescriptor]
+) -> Select:
+    """Perform the fold traversals in a subquery correlated with the vertex outside the fold.
+
+    Args:
+        select_statement: Select of the aggregated output column.
+        traversals: traversals performed within the fold. The earliest (first in the list) traversal
+                    is performed as a part of the WHERE clause. All other traversals will be JOINed
+                    to the FROM clause.
+
+    Returns:
+        Select with the traversals added to its WHERE and FROM clauses.
+    """
+    # Construct traversals. The earliest traversal (the first in the list of traversals) is
+    # performed as a part of the WHERE statement.
+    edge, from_alias, to_alias = traversals[0]
+    predicate_expression = from_alias.c[edge.from_column] == to_alias.c[edge.to_column]
+
+    # Any other traversals are performed as JOINs to the FROM statement.
+    traversals = traversals[1:]
+    if traversals:
+        join_clause = _construct_traversal_joins(traversals)
+        select_statement = select_statement.select_from(join_clause)
+
+    return select_statement.where(predicate_expression)
+
+
 def _get_array_agg_column(output_column: Column, intermediate_fold_output_name: str,) -> Label:
     """Select an array_agg of the fold output field, labeled as requested."""
     return sqlalchemy.func.array_agg(output_column).label(intermediate_fold_output_name)
@@ -344,26 +442,237 @@ def _get_mssql_xml_path_column(
     # from plain text.
     xml_column = XMLPathBinaryExpression(xml_column.left, xml_column.right, xml_column.operator)
 
-    select_statement = select([xml_column])
-
-    # Construct traversals. The earliest traversal (the first in the list of traversals) is
-    # performed as a part of the WHERE statement.
-    edge, from_alias, to_alias = traversals[0]
-    predicate_expression = from_alias.c[edge.from_column] == to_alias.c[edge.to_column]
-
-    # Any other traversals are performed as JOINs to the FROM statement.
-    traversals = traversals[1:]
-    if traversals:
-        join_clause = _construct_traversal_joins(traversals)
-        select_statement = select_statement.select_from(join_clause)
+    select_statement = _add_correlated_fold_traversals(select([xml_column]), traversals)
 
     # Coalesce to represent empty arrays as '' and return the XML PATH aggregated data with label.
     return func.COALESCE(
-        select_statement.where(predicate_expression).suffix_with("FOR XML PATH ('')").as_scalar(),
+        select_statement.suffix_with("FOR XML PATH ('')").as_scalar(),
         expression.literal_column("''"),
     ).label(intermediate_fold_output_name)
 
 
+def _get_mssql_json_path_column(
+    output_column: Column,
+    intermediate_fold_output_name: str,
+    traversals: List[SQLFoldTraversalDescriptor],
+) -> Label:
+    """Select the MSSQL JSON PATH aggregation of the fold output field, labeled as requested.
+
+    The subquery has the same structure as the XML PATH subquery of _get_mssql_xml_path_column,
+    but the values are aggregated into a JSON array by the database, without any additional
+    encoding:
+
+    SELECT
+        OutputVertex.output_field AS value
+    FROM
+        OutputVertex
+    JOIN ... ON ...
+    WHERE
+        FirstTraversedVertex.primary_key = SecondTraversedVertex.foreign_key
+    FOR JSON PATH, INCLUDE_NULL_VALUES
+
+    The result is a JSON array of objects such as [{"value": "a"}, {"value": null}], which can be
+    decoded with a single call to a JSON parser. FOR JSON PATH requires SQL Server 2016 or later.
+
+    Args:
+        output_column: SQLAlchemy Column to be aggregated with JSON PATH.
+        intermediate_fold_output_name: string label to give to the resulting aggregated output.
+        traversals: traversals performed within the fold. The earliest (first in the list) traversal
+                    is performed as a part of the WHERE clause. All other traversals will be JOINed
+                    to the FROM clause.
+
+    Returns:
+        Selectable for JSON PATH aggregation subquery.
+    """
+    select_statement = _add_correlated_fold_traversals(
+        select([output_column.label(FOLD_JSON_PATH_VALUE_KEY)]), traversals
+    )
+
+    # Coalesce to represent empty arrays as '[]' and return the JSON PATH aggregated data labeled.
+    return func.COALESCE(
+        select_statement.suffix_with("FOR JSON PATH, INCLUDE_NULL_VALUES").as_scalar(),
+        expression.literal_column("'[]'"),
+    ).label(intermediate_fold_output_name)
+
+
+class SQLFoldStrategy(metaclass=ABCMeta):
+    """Strategy for aggregating each folded output into a single value per vertex outside the fold.
+
+    Fold strategies differ in the SQL features they rely on, in the cost of evaluating the
+    aggregation in the database, and in how the aggregated values are represented in the results.
+    The strategy used when compiling a query may be chosen with the fold_strategy field of
+    SQLAlchemySchemaInfo, and the results of the query decoded accordingly by ResultDecoder.
+    """
+
+    # str, name of the strategy, used in error messages.
+    name: str
+
+    # Type of the SQLAlchemy dialects with which the strategy can be used.
+    dialect_type: Type[DefaultDialect]
+
+    # bool, True if the fold subquery joins all the tables in the fold and groups by the primary
+    # key of the vertex outside the fold, and False if each folded output is aggregated by
+    # a correlated subquery performing the traversals in the fold.
+    groups_by_outer_vertex: bool
+
+    # bool, whether the strategy supports _x_count, filters inside the fold, and folds with more
+    # than one output, respectively.
+    supports_count: bool
+    supports_filters: bool
+    supports_multiple_outputs: bool
+
+    # str, one of the FOLD_RESULT_ENCODING_* values, describing how folded outputs are represented.
+    result_encoding: str
+
+    def __repr__(self) -> str:
+        """Return a human-readable representation of the strategy."""
+        return f"{type(self).__name__}()"
+
+    @abstractmethod
+    def get_fold_output_column(
+        self,
+        output_column: Column,
+        intermediate_fold_output_name: str,
+        traversals: List[SQLFoldTraversalDescriptor],
+    ) -> Label:
+        """Return the aggregation of the fold output column, labeled as requested.
+
+        Args:
+            output_column: SQLAlchemy Column of the output vertex to be aggregated.
+            intermediate_fold_output_name: string label to give to the resulting aggregated output.
+            traversals: traversals performed within the fold, from earliest to latest.
+
+        Returns:
+            Label of the aggregated output
+        """
+        raise NotImplementedError()
+
+
+class ArrayAggFoldStrategy(SQLFoldStrategy):
+    """Aggregate folded outputs with PostgreSQL's ARRAY_AGG, producing native arrays."""
+
+    name = "ARRAY_AGG"
+    dialect_type = PGDialect
+    groups_by_outer_vertex = True
+    supports_count = True
+    supports_filters = True
+    supports_multiple_outputs = True
+    result_encoding = FOLD_RESULT_ENCODING_NATIVE_LIST
+
+    def get_fold_output_column(
+        self,
+        output_column: Column,
+        intermediate_fold_output_name: str,
+        traversals: List[SQLFoldTraversalDescriptor],
+    ) -> Label:
+        """Return the ARRAY_AGG of the fold output column, labeled as requested."""
+        return _get_array_agg_column(output_column, intermediate_fold_output_name)
+
+
+class XMLPathFoldStrategy(SQLFoldStrategy):
+    """Aggregate folded outputs with MSSQL's FOR XML PATH, into encoded strings."""
+
+    name = "XML PATH"
+    dialect_type = MSDialect
+    groups_by_outer_vertex = False
+    supports_count = False
+    supports_filters = False
+    supports_multiple_outputs = False
+    result_encoding = FOLD_RESULT_ENCODING_XML_PATH
+
+    def get_fold_output_column(
+        self,
+        output_column: Column,
+        intermediate_fold_output_name: str,
+        traversals: List[SQLFoldTraversalDescriptor],
+    ) -> Label:
+        """Return the XML PATH aggregation of the fold output column, labeled as requested."""
+        return _get_mssql_xml_path_column(output_column, intermediate_fold_output_name, traversals)
+
+
+class JSONPathFoldStrategy(SQLFoldStrategy):
+    """Aggregate folded outputs with MSSQL's FOR JSON PATH, into JSON arrays."""
+
+    name = "JSON PATH"
+    dialect_type = MSDialect
+    groups_by_outer_vertex = False
+    supports_count = False
+    supports_filters = False
+    supports_multiple_outputs = False
+    result_encoding = FOLD_RESULT_ENCODING_JSON_PATH
+
+    def get_fold_output_column(
+        self,
+        output_column: Column,
+        intermediate_fold_output_name: str,
+        traversals: List[SQLFoldTraversalDescriptor],
+    ) -> Label:
+        """Return the JSON PATH aggregation of the fold output column, labeled as requested."""
+        return _get_mssql_json_path_column(output_column, intermediate_fold_output_name, traversals)
+
+
+ARRAY_AGG_FOLD_STRATEGY = ArrayAggFoldStrategy()
+XML_PATH_FOLD_STRATEGY = XMLPathFoldStrategy()
+JSON_PATH_FOLD_STRATEGY = JSONPathFoldStrategy()
+
+
+def get_default_fold_strategy(dialect: DefaultDialect) -> SQLFoldStrategy:
+    """Return the fold strategy used for the given dialect if none is specified."""
+    if isinstance(dialect, MSDialect):
+        return XML_PATH_FOLD_STRATEGY
+    elif isinstance(dialect, PGDialect):
+        return ARRAY_AGG_FOLD_STRATEGY
+    else:
+        raise NotImplementedError(
+            f"Fold only supported for MSSQL and PostgreSQL, dialect was set to {dialect.name}."
+        )
+
+
+def get_fold_strategy(sql_schema_info: SQLAlchemySchemaInfo) -> SQLFoldStrategy:
+    """Return the fold strategy used when compiling queries with the given schema info."""
+    if sql_schema_info.fold_strategy is not None:
+        return sql_schema_info.fold_strategy
+    return get_default_fold_strategy(sql_schema_info.dialect)
+
+
+class SQLRecurseOptions(NamedTuple):
+    """Options controlling the recursive CTEs emitted for @recurse."""
+
+    # If False, the recursive CTE carries every column used at the recursion location through each
+    # level of the recursion. If True, it only carries the columns needed to follow the edge,
+    # i.e. the primary key and the join column, and the other used columns are joined once to the
+    # rows found by the recursion. This moves much less data per iteration on deep hierarchies.
+    recurse_over_keys_only: bool = False
+
+    # If True, combine the levels of the recursion with UNION rather than UNION ALL, so vertices
+    # reached from the same root at the same depth by multiple paths are only returned once.
+    # Not supported on MSSQL, which only allows UNION ALL in recursive CTEs.
+    deduplicate_paths: bool = False
+
+    # PostgreSQL only. If not None, the CTE wrapping the query before the recursion is emitted
+    # with the MATERIALIZED (if True) or NOT MATERIALIZED (if False) hint of PostgreSQL 12+.
+    # If None, PostgreSQL decides whether to inline it.
+    materialize_prefix_cte: Optional[bool] = None
+
+    def is_supported_by_dialect(self, dialect: DefaultDialect) -> bool:
+        """Return whether the options can be used when compiling to the given dialect."""
+        if self.deduplicate_paths and isinstance(dialect, MSDialect):
+            return False
+        if self.materialize_prefix_cte is not None and not isinstance(dialect, PGDialect):
+            return False
+        return True
+
+
+DEFAULT_SQL_RECURSE_OPTIONS = SQLRecurseOptions()
+
+
+def get_recurse_options(sql_schema_info: SQLAlchemySchemaInfo) -> SQLRecurseOptions:
+    """Return the recurse options used when compiling queries with the given schema info."""
+    if sql_schema_info.recurse_options is not None:
+        return sql_schema_info.recurse_options
+    return DEFAULT_SQL_RECURSE_OPTIONS
+
+
 class FoldSubqueryBuilder(object):
     """Builder that emits a subquery for a fold scope."""
 
@@ -381,8 +690,9 @@ class FoldSubqueryBuilder(object):
     # from the vertex immediately outside the fold to the folded vertex. This presently
     # only supports non-composite primary keys.
     #
-    # SELECT will also contain an ARRAY_AGG for each column labeled for output inside the fold if
-    # compiling to PostgreSQL. For compilation to MSSQL an XML PATH-based aggregation is performed.
+    # SELECT will also contain an aggregation for each column labeled for output inside the fold,
+    # as determined by the SQLFoldStrategy: by default ARRAY_AGG if compiling to PostgreSQL, and an
+    # XML PATH-based aggregation if compiling to MSSQL.
     #
     # SELECT will also contain a COUNT(*) if _x_count is referred to by the query.
     #
@@ -419,7 +729,13 @@ class FoldSubqueryBuilder(object):
     #          ...
     # JOIN VertexPrecedingOutput
     # ON ...
-    def __init__(self, dialect: DefaultDialect, outer_vertex_table: Alias, primary_key_name: str):
+    def __init__(
+        self,
+        dialect: DefaultDialect,
+        outer_vertex_table: Alias,
+        primary_key_name: str,
+        fold_strategy: Optional[SQLFoldStrategy] = None,
+    ):
         """Create a FoldSubqueryBuilder with table, type, and join information supplied by the IR.
 
         Args:
@@ -428,7 +744,18 @@ class FoldSubqueryBuilder(object):
             primary_key_name: name of the primary key of the vertex immediately outside the
                               fold. Used to set the group by as well as join the fold subquery
                               to the rest of the query.
+            fold_strategy: optional SQLFoldStrategy used to aggregate the folded outputs. If None,
+                           the default strategy for the dialect is used.
         """
+        if fold_strategy is None:
+            fold_strategy = get_default_fold_strategy(dialect)
+        elif not isinstance(dialect, fold_strategy.dialect_type):
+            raise NotImplementedError(
+                f"The {fold_strategy.name} fold strategy is not supported for "
+                f"dialect {dialect.name}."
+            )
+        self._fold_strategy: SQLFoldStrategy = fold_strategy
+
         # Table and FoldScopeLocation containing output columns, and the fields to be output
         # are initialized to None because the output table is unknown until one is marked in
         # mark_output_location_and_fields.
@@ -471,19 +798,14 @@ class FoldSubqueryBuilder(object):
 
     def _construct_fold_joins(self) -> Join:
         """Use the traversal descriptors to create the join clause for the tables in the fold."""
-        if isinstance(self._dialect, MSDialect):
-            # For MSSQL, traversals are performed as a part of the SELECT ... FOR XML PATH('')
-            # statement, which is contained in self._outputs. The JOIN clause is simply the
-            # from_table of the first traversal descriptor, which is the vertex immediately
-            # preceding the fold.
-            return self._traversal_descriptors[0].from_table
-        elif isinstance(self._dialect, PGDialect):
+        if self._fold_strategy.groups_by_outer_vertex:
             return _construct_traversal_joins(self._traversal_descriptors)
         else:
-            raise NotImplementedError(
-                "Fold only supported for MSSQL and PostgreSQL, "
-                f"dialect was set to {self._dialect.name}."
-            )
+            # Traversals are performed as a part of the correlated subqueries aggregating each
+            # output (e.g. SELECT ... FOR XML PATH('')), which are contained in self._outputs.
+            # The JOIN clause is simply the from_table of the first traversal descriptor,
+            # which is the vertex immediately preceding the fold.
+            return self._traversal_descriptors[0].from_table
 
     def _construct_fold_subquery(self, subquery_from_clause: Join) -> Select:
         """Combine all parts of the fold object to produce the complete fold subquery."""
@@ -493,18 +815,13 @@ class FoldSubqueryBuilder(object):
             .where(sqlalchemy.and_(*self._filters))
         )
 
-        if isinstance(self._dialect, MSDialect):
-            # mssql doesn't rely on a group by
-            return select_statement
-        elif isinstance(self._dialect, PGDialect):
+        if self._fold_strategy.groups_by_outer_vertex:
             return select_statement.group_by(
                 self._outer_vertex_alias.c[self._outer_vertex_primary_key]
             )
         else:
-            raise NotImplementedError(
-                "Fold only supported for MSSQL and "
-                f"PostgreSQL, dialect was set to {self._dialect.name}."
-            )
+            # Correlated subqueries don't rely on a group by.
+            return select_statement
 
     def _get_fold_outputs(self) -> List[Label]:
         """Generate outputs for _output_fields and a key to join the subquery to the main query."""
@@ -525,8 +842,11 @@ class FoldSubqueryBuilder(object):
 
             # _x_count uses the SQL COUNT function.
             if fold_output_field == COUNT_META_FIELD_NAME:
-                if isinstance(self._dialect, MSDialect):
-                    raise NotImplementedError("_x_count is not implemented for MSSQL.")
+                if not self._fold_strategy.supports_count:
+                    raise NotImplementedError(
+                        f"_x_count is not implemented for the {self._fold_strategy.name} "
+                        "fold strategy."
+                    )
                 else:
                     x_count_column_clause = sqlalchemy.func.coalesce(
                         sqlalchemy.func.count(), sqlalchemy.literal_column("0")
@@ -541,27 +861,13 @@ class FoldSubqueryBuilder(object):
                 # Create intermediate name for the output_column.
                 intermediate_fold_output_name = FOLD_OUTPUT_FORMAT_STRING.format(fold_output_field)
 
-                # Perform aggregation appropriate for the _dialect and add aggregated output column
+                # Perform the aggregation of the fold strategy and add aggregated output column
                 # to outputs.
-                if isinstance(self._dialect, MSDialect):
-                    # MSSQL uses XML PATH aggregation.
-                    outputs.append(
-                        _get_mssql_xml_path_column(
-                            output_column,
-                            intermediate_fold_output_name,
-                            self._traversal_descriptors,
-                        )
-                    )
-                elif isinstance(self._dialect, PGDialect):
-                    # PostgreSQL uses ARRAY_AGG.
-                    outputs.append(
-                        _get_array_agg_column(output_column, intermediate_fold_output_name)
-                    )
-                else:
-                    raise NotImplementedError(
-                        "Fold only supported for MSSQL and PostgreSQL, "
-                        f"dialect set to {self._dialect.name}."
+                outputs.append(
+                    self._fold_strategy.get_fold_output_column(
+                        output_column, intermediate_fold_output_name, self._traversal_descriptors
                     )
+                )
 
         # Add the primary key field to the output list, which will be used to join the folded
         # subquery to the main Selectable.
@@ -620,9 +926,10 @@ class FoldSubqueryBuilder(object):
                 "Cannot add a filter after end_fold has been called. Invalid "
                 f"state encountered during fold {self}."
             )
-        if isinstance(self._dialect, MSDialect):
+        if not self._fold_strategy.supports_filters:
             raise NotImplementedError(
-                "Filtering on fields inside a fold is not implemented for MSSQL yet."
+                "Filtering on fields inside a fold is not implemented for the "
+                f"{self._fold_strategy.name} fold strategy yet."
             )
         # Filters are applied to output vertices, thus current_alias=self.output_vertex_alias.
         sql_expression = predicate.to_sql(self._dialect, aliases, self._output_vertex_alias)
@@ -647,15 +954,17 @@ class FoldSubqueryBuilder(object):
         # Collect the outputs for the output vertex.
         self._outputs = self._get_fold_outputs()
 
-        # For now, folds with multiple outputs are not implemented in MSSQL. Each output comes
-        # from its own selectable within the XML PATH statement so it is not guaranteed result order
-        # would be preserved across multiple outputs from the same FoldScopeLocation.
+        # For now, folds with multiple outputs are not implemented with correlated subqueries
+        # (e.g. in MSSQL). Each output comes from its own selectable within the XML PATH statement
+        # so it is not guaranteed result order would be preserved across multiple outputs from the
+        # same FoldScopeLocation.
         # Note: _outputs includes 1 output used for joining the folded subquery to the main
-        # selectable and at least 1 other folded output. Since MSSQL only supports 1 output of a
-        # field (_x_counts are not implemented), ensure that len(self.outputs) == 2.
-        if len(self._outputs) != 2 and isinstance(self._dialect, MSDialect):
+        # selectable and at least 1 other folded output. Since these strategies only support
+        # 1 output of a field (_x_counts are not implemented), ensure that len(self.outputs) == 2.
+        if len(self._outputs) != 2 and not self._fold_strategy.supports_multiple_outputs:
             raise NotImplementedError(
-                "Folds containing multiple outputs are not implemented in MSSQL."
+                "Folds containing multiple outputs are not implemented for the "
+                f"{self._fold_strategy.name} fold strategy."
             )
 
         # End the fold, preventing any more functions from being called on this fold.
@@ -667,6 +976,49 @@ class FoldSubqueryBuilder(object):
         return fold_subquery, self._output_vertex_location
 
 
+class _TableAliasPool(object):
+    """Aliases of a table whose column collections are already populated, shared by queries.
+
+    The first lookup of a column in a new alias of a table creates a proxy of every column of the
+    table, which dominates the time spent emitting queries over wide tables. SQLAlchemy only names
+    anonymous aliases when compiling the query containing them, so different queries can share
+    alias objects, as long as no query uses the same alias for two different locations.
+    The pools are kept in the table_alias_pools of the SQLAlchemySchemaInfo, so only queries
+    compiled with the same SQLAlchemySchemaInfo share aliases.
+    """
+
+    def __init__(self, table: sqlalchemy.Table) -> None:
+        """Create a pool of aliases of the given table, initially empty."""
+        self.table = table
+        self._aliases: List[Alias] = []
+        self._lock = Lock()
+
+    def get_alias(self, index: int) -> Alias:
+        """Return the alias of the table with the given index, creating it if needed."""
+        if index >= len(self._aliases):
+            with self._lock:
+                while index >= len(self._aliases):
+                    alias = self.table.alias()
+                    # Populate the column collections before sharing the alias between threads.
+                    alias.c  # pylint: disable=pointless-statement
+                    self._aliases.append(alias)
+        return self._aliases[index]
+
+
+def _get_table_alias(
+    sql_schema_info: SQLAlchemySchemaInfo, table: sqlalchemy.Table, index: int
+) -> Alias:
+    """Return the alias of the table with the given index, shared by queries if possible."""
+    alias_pools = sql_schema_info.table_alias_pools
+    if alias_pools is None:
+        return table.alias()
+    alias_pool = alias_pools.get(table)
+    if alias_pool is None:
+        # setdefault ensures threads racing to create the pool of a table all use the same one.
+        alias_pool = alias_pools.setdefault(table, _TableAliasPool(table))
+    return alias_pool.get_alias(index)
+
+
 class UniqueAliasGenerator(object):
     """Mutable class used to generate unique aliases for subqueries."""
 
@@ -732,6 +1084,9 @@ class CompilationState(object):
         # be named "fold_output__x_count".
         self._aliases: Dict[Tuple[QueryPath, Optional[FoldPath]], Union[Alias, ColumnRouter]] = {}
 
+        # Number of aliases of each table used so far, to get distinct aliases from its pool.
+        self._table_alias_counts: Dict[sqlalchemy.Table, int] = {}
+
         # Move to the beginning location of the query.
         self._relocate(ir.query_metadata_table.root_location)
 
@@ -739,6 +1094,16 @@ class CompilationState(object):
         self._came_from: Dict[Alias, Column] = {}
 
         self._recurse_needs_cte: bool = False
+        self._recurse_options: SQLRecurseOptions = get_recurse_options(sql_schema_info)
+
+        if self._current_alias is None:
+            raise AssertionError(
+                f"Expected _current_alias to be set at the root location of the query {ir}."
+            )
+        # Columns that together identify each result, and the reason why they do not, if any.
+        # Used to emit keyset-paginated queries.
+        self._keyset_columns: List[Column] = list(self._current_alias.primary_key)
+        self._keyset_unsupported_reason: Optional[str] = None
 
         # The query being constructed as the IR is processed
         self._from_clause: FromClause = self._current_alias  # The main SQLAlchemy Selectable.
@@ -782,9 +1147,10 @@ class CompilationState(object):
         if alias_key in self._aliases:
             self._current_alias = self._aliases[alias_key]
         else:
-            self._current_alias = self._sql_schema_info.vertex_name_to_table[
-                self._current_classname
-            ].alias()
+            table = self._sql_schema_info.vertex_name_to_table[self._current_classname]
+            alias_index = self._table_alias_counts.get(table, 0)
+            self._table_alias_counts[table] = alias_index + 1
+            self._current_alias = _get_table_alias(self._sql_schema_info, table, alias_index)
 
         # If in a Fold, check for outputs, marking the location as the output location if any
         # folded outputs exist.
@@ -882,6 +1248,18 @@ class CompilationState(object):
             self._join_to_parent_location(
                 previous_alias, edge.from_column, edge.to_column, optional
             )
+            if optional or self._is_in_optional_scope():
+                self._keyset_unsupported_reason = (
+                    f"the query traverses {vertex_field} in an @optional scope, so the primary key "
+                    f"of {self._current_classname} may be null"
+                )
+            elif self._current_alias is None:
+                raise AssertionError(
+                    f"Attempted to traverse {vertex_field} when _current_alias was None "
+                    f"during fold {self}."
+                )
+            else:
+                self._keyset_columns.extend(self._current_alias.primary_key)
 
     def _wrap_into_cte(self) -> None:
         """Wrap the current query into a cte."""
@@ -899,6 +1277,11 @@ class CompilationState(object):
         # Wrap the query so far into a cte. Make sure to select any fields used outside the cte.
         if self._recurse_needs_cte:
             self._current_alias = self.get_query(extra_outputs).cte(recursive=False)
+            materialize_prefix_cte = self._recurse_options.materialize_prefix_cte
+            if materialize_prefix_cte is not None:
+                self._current_alias = self._current_alias.prefix_with(
+                    "MATERIALIZED" if materialize_prefix_cte else "NOT MATERIALIZED"
+                )
             self._from_clause = self._current_alias
 
             self._filters = []  # The filters are already included in the cte
@@ -960,9 +1343,17 @@ class CompilationState(object):
                 f"was set to {self._current_location}."
             )
 
+        if not self._recurse_options.is_supported_by_dialect(self._sql_schema_info.dialect):
+            raise NotImplementedError(
+                f"The recurse options {self._recurse_options} are not supported for dialect "
+                f"{self._sql_schema_info.dialect.name}."
+            )
+
         edge = self._sql_schema_info.join_descriptors[self._current_classname][vertex_field]
         primary_key = self._get_current_primary_key_name("@recurse")
 
+        self._keyset_unsupported_reason = f"the query has a @recurse on {vertex_field}"
+
         # Wrap the query so far into a cte if it would speed up the recursive query.
         if self._recurse_needs_cte:
             self._wrap_into_cte()
@@ -979,18 +1370,23 @@ class CompilationState(object):
 
         # Find which columns should be selected
         used_columns = sorted(self._used_columns[self._current_location.query_path])
+        if self._recurse_options.recurse_over_keys_only:
+            recursion_primary_key = self._get_current_primary_key_name("@recurse")
+            recursion_columns = sorted({recursion_primary_key, edge.from_column})
+        else:
+            recursion_columns = used_columns
 
         # The base of the recursive CTE selects all needed columns and sets the depth to 0
         base = sqlalchemy.select(
-            [previous_alias.c[col].label(col) for col in used_columns]
+            [previous_alias.c[col].label(col) for col in recursion_columns]
             + [previous_alias.c[primary_key].label(CTE_KEY_NAME), literal_0.label(CTE_DEPTH_NAME),]
         ).cte(recursive=True)
 
         # The recursive step selects all needed columns, increments the depth, and joins to the base
         step = self._current_alias.alias()
-        self._current_alias = base.union_all(
+        recursive_step = (
             sqlalchemy.select(
-                [step.c[col] for col in used_columns]
+                [step.c[col] for col in recursion_columns]
                 + [
                     base.c[CTE_KEY_NAME].label(CTE_KEY_NAME),
                     (base.c[CTE_DEPTH_NAME] + literal_1).label(CTE_DEPTH_NAME),
@@ -1001,6 +1397,32 @@ class CompilationState(object):
             )
             .where(base.c[CTE_DEPTH_NAME] < literal_depth)
         )
+        if self._recurse_options.deduplicate_paths:
+            recursive_cte = base.union(recursive_step)
+        else:
+            recursive_cte = base.union_all(recursive_step)
+
+        if self._recurse_options.recurse_over_keys_only:
+            # Join the remaining used columns once, to the vertices found by the recursion.
+            payload = self._current_alias.alias()
+            self._current_alias = (
+                sqlalchemy.select(
+                    [payload.c[col].label(col) for col in used_columns]
+                    + [recursive_cte.c[CTE_KEY_NAME], recursive_cte.c[CTE_DEPTH_NAME]]
+                )
+                .select_from(
+                    recursive_cte.join(
+                        payload,
+                        onclause=(
+                            recursive_cte.c[recursion_primary_key]
+                            == payload.c[recursion_primary_key]
+                        ),
+                    )
+                )
+                .alias()
+            )
+        else:
+            self._current_alias = recursive_cte
 
         # Instead of joining to the current _from_clause, we make this alias the _from_clause.
         # If the existing _from_clause had any information in it, then the _current_alias would
@@ -1064,7 +1486,10 @@ class CompilationState(object):
 
         # 3. Initialize fold object.
         self._current_fold = FoldSubqueryBuilder(
-            self._sql_schema_info.dialect, outer_alias, outer_vertex_primary_key_name
+            self._sql_schema_info.dialect,
+            outer_alias,
+            outer_vertex_primary_key_name,
+            fold_strategy=self._sql_schema_info.fold_strategy,
         )
 
         # 4. Relocate to inside the fold scope and visit the first vertex.
@@ -1151,17 +1576,84 @@ class CompilationState(object):
             .where(sqlalchemy.and_(*self._filters))
         )
 
+    def get_keyset_paginated_query(self, page_size: int) -> KeysetPaginatedQuery:
+        """After all IR Blocks are processed, return the query paginated in keyset order.
 
-def emit_code_from_ir(sql_schema_info: SQLAlchemySchemaInfo, ir: IrAndMetadata) -> Select:
-    """Return a SQLAlchemy Query for the query described by the internal representation.
+        Args:
+            page_size: int, maximum number of results in each page
 
-    Args:
-        sql_schema_info: SQLAlchemySchemaInfo containing all relevant schema information
-        ir: IrAndMetadata containing query information with lowered blocks
+        Returns:
+            KeysetPaginatedQuery describing the statements fetching each page of results
 
-    Returns:
-        SQLAlchemy Query
-    """
+        Raises:
+            ValueError if page_size is below 1.
+        """
+        if page_size < 1:
+            raise ValueError(f"Could not paginate query with page size lower than 1: {page_size}")
+        if self._keyset_unsupported_reason is not None:
+            raise NotImplementedError(
+                f"Keyset pagination requires each result to be identified by the primary keys of "
+                f"the vertices in the query, but {self._keyset_unsupported_reason}."
+            )
+        if not self._keyset_columns:
+            raise AssertionError(
+                f"The table for vertex {self._ir.query_metadata_table.root_location} has no "
+                f"primary key specified. This information is required for keyset pagination."
+            )
+
+        key_output_names = tuple(
+            KEYSET_KEY_OUTPUT_FORMAT_STRING.format(index)
+            for index in range(len(self._keyset_columns))
+        )
+        last_key_parameter_names = tuple(
+            KEYSET_LAST_KEY_PARAMETER_FORMAT_STRING.format(index)
+            for index in range(len(self._keyset_columns))
+        )
+        last_key_parameters = [
+            sqlalchemy.bindparam(parameter_name, type_=column.type)
+            for parameter_name, column in zip(last_key_parameter_names, self._keyset_columns)
+        ]
+
+        # The results after the last seen key (k_1, ..., k_n) are those where, for some i,
+        # the first i - 1 key columns equal those of the last key and the i-th one is greater.
+        after_last_key = sqlalchemy.or_(
+            *(
+                sqlalchemy.and_(
+                    *(
+                        column == parameter
+                        for column, parameter in zip(
+                            self._keyset_columns[:index], last_key_parameters[:index]
+                        )
+                    ),
+                    self._keyset_columns[index] > last_key_parameters[index],
+                )
+                for index in range(len(self._keyset_columns))
+            )
+        )
+
+        first_page_query = (
+            self.get_query(
+                [
+                    column.label(output_name)
+                    for column, output_name in zip(self._keyset_columns, key_output_names)
+                ]
+            )
+            .order_by(*self._keyset_columns)
+            .limit(page_size)
+        )
+        return KeysetPaginatedQuery(
+            first_page_query=first_page_query,
+            next_page_query=first_page_query.where(after_last_key),
+            key_output_names=key_output_names,
+            last_key_parameter_names=last_key_parameter_names,
+            page_size=page_size,
+        )
+
+
+def _emit_compilation_state(
+    sql_schema_info: SQLAlchemySchemaInfo, ir: IrAndMetadata
+) -> CompilationState:
+    """Return the CompilationState after processing all blocks of the internal representation."""
     state = CompilationState(sql_schema_info, ir)
     for block in _traverse_and_validate_blocks(ir):
         if isinstance(block, blocks.QueryRoot):
@@ -1190,4 +1682,39 @@ def emit_code_from_ir(sql_schema_info: SQLAlchemySchemaInfo, ir: IrAndMetadata)
         else:
             raise NotImplementedError(f"Unsupported block {block}.")
 
-    return state.get_query()
+    return state
+
+
+def emit_code_from_ir(sql_schema_info: SQLAlchemySchemaInfo, ir: IrAndMetadata) -> Select:
+    """Return a SQLAlchemy Query for the query described by the internal representation.
+
+    Args:
+        sql_schema_info: SQLAlchemySchemaInfo containing all relevant schema information
+        ir: IrAndMetadata containing query information with lowered blocks
+
+    Returns:
+        SQLAlchemy Query
+    """
+    return _emit_compilation_state(sql_schema_info, ir).get_query()
+
+
+def emit_keyset_paginated_code_from_ir(
+    sql_schema_info: SQLAlchemySchemaInfo, ir: IrAndMetadata, page_size: int
+) -> KeysetPaginatedQuery:
+    """Return the SQLAlchemy Queries paging through the results of the query in keyset order.
+
+    Unlike the pagination in query_pagination, which adds filters on a field chosen using
+    statistics and recompiles the query for each page, the statements are emitted only once,
+    and each page is fetched by binding the key of the last seen result. See KeysetPaginatedQuery.
+    Queries with @recurse, or with traversals in @optional scopes, are not supported, since their
+    results are not identified by non-null primary keys.
+
+    Args:
+        sql_schema_info: SQLAlchemySchemaInfo containing all relevant schema information
+        ir: IrAndMetadata containing query information with lowered blocks
+        page_size: int, maximum number of results in each page
+
+    Returns:
+        KeysetPaginatedQuery
+    """
+    return _emit_compilation_state(sql_schema_info, ir).get_keyset_paginated_query(page_size)
@@ -196,6 +196,9 @@ class Variable(Expression):
 
     __slots__ = ("variable_name", "inferred_type")
 
+    # Variables with reserved names, or of unsupported types, are errors in the compiled query.
+    _has_user_facing_validation = True
+
     def __init__(self, variable_name: str, inferred_type: GraphQLOutputType) -> None:
         """Construct a new Variable object for the given variable name.
 
@@ -312,20 +315,6 @@ class Variable(Expression):
         is_list = isinstance(self.inferred_type, GraphQLList)
         return bindparam(self.variable_name[1:], expanding=is_list)
 
-    def __eq__(self, other: Any) -> bool:
-        """Return True if the given object is equal to this one, and False otherwise."""
-        # Since this object has a GraphQL type as a variable, which doesn't implement
-        # the equality operator, we have to override equality and call is_same_type() here.
-        return (
-            type(self) == type(other)
-            and self.variable_name == other.variable_name
-            and is_same_type(self.inferred_type, other.inferred_type)
-        )
-
-    def __ne__(self, other: Any) -> bool:
-        """Check another object for non-equality against this one."""
-        return not self.__eq__(other)
-
 
 class LocalField(Expression):
     """A field at the current position in the query."""
@@ -643,6 +632,9 @@ class OutputContextField(Expression):
 
     __slots__ = ("location", "field_type")
 
+    # Outputs of unsupported types are errors in the compiled query.
+    _has_user_facing_validation = True
+
     def __init__(self, location: Location, field_type: GraphQLOutputType) -> None:
         """Construct a new OutputContextField object for the field at the given location.
 
@@ -774,26 +766,15 @@ class OutputContextField(Expression):
 
         return aliases[(self.location.at_vertex().query_path, None)].c[self.location.field]
 
-    def __eq__(self, other: Any) -> bool:
-        """Return True if the given object is equal to this one, and False otherwise."""
-        # Since this object has a GraphQL type as a variable, which doesn't implement
-        # the equality operator, we have to override equality and call is_same_type() here.
-        return (
-            type(self) == type(other)
-            and self.location == other.location
-            and is_same_type(self.field_type, other.field_type)
-        )
-
-    def __ne__(self, other: Any) -> bool:
-        """Check another object for non-equality against this one."""
-        return not self.__eq__(other)
-
 
 class FoldedContextField(Expression):
     """An expression used to output data captured in a @fold scope."""
 
     __slots__ = ("fold_scope_location", "field_type")
 
+    # Outputs of unsupported types are errors in the compiled query.
+    _has_user_facing_validation = True
+
     def __init__(
         self, fold_scope_location: FoldScopeLocation, field_type: GraphQLList[GraphQLOutputType]
     ) -> None:
@@ -975,20 +956,6 @@ class FoldedContextField(Expression):
                 "PostgreSQL, dialect was set to {}".format(dialect.name)
             )
 
-    def __eq__(self, other: Any) -> bool:
-        """Return True if the given object is equal to this one, and False otherwise."""
-        # Since this object has a GraphQL type as a variable, which doesn't implement
-        # the equality operator, we have to override equality and call is_same_type() here.
-        return (
-            type(self) == type(other)
-            and self.fold_scope_location == other.fold_scope_location
-            and is_same_type(self.field_type, other.field_type)
-        )
-
-    def __ne__(self, other: Any) -> bool:
-        """Check another object for non-equality against this one."""
-        return not self.__eq__(other)
-
 
 class FoldCountContextField(Expression):
     """An expression used to output the number of elements captured in a @fold scope."""
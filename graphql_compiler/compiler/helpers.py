@@ -317,16 +317,59 @@ def get_parameter_name(argument: str) -> str:
 
 LocationT = TypeVar("LocationT", bound="BaseLocation")
 
+# Location objects are immutable, so their attributes are set bypassing their __setattr__ method.
+_set_location_attribute = object.__setattr__
+
 
 @total_ordering  # type: ignore
 # Issue might be due to https://github.com/python/mypy/issues/5374
 # Feel free to remove this mypy exception if you get mypy to pass
 @six.add_metaclass(ABCMeta)
 class BaseLocation(object):
-    """An abstract location object, describing a location in the GraphQL query."""
+    """An abstract location object, describing a location in the GraphQL query.
+
+    Location objects are immutable, and compute their hash value once, upon construction.
+    Since they are used as keys in most of the maps built during compilation, locations obtained
+    by navigating from the same location object are also cached and reused: for example,
+    calling navigate_to_field("name") twice on the same location returns the same object.
+    Since all locations in a query are derived from its root location, equal locations within
+    a query are usually the same object, and comparing them requires only an identity check.
+    """
+
+    __slots__ = ()
 
     field: Optional[str]
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Disallow modifying location objects, since their hash values are cached."""
+        raise AttributeError(
+            "Location objects are immutable, cannot set attribute {} of {}".format(name, self)
+        )
+
+    def __copy__(self: LocationT) -> LocationT:
+        """Return the location itself, since location objects are immutable."""
+        return self
+
+    def __deepcopy__(self: LocationT, memo: Dict[int, Any]) -> LocationT:
+        """Return the location itself, since location objects are immutable."""
+        return self
+
+    def _get_cached_navigation(self, cache_key: Tuple[str, ...]) -> Optional["BaseLocation"]:
+        """Return the location previously navigated to with the given cache key, if any."""
+        navigation_cache = self._navigation_cache  # type: ignore
+        if navigation_cache is None:
+            return None
+        return navigation_cache.get(cache_key, None)
+
+    def _set_cached_navigation(self, cache_key: Tuple[str, ...], location: LocationT) -> LocationT:
+        """Record the location navigated to with the given cache key, and return it."""
+        navigation_cache = self._navigation_cache  # type: ignore
+        if navigation_cache is None:
+            navigation_cache = {}
+            _set_location_attribute(self, "_navigation_cache", navigation_cache)
+        navigation_cache[cache_key] = location
+        return location
+
     @abstractmethod
     def navigate_to_field(self: LocationT, field: str) -> LocationT:
         """Return a new BaseLocation object at the specified field of the current BaseLocation."""
@@ -385,11 +428,26 @@ class BaseLocation(object):
 class Location(BaseLocation):
     """A location in the GraphQL query, anywhere except within a @fold scope."""
 
+    __slots__ = (
+        "query_path",
+        "field",
+        "visit_counter",
+        "_hash",
+        "_vertex_location",
+        "_navigation_cache",
+    )
+
     query_path: QueryPath
     visit_counter: int
+    _hash: int
+    _vertex_location: Optional["Location"]
 
     def __init__(
-        self, query_path: Tuple[str, ...], field: Optional[str] = None, visit_counter: int = 1
+        self,
+        query_path: Tuple[str, ...],
+        field: Optional[str] = None,
+        visit_counter: int = 1,
+        _vertex_location: Optional["Location"] = None,
     ) -> None:
         """Create a new Location object.
 
@@ -415,6 +473,9 @@ class Location(BaseLocation):
             field: string if at a field in a vertex, or None if at a vertex
             visit_counter: int, number that allows semantic disambiguation of otherwise equivalent
                            Location objects -- see the explanation above.
+            _vertex_location: optional Location at the vertex of the new Location, for internal use
+                              only. Used to make at_vertex() return the same object that
+                              navigate_to_field() was called on.
 
         Returns:
             new Location object with the provided properties
@@ -430,25 +491,50 @@ class Location(BaseLocation):
                 "{} {}".format(type(field).__name__, field)
             )
 
-        self.query_path = query_path
-        self.field = field
+        _set_location_attribute(self, "query_path", query_path)
+        _set_location_attribute(self, "field", field)
 
         # A single visit counter is enough, rather than a visit counter per path level,
         # because field names are unique -- one can't be at path 'X' and
         # visit 'Y' in two different ways to generate colliding 'X__Y___1' identifiers.
-        self.visit_counter = visit_counter
+        _set_location_attribute(self, "visit_counter", visit_counter)
+
+        _set_location_attribute(self, "_hash", hash(query_path) ^ hash(field) ^ hash(visit_counter))
+        _set_location_attribute(self, "_vertex_location", _vertex_location)
+        _set_location_attribute(self, "_navigation_cache", None)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        """Return the information needed to pickle the Location object."""
+        return (Location, (self.query_path, self.field, self.visit_counter))
 
     def navigate_to_field(self, field: str) -> "Location":
         """Return a new Location object at the specified field of the current Location's vertex."""
         if self.field:
             raise AssertionError("Already at a field, cannot nest fields: {}".format(self))
-        return Location(self.query_path, field=field, visit_counter=self.visit_counter)
+
+        cache_key = ("field", field)
+        cached_location = self._get_cached_navigation(cache_key)
+        if cached_location is not None:
+            return cached_location  # type: ignore
+
+        return self._set_cached_navigation(
+            cache_key,
+            Location(
+                self.query_path,
+                field=field,
+                visit_counter=self.visit_counter,
+                _vertex_location=self,
+            ),
+        )
 
     def at_vertex(self) -> "Location":
         """Get the Location ignoring its field component."""
         if not self.field:
             return self
 
+        if self._vertex_location is not None:
+            return self._vertex_location
+
         return Location(self.query_path, field=None, visit_counter=self.visit_counter)
 
     def navigate_to_subpath(self, child: str) -> "Location":
@@ -457,7 +543,13 @@ class Location(BaseLocation):
             raise TypeError("Expected child to be a string, was: {}".format(child))
         if self.field:
             raise AssertionError("Currently at a field, cannot go to child: {}".format(self))
-        return Location(self.query_path + (child,))
+
+        cache_key = ("subpath", child)
+        cached_location = self._get_cached_navigation(cache_key)
+        if cached_location is not None:
+            return cached_location  # type: ignore
+
+        return self._set_cached_navigation(cache_key, Location(self.query_path + (child,)))
 
     def navigate_to_fold(self, folded_child: str) -> "FoldScopeLocation":
         """Return a new FoldScopeLocation for the folded child vertex of the current Location."""
@@ -466,16 +558,30 @@ class Location(BaseLocation):
         if self.field:
             raise AssertionError("Currently at a field, cannot go to folded child: {}".format(self))
 
+        cache_key = ("fold", folded_child)
+        cached_location = self._get_cached_navigation(cache_key)
+        if cached_location is not None:
+            return cached_location  # type: ignore
+
         edge_direction, edge_name = get_edge_direction_and_name(folded_child)
 
         fold_path = _create_fold_path_component(edge_direction, edge_name)
-        return FoldScopeLocation(self, fold_path)
+        return self._set_cached_navigation(cache_key, FoldScopeLocation(self, fold_path))
 
     def revisit(self) -> "Location":
         """Return a new Location object with an incremented 'visit_counter'."""
         if self.field:
             raise AssertionError("Attempted to revisit a location at a field: {}".format(self))
-        return Location(self.query_path, field=None, visit_counter=(self.visit_counter + 1))
+
+        cache_key = ("revisit",)
+        cached_location = self._get_cached_navigation(cache_key)
+        if cached_location is not None:
+            return cached_location  # type: ignore
+
+        return self._set_cached_navigation(
+            cache_key,
+            Location(self.query_path, field=None, visit_counter=(self.visit_counter + 1)),
+        )
 
     def get_location_name(self) -> Tuple[str, Optional[str]]:
         """Return a tuple of a unique name of the Location, and the current field name (or None)."""
@@ -501,8 +607,12 @@ class Location(BaseLocation):
 
     def __eq__(self, other: Any) -> bool:
         """Return True if the Locations are equal, and False otherwise."""
+        if self is other:
+            return True
+
         return (
             type(self) == type(other)
+            and self._hash == other._hash
             and self.query_path == other.query_path
             and self.field == other.field
             and self.visit_counter == other.visit_counter
@@ -540,21 +650,33 @@ class Location(BaseLocation):
 
     def __hash__(self) -> int:
         """Return the object's hash value."""
-        return hash(self.query_path) ^ hash(self.field) ^ hash(self.visit_counter)
+        return self._hash
 
 
 @six.python_2_unicode_compatible
 class FoldScopeLocation(BaseLocation):
     """A location within a @fold scope."""
 
+    __slots__ = (
+        "base_location",
+        "fold_path",
+        "field",
+        "_hash",
+        "_vertex_location",
+        "_navigation_cache",
+    )
+
     base_location: Location
     fold_path: FoldPath
+    _hash: int
+    _vertex_location: Optional["FoldScopeLocation"]
 
     def __init__(
         self,
         base_location: Location,
         fold_path: Tuple[Tuple[str, str], ...],
         field: Optional[str] = None,
+        _vertex_location: Optional["FoldScopeLocation"] = None,
     ) -> None:
         """Create a new FoldScopeLocation object. Used to represent the locations of @fold scopes.
 
@@ -564,6 +686,9 @@ class FoldScopeLocation(BaseLocation):
             fold_path: tuple of (edge_direction, edge_name) tuples, containing the traversal path
                        of the fold, starting from the base_location of the @fold scope.
             field: string if at a field in a vertex, or None if at a vertex
+            _vertex_location: optional FoldScopeLocation at the vertex of the new location, for
+                              internal use only. Used to make at_vertex() return the same object
+                              that navigate_to_field() was called on.
 
         Returns:
             new FoldScopeLocation object
@@ -591,9 +716,17 @@ class FoldScopeLocation(BaseLocation):
         if not fold_path_is_valid:
             raise ValueError("Encountered an invalid fold_path: {}".format(fold_path))
 
-        self.base_location = base_location
-        self.fold_path = fold_path
-        self.field = field
+        _set_location_attribute(self, "base_location", base_location)
+        _set_location_attribute(self, "fold_path", fold_path)
+        _set_location_attribute(self, "field", field)
+
+        _set_location_attribute(self, "_hash", hash(base_location) ^ hash(fold_path) ^ hash(field))
+        _set_location_attribute(self, "_vertex_location", _vertex_location)
+        _set_location_attribute(self, "_navigation_cache", None)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        """Return the information needed to pickle the FoldScopeLocation object."""
+        return (FoldScopeLocation, (self.base_location, self.fold_path, self.field))
 
     def get_location_name(self) -> Tuple[str, Optional[str]]:
         """Return a tuple of a unique name of the location, and the current field name (or None)."""
@@ -628,13 +761,27 @@ class FoldScopeLocation(BaseLocation):
         if not self.field:
             return self
 
+        if self._vertex_location is not None:
+            return self._vertex_location
+
         return FoldScopeLocation(self.base_location, self.fold_path, field=None)
 
     def navigate_to_field(self, field: str) -> "FoldScopeLocation":
         """Return a new location object at the specified field of the current location."""
         if self.field:
             raise AssertionError("Already at a field, cannot nest fields: {}".format(self))
-        return FoldScopeLocation(self.base_location, self.fold_path, field=field)
+
+        cache_key = ("field", field)
+        cached_location = self._get_cached_navigation(cache_key)
+        if cached_location is not None:
+            return cached_location  # type: ignore
+
+        return self._set_cached_navigation(
+            cache_key,
+            FoldScopeLocation(
+                self.base_location, self.fold_path, field=field, _vertex_location=self
+            ),
+        )
 
     def navigate_to_subpath(self, child: str) -> "FoldScopeLocation":
         """Return a new location after a traversal to the specified child location."""
@@ -643,9 +790,16 @@ class FoldScopeLocation(BaseLocation):
         if self.field:
             raise AssertionError("Currently at a field, cannot go to child: {}".format(self))
 
+        cache_key = ("subpath", child)
+        cached_location = self._get_cached_navigation(cache_key)
+        if cached_location is not None:
+            return cached_location  # type: ignore
+
         edge_direction, edge_name = get_edge_direction_and_name(child)
         new_fold_path = self.fold_path + _create_fold_path_component(edge_direction, edge_name)
-        return FoldScopeLocation(self.base_location, new_fold_path)
+        return self._set_cached_navigation(
+            cache_key, FoldScopeLocation(self.base_location, new_fold_path)
+        )
 
     def __str__(self) -> str:
         """Return a human-readable str representation of the FoldScopeLocation object."""
@@ -659,8 +813,12 @@ class FoldScopeLocation(BaseLocation):
 
     def __eq__(self, other: Any) -> bool:
         """Return True if the FoldScopeLocations are equal, and False otherwise."""
+        if self is other:
+            return True
+
         return (
             type(self) == type(other)
+            and self._hash == other._hash
             and self.base_location == other.base_location
             and self.fold_path == other.fold_path
             and self.field == other.field
@@ -672,7 +830,7 @@ class FoldScopeLocation(BaseLocation):
 
     def __hash__(self) -> int:
         """Return the object's hash value."""
-        return hash(self.base_location) ^ hash(self.fold_path) ^ hash(self.field)
+        return self._hash
 
     def _check_if_object_of_same_type_is_smaller(self, other: "FoldScopeLocation") -> bool:
         """Return True if the other object is smaller than self in the total ordering."""
@@ -1,5 +1,7 @@
 # Copyright 2017-present Kensho Technologies, LLC.
 """Language-independent IR lowering and optimization functions."""
+from functools import partial
+
 import six
 
 from ..blocks import (
@@ -12,6 +14,7 @@ from ..blocks import (
     Traverse,
     Unfold,
 )
+from ..compiler_entities import InterningTable
 from ..expressions import (
     BinaryComposition,
     ContextField,
@@ -23,27 +26,59 @@ from ..expressions import (
     TrueLiteral,
 )
 from ..helpers import validate_safe_string
+from .pass_manager import ExpressionRewriteRule, IrBlocksPass
 
 
 def merge_consecutive_filter_clauses(ir_blocks):
-    """Merge consecutive Filter(x), Filter(y) blocks into Filter(x && y) block."""
+    """Merge consecutive Filter(x), Filter(y) blocks into Filter(x && y) block.
+
+    Filter blocks whose predicate is equal to a predicate already merged into the same block
+    are redundant, and are dropped.
+    """
     if not ir_blocks:
         return ir_blocks
 
     new_ir_blocks = [ir_blocks[0]]
 
+    # The set of predicates merged into the last block of new_ir_blocks, if it is a Filter block.
+    merged_predicates = set()
+    if isinstance(ir_blocks[0], Filter):
+        merged_predicates.add(ir_blocks[0].predicate)
+
     for block in ir_blocks[1:]:
         last_block = new_ir_blocks[-1]
         if isinstance(last_block, Filter) and isinstance(block, Filter):
-            new_ir_blocks[-1] = Filter(
-                BinaryComposition("&&", last_block.predicate, block.predicate)
-            )
+            if block.predicate not in merged_predicates:
+                merged_predicates.add(block.predicate)
+                new_ir_blocks[-1] = Filter(
+                    BinaryComposition("&&", last_block.predicate, block.predicate)
+                )
         else:
             new_ir_blocks.append(block)
+            merged_predicates = set()
+            if isinstance(block, Filter):
+                merged_predicates.add(block.predicate)
 
     return new_ir_blocks
 
 
+def intern_ir_block_expressions(ir_blocks, interning_table=None):
+    """Return a list of IR blocks in which all structurally-equal expressions are the same object.
+
+    Args:
+        ir_blocks: list of BasicBlock objects
+        interning_table: optional InterningTable to use. Sharing a table across calls makes
+                         expressions equal to ones interned in previous calls share their objects
+
+    Returns:
+        list of BasicBlock objects, equal to the input blocks
+    """
+    if interning_table is None:
+        interning_table = InterningTable()
+
+    return [block.visit_and_update_expressions(interning_table.intern) for block in ir_blocks]
+
+
 class OutputContextVertex(ContextField):
     """An expression referring to a vertex location for output from the global context."""
 
@@ -70,61 +105,111 @@ class OutputContextVertex(ContextField):
         return mark_name
 
 
-def lower_context_field_existence(ir_blocks, query_metadata_table):
-    """Lower ContextFieldExistence expressions into lower-level expressions."""
-
-    def regular_visitor_fn(expression):
-        """Expression visitor function that rewrites ContextFieldExistence expressions."""
-        if not isinstance(expression, ContextFieldExistence):
-            return expression
+def _lower_context_field_existence_expression(expression, block, query_metadata_table):
+    """Rewrite a ContextFieldExistence expression within the given block, if needed."""
+    if not isinstance(expression, ContextFieldExistence):
+        return expression
 
-        location_type = query_metadata_table.get_location_info(expression.location).type
+    location_type = query_metadata_table.get_location_info(expression.location).type
 
-        # Since this function is only used in blocks that aren't ConstructResult,
+    if isinstance(block, ConstructResult):
+        # In ConstructResult blocks, the location check is performed
+        # using the special OutputContextVertex expression.
+        return BinaryComposition(
+            "!=", OutputContextVertex(expression.location, location_type), NullLiteral
+        )
+    else:
+        # In blocks that aren't ConstructResult,
         # the location check is performed using a regular ContextField expression.
         return BinaryComposition(
             "!=", ContextField(expression.location, location_type), NullLiteral
         )
 
-    def construct_result_visitor_fn(expression):
-        """Expression visitor function that rewrites ContextFieldExistence expressions."""
-        if not isinstance(expression, ContextFieldExistence):
-            return expression
-
-        location_type = query_metadata_table.get_location_info(expression.location).type
 
-        # Since this function is only used in ConstructResult blocks,
-        # the location check is performed using the special OutputContextVertex expression.
-        return BinaryComposition(
-            "!=", OutputContextVertex(expression.location, location_type), NullLiteral
+def lower_context_field_existence(ir_blocks, query_metadata_table):
+    """Lower ContextFieldExistence expressions into lower-level expressions."""
+    return [
+        block.visit_and_update_expressions(
+            partial(
+                _lower_context_field_existence_expression,
+                block=block,
+                query_metadata_table=query_metadata_table,
+            )
         )
+        for block in ir_blocks
+    ]
 
-    new_ir_blocks = []
-    for block in ir_blocks:
-        new_block = None
-        if isinstance(block, ConstructResult):
-            new_block = block.visit_and_update_expressions(construct_result_visitor_fn)
-        else:
-            new_block = block.visit_and_update_expressions(regular_visitor_fn)
-        new_ir_blocks.append(new_block)
 
-    return new_ir_blocks
+def _short_circuit_ternary_conditional(expression):
+    """Simplify the TernaryConditional if its predicate is a boolean Literal."""
+    if isinstance(expression, TernaryConditional) and isinstance(expression.predicate, Literal):
+        if isinstance(expression.predicate.value, bool):
+            if expression.predicate.value:
+                return expression.if_true
+            else:
+                return expression.if_false
+    return expression
 
 
 def short_circuit_ternary_conditionals(ir_blocks, query_metadata_table):
     """If the predicate outcome in a TernaryConditional is a Literal, evaluate and simplify it."""
+    return [
+        block.visit_and_update_expressions(_short_circuit_ternary_conditional)
+        for block in ir_blocks
+    ]
+
+
+_BOOLEAN_OPERATOR_INVERSES = {
+    "=": "!=",
+    "!=": "=",
+}
 
-    def visitor_fn(expression):
-        """Simplify TernaryConditionals."""
-        if isinstance(expression, TernaryConditional) and isinstance(expression.predicate, Literal):
-            if isinstance(expression.predicate.value, bool):
-                if expression.predicate.value:
-                    return expression.if_true
-                else:
-                    return expression.if_false
+
+def _optimize_boolean_expression_comparison(expression):
+    """Rewrite the expression as described in optimize_boolean_expression_comparisons()."""
+    if not isinstance(expression, BinaryComposition):
         return expression
 
-    return [block.visit_and_update_expressions(visitor_fn) for block in ir_blocks]
+    left_is_binary_composition = isinstance(expression.left, BinaryComposition)
+    right_is_binary_composition = isinstance(expression.right, BinaryComposition)
+
+    if not left_is_binary_composition and not right_is_binary_composition:
+        # Nothing to rewrite, return the expression as-is.
+        return expression
+
+    identity_literal = None  # The boolean literal for which we just use the inner expression.
+    inverse_literal = None  # The boolean literal for which we negate the inner expression.
+    if expression.operator == "=":
+        identity_literal = TrueLiteral
+        inverse_literal = FalseLiteral
+    elif expression.operator == "!=":
+        identity_literal = FalseLiteral
+        inverse_literal = TrueLiteral
+    else:
+        return expression
+
+    expression_to_rewrite = None
+    if expression.left == identity_literal and right_is_binary_composition:
+        return expression.right
+    elif expression.right == identity_literal and left_is_binary_composition:
+        return expression.left
+    elif expression.left == inverse_literal and right_is_binary_composition:
+        expression_to_rewrite = expression.right
+    elif expression.right == inverse_literal and left_is_binary_composition:
+        expression_to_rewrite = expression.left
+
+    if expression_to_rewrite is None:
+        # We couldn't find anything to rewrite, return the expression as-is.
+        return expression
+    elif expression_to_rewrite.operator not in _BOOLEAN_OPERATOR_INVERSES:
+        # We can't rewrite the inner expression since we don't know its inverse operator.
+        return expression
+    else:
+        return BinaryComposition(
+            _BOOLEAN_OPERATOR_INVERSES[expression_to_rewrite.operator],
+            expression_to_rewrite.left,
+            expression_to_rewrite.right,
+        )
 
 
 def optimize_boolean_expression_comparisons(ir_blocks):
@@ -145,60 +230,9 @@ def optimize_boolean_expression_comparisons(ir_blocks):
     Returns:
         a new list of basic block objects, with the optimization applied
     """
-    operator_inverses = {
-        "=": "!=",
-        "!=": "=",
-    }
-
-    def visitor_fn(expression):
-        """Expression visitor function that performs the above rewriting."""
-        if not isinstance(expression, BinaryComposition):
-            return expression
-
-        left_is_binary_composition = isinstance(expression.left, BinaryComposition)
-        right_is_binary_composition = isinstance(expression.right, BinaryComposition)
-
-        if not left_is_binary_composition and not right_is_binary_composition:
-            # Nothing to rewrite, return the expression as-is.
-            return expression
-
-        identity_literal = None  # The boolean literal for which we just use the inner expression.
-        inverse_literal = None  # The boolean literal for which we negate the inner expression.
-        if expression.operator == "=":
-            identity_literal = TrueLiteral
-            inverse_literal = FalseLiteral
-        elif expression.operator == "!=":
-            identity_literal = FalseLiteral
-            inverse_literal = TrueLiteral
-        else:
-            return expression
-
-        expression_to_rewrite = None
-        if expression.left == identity_literal and right_is_binary_composition:
-            return expression.right
-        elif expression.right == identity_literal and left_is_binary_composition:
-            return expression.left
-        elif expression.left == inverse_literal and right_is_binary_composition:
-            expression_to_rewrite = expression.right
-        elif expression.right == inverse_literal and left_is_binary_composition:
-            expression_to_rewrite = expression.left
-
-        if expression_to_rewrite is None:
-            # We couldn't find anything to rewrite, return the expression as-is.
-            return expression
-        elif expression_to_rewrite.operator not in operator_inverses:
-            # We can't rewrite the inner expression since we don't know its inverse operator.
-            return expression
-        else:
-            return BinaryComposition(
-                operator_inverses[expression_to_rewrite.operator],
-                expression_to_rewrite.left,
-                expression_to_rewrite.right,
-            )
-
     new_ir_blocks = []
     for block in ir_blocks:
-        new_block = block.visit_and_update_expressions(visitor_fn)
+        new_block = block.visit_and_update_expressions(_optimize_boolean_expression_comparison)
         new_ir_blocks.append(new_block)
 
     return new_ir_blocks
@@ -385,3 +419,41 @@ def remove_end_optionals(ir_blocks):
         if not isinstance(block, EndOptional):
             new_ir_blocks.append(block)
     return new_ir_blocks
+
+
+################################################################
+# Rules for running lowering passes with IrLoweringPassManager #
+################################################################
+
+LOWER_CONTEXT_FIELD_EXISTENCE_RULE = ExpressionRewriteRule(
+    name="lower_context_field_existence",
+    trigger_types=(ContextFieldExistence,),
+    produced_types=(BinaryComposition, ContextField, OutputContextVertex, Literal),
+    rewrite_fn=_lower_context_field_existence_expression,
+)
+
+SHORT_CIRCUIT_TERNARY_CONDITIONALS_RULE = ExpressionRewriteRule(
+    name="short_circuit_ternary_conditionals",
+    trigger_types=(TernaryConditional,),
+    # The rule only replaces TernaryConditionals with their existing sub-expressions.
+    produced_types=(),
+    rewrite_fn=lambda expression, block, query_metadata_table: (
+        _short_circuit_ternary_conditional(expression)
+    ),
+)
+
+OPTIMIZE_BOOLEAN_EXPRESSION_COMPARISONS_RULE = ExpressionRewriteRule(
+    name="optimize_boolean_expression_comparisons",
+    trigger_types=(BinaryComposition,),
+    produced_types=(BinaryComposition,),
+    rewrite_fn=lambda expression, block, query_metadata_table: (
+        _optimize_boolean_expression_comparison(expression)
+    ),
+)
+
+MERGE_CONSECUTIVE_FILTER_CLAUSES_PASS = IrBlocksPass(
+    name="merge_consecutive_filter_clauses",
+    trigger_types=(Filter,),
+    produced_types=(Filter, BinaryComposition),
+    pass_fn=lambda ir_blocks, query_metadata_table: merge_consecutive_filter_clauses(ir_blocks),
+)
@@ -0,0 +1,233 @@
+# Copyright 2020-present Kensho Technologies, LLC.
+"""Pass manager that fuses compatible IR lowering passes into shared IR traversals.
+
+Most lowering passes rewrite individual expressions or blocks, and are independent of each other.
+Running each of them separately means rebuilding the list of IR blocks and walking every
+expression tree once per pass. Instead, passes can be declared as rewrite rules, and the pass
+manager runs consecutive compatible rules together in a single traversal of the IR.
+
+Each rule declares the types of IR nodes it triggers on, and the types of IR nodes it may produce:
+- a rule is only applied to IR nodes that are instances of its trigger types;
+- a rule is skipped entirely if its trigger types cannot be present in the IR at that point, given
+  the nodes in the original IR and the nodes produced by the passes that ran before it;
+- a rule may be fused into the same traversal as the rules preceding it only if none of the nodes
+  it may produce can trigger any of those preceding rules. This guarantees that fusing rules
+  produces the same IR as running them one after the other.
+
+Expression rules within a fused traversal may be applied more than once to parts of an expression
+tree that an earlier rule has rewritten, so expression rewrite functions must be idempotent.
+"""
+from collections import namedtuple
+
+
+ExpressionRewriteRule = namedtuple(
+    "ExpressionRewriteRule",
+    (
+        "name",  # str, name of the rule, reported in LoweringPassesResult
+        "trigger_types",  # tuple of Expression types that the rule rewrites or inspects
+        "produced_types",  # tuple of Expression types that the rule may produce
+        "rewrite_fn",  # function (Expression, BasicBlock, QueryMetadataTable) -> Expression
+    ),
+)
+
+
+BlockRewriteRule = namedtuple(
+    "BlockRewriteRule",
+    (
+        "name",  # str, name of the rule, reported in LoweringPassesResult
+        "trigger_types",  # tuple of BasicBlock types that the rule rewrites
+        "produced_types",  # tuple of BasicBlock and Expression types that the rule may produce
+        "rewrite_fn",  # function (BasicBlock, QueryMetadataTable) -> BasicBlock
+    ),
+)
+
+
+IrBlocksPass = namedtuple(
+    "IrBlocksPass",
+    (
+        "name",  # str, name of the pass, reported in LoweringPassesResult
+        "trigger_types",  # tuple of BasicBlock and Expression types that the pass rewrites
+        "produced_types",  # tuple of BasicBlock and Expression types that the pass may produce
+        "pass_fn",  # function (list of BasicBlocks, QueryMetadataTable) -> list of BasicBlocks
+    ),
+)
+
+
+LoweringPassesResult = namedtuple(
+    "LoweringPassesResult",
+    (
+        "ir_blocks",  # list of BasicBlocks, the result of running all passes
+        "run_passes",  # list of str, names of passes that were run, in order
+        "skipped_passes",  # list of str, names of passes that were skipped
+    ),
+)
+
+
+def _do_types_overlap(first_types, second_types):
+    """Return True if an object could be an instance of both a first type and a second type."""
+    return any(
+        issubclass(first_type, second_type) or issubclass(second_type, first_type)
+        for first_type in first_types
+        for second_type in second_types
+    )
+
+
+def _get_present_types(ir_blocks):
+    """Return the set of types of all blocks and expressions in the given IR blocks."""
+    present_types = set()
+
+    def visitor_fn(expression):
+        """Record the type of the expression, without rewriting it."""
+        present_types.add(type(expression))
+        return expression
+
+    for block in ir_blocks:
+        present_types.add(type(block))
+        block.visit_and_update_expressions(visitor_fn)
+
+    return present_types
+
+
+def _are_rules_compatible(rule, preceding_rules):
+    """Return True if the rule can be run in the same traversal as the preceding rules."""
+    if type(rule) is not type(preceding_rules[0]) or isinstance(rule, IrBlocksPass):
+        return False
+
+    return not any(
+        _do_types_overlap(rule.produced_types, preceding_rule.trigger_types)
+        for preceding_rule in preceding_rules
+    )
+
+
+def _make_fusion_groups(passes):
+    """Split the passes into lists of consecutive compatible passes, preserving their order."""
+    fusion_groups = []
+    for lowering_pass in passes:
+        if fusion_groups and _are_rules_compatible(lowering_pass, fusion_groups[-1]):
+            fusion_groups[-1].append(lowering_pass)
+        else:
+            fusion_groups.append([lowering_pass])
+    return [tuple(fusion_group) for fusion_group in fusion_groups]
+
+
+class IrLoweringPassManager(object):
+    def __init__(self, passes):
+        """Create a pass manager that runs the given passes, fusing compatible ones.
+
+        Args:
+            passes: list of ExpressionRewriteRule, BlockRewriteRule and IrBlocksPass objects,
+                    in the order in which they are to be run. Pass names must be unique.
+
+        Returns:
+            new IrLoweringPassManager object
+        """
+        pass_names = [lowering_pass.name for lowering_pass in passes]
+        if len(pass_names) != len(set(pass_names)):
+            raise AssertionError("Pass names are not unique: {}".format(pass_names))
+
+        for lowering_pass in passes:
+            if not isinstance(
+                lowering_pass, (ExpressionRewriteRule, BlockRewriteRule, IrBlocksPass)
+            ):
+                raise AssertionError(
+                    "Unexpected pass type {}: {}".format(
+                        type(lowering_pass).__name__, lowering_pass
+                    )
+                )
+
+        self.passes = tuple(passes)
+        self.fusion_groups = _make_fusion_groups(self.passes)
+
+    def run(self, ir_blocks, query_metadata_table):
+        """Run all passes over the given IR blocks.
+
+        Args:
+            ir_blocks: list of BasicBlocks to lower
+            query_metadata_table: QueryMetadataTable object, made available to all passes
+
+        Returns:
+            LoweringPassesResult containing the lowered IR blocks and statistics about the passes
+        """
+        run_passes = []
+        skipped_passes = []
+        present_types = _get_present_types(ir_blocks)
+
+        for fusion_group in self.fusion_groups:
+            # Passes in a fusion group never trigger on types produced by later passes in the group,
+            # so whether a pass is needed only depends on the passes that come before it.
+            passes_to_run = []
+            for lowering_pass in fusion_group:
+                if _do_types_overlap(present_types, lowering_pass.trigger_types):
+                    passes_to_run.append(lowering_pass)
+                    present_types.update(lowering_pass.produced_types)
+                else:
+                    skipped_passes.append(lowering_pass.name)
+
+            if not passes_to_run:
+                continue
+
+            run_passes.extend(lowering_pass.name for lowering_pass in passes_to_run)
+
+            first_pass = passes_to_run[0]
+            if isinstance(first_pass, IrBlocksPass):
+                ir_blocks = first_pass.pass_fn(ir_blocks, query_metadata_table)
+            elif isinstance(first_pass, BlockRewriteRule):
+                ir_blocks = _run_block_rewrite_rules(ir_blocks, query_metadata_table, passes_to_run)
+            elif isinstance(first_pass, ExpressionRewriteRule):
+                ir_blocks = _run_expression_rewrite_rules(
+                    ir_blocks, query_metadata_table, passes_to_run
+                )
+            else:
+                raise AssertionError(
+                    "Unreachable code reached: {} {}".format(first_pass, passes_to_run)
+                )
+
+        return LoweringPassesResult(ir_blocks, run_passes, skipped_passes)
+
+
+def _run_block_rewrite_rules(ir_blocks, query_metadata_table, rules):
+    """Apply the given block rules to each block, in order, in a single traversal of the IR."""
+    new_ir_blocks = []
+    for block in ir_blocks:
+        for rule in rules:
+            if isinstance(block, rule.trigger_types):
+                block = rule.rewrite_fn(block, query_metadata_table)
+        new_ir_blocks.append(block)
+    return new_ir_blocks
+
+
+def _make_fused_expression_visitor_fn(block, query_metadata_table, rules):
+    """Return an expression visitor function that applies all the given rules to an expression."""
+
+    def visitor_fn(expression):
+        """Apply the rules in order, then apply the remaining rules to any rewritten expression."""
+        for index, rule in enumerate(rules):
+            if not isinstance(expression, rule.trigger_types):
+                continue
+
+            new_expression = rule.rewrite_fn(expression, block, query_metadata_table)
+
+            if new_expression is not expression:
+                # The rewritten expression may contain new expressions that the remaining rules
+                # have not seen yet, so apply the remaining rules to the whole rewritten expression.
+                remaining_rules = rules[index + 1 :]
+                if not remaining_rules:
+                    return new_expression
+
+                return new_expression.visit_and_update(
+                    _make_fused_expression_visitor_fn(block, query_metadata_table, remaining_rules)
+                )
+
+        return expression
+
+    return visitor_fn
+
+
+def _run_expression_rewrite_rules(ir_blocks, query_metadata_table, rules):
+    """Apply the given expression rules to all expressions in a single traversal of the IR."""
+    return [
+        block.visit_and_update_expressions(
+            _make_fused_expression_visitor_fn(block, query_metadata_table, rules)
+        )
+        for block in ir_blocks
+    ]
@@ -1,17 +1,28 @@
 # Copyright 2019-present Kensho Technologies, LLC.
 from ..cypher_query import convert_to_cypher_query
 from ..ir_lowering_common.common import (
-    lower_context_field_existence,
-    merge_consecutive_filter_clauses,
-    optimize_boolean_expression_comparisons,
+    LOWER_CONTEXT_FIELD_EXISTENCE_RULE,
+    MERGE_CONSECUTIVE_FILTER_CLAUSES_PASS,
+    OPTIMIZE_BOOLEAN_EXPRESSION_COMPARISONS_RULE,
 )
+from ..ir_lowering_common.pass_manager import IrLoweringPassManager
 from ..ir_sanity_checks import sanity_check_ir_blocks_from_frontend
 from .ir_lowering import (
+    REPLACE_LOCAL_FIELDS_WITH_CONTEXT_FIELDS_PASS,
     insert_explicit_type_bounds,
     move_filters_in_optional_locations_to_global_operations,
     remove_mark_location_after_optional_backtrack,
     renumber_locations_to_one,
-    replace_local_fields_with_context_fields,
+)
+
+
+_CYPHER_LOWERING_PASS_MANAGER = IrLoweringPassManager(
+    [
+        LOWER_CONTEXT_FIELD_EXISTENCE_RULE,
+        REPLACE_LOCAL_FIELDS_WITH_CONTEXT_FIELDS_PASS,
+        OPTIMIZE_BOOLEAN_EXPRESSION_COMPARISONS_RULE,
+        MERGE_CONSECUTIVE_FILTER_CLAUSES_PASS,
+    ]
 )
 
 
@@ -39,10 +50,7 @@ def lower_ir(schema_info, ir):
     )
 
     ir_blocks = remove_mark_location_after_optional_backtrack(ir_blocks, ir.query_metadata_table)
-    ir_blocks = lower_context_field_existence(ir_blocks, ir.query_metadata_table)
-    ir_blocks = replace_local_fields_with_context_fields(ir_blocks)
-    ir_blocks = optimize_boolean_expression_comparisons(ir_blocks)
-    ir_blocks = merge_consecutive_filter_clauses(ir_blocks)
+    ir_blocks = _CYPHER_LOWERING_PASS_MANAGER.run(ir_blocks, ir.query_metadata_table).ir_blocks
     ir_blocks = renumber_locations_to_one(ir_blocks)
 
     cypher_query = convert_to_cypher_query(
@@ -18,6 +18,7 @@ from ..ir_lowering_common.location_renaming import (
     make_location_rewriter_visitor_fn,
     make_revisit_location_translations,
 )
+from ..ir_lowering_common.pass_manager import IrBlocksPass
 
 
 ##################################
@@ -181,20 +182,6 @@ class FoldedContextFieldBeforeFolding(Expression):
         template = "{mark_name}.{field_name}"
         return template.format(mark_name=mark_name, field_name=field_name)
 
-    def __eq__(self, other):
-        """Return True if the given object is equal to this one, and False otherwise."""
-        # Since this object has a GraphQL type as a variable, which doesn't implement
-        # the equality operator, we have to override equality and call is_same_type() here.
-        return (
-            type(self) == type(other)
-            and self.fold_scope_location == other.fold_scope_location
-            and self.field_type.is_same_type(other.field_type)
-        )
-
-    def __ne__(self, other):
-        """Check another object for non-equality against this one."""
-        return not self.__eq__(other)
-
 
 def replace_local_fields_with_context_fields(ir_blocks):
     """Rewrite LocalField expressions into ContextField expressions referencing that location."""
@@ -344,3 +331,13 @@ def renumber_locations_to_one(ir_blocks):
 
         new_ir_blocks.append(new_block)
     return new_ir_blocks
+
+
+REPLACE_LOCAL_FIELDS_WITH_CONTEXT_FIELDS_PASS = IrBlocksPass(
+    name="replace_local_fields_with_context_fields",
+    trigger_types=(LocalField,),
+    produced_types=(ContextField, FoldedContextFieldBeforeFolding),
+    pass_fn=lambda ir_blocks, query_metadata_table: replace_local_fields_with_context_fields(
+        ir_blocks
+    ),
+)
@@ -1,9 +1,10 @@
 # Copyright 2018-present Kensho Technologies, LLC.
 from ..ir_lowering_common.common import (
-    lower_context_field_existence,
+    LOWER_CONTEXT_FIELD_EXISTENCE_RULE,
+    OPTIMIZE_BOOLEAN_EXPRESSION_COMPARISONS_RULE,
     merge_consecutive_filter_clauses,
-    optimize_boolean_expression_comparisons,
 )
+from ..ir_lowering_common.pass_manager import IrLoweringPassManager
 from ..ir_sanity_checks import sanity_check_ir_blocks_from_frontend
 from .ir_lowering import (
     lower_coerce_type_block_type_data,
@@ -13,6 +14,11 @@ from .ir_lowering import (
 )
 
 
+_GREMLIN_CONTEXT_FIELD_EXISTENCE_LOWERING_PASS_MANAGER = IrLoweringPassManager(
+    [LOWER_CONTEXT_FIELD_EXISTENCE_RULE, OPTIMIZE_BOOLEAN_EXPRESSION_COMPARISONS_RULE]
+)
+
+
 ##############
 # Public API #
 ##############
@@ -30,8 +36,9 @@ def lower_ir(schema_info, ir):
     """
     sanity_check_ir_blocks_from_frontend(ir.ir_blocks, ir.query_metadata_table)
 
-    ir_blocks = lower_context_field_existence(ir.ir_blocks, ir.query_metadata_table)
-    ir_blocks = optimize_boolean_expression_comparisons(ir_blocks)
+    ir_blocks = _GREMLIN_CONTEXT_FIELD_EXISTENCE_LOWERING_PASS_MANAGER.run(
+        ir.ir_blocks, ir.query_metadata_table
+    ).ir_blocks
 
     if schema_info.type_equivalence_hints:
         ir_blocks = lower_coerce_type_block_type_data(ir_blocks, schema_info.type_equivalence_hints)
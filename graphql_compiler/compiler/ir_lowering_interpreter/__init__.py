@@ -0,0 +1,24 @@
+# Copyright 2020-present Kensho Technologies, LLC.
+from ..ir_sanity_checks import sanity_check_ir_blocks_from_frontend
+
+
+##############
+# Public API #
+##############
+
+
+def lower_ir(schema_info, ir):
+    """Lower the IR into a form that can be executed by the interpreter.
+
+    The interpreter executes the IR blocks produced by the frontend directly, so no lowering passes
+    are needed. The IR is only checked for consistency.
+
+    Args:
+        schema_info: CommonSchemaInfo containing all relevant schema information
+        ir: IrAndMetadata representing the query to lower
+
+    Returns:
+        IrAndMetadata, the given IR
+    """
+    sanity_check_ir_blocks_from_frontend(ir.ir_blocks, ir.query_metadata_table)
+    return ir
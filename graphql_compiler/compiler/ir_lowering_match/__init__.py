@@ -3,13 +3,15 @@ import six
 
 from ..blocks import Filter
 from ..ir_lowering_common.common import (
+    LOWER_CONTEXT_FIELD_EXISTENCE_RULE,
+    MERGE_CONSECUTIVE_FILTER_CLAUSES_PASS,
+    OPTIMIZE_BOOLEAN_EXPRESSION_COMPARISONS_RULE,
     extract_optional_location_root_info,
     extract_simple_optional_location_info,
-    lower_context_field_existence,
     merge_consecutive_filter_clauses,
-    optimize_boolean_expression_comparisons,
     remove_end_optionals,
 )
+from ..ir_lowering_common.pass_manager import IrLoweringPassManager
 from ..ir_sanity_checks import sanity_check_ir_blocks_from_frontend
 from ..match_query import convert_to_match_query
 from ..workarounds import (
@@ -19,11 +21,11 @@ from ..workarounds import (
 )
 from .between_lowering import lower_comparisons_to_between
 from .ir_lowering import (
+    LOWER_STRING_OPERATORS_RULE,
+    REWRITE_BINARY_COMPOSITION_INSIDE_TERNARY_CONDITIONAL_RULE,
     lower_backtrack_blocks,
     lower_folded_coerce_types_into_filter_blocks,
-    lower_string_operators,
     remove_backtrack_blocks_from_fold,
-    rewrite_binary_composition_inside_ternary_conditional,
     truncate_repeated_single_step_traversals,
     truncate_repeated_single_step_traversals_in_sub_queries,
 )
@@ -36,17 +38,33 @@ from .optional_traversal import (
 from .utils import construct_where_filter_predicate
 
 
+# These lowering / optimization passes work on IR blocks, and are run in the given order.
+_MATCH_IR_BLOCKS_LOWERING_PASS_MANAGER = IrLoweringPassManager(
+    [
+        LOWER_CONTEXT_FIELD_EXISTENCE_RULE,
+        OPTIMIZE_BOOLEAN_EXPRESSION_COMPARISONS_RULE,
+        REWRITE_BINARY_COMPOSITION_INSIDE_TERNARY_CONDITIONAL_RULE,
+        MERGE_CONSECUTIVE_FILTER_CLAUSES_PASS,
+        LOWER_STRING_OPERATORS_RULE,
+    ]
+)
+
+
 ##############
 # Public API #
 ##############
 
 
-def lower_ir(schema_info, ir):
+def lower_ir(schema_info, ir, query_planning_schema_info=None, parameters=None):
     """Lower the IR into an IR form that can be represented in MATCH queries.
 
     Args:
         schema_info: CommonSchemaInfo containing all relevant schema information
         ir: IrAndMetadata representing the query to lower into MATCH-compatible form
+        query_planning_schema_info: optional QueryPlanningSchemaInfo, whose statistics are used
+                                    to choose the query start point matching the fewest vertices
+        parameters: optional dict, parameters with which the query will be executed. Must be
+                    provided if and only if query_planning_schema_info is provided.
 
     Returns:
         MatchQuery object containing the IR blocks organized in a MATCH-like structure
@@ -85,11 +103,9 @@ def lower_ir(schema_info, ir):
         ir_blocks.insert(-1, Filter(where_filter_predicate))
 
     # These lowering / optimization passes work on IR blocks.
-    ir_blocks = lower_context_field_existence(ir_blocks, ir.query_metadata_table)
-    ir_blocks = optimize_boolean_expression_comparisons(ir_blocks)
-    ir_blocks = rewrite_binary_composition_inside_ternary_conditional(ir_blocks)
-    ir_blocks = merge_consecutive_filter_clauses(ir_blocks)
-    ir_blocks = lower_string_operators(ir_blocks)
+    ir_blocks = _MATCH_IR_BLOCKS_LOWERING_PASS_MANAGER.run(
+        ir_blocks, ir.query_metadata_table
+    ).ir_blocks
     ir_blocks = orientdb_eval_scheduling.workaround_lowering_pass(
         ir_blocks, ir.query_metadata_table
     )
@@ -125,8 +141,17 @@ def lower_ir(schema_info, ir):
     compound_match_query = truncate_repeated_single_step_traversals_in_sub_queries(
         compound_match_query
     )
+    if query_planning_schema_info is None:
+        query_metadata_table = None
+    else:
+        query_metadata_table = ir.query_metadata_table
     compound_match_query = orientdb_query_execution.expose_ideal_query_execution_start_points(
-        compound_match_query, location_types, coerced_locations
+        compound_match_query,
+        location_types,
+        coerced_locations,
+        query_metadata_table=query_metadata_table,
+        query_planning_schema_info=query_planning_schema_info,
+        parameters=parameters,
     )
 
     return compound_match_query
@@ -17,6 +17,7 @@ from ..ir_lowering_common.location_renaming import (
     make_revisit_location_translations,
     translate_potential_location,
 )
+from ..ir_lowering_common.pass_manager import ExpressionRewriteRule
 from .utils import convert_coerce_type_to_instanceof_filter
 
 
@@ -25,71 +26,85 @@ from .utils import convert_coerce_type_to_instanceof_filter
 ##################################
 
 
-def rewrite_binary_composition_inside_ternary_conditional(ir_blocks):
-    """Rewrite BinaryConditional expressions in the true/false values of TernaryConditionals."""
-
-    def visitor_fn(expression):
-        """Expression visitor function."""
-        # MATCH queries do not allow BinaryComposition inside a TernaryConditional's true/false
-        # value blocks, since OrientDB cannot produce boolean values for comparisons inside them.
-        # We transform any structures that resemble the following:
-        #    TernaryConditional(predicate, X, Y), with X or Y of type BinaryComposition
-        # into the following:
-        # - if X is of type BinaryComposition, and Y is not,
-        #    BinaryComposition(
-        #        '=',
-        #        TernaryConditional(
-        #            predicate,
-        #            TernaryConditional(X, true, false),
-        #            Y
-        #        ),
-        #        true
-        #    )
-        # - if Y is of type BinaryComposition, and X is not,
-        #    BinaryComposition(
-        #        '=',
-        #        TernaryConditional(
-        #            predicate,
-        #            X,
-        #            TernaryConditional(Y, true, false),
-        #        ),
-        #        true
-        #    )
-        # - if both X and Y are of type BinaryComposition,
-        #    BinaryComposition(
-        #        '=',
-        #        TernaryConditional(
-        #            predicate,
-        #            TernaryConditional(X, true, false),
-        #            TernaryConditional(Y, true, false)
-        #        ),
-        #        true
-        #    )
-        if not isinstance(expression, TernaryConditional):
-            return expression
-
-        if_true = expression.if_true
-        if_false = expression.if_false
+def _rewrite_binary_composition_inside_ternary_conditional(expression):
+    """Rewrite a TernaryConditional whose true/false values contain a BinaryComposition."""
+    # MATCH queries do not allow BinaryComposition inside a TernaryConditional's true/false
+    # value blocks, since OrientDB cannot produce boolean values for comparisons inside them.
+    # We transform any structures that resemble the following:
+    #    TernaryConditional(predicate, X, Y), with X or Y of type BinaryComposition
+    # into the following:
+    # - if X is of type BinaryComposition, and Y is not,
+    #    BinaryComposition(
+    #        '=',
+    #        TernaryConditional(
+    #            predicate,
+    #            TernaryConditional(X, true, false),
+    #            Y
+    #        ),
+    #        true
+    #    )
+    # - if Y is of type BinaryComposition, and X is not,
+    #    BinaryComposition(
+    #        '=',
+    #        TernaryConditional(
+    #            predicate,
+    #            X,
+    #            TernaryConditional(Y, true, false),
+    #        ),
+    #        true
+    #    )
+    # - if both X and Y are of type BinaryComposition,
+    #    BinaryComposition(
+    #        '=',
+    #        TernaryConditional(
+    #            predicate,
+    #            TernaryConditional(X, true, false),
+    #            TernaryConditional(Y, true, false)
+    #        ),
+    #        true
+    #    )
+    if not isinstance(expression, TernaryConditional):
+        return expression
+
+    if_true = expression.if_true
+    if_false = expression.if_false
+
+    true_branch_rewriting_necessary = isinstance(if_true, BinaryComposition)
+    false_branch_rewriting_necessary = isinstance(if_false, BinaryComposition)
+
+    if not (true_branch_rewriting_necessary or false_branch_rewriting_necessary):
+        # No rewriting is necessary.
+        return expression
+
+    if true_branch_rewriting_necessary:
+        if_true = TernaryConditional(if_true, TrueLiteral, FalseLiteral)
+
+    if false_branch_rewriting_necessary:
+        if_false = TernaryConditional(if_false, TrueLiteral, FalseLiteral)
+
+    ternary = TernaryConditional(expression.predicate, if_true, if_false)
+    return BinaryComposition("=", ternary, TrueLiteral)
 
-        true_branch_rewriting_necessary = isinstance(if_true, BinaryComposition)
-        false_branch_rewriting_necessary = isinstance(if_false, BinaryComposition)
 
-        if not (true_branch_rewriting_necessary or false_branch_rewriting_necessary):
-            # No rewriting is necessary.
-            return expression
-
-        if true_branch_rewriting_necessary:
-            if_true = TernaryConditional(if_true, TrueLiteral, FalseLiteral)
-
-        if false_branch_rewriting_necessary:
-            if_false = TernaryConditional(if_false, TrueLiteral, FalseLiteral)
+def rewrite_binary_composition_inside_ternary_conditional(ir_blocks):
+    """Rewrite BinaryConditional expressions in the true/false values of TernaryConditionals."""
+    new_ir_blocks = [
+        block.visit_and_update_expressions(_rewrite_binary_composition_inside_ternary_conditional)
+        for block in ir_blocks
+    ]
 
-        ternary = TernaryConditional(expression.predicate, if_true, if_false)
-        return BinaryComposition("=", ternary, TrueLiteral)
+    return new_ir_blocks
 
-    new_ir_blocks = [block.visit_and_update_expressions(visitor_fn) for block in ir_blocks]
 
-    return new_ir_blocks
+REWRITE_BINARY_COMPOSITION_INSIDE_TERNARY_CONDITIONAL_RULE = ExpressionRewriteRule(
+    name="rewrite_binary_composition_inside_ternary_conditional",
+    # The rule inspects the true/false values of TernaryConditionals for BinaryCompositions.
+    trigger_types=(TernaryConditional, BinaryComposition),
+    produced_types=(BinaryComposition, TernaryConditional, Literal),
+    rewrite_fn=lambda expression, block, query_metadata_table: (
+        _rewrite_binary_composition_inside_ternary_conditional(expression)
+    ),
+)
 
 
 def _prepend_wildcard(expression):
@@ -102,46 +117,57 @@ def _append_wildcard(expression):
     return BinaryComposition("+", expression, Literal("%"))
 
 
+def _lower_string_operator(expression):
+    """Lower the expression if it is a "has_substring", "starts_with" or "ends_with" operation."""
+    if not isinstance(expression, BinaryComposition):
+        return expression
+    elif expression.operator == "has_substring":
+        # The implementation of "has_substring" must use the LIKE operator in MATCH, and must
+        # prepend and append "%" (wildcard) symbols to the substring being matched.
+        # We transform any structures that resemble the following:
+        #    BinaryComposition('has_substring', X, Y)
+        # into the following:
+        #    BinaryComposition(
+        #        'LIKE',
+        #        X,
+        #        BinaryComposition(
+        #            '+',
+        #            Literal("%"),
+        #            BinaryComposition(
+        #                 '+',
+        #                 Y,
+        #                 Literal("%")
+        #            )
+        #        )
+        #    )
+        return BinaryComposition(
+            "LIKE", expression.left, _prepend_wildcard(_append_wildcard(expression.right))
+        )
+    elif expression.operator == "starts_with":
+        # Append a wildcard to the right of the argument string
+        return BinaryComposition("LIKE", expression.left, _append_wildcard(expression.right))
+    elif expression.operator == "ends_with":
+        # Prepend a wildcard to the left of the argument string
+        return BinaryComposition("LIKE", expression.left, _prepend_wildcard(expression.right))
+    else:
+        return expression
+
+
 def lower_string_operators(ir_blocks):
     """Lower Filters with "has_substring", "starts_with", or "ends_with" operation into MATCH."""
+    new_ir_blocks = [
+        block.visit_and_update_expressions(_lower_string_operator) for block in ir_blocks
+    ]
 
-    def visitor_fn(expression):
-        if not isinstance(expression, BinaryComposition):
-            return expression
-        elif expression.operator == "has_substring":
-            # The implementation of "has_substring" must use the LIKE operator in MATCH, and must
-            # prepend and append "%" (wildcard) symbols to the substring being matched.
-            # We transform any structures that resemble the following:
-            #    BinaryComposition('has_substring', X, Y)
-            # into the following:
-            #    BinaryComposition(
-            #        'LIKE',
-            #        X,
-            #        BinaryComposition(
-            #            '+',
-            #            Literal("%"),
-            #            BinaryComposition(
-            #                 '+',
-            #                 Y,
-            #                 Literal("%")
-            #            )
-            #        )
-            #    )
-            return BinaryComposition(
-                "LIKE", expression.left, _prepend_wildcard(_append_wildcard(expression.right))
-            )
-        elif expression.operator == "starts_with":
-            # Append a wildcard to the right of the argument string
-            return BinaryComposition("LIKE", expression.left, _append_wildcard(expression.right))
-        elif expression.operator == "ends_with":
-            # Prepend a wildcard to the left of the argument string
-            return BinaryComposition("LIKE", expression.left, _prepend_wildcard(expression.right))
-        else:
-            return expression
+    return new_ir_blocks
 
-    new_ir_blocks = [block.visit_and_update_expressions(visitor_fn) for block in ir_blocks]
 
-    return new_ir_blocks
+LOWER_STRING_OPERATORS_RULE = ExpressionRewriteRule(
+    name="lower_string_operators",
+    trigger_types=(BinaryComposition,),
+    produced_types=(BinaryComposition, Literal),
+    rewrite_fn=lambda expression, block, query_metadata_table: _lower_string_operator(expression),
+)
 
 
 def truncate_repeated_single_step_traversals(match_query):
@@ -5,6 +5,15 @@ from .. import blocks, expressions
 from ...compiler.compiler_frontend import IrAndMetadata
 from ..helpers import FoldScopeLocation, get_edge_direction_and_name
 from ..ir_lowering_common import common
+from ..ir_lowering_common.pass_manager import IrLoweringPassManager
+
+
+_SQL_LOWERING_PASS_MANAGER = IrLoweringPassManager(
+    [
+        common.SHORT_CIRCUIT_TERNARY_CONDITIONALS_RULE,
+        common.OPTIMIZE_BOOLEAN_EXPRESSION_COMPARISONS_RULE,
+    ]
+)
 
 
 def _remove_output_context_field_existence(ir_blocks, query_metadata_table):
@@ -141,6 +150,5 @@ def lower_ir(schema_info, ir):
     ir_blocks = ir.ir_blocks
     ir_blocks = _remove_output_context_field_existence(ir_blocks, ir.query_metadata_table)
     ir_blocks = _lower_sql_context_field_existence(schema_info, ir_blocks, ir.query_metadata_table)
-    ir_blocks = common.short_circuit_ternary_conditionals(ir_blocks, ir.query_metadata_table)
-    ir_blocks = common.optimize_boolean_expression_comparisons(ir_blocks)
+    ir_blocks = _SQL_LOWERING_PASS_MANAGER.run(ir_blocks, ir.query_metadata_table).ir_blocks
     return IrAndMetadata(ir_blocks, ir.input_metadata, ir.output_metadata, ir.query_metadata_table)
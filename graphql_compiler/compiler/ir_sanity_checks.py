@@ -17,8 +17,10 @@ from .blocks import (
     Unfold,
 )
 from .ir_lowering_common.common import extract_folds_from_ir_blocks
+from .trusted_mode import skip_in_trusted_ir_mode
 
 
+@skip_in_trusted_ir_mode
 def sanity_check_ir_blocks_from_frontend(ir_blocks, query_metadata_table):
     """Assert that IR blocks originating from the frontend do not have nonsensical structure.
 
@@ -30,6 +32,8 @@ def sanity_check_ir_blocks_from_frontend(ir_blocks, query_metadata_table):
         AssertionError, if the IR has unexpected structure. If the IR produced by the front-end
         cannot be successfully and correctly used to generate MATCH or Gremlin due to a bug,
         this is the method that should catch the problem.
+
+    This check is skipped in trusted IR mode.
     """
     if not ir_blocks:
         raise AssertionError("Received no ir_blocks: {}".format(ir_blocks))
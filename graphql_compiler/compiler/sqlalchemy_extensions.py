@@ -1,4 +1,7 @@
 # Copyright 2019-present Kensho Technologies, LLC.
+from collections import namedtuple
+import re
+
 import sqlalchemy
 
 
@@ -76,3 +79,107 @@ def print_sqlalchemy_query_string(query, dialect):
             return super(BindparamCompiler, self).visit_bindparam(bindparam, **kwargs)
 
     return str(BindparamCompiler(dialect, query).process(query))
+
+
+# The SQLAlchemy compiler renders each expanding (list-valued) bound parameter using this pattern,
+# to be replaced with one placeholder per list element when the query is executed.
+_EXPANDING_BIND_PARAMETER_PATTERN = re.compile(r"\(\[EXPANDING_(\w+)\]\)")
+
+# The placeholder formats for list elements of expanding bound parameters, for each paramstyle.
+# Named paramstyles receive the DBAPI parameter name of the element.
+_EXPANDED_ELEMENT_PLACEHOLDER_FORMATS = {
+    "qmark": "?",
+    "format": "%s",
+    "named": ":{element_name}",
+    "pyformat": "%({element_name})s",
+}
+
+
+PrecompiledSqlQuery = namedtuple(
+    "PrecompiledSqlQuery",
+    (
+        # Tuple of str, the dialect-specific SQL text of the query, split at each expanding
+        # bound parameter. Contains one more element than expanding_parameters.
+        "query_string_parts",
+        # Tuple of (str, str) tuples, the name of each expanding bound parameter in the order
+        # they appear in the query text, and the SQL expression to use if its value is empty.
+        "expanding_parameters",
+        # str, format of the placeholder for each list element of an expanding bound parameter,
+        # in the DBAPI paramstyle of the query. See _EXPANDED_ELEMENT_PLACEHOLDER_FORMATS.
+        "expanded_element_placeholder_format",
+        # str, format of the DBAPI parameter name of each list element of an expanding bound
+        # parameter, given the parameter name and the 1-based index of the element, e.g.
+        # "{name}_{index}". Chosen so that element names cannot collide with the names of
+        # the other bound parameters of the query.
+        "expanded_element_name_format",
+        # Tuple of str, the names of the bound parameters in the order in which their values must
+        # be passed to the DBAPI, for positional paramstyles. None for named paramstyles.
+        "positional_parameter_names",
+    ),
+)
+
+
+def precompile_sqlalchemy_query(query, dialect):
+    """Compile the query to dialect-specific SQL text and a specification of its bound parameters.
+
+    Executing a SQLAlchemy query compiles it to SQL text every time, and binding its parameters
+    with query.params() copies the whole query. The precompiled query avoids both: the values of
+    its bound parameters are passed directly to the DBAPI cursor together with the precompiled
+    text, see insert_arguments_into_precompiled_sql_query().
+
+    The bound parameters created by the compiler are untyped, so SQLAlchemy does not process their
+    values before passing them to the DBAPI, and neither does the precompiled query.
+
+    Args:
+        query: sqlalchemy.sql.selectable.Select
+        dialect: sqlalchemy.engine.interfaces.Dialect, the dialect of the database that will
+                 execute the query. Its paramstyle must be one of "qmark", "format", "named"
+                 or "pyformat".
+
+    Returns:
+        PrecompiledSqlQuery object
+    """
+    if dialect.paramstyle not in _EXPANDED_ELEMENT_PLACEHOLDER_FORMATS:
+        raise NotImplementedError(
+            "Precompiling queries is not supported for the {} paramstyle of dialect {}.".format(
+                dialect.paramstyle, dialect.name
+            )
+        )
+
+    compiled_query = query.compile(dialect=dialect)
+
+    split_query_string = _EXPANDING_BIND_PARAMETER_PATTERN.split(compiled_query.string)
+    # Splitting on a pattern with a group alternates the query text and the group's matches.
+    query_string_parts = tuple(split_query_string[::2])
+    expanding_parameters = tuple(
+        (
+            parameter_name,
+            compiled_query.visit_empty_set_expr([compiled_query.binds[parameter_name].type]),
+        )
+        for parameter_name in split_query_string[1::2]
+    )
+
+    # Element names are formed by joining the parameter name and the element index with
+    # a separator, which is lengthened until no other bound parameter can have such a name,
+    # e.g. for a query with the parameters "names" and "names_1".
+    separator = "_"
+    while any(
+        re.fullmatch(re.escape(parameter_name + separator) + r"\d+", bind_name)
+        for parameter_name, _ in expanding_parameters
+        for bind_name in compiled_query.binds
+    ):
+        separator += "_"
+
+    positional_parameter_names = None
+    if compiled_query.positional:
+        positional_parameter_names = tuple(compiled_query.positiontup)
+
+    return PrecompiledSqlQuery(
+        query_string_parts=query_string_parts,
+        expanding_parameters=expanding_parameters,
+        expanded_element_placeholder_format=_EXPANDED_ELEMENT_PLACEHOLDER_FORMATS[
+            dialect.paramstyle
+        ],
+        expanded_element_name_format="{name}" + separator + "{index}",
+        positional_parameter_names=positional_parameter_names,
+    )
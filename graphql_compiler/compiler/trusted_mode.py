@@ -0,0 +1,76 @@
+# Copyright 2020-present Kensho Technologies, LLC.
+"""Trusted IR mode, in which the compiler skips checks of its own internal invariants.
+
+The compiler checks its intermediate representation extensively: most blocks and expressions
+validate themselves when constructed and again when emitted, and the IR produced by the frontend
+is sanity-checked before lowering. These checks catch bugs in the compiler rather than errors in
+the compiled queries, so production deployments may choose to skip them.
+
+Checks that may fail due to invalid queries or schemas are always performed, regardless of mode.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
+
+FunctionT = TypeVar("FunctionT", bound=Callable[..., Any])
+
+# Whether trusted IR mode is enabled, unless overridden in the current context.
+_trusted_ir_mode_default = False
+
+# Per-context override of the above default, set by the trusted_ir_mode() context manager.
+_trusted_ir_mode_override: ContextVar[Optional[bool]] = ContextVar(
+    "trusted_ir_mode_override", default=None
+)
+
+
+def set_trusted_ir_mode_default(enabled: bool) -> None:
+    """Enable or disable trusted IR mode globally, for all contexts that do not override it."""
+    global _trusted_ir_mode_default
+    _trusted_ir_mode_default = enabled
+
+
+def is_trusted_ir_mode_enabled() -> bool:
+    """Return True if trusted IR mode is enabled in the current context, and False otherwise."""
+    override = _trusted_ir_mode_override.get()
+    if override is None:
+        return _trusted_ir_mode_default
+    return override
+
+
+@contextmanager
+def trusted_ir_mode(enabled: bool = True) -> Iterator[None]:
+    """Enable (or disable) trusted IR mode within the context manager's scope.
+
+    The setting is local to the current thread or asyncio task, and takes precedence over the
+    global default set with set_trusted_ir_mode_default().
+
+    Args:
+        enabled: bool, whether trusted IR mode should be enabled within the context manager's scope
+    """
+    token = _trusted_ir_mode_override.set(enabled)
+    try:
+        yield
+    finally:
+        _trusted_ir_mode_override.reset(token)
+
+
+def skip_in_trusted_ir_mode(func: FunctionT) -> FunctionT:
+    """Decorate a function that checks internal invariants, so it does nothing in trusted IR mode.
+
+    Args:
+        func: function returning None, whose only purpose is to raise errors when an
+              internal invariant of the compiler is violated
+
+    Returns:
+        function with the same signature, which only calls func if trusted IR mode is disabled
+    """
+
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> None:
+        """Call the function, unless trusted IR mode is enabled."""
+        if not is_trusted_ir_mode_enabled():
+            func(*args, **kwargs)
+
+    return wrapper  # type: ignore
@@ -42,8 +42,17 @@ The process of applying the optimizations is as follows:
         - Ensure that all query points not inside fold, optional, or recursion scope contain
           a "class:" clause. That increases the number of available query start points,
           so OrientDB can choose the start point of lowest cardinality.
+
+Both assumptions ignore how selective the filters are, and how many vertices each class has.
+When statistics about the data are available, a location with a local filter may still be
+a much worse start point than one without filters, e.g. if its filter matches most vertices of
+a large class. In that case, the number of vertices matching each preferred or eligible location
+is estimated from the class counts and the selectivity of the filters at the location, and only
+the location with the lowest estimate is exposed as a query start point. If the count of any of
+these classes is unknown, the assumptions above are used instead.
 """
 
+from ...cost_estimation.filter_selectivity_utils import adjust_counts_for_filters
 from ..blocks import CoerceType, Filter, QueryRoot, Recurse, Traverse
 from ..expressions import (
     BinaryComposition,
@@ -372,17 +381,124 @@ def _expose_all_eligible_locations(match_query, location_types, eligible_locatio
     return match_query._replace(match_traversals=new_match_traversals)
 
 
+def _get_cheapest_start_location(
+    match_query,
+    location_types,
+    candidate_locations,
+    query_metadata_table,
+    query_planning_schema_info,
+    parameters,
+):
+    """Return the candidate location matching the fewest vertices, or None if it is unknown.
+
+    Args:
+        match_query: MatchQuery object describing the query being analyzed for optimization
+        location_types: dict mapping each location in the query to its GraphQL type
+        candidate_locations: set of Location objects, the preferred and eligible locations
+        query_metadata_table: QueryMetadataTable object of the query, containing its filters
+        query_planning_schema_info: QueryPlanningSchemaInfo whose statistics are used to estimate
+                                    the number of vertices matching each location
+        parameters: dict, parameters with which the query will be executed
+
+    Returns:
+        the Location in candidate_locations with the lowest estimated number of matching vertices,
+        or None if the class count of any of the candidate locations is unknown
+    """
+    statistics = query_planning_schema_info.statistics
+    cheapest_location = None
+    cheapest_location_count = None
+    for current_traversal in match_query.match_traversals:
+        for match_step in current_traversal:
+            location = match_step.as_block.location
+            # Locations may appear in more than one MATCH step, but are only estimated once.
+            if location not in candidate_locations or location == cheapest_location:
+                continue
+
+            class_name = location_types[location].name
+            class_count = statistics.get_class_count(class_name)
+            if class_count is None:
+                return None
+            location_count = adjust_counts_for_filters(
+                query_planning_schema_info,
+                query_metadata_table.get_filter_infos(location),
+                parameters,
+                class_name,
+                class_count,
+            )
+            # The first of multiple equally cheap locations is chosen, keeping the output stable.
+            if cheapest_location_count is None or location_count < cheapest_location_count:
+                cheapest_location = location
+                cheapest_location_count = location_count
+
+    return cheapest_location
+
+
 def expose_ideal_query_execution_start_points(
-    compound_match_query, location_types, coerced_locations
+    compound_match_query,
+    location_types,
+    coerced_locations,
+    query_metadata_table=None,
+    query_planning_schema_info=None,
+    parameters=None,
 ):
-    """Ensure that OrientDB only considers desirable query start points in query planning."""
+    """Ensure that OrientDB only considers desirable query start points in query planning.
+
+    Args:
+        compound_match_query: CompoundMatchQuery object describing the query to optimize
+        location_types: dict mapping each location in the query to its GraphQL type
+        coerced_locations: set of locations that have associated type coercions
+        query_metadata_table: optional QueryMetadataTable object of the query. Must be provided
+                              if and only if query_planning_schema_info is provided.
+        query_planning_schema_info: optional QueryPlanningSchemaInfo. If provided, its statistics
+                                    are used to only expose the start point matching the fewest
+                                    vertices, as described in the module docstring.
+        parameters: optional dict, parameters with which the query will be executed, used to
+                    estimate the selectivity of filters. Must be provided if and only if
+                    query_planning_schema_info is provided.
+
+    Returns:
+        CompoundMatchQuery object with the same semantics, whose only valid start points are
+        the desirable ones
+    """
+    use_statistics = query_planning_schema_info is not None
+    if use_statistics != (query_metadata_table is not None) or use_statistics != (
+        parameters is not None
+    ):
+        raise AssertionError(
+            "Expected query_metadata_table, query_planning_schema_info and parameters to either "
+            "all be provided or all be None, but got {} {} {}".format(
+                query_metadata_table, query_planning_schema_info, parameters
+            )
+        )
+
     new_queries = []
 
     for match_query in compound_match_query.match_queries:
         location_classification = _classify_query_locations(match_query)
         preferred_locations, eligible_locations, _ = location_classification
 
-        if preferred_locations:
+        cheapest_location = None
+        if use_statistics:
+            cheapest_location = _get_cheapest_start_location(
+                match_query,
+                location_types,
+                preferred_locations | eligible_locations,
+                query_metadata_table,
+                query_planning_schema_info,
+                parameters,
+            )
+
+        if cheapest_location is not None:
+            # Expose only the cheapest location as a query start point, by treating it as
+            # the only preferred location and all other candidate locations as merely eligible.
+            new_query = _expose_only_preferred_locations(
+                match_query,
+                location_types,
+                coerced_locations,
+                {cheapest_location},
+                (preferred_locations | eligible_locations) - {cheapest_location},
+            )
+        elif preferred_locations:
             # Convert all eligible locations into non-eligible ones, by removing
             # their "class:" clause. The "class:" clause is provided either by having
             # a QueryRoot block or a CoerceType block in the MatchStep corresponding
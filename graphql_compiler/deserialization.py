@@ -82,6 +82,47 @@ _ALLOWED_TYPES_AND_DESERIALIZATION_FUNCTIONS: Mapping[
 )
 
 
+def get_scalar_deserialization_function(expected_type: GraphQLScalarType) -> Callable[[Any], Any]:
+    """Return a function that converts scalar values to the given GraphQLScalarType.
+
+    The returned function behaves exactly like deserialize_scalar_value with the given expected
+    type, but the deserialization rules for the type are only looked up once. Prefer it over
+    deserialize_scalar_value when deserializing many values of the same type.
+
+    Args:
+        expected_type: a GraphQLScalarType to which values should be converted.
+
+    Returns:
+        function that takes a value and returns it converted to expected_type, raising ValueError
+        if the value is not appropriate for the type
+    """
+    types_and_deserialization = _ALLOWED_TYPES_AND_DESERIALIZATION_FUNCTIONS.get(expected_type.name)
+    if types_and_deserialization is None:
+        raise AssertionError(
+            f"Unexpected GraphQLType {expected_type}. No deserialization function known."
+        )
+    expected_python_types, deserialization_function = types_and_deserialization
+    is_boolean_type = is_same_type(GraphQLBoolean, expected_type)
+
+    def deserialize(value: Any) -> Any:
+        """Deserialize a single value to expected_type."""
+        # Explicitly disallow passing boolean values for non-boolean types.
+        if isinstance(value, bool) and not is_boolean_type:
+            raise ValueError(
+                f"Cannot deserialize boolean value {value} to non-GraphQLBoolean type "
+                f"{expected_type}."
+            )
+
+        # Ensure value has an appropriate type and deserialize the value.
+        if not isinstance(value, expected_python_types):
+            raise ValueError(
+                f"{value} ({type(value)} cannot be deserialized to GraphQL type {expected_type}."
+            )
+        return deserialization_function(value)
+
+    return deserialize
+
+
 def deserialize_scalar_value(expected_type: GraphQLScalarType, value: Any) -> Any:
     """Convert a scalar value to the appropriate type for the given GraphQLScalarType.
 
@@ -114,25 +155,7 @@ def deserialize_scalar_value(expected_type: GraphQLScalarType, value: Any) -> An
         ValueError: if the value is not appropriate for the type. ValueError is chosen because
                     it is already the base case of exceptions raised by the GraphQL parsers.
     """
-    types_and_deserialization = _ALLOWED_TYPES_AND_DESERIALIZATION_FUNCTIONS.get(expected_type.name)
-    if types_and_deserialization is None:
-        raise AssertionError(
-            f"Unexpected GraphQLType {expected_type}. No deserialization function known."
-        )
-
-    # Explicitly disallow passing boolean values for non-boolean types.
-    if isinstance(value, bool) and not is_same_type(GraphQLBoolean, expected_type):
-        raise ValueError(
-            f"Cannot deserialize boolean value {value} to non-GraphQLBoolean type {expected_type}."
-        )
-
-    # Ensure value has an appropriate type and deserialize the value.
-    expected_python_types, deserialization_function = types_and_deserialization
-    if not isinstance(value, expected_python_types):
-        raise ValueError(
-            f"{value} ({type(value)} cannot be deserialized to GraphQL type {expected_type}."
-        )
-    return deserialization_function(value)
+    return get_scalar_deserialization_function(expected_type)(value)
 
 
 def deserialize_value(expected_type: QueryArgumentGraphQLType, value: Any) -> Any:
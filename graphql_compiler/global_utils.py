@@ -1,6 +1,9 @@
 # Copyright 2017-present Kensho Technologies, LLC.
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Any, Dict, NamedTuple, Set, Tuple
+from threading import Lock
+import typing
+from typing import Any, Callable, Dict, Generic, NamedTuple, Optional, Set, Tuple, TypeVar
 
 from graphql import DocumentNode, GraphQLList, GraphQLNamedType, GraphQLNonNull
 import six
@@ -9,6 +12,9 @@ import six
 # A path starting with a vertex and continuing with edges from that vertex
 VertexPath = Tuple[str, ...]
 
+KeyType = TypeVar("KeyType")
+ValueType = TypeVar("ValueType")
+
 
 class PropertyPath(NamedTuple):
     """A VertexPath with a property on the final vertex of the path."""
@@ -73,3 +79,47 @@ def assert_set_equality(set1: Set[Any], set2: Set[Any]) -> None:
         if diff2:
             error_message_list.append(f"Keys in the second set but not the first: {diff2}.")
         raise AssertionError(" ".join(error_message_list))
+
+
+class BoundedLRUCache(Generic[KeyType, ValueType]):
+    """Thread-safe cache keeping at most max_size values, discarding the least recently used."""
+
+    def __init__(self, max_size: int) -> None:
+        """Create an empty cache holding at most max_size values."""
+        if max_size < 1:
+            raise AssertionError(f"Expected a positive cache size, received {max_size}.")
+        self._max_size = max_size
+        self._lock = Lock()
+        self._values: typing.OrderedDict[KeyType, ValueType] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Return the number of values in the cache."""
+        return len(self._values)
+
+    def get(self, key: KeyType) -> Optional[ValueType]:
+        """Return the value of the key, marking it as recently used, or None if not cached."""
+        with self._lock:
+            value = self._values.get(key)
+            if value is not None:
+                self._values.move_to_end(key)
+            return value
+
+    def put(self, key: KeyType, value: ValueType) -> None:
+        """Cache the value of the key, discarding the least recently used values if full."""
+        with self._lock:
+            self._values[key] = value
+            self._values.move_to_end(key)
+            while len(self._values) > self._max_size:
+                self._values.popitem(last=False)
+
+    def get_or_create(self, key: KeyType, create: Callable[[KeyType], ValueType]) -> ValueType:
+        """Return the value of the key, creating and caching it if not cached.
+
+        The value is created without holding the lock, so that slow creations do not block
+        lookups of other keys. Concurrent lookups of a missing key may each create its value.
+        """
+        value = self.get(key)
+        if value is None:
+            value = create(key)
+            self.put(key, value)
+        return value
@@ -0,0 +1,4 @@
+# Copyright 2020-present Kensho Technologies, LLC.
+"""Execute compiled queries over a graph held in process memory, without a database."""
+from .execution import execute_query  # noqa
+from .in_memory_graph import HASH_INDEX, SORTED_INDEX, InMemoryGraph, Vertex  # noqa
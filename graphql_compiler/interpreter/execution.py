@@ -0,0 +1,29 @@
+# Copyright 2020-present Kensho Technologies, LLC.
+from typing import Any, Dict, Iterator
+
+from ..compiler.common import INTERPRETER_LANGUAGE, CompilationResult
+from ..compiler.emit_interpreter import execute_interpreter_query
+from ..query_formatting.common import validate_arguments
+from .in_memory_graph import InMemoryGraph
+
+
+def execute_query(
+    graph: InMemoryGraph, compilation_result: CompilationResult, arguments: Dict[str, Any]
+) -> Iterator[Dict[str, Any]]:
+    """Execute the compiled query over the graph, and lazily yield its results.
+
+    Args:
+        graph: InMemoryGraph containing the data to query
+        compilation_result: CompilationResult, as returned by compile_graphql_to_interpreter()
+        arguments: dict, mapping argument name to its value, for every parameter the query expects.
+                   The arguments are validated before any results are produced.
+
+    Returns:
+        generator of dicts, output name -> value, one for each result of the query
+    """
+    if compilation_result.language != INTERPRETER_LANGUAGE:
+        raise AssertionError(
+            f"Expected a query compiled for the interpreter, but got {compilation_result}."
+        )
+    validate_arguments(compilation_result.input_metadata, arguments)
+    return execute_interpreter_query(compilation_result.query, graph, dict(arguments))
@@ -0,0 +1,201 @@
+# Copyright 2020-present Kensho Technologies, LLC.
+"""A property graph held in process memory, queryable with the interpreter backend.
+
+Vertices are stored in a list per class, and edges in adjacency indexes per edge class and
+direction, mapping each vertex id to the list of its neighbors. Property indexes may be created
+on any vertex class and property, to speed up filters on the root vertex of queries:
+    - hash indexes support the "=" and "in_collection" filters;
+    - sorted indexes additionally support the "<", "<=", ">", ">=" and "between" filters.
+Null property values are not indexed, and indexes are kept up to date as vertices are added.
+"""
+import bisect
+from collections import namedtuple
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+HASH_INDEX = "hash"
+SORTED_INDEX = "sorted"
+
+# Comparison operators that sorted indexes can answer, as used in BinaryComposition expressions.
+RANGE_OPERATORS = frozenset({"<", "<=", ">", ">="})
+
+
+Vertex = namedtuple(
+    "Vertex",
+    (
+        "vertex_id",  # hashable id of the vertex, unique across all classes
+        "class_name",  # str, name of the vertex class, i.e. of its GraphQL object type
+        "properties",  # dict, property name -> value, with missing properties treated as null
+    ),
+)
+
+
+class _PropertyIndex(object):
+    def __init__(self, kind: str) -> None:
+        """Create an empty index of the given kind, one of HASH_INDEX and SORTED_INDEX."""
+        if kind not in (HASH_INDEX, SORTED_INDEX):
+            raise AssertionError(f"Unexpected index kind {kind}.")
+        self.kind = kind
+        self.vertices_by_value: Dict[Any, List[Vertex]] = {}
+        # For sorted indexes, the distinct indexed values in ascending order.
+        self.sorted_values: List[Any] = []
+
+    def add(self, vertex: Vertex, value: Any) -> None:
+        """Add the vertex to the index, under the given value of the indexed property."""
+        if value is None:
+            return
+        if isinstance(value, (list, tuple)):
+            raise AssertionError(
+                f"Only scalar properties can be indexed, but vertex {vertex} has a list value."
+            )
+        vertices = self.vertices_by_value.get(value)
+        if vertices is None:
+            vertices = []
+            self.vertices_by_value[value] = vertices
+            if self.kind == SORTED_INDEX:
+                bisect.insort(self.sorted_values, value)
+        vertices.append(vertex)
+
+    def find_equal(self, values: Iterable[Any]) -> List[Vertex]:
+        """Return the vertices whose property is equal to any of the given distinct values."""
+        vertices: List[Vertex] = []
+        for value in values:
+            vertices.extend(self.vertices_by_value.get(value, ()))
+        return vertices
+
+    def find_in_range(self, operator: str, value: Any) -> List[Vertex]:
+        """Return the vertices whose property compares to the value with the given operator."""
+        if operator == "<":
+            matching_values = self.sorted_values[: bisect.bisect_left(self.sorted_values, value)]
+        elif operator == "<=":
+            matching_values = self.sorted_values[: bisect.bisect_right(self.sorted_values, value)]
+        elif operator == ">":
+            matching_values = self.sorted_values[bisect.bisect_right(self.sorted_values, value) :]
+        elif operator == ">=":
+            matching_values = self.sorted_values[bisect.bisect_left(self.sorted_values, value) :]
+        else:
+            raise AssertionError(f"Unexpected range operator {operator}.")
+        return self.find_equal(matching_values)
+
+
+class InMemoryGraph(object):
+    def __init__(self) -> None:
+        """Create an empty graph."""
+        self._vertices_by_id: Dict[Any, Vertex] = {}
+        self._vertices_by_class: Dict[str, List[Vertex]] = {}
+        # Edge class -> direction ("out" or "in") -> vertex id -> list of neighboring vertices.
+        self._adjacency: Dict[str, Dict[str, Dict[Any, List[Vertex]]]] = {}
+        # (vertex class, property name) -> index of the property's values at that class.
+        self._property_indexes: Dict[Tuple[str, str], _PropertyIndex] = {}
+
+    def add_vertex(
+        self, class_name: str, vertex_id: Any, properties: Optional[Dict[str, Any]] = None
+    ) -> Vertex:
+        """Add a vertex of the given class to the graph, and return it.
+
+        Args:
+            class_name: str, name of the vertex class, i.e. of the GraphQL object type of
+                        the vertex. Interfaces and unions the type belongs to are resolved
+                        using the schema when the graph is queried.
+            vertex_id: hashable id of the vertex, unique across all classes
+            properties: optional dict, property name -> value. Values must have the Python types
+                        produced by deserialization.py, e.g. datetime.date for Date properties.
+
+        Returns:
+            the new Vertex
+        """
+        if vertex_id in self._vertices_by_id:
+            raise AssertionError(f"A vertex with id {vertex_id} already exists in the graph.")
+        vertex = Vertex(vertex_id, class_name, dict(properties or {}))
+        self._vertices_by_id[vertex_id] = vertex
+        self._vertices_by_class.setdefault(class_name, []).append(vertex)
+        for (indexed_class_name, property_name), index in self._property_indexes.items():
+            if indexed_class_name == class_name:
+                index.add(vertex, vertex.properties.get(property_name))
+        return vertex
+
+    def add_edge(self, edge_class_name: str, from_vertex_id: Any, to_vertex_id: Any) -> None:
+        """Add an edge of the given class between the vertices with the given ids."""
+        from_vertex = self.get_vertex(from_vertex_id)
+        to_vertex = self.get_vertex(to_vertex_id)
+        edges_by_direction = self._adjacency.setdefault(edge_class_name, {"out": {}, "in": {}})
+        edges_by_direction["out"].setdefault(from_vertex_id, []).append(to_vertex)
+        edges_by_direction["in"].setdefault(to_vertex_id, []).append(from_vertex)
+
+    def create_property_index(
+        self, class_name: str, property_name: str, kind: str = HASH_INDEX
+    ) -> None:
+        """Index the values of the property at the vertices of the given class.
+
+        Indexes are per vertex class: to speed up queries starting at an interface or union,
+        the property must be indexed at every class belonging to it.
+
+        Args:
+            class_name: str, name of the vertex class whose vertices to index
+            property_name: str, name of the scalar property to index
+            kind: str, HASH_INDEX or SORTED_INDEX, see the module docstring
+        """
+        if (class_name, property_name) in self._property_indexes:
+            raise AssertionError(f"Property {property_name} of {class_name} is already indexed.")
+        index = _PropertyIndex(kind)
+        for vertex in self._vertices_by_class.get(class_name, ()):
+            index.add(vertex, vertex.properties.get(property_name))
+        self._property_indexes[(class_name, property_name)] = index
+
+    def get_vertex(self, vertex_id: Any) -> Vertex:
+        """Return the vertex with the given id."""
+        vertex = self._vertices_by_id.get(vertex_id)
+        if vertex is None:
+            raise AssertionError(f"No vertex with id {vertex_id} exists in the graph.")
+        return vertex
+
+    def get_vertices(self, class_names: Set[str]) -> List[Vertex]:
+        """Return all vertices of the given classes."""
+        vertices: List[Vertex] = []
+        for class_name in sorted(class_names):
+            vertices.extend(self._vertices_by_class.get(class_name, ()))
+        return vertices
+
+    def get_neighbors(self, vertex: Vertex, edge_class_name: str, direction: str) -> List[Vertex]:
+        """Return the vertices connected to the vertex by edges of the class, in the direction."""
+        edges_by_direction = self._adjacency.get(edge_class_name)
+        if edges_by_direction is None:
+            return []
+        return edges_by_direction[direction].get(vertex.vertex_id, [])
+
+    def find_vertices(
+        self, class_names: Set[str], property_name: str, operator: str, value: Any
+    ) -> Optional[List[Vertex]]:
+        """Use the property indexes to find the vertices of the classes matching a comparison.
+
+        Args:
+            class_names: set of str, names of the vertex classes whose vertices to find
+            property_name: str, name of the compared property
+            operator: str, "=", "in_collection", or one of RANGE_OPERATORS
+            value: the value compared against, or the collection of values for "in_collection"
+
+        Returns:
+            list of the vertices of the given classes whose property matches the comparison, or
+            None if the property is not indexed at every class with an index supporting
+            the operator, in which case the vertices must be scanned instead
+        """
+        indexes = []
+        for class_name in sorted(class_names):
+            if class_name not in self._vertices_by_class:
+                continue
+            index = self._property_indexes.get((class_name, property_name))
+            if index is None or (operator in RANGE_OPERATORS and index.kind != SORTED_INDEX):
+                return None
+            indexes.append(index)
+
+        vertices: List[Vertex] = []
+        for index in indexes:
+            if operator == "=":
+                vertices.extend(index.find_equal((value,)))
+            elif operator == "in_collection":
+                vertices.extend(index.find_equal(set(value)))
+            elif operator in RANGE_OPERATORS:
+                vertices.extend(index.find_in_range(operator, value))
+            else:
+                raise AssertionError(f"Unexpected operator {operator} for index lookups.")
+        return vertices
@@ -0,0 +1,341 @@
+# Copyright 2020-present Kensho Technologies, LLC.
+"""Materialize query results as typed columns, rather than as a list of dicts.
+
+Each output of a query becomes a Column, whose values are stored according to the output's type:
+    GraphQLInt: "int64" array of signed 64-bit integers
+    GraphQLFloat: "float64" array of doubles
+    GraphQLBoolean: "bool" array of bytes, each 0 or 1
+    GraphQLDate: "date" array of signed 64-bit integers, days since 1970-01-01
+    GraphQLDateTime: "datetime" array of signed 64-bit integers, microseconds since 1970-01-01
+    GraphQLString, GraphQLID: "dictionary" array of signed 64-bit integer indices into a list
+                              of the distinct values of the column
+    GraphQLDecimal, folded lists: "object" list of Python objects
+If any Int value does not fit in 64 bits, the column is stored as an "object" list instead.
+
+Fixed-width values are stored in array.array objects, which support the buffer protocol. They can
+be handed off to NumPy without copying, e.g. numpy.frombuffer(column.values, dtype="int64") or,
+for "date" and "datetime" columns, dtype="datetime64[D]" and dtype="datetime64[us]" respectively.
+Null values are recorded in a bytearray null mask with a 1 for each null value, which is None if
+the column has no null values. In fixed-width arrays, null values are stored as 0.
+"""
+from array import array
+from collections import OrderedDict, namedtuple
+from datetime import date, datetime, timedelta, timezone
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional
+
+from graphql import GraphQLBoolean, GraphQLFloat, GraphQLID, GraphQLInt, GraphQLList, GraphQLString
+
+from ..compiler.compiler_frontend import OutputMetadata
+from ..compiler.emit_sql import SQLFoldStrategy
+from ..compiler.helpers import strip_non_null_from_type
+from ..global_utils import assert_set_equality
+from ..schema import SUPPORTED_SCALAR_TYPES, GraphQLDate, GraphQLDateTime, GraphQLDecimal
+from .result_decoding import make_output_converters
+
+
+COLUMN_KIND_INT64 = "int64"
+COLUMN_KIND_FLOAT64 = "float64"
+COLUMN_KIND_BOOL = "bool"
+COLUMN_KIND_DATE = "date"
+COLUMN_KIND_DATETIME = "datetime"
+COLUMN_KIND_DICTIONARY = "dictionary"
+COLUMN_KIND_OBJECT = "object"
+
+# The kind of column used to store the values of each GraphQL scalar type.
+_COLUMN_KIND_FOR_SCALAR_TYPE: Mapping[str, str] = MappingProxyType(
+    {
+        GraphQLInt.name: COLUMN_KIND_INT64,
+        GraphQLFloat.name: COLUMN_KIND_FLOAT64,
+        GraphQLBoolean.name: COLUMN_KIND_BOOL,
+        GraphQLDate.name: COLUMN_KIND_DATE,
+        GraphQLDateTime.name: COLUMN_KIND_DATETIME,
+        GraphQLString.name: COLUMN_KIND_DICTIONARY,
+        GraphQLID.name: COLUMN_KIND_DICTIONARY,
+        GraphQLDecimal.name: COLUMN_KIND_OBJECT,
+    }
+)
+assert_set_equality(
+    set(_COLUMN_KIND_FOR_SCALAR_TYPE.keys()),
+    {graphql_type.name for graphql_type in SUPPORTED_SCALAR_TYPES},
+)
+
+# The array.array typecode used for each kind of fixed-width column.
+_ARRAY_TYPECODE_FOR_COLUMN_KIND: Mapping[str, str] = MappingProxyType(
+    {
+        COLUMN_KIND_INT64: "q",
+        COLUMN_KIND_FLOAT64: "d",
+        COLUMN_KIND_BOOL: "B",
+        COLUMN_KIND_DATE: "q",
+        COLUMN_KIND_DATETIME: "q",
+        COLUMN_KIND_DICTIONARY: "q",
+    }
+)
+
+_EPOCH_DATE_ORDINAL = date(1970, 1, 1).toordinal()
+_EPOCH_DATETIME = datetime(1970, 1, 1)
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+Column = namedtuple(
+    "Column",
+    (
+        "name",  # str, name of the output whose values are in the column
+        "kind",  # str, one of the COLUMN_KIND_* constants, describing how values are stored
+        "values",  # array.array of fixed-width values, or list of Python objects for "object"
+        "null_mask",  # bytearray with a 1 for each null value, or None if there are no nulls
+        "dictionary",  # list of distinct values for "dictionary" columns, None otherwise
+    ),
+)
+
+
+ColumnarResults = namedtuple(
+    "ColumnarResults",
+    (
+        "row_count",  # int, number of results
+        "columns",  # OrderedDict of output name -> Column, in the order of the output metadata
+    ),
+)
+
+
+def _get_column_kind(metadata: OutputMetadata) -> str:
+    """Return the kind of column used to store the values of the given output."""
+    output_type = strip_non_null_from_type(metadata.type)
+    if isinstance(output_type, GraphQLList):
+        return COLUMN_KIND_OBJECT
+    return _COLUMN_KIND_FOR_SCALAR_TYPE[output_type.name]
+
+
+def _get_date_value(value: date) -> int:
+    """Return the number of days between the epoch and the given date."""
+    return value.toordinal() - _EPOCH_DATE_ORDINAL
+
+
+def _get_datetime_value(value: datetime) -> int:
+    """Return the number of microseconds between the epoch and the given datetime.
+
+    Timezone-aware datetimes are converted to UTC, as naive datetimes are assumed to be in UTC.
+    """
+    if value.utcoffset() is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH_DATETIME) // _ONE_MICROSECOND
+
+
+def _get_date_from_value(value: int) -> date:
+    """Return the date the given number of days after the epoch."""
+    return date.fromordinal(value + _EPOCH_DATE_ORDINAL)
+
+
+def _get_datetime_from_value(value: int) -> datetime:
+    """Return the datetime the given number of microseconds after the epoch."""
+    return _EPOCH_DATETIME + value * _ONE_MICROSECOND
+
+
+def _identity(value: Any) -> Any:
+    """Return the given value."""
+    return value
+
+
+class _ColumnBuilder(object):
+    def __init__(self, name: str, kind: str, converter: Callable[[Any], Any]) -> None:
+        """Create a builder for a column of the given kind, initially with no values."""
+        self.name = name
+        self.kind = kind
+        self.converter = converter
+        self.null_mask: Optional[bytearray] = None
+        self.dictionary: Optional[List[Any]] = None
+        self.dictionary_indices: Dict[Any, int] = {}
+
+        self.values: Any
+        if kind == COLUMN_KIND_OBJECT:
+            self.values = []
+            self.null_value = None
+        else:
+            self.values = array(_ARRAY_TYPECODE_FOR_COLUMN_KIND[kind])
+            self.null_value = 0
+
+        self.encode: Optional[Callable[[Any], Any]] = None
+        if kind == COLUMN_KIND_DATE:
+            self.encode = _get_date_value
+        elif kind == COLUMN_KIND_DATETIME:
+            self.encode = _get_datetime_value
+        elif kind == COLUMN_KIND_DICTIONARY:
+            self.dictionary = []
+            self.encode = self._get_dictionary_index
+
+    def _get_dictionary_index(self, value: Any) -> int:
+        """Return the index of the value in the column's dictionary, adding it if necessary."""
+        index = self.dictionary_indices.get(value)
+        if index is None:
+            index = len(self.dictionary_indices)
+            self.dictionary_indices[value] = index
+            self.dictionary.append(value)  # type: ignore  # set for dictionary columns
+        return index
+
+    def _convert_to_object_column(self) -> None:
+        """Store the values of the column as Python objects, e.g. if they do not fit in 64 bits."""
+        null_mask = self.null_mask
+        self.values = [
+            None if null_mask is not None and null_mask[index] else value
+            for index, value in enumerate(self.values)
+        ]
+        self.kind = COLUMN_KIND_OBJECT
+        self.null_value = None
+
+    def append(self, value: Any) -> None:
+        """Convert the value returned by the backend, and add it to the end of the column."""
+        value = self.converter(value)
+        if value is None:
+            if self.null_mask is None:
+                self.null_mask = bytearray(len(self.values))
+            self.null_mask.append(1)
+            self.values.append(self.null_value)
+            return
+
+        if self.encode is not None:
+            value = self.encode(value)
+        try:
+            self.values.append(value)
+        except OverflowError:
+            if self.kind != COLUMN_KIND_INT64:
+                raise
+            self._convert_to_object_column()
+            self.values.append(value)
+
+        if self.null_mask is not None:
+            self.null_mask.append(0)
+
+    def build(self) -> Column:
+        """Return the Column with all values added so far."""
+        return Column(self.name, self.kind, self.values, self.null_mask, self.dictionary)
+
+
+class ColumnarResultBuilder(object):
+    def __init__(
+        self,
+        output_metadata: Dict[str, OutputMetadata],
+        fold_strategy: Optional[SQLFoldStrategy] = None,
+    ) -> None:
+        """Create a builder of columns for the results of a query with the given output metadata.
+
+        Args:
+            output_metadata: Dict[str, OutputMetadata], mapping output name to output metadata,
+                             as found in the CompilationResult of the query
+            fold_strategy: optional SQLFoldStrategy with which the query was compiled to SQL,
+                           see make_output_converters in result_decoding.py
+
+        Returns:
+            new ColumnarResultBuilder object
+        """
+        converters = make_output_converters(output_metadata, fold_strategy)
+        self._column_builders = tuple(
+            _ColumnBuilder(out_name, _get_column_kind(metadata), converters[out_name])
+            for out_name, metadata in output_metadata.items()
+        )
+        self._row_count = 0
+        self._is_built = False
+
+    def _check_not_built(self) -> None:
+        """Raise an error if the columns have already been built."""
+        if self._is_built:
+            raise AssertionError(
+                "Cannot add results to a ColumnarResultBuilder after its columns have been built."
+            )
+
+    def add_results(self, results: Iterable[Mapping[str, Any]]) -> None:
+        """Add the given results to the end of the columns.
+
+        Args:
+            results: iterable of mappings of output name to the value returned by the backend.
+                     Outputs missing from a result are treated as null.
+        """
+        self._check_not_built()
+        column_builders = self._column_builders
+        for result in results:
+            for column_builder in column_builders:
+                column_builder.append(result.get(column_builder.name))
+            self._row_count += 1
+
+    def add_dbapi_cursor_results(self, cursor: Any, batch_size: int = 1000) -> None:
+        """Add all remaining results of an executed DBAPI cursor, without creating a dict per row.
+
+        Args:
+            cursor: DBAPI cursor on which the query has been executed
+            batch_size: int, number of rows to fetch from the cursor at a time
+        """
+        self._check_not_built()
+        if batch_size < 1:
+            raise AssertionError(f"Expected a positive batch size, received {batch_size}.")
+
+        column_indices = {
+            column_description[0]: index
+            for index, column_description in enumerate(cursor.description)
+        }
+        missing_columns = {
+            column_builder.name
+            for column_builder in self._column_builders
+            if column_builder.name not in column_indices
+        }
+        if missing_columns:
+            raise AssertionError(
+                f"The cursor results are missing the following outputs: {missing_columns}"
+            )
+        indexed_column_builders = [
+            (column_indices[column_builder.name], column_builder)
+            for column_builder in self._column_builders
+        ]
+
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for index, column_builder in indexed_column_builders:
+                append = column_builder.append
+                for row in rows:
+                    append(row[index])
+            self._row_count += len(rows)
+
+    def build(self) -> ColumnarResults:
+        """Return the columns of all results added so far. No results may be added afterward."""
+        self._is_built = True
+        return ColumnarResults(
+            self._row_count,
+            OrderedDict(
+                (column_builder.name, column_builder.build())
+                for column_builder in self._column_builders
+            ),
+        )
+
+
+def column_to_list(column: Column) -> List[Any]:
+    """Return the values of the column as a list of Python objects, with None for null values.
+
+    Args:
+        column: Column, as found in ColumnarResults
+
+    Returns:
+        List[Any], the values of the column, with the types produced by ResultDecoder
+    """
+    decode: Callable[[Any], Any]
+    if column.kind in (COLUMN_KIND_OBJECT, COLUMN_KIND_INT64, COLUMN_KIND_FLOAT64):
+        values = list(column.values)
+        if column.null_mask is None:
+            return values
+        decode = _identity
+    elif column.kind == COLUMN_KIND_DICTIONARY:
+        decode = column.dictionary.__getitem__
+    elif column.kind == COLUMN_KIND_BOOL:
+        decode = bool
+    elif column.kind == COLUMN_KIND_DATE:
+        decode = _get_date_from_value
+    elif column.kind == COLUMN_KIND_DATETIME:
+        decode = _get_datetime_from_value
+    else:
+        raise AssertionError(f"Unexpected column kind {column.kind}: {column}")
+
+    if column.null_mask is None:
+        return [decode(value) for value in column.values]
+    return [
+        None if is_null else decode(value)
+        for value, is_null in zip(column.values, column.null_mask)
+    ]
@@ -0,0 +1,242 @@
+# Copyright 2020-present Kensho Technologies, LLC.
+"""Convert query results from any backend to uniform Python types, using the output metadata.
+
+Backends represent the values of the same GraphQL type differently: some return native Decimal,
+date and datetime objects, while others return the ISO-8601 or decimal strings the values were
+stored as, and the Neo4j driver returns its own temporal types. A ResultDecoder is built once
+per compiled query, precompiling a converter for each output, and then converts each result row
+to the Python types produced by deserialization.py:
+    GraphQLDate: datetime.date
+    GraphQLDateTime: datetime.datetime with tzinfo=None
+    GraphQLFloat: float
+    GraphQLDecimal: decimal.Decimal
+    GraphQLInt: int
+    GraphQLString: str
+    GraphQLBoolean: bool
+    GraphQLID: str
+Folded outputs are converted to lists of the inner type, and null values are left as None.
+"""
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Type
+
+from graphql import (
+    GraphQLBoolean,
+    GraphQLFloat,
+    GraphQLID,
+    GraphQLInt,
+    GraphQLList,
+    GraphQLOutputType,
+    GraphQLString,
+)
+
+from ..compiler.compiler_frontend import OutputMetadata
+from ..compiler.emit_sql import SQLFoldStrategy
+from ..compiler.helpers import strip_non_null_from_type
+from ..deserialization import get_scalar_deserialization_function
+from ..global_utils import assert_set_equality
+from ..schema import SUPPORTED_SCALAR_TYPES, GraphQLDate, GraphQLDateTime, GraphQLDecimal
+from .sql_post_processing import make_fold_output_decoders
+
+
+# The Python type that values of each GraphQL scalar type are decoded to. Values that already
+# have exactly this type are returned as they are, without being deserialized again.
+_DECODED_PYTHON_TYPES: Mapping[str, Type] = MappingProxyType(
+    {
+        GraphQLDate.name: date,
+        GraphQLDateTime.name: datetime,
+        GraphQLFloat.name: float,
+        GraphQLDecimal.name: Decimal,
+        GraphQLInt.name: int,
+        GraphQLString.name: str,
+        GraphQLBoolean.name: bool,
+        GraphQLID.name: str,
+    }
+)
+assert_set_equality(
+    set(_DECODED_PYTHON_TYPES.keys()),
+    {graphql_type.name for graphql_type in SUPPORTED_SCALAR_TYPES},
+)
+
+
+def _get_native_temporal_value(value: Any) -> Any:
+    """Return the datetime.date or datetime.datetime equivalent of a Neo4j driver temporal value.
+
+    The Neo4j driver returns Date and DateTime values as its own types, e.g. neotime.Date and
+    neotime.DateTime, which can be converted with their to_native() method. Values of any other
+    type are returned unchanged.
+    """
+    to_native = getattr(value, "to_native", None)
+    if to_native is None:
+        return value
+    native_value = to_native()
+    if isinstance(native_value, datetime) and native_value.tzinfo is None:
+        # neotime.DateTime.to_native() drops the timezone of the value, so subtract its UTC
+        # offset here instead, producing the naive datetime in UTC.
+        utc_offset = value.utcoffset()
+        if utc_offset is not None:
+            native_value -= utc_offset
+    return native_value
+
+
+def _make_date_converter(deserialize: Callable[[Any], date]) -> Callable[[Any], Any]:
+    """Return a function converting backend Date values to dates."""
+
+    def convert_date(value: Any) -> Any:
+        """Convert a Date value, unless it already is a date."""
+        if value is None or type(value) is date:
+            return value
+        value = _get_native_temporal_value(value)
+        if type(value) is date:
+            return value
+        return deserialize(value)
+
+    return convert_date
+
+
+def _make_datetime_converter(deserialize: Callable[[Any], datetime]) -> Callable[[Any], Any]:
+    """Return a function converting backend DateTime values to naive datetimes in UTC."""
+
+    def convert_datetime(value: Any) -> Any:
+        """Convert a DateTime value, normalizing timezone-aware datetimes to naive UTC ones."""
+        if value is None:
+            return None
+        if type(value) is not datetime:
+            value = _get_native_temporal_value(value)
+            if type(value) is not datetime:
+                return deserialize(value)
+        # Backends may return timezone-aware datetimes, e.g. for PostgreSQL timestamptz
+        # columns, while DateTime values are always timezone-naive.
+        if value.utcoffset() is not None:
+            return value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+    return convert_datetime
+
+
+def _make_value_converter(graphql_type: GraphQLOutputType) -> Callable[[Any], Any]:
+    """Return a function that converts backend values of the given type to their Python type."""
+    stripped_type = strip_non_null_from_type(graphql_type)
+
+    if isinstance(stripped_type, GraphQLList):
+        convert_element = _make_value_converter(stripped_type.of_type)
+
+        def convert_list(value: Any) -> Any:
+            """Convert a list value and all of its elements."""
+            if value is None:
+                return None
+            if not isinstance(value, (list, tuple)):
+                raise ValueError(f"Cannot deserialize non-list value {value} to GraphQLList type.")
+            return [convert_element(element) for element in value]
+
+        return convert_list
+
+    decoded_python_type = _DECODED_PYTHON_TYPES.get(stripped_type.name)
+    if decoded_python_type is None:
+        raise AssertionError(
+            f"Unexpected GraphQLType {stripped_type}. No deserialization function known."
+        )
+    deserialize = get_scalar_deserialization_function(stripped_type)
+
+    if decoded_python_type is date:
+        return _make_date_converter(deserialize)
+    elif decoded_python_type is datetime:
+        return _make_datetime_converter(deserialize)
+
+    def convert_scalar(value: Any) -> Any:
+        """Convert a scalar value, unless it already has the appropriate type."""
+        # Exact type checks are needed here, since bool is a subclass of int
+        # and datetime.datetime is a subclass of datetime.date.
+        if value is None or type(value) is decoded_python_type:
+            return value
+        return deserialize(value)
+
+    return convert_scalar
+
+
+def make_output_converters(
+    output_metadata: Dict[str, OutputMetadata], fold_strategy: Optional[SQLFoldStrategy] = None
+) -> Dict[str, Callable[[Any], Any]]:
+    """Return a dict of output name -> function converting the output's values to Python types.
+
+    Args:
+        output_metadata: Dict[str, OutputMetadata], mapping output name to output metadata,
+                         as found in the CompilationResult of the query
+        fold_strategy: optional SQLFoldStrategy with which the query was compiled to SQL, as
+                       returned by get_fold_strategy in compiler/emit_sql.py. It determines how
+                       folded outputs are represented in the results, e.g. as XML PATH strings for
+                       MSSQL. If None, folded outputs are expected to be lists of values, as
+                       returned by all non-SQL backends.
+
+    Returns:
+        Dict[str, Callable[[Any], Any]], with an entry for every output in output_metadata
+    """
+    fold_decoders = {}
+    if fold_strategy is not None:
+        fold_decoders = make_fold_output_decoders(output_metadata, fold_strategy)
+
+    converters = {}
+    for out_name, metadata in output_metadata.items():
+        if out_name in fold_decoders:
+            converters[out_name] = fold_decoders[out_name]
+        else:
+            converters[out_name] = _make_value_converter(metadata.type)
+    return converters
+
+
+class ResultDecoder(object):
+    def __init__(
+        self,
+        output_metadata: Dict[str, OutputMetadata],
+        fold_strategy: Optional[SQLFoldStrategy] = None,
+    ) -> None:
+        """Create a decoder for the results of a query with the given output metadata.
+
+        Args:
+            output_metadata: Dict[str, OutputMetadata], mapping output name to output metadata,
+                             as found in the CompilationResult of the query
+            fold_strategy: optional SQLFoldStrategy with which the query was compiled to SQL,
+                           see make_output_converters
+
+        Returns:
+            new ResultDecoder object
+        """
+        self._converters = tuple(make_output_converters(output_metadata, fold_strategy).items())
+
+    def decode_result(self, result: Mapping[str, Any]) -> Dict[str, Any]:
+        """Return a new dict with the values of the given result converted to their Python types.
+
+        Args:
+            result: mapping of output name to the value returned by the backend. Values of names
+                    that are not outputs of the query are left unchanged, and outputs missing
+                    from the result are not added to it.
+
+        Returns:
+            Dict[str, Any], the decoded result
+        """
+        decoded_result = dict(result)
+        for out_name, converter in self._converters:
+            if out_name in decoded_result:
+                decoded_result[out_name] = converter(decoded_result[out_name])
+        return decoded_result
+
+    def decode_results(self, results: Iterable[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+        """Return a list of the given results, decoded as in decode_result."""
+        return [self.decode_result(result) for result in results]
+
+    def stream_decode_results(
+        self, results: Iterable[Mapping[str, Any]]
+    ) -> Iterator[Dict[str, Any]]:
+        """Lazily decode the given results as in decode_result, one at a time.
+
+        Args:
+            results: iterable of results, such as a SQLAlchemy ResultProxy or the output of
+                     iterate_dbapi_cursor_results in sql_post_processing.py
+
+        Yields:
+            Dict[str, Any], each decoded result
+        """
+        decode_result = self.decode_result
+        for result in results:
+            yield decode_result(result)
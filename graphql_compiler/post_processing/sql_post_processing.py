@@ -1,101 +1,219 @@
 # Copyright 2019-present Kensho Technologies, LLC.
 import html
+import json
 import re
-from typing import Any, Dict, List, Optional, Sequence
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Match, Optional
 
-from graphql import GraphQLList, GraphQLScalarType
+from graphql import GraphQLID, GraphQLList, GraphQLScalarType, GraphQLString
 
 from ..compiler.compiler_frontend import OutputMetadata
-from ..deserialization import deserialize_scalar_value
+from ..compiler.emit_sql import (
+    FOLD_JSON_PATH_VALUE_KEY,
+    FOLD_RESULT_ENCODING_JSON_PATH,
+    FOLD_RESULT_ENCODING_NATIVE_LIST,
+    FOLD_RESULT_ENCODING_XML_PATH,
+    XML_PATH_FOLD_STRATEGY,
+    SQLFoldStrategy,
+)
+from ..compiler.helpers import strip_non_null_from_type
+from ..deserialization import get_scalar_deserialization_function
+from ..global_utils import is_same_type
 
 
-def _mssql_xml_path_string_to_list(
-    xml_path_result: str, list_entry_type: GraphQLScalarType
-) -> List[Any]:
-    """Convert the string result produced with XML PATH for MSSQL folds to a list.
+# Some of the special characters involved in XML path array aggregation.
+_MSSQL_XML_PATH_DELIMITER = "|"
+_MSSQL_XML_PATH_NULL = "~"
+
+# Escape sequences produced by the XML PATH encoding of fold results, and the characters they
+# represent. The caret escapes are added by the compiler, and the ampersand escapes by XML PATH.
+_MSSQL_XML_PATH_ESCAPE_SEQUENCES: Mapping[str, str] = MappingProxyType(
+    {"^d": "|", "^n": "~", "^e": "^", "&amp;": "&", "&lt;": "<", "&gt;": ">"}
+)
+
+# Matches, in order of preference: a caret escape, one of the common ampersand escapes (capturing
+# the digits of "&#x{2 digit HEX};"), or any other ampersand escape, which is left to html.unescape.
+# Escape sequences never overlap, so a single left-to-right pass over a value reverses all of them.
+_MSSQL_XML_PATH_ESCAPE_PATTERN = re.compile(r"\^[dne]|&(?:#x([0-9A-Fa-f]{2})|amp|lt|gt);|&[^&^]*")
+
+
+def _unescape_mssql_xml_path_match(match: Match[str]) -> str:
+    """Return the characters represented by an escape sequence matched in an XML PATH result."""
+    hex_value = match.group(1)
+    if hex_value is not None:
+        return chr(int(hex_value, 16))
+
+    escape_sequence = match.group(0)
+    unescaped = _MSSQL_XML_PATH_ESCAPE_SEQUENCES.get(escape_sequence)
+    if unescaped is None:
+        unescaped = html.unescape(escape_sequence)
+    return unescaped
+
+
+def make_mssql_xml_path_decoder(
+    list_entry_type: GraphQLScalarType,
+) -> Callable[[str], List[Optional[Any]]]:
+    """Return a function that converts XML PATH fold results for MSSQL to lists of the given type.
+
+    Decoding a fold result takes a single split of the string, followed by a single regex
+    substitution pass on each list element that contains escaped characters. Elements are then
+    deserialized with a function specialized to the list entry type, which is skipped entirely
+    for string types.
 
     Args:
-        xml_path_result: str, result from an XML PATH folded output
         list_entry_type: GraphQLScalarType, type the results should be output as
 
     Returns:
-        list representation of the result with all XML and GraphQL Compiler escaping reversed
+        function that takes a str result from an XML PATH folded output and returns its list
+        representation, with all XML and GraphQL Compiler escaping reversed
     """
-    # Return an empty list if the XML PATH result is "".
-    if xml_path_result == "":
-        return []
+    # Every element of the split XML PATH result is a str, which GraphQLString and GraphQLID
+    # deserialize to itself.
+    deserialization_function: Optional[Callable[[Any], Any]] = None
+    if not is_same_type(GraphQLString, list_entry_type) and not is_same_type(
+        GraphQLID, list_entry_type
+    ):
+        deserialization_function = get_scalar_deserialization_function(list_entry_type)
+
+    delimiter = _MSSQL_XML_PATH_DELIMITER
+    null = _MSSQL_XML_PATH_NULL
+    unescape = _MSSQL_XML_PATH_ESCAPE_PATTERN.sub
+    unescape_match = _unescape_mssql_xml_path_match
+
+    def decode(xml_path_result: str) -> List[Optional[Any]]:
+        """Convert the string result produced with XML PATH for an MSSQL fold to a list."""
+        # Return an empty list if the XML PATH result is "".
+        if xml_path_result == "":
+            return []
+
+        # Remove the "|" from the first result in the string representation of the list.
+        if xml_path_result[0] != delimiter:
+            raise AssertionError(
+                f"Unexpected fold result. All XML path array aggregated lists must start with a "
+                f"'{delimiter}'. Received a result beginning with '{xml_path_result[0]}': "
+                f"{xml_path_result}"
+            )
+
+        list_result: List[Optional[Any]] = []
+        for element in xml_path_result[1:].split(delimiter):
+            # Check for "~" before unescaping, since "^n" is unescaped to "~".
+            if element == null:
+                list_result.append(None)
+                continue
+            if "^" in element or "&" in element:
+                element = unescape(unescape_match, element)
+            if deserialization_function is None:
+                list_result.append(element)
+            else:
+                list_result.append(deserialization_function(element))
+        return list_result
+
+    return decode
+
+
+def make_mssql_json_path_decoder(
+    list_entry_type: GraphQLScalarType,
+) -> Callable[[str], List[Optional[Any]]]:
+    """Return a function that converts JSON PATH fold results for MSSQL to lists of the given type.
+
+    See _get_mssql_json_path_column in graphql_compiler/compiler/emit_sql.py for a description
+    of the encoding. Floating point numbers are parsed from their string representations,
+    so that GraphQLDecimal values do not lose precision.
+
+    Args:
+        list_entry_type: GraphQLScalarType, type the results should be output as
+
+    Returns:
+        function that takes a str result from a JSON PATH folded output and returns its list
+        representation
+    """
+    parse_json = json.JSONDecoder(parse_float=str).decode
+    value_key = FOLD_JSON_PATH_VALUE_KEY
+
+    if is_same_type(GraphQLString, list_entry_type):
+        # GraphQLString values are JSON strings, which need no further deserialization.
+        def decode_strings(json_path_result: str) -> List[Optional[Any]]:
+            """Convert the string result produced with JSON PATH for an MSSQL fold to a list."""
+            return [element.get(value_key) for element in parse_json(json_path_result)]
+
+        return decode_strings
+
+    deserialization_function = get_scalar_deserialization_function(list_entry_type)
+
+    def decode(json_path_result: str) -> List[Optional[Any]]:
+        """Convert the string result produced with JSON PATH for an MSSQL fold to a list."""
+        list_result: List[Optional[Any]] = []
+        for element in parse_json(json_path_result):
+            value = element.get(value_key)
+            if value is None:
+                list_result.append(None)
+            else:
+                list_result.append(deserialization_function(value))
+        return list_result
+
+    return decode
 
-    # Some of the special characters involved in XML path array aggregation.
-    delimiter = "|"
-    null = "~"
 
-    # Remove the "|" from the first result in the string representation of the list.
-    if xml_path_result[0] != delimiter:
+# Function returning a decoder for folded outputs of a given list entry type, for each result
+# encoding of folded outputs. Native lists need no decoding, so their entry is None.
+_FOLD_DECODER_FACTORIES: Mapping[
+    str, Optional[Callable[[GraphQLScalarType], Callable[[str], List[Any]]]]
+] = MappingProxyType(
+    {
+        FOLD_RESULT_ENCODING_NATIVE_LIST: None,
+        FOLD_RESULT_ENCODING_XML_PATH: make_mssql_xml_path_decoder,
+        FOLD_RESULT_ENCODING_JSON_PATH: make_mssql_json_path_decoder,
+    }
+)
+
+
+def make_fold_output_decoders(
+    output_metadata: Dict[str, OutputMetadata], fold_strategy: SQLFoldStrategy
+) -> Dict[str, Callable[[Any], Any]]:
+    """Return a dict of output name -> function decoding the output, for folded outputs only.
+
+    Only the folded outputs of type GraphQLList (i.e. not _x_count) of queries compiled with fold
+    strategies that do not produce native lists, such as the XML PATH strategy for MSSQL, need to
+    be decoded. The values of all other outputs are left as returned by the backend.
+
+    Args:
+        output_metadata: Dict[str, OutputMetadata], mapping output name to output metadata,
+                         as found in the CompilationResult of the query
+        fold_strategy: SQLFoldStrategy with which the query was compiled to SQL, as returned by
+                       get_fold_strategy in compiler/emit_sql.py
+
+    Returns:
+        Dict[str, Callable[[Any], Any]], with an entry for every output that needs decoding
+    """
+    if fold_strategy.result_encoding not in _FOLD_DECODER_FACTORIES:
         raise AssertionError(
-            f"Unexpected fold result. All XML path array aggregated lists must start with a "
-            f"'{delimiter}'. Received a result beginning with '{xml_path_result[0]}': "
-            f"{xml_path_result}"
+            f"Unexpected result encoding {fold_strategy.result_encoding} of fold strategy "
+            f"{fold_strategy}."
         )
-    xml_path_result = xml_path_result[1:]
-
-    # Split the XML path result on "|".
-    list_result: Sequence[Optional[str]] = xml_path_result.split(delimiter)
-
-    # Convert "~" to None. Note that this must be done before "^n" -> "~".
-    list_result = [None if result == null else result for result in list_result]
-
-    # Convert "^d" to "|".
-    list_result = [
-        result.replace("^d", delimiter) if result is not None else None for result in list_result
-    ]
-
-    # Convert "^n" to "~".
-    list_result = [
-        result.replace("^n", null) if result is not None else None for result in list_result
-    ]
-
-    # Convert "^e" to "^". Note that this must be done after the caret escaped characters i.e.
-    # after "^n" -> "~" and "^d" -> "|".
-    list_result = [
-        result.replace("^e", "^") if result is not None else None for result in list_result
-    ]
-
-    # Convert "&#x{2 digit HEX};" to unicode character.
-    new_list_result: List[Optional[str]] = []
-    for result in list_result:
-        if result is not None:
-            split_result = re.split("&#x([A-Fa-f0-9][A-Fa-f0-9]);", result)
-            new_result = split_result[0]
-            for hex_value, next_substring in zip(split_result[1::2], split_result[2::2]):
-                new_result += chr(int(hex_value, 16)) + next_substring
-            new_list_result.append(new_result)
-        else:
-            new_list_result.append(None)
-
-    # Convert "&amp;" to "&", "&gt;" to ">", "&lt;" to "<". Note that the ampersand conversion
-    # must be done after the ampersand escaped HEX values.
-    list_result = [
-        html.unescape(result) if result is not None else None for result in new_list_result
-    ]
-
-    # Convert to the appropriate return type.
-    list_result_to_return: List[Optional[Any]] = [
-        deserialize_scalar_value(list_entry_type, result) if result is not None else None
-        for result in list_result
-    ]
-
-    return list_result_to_return
+    make_fold_decoder = _FOLD_DECODER_FACTORIES[fold_strategy.result_encoding]
+    if make_fold_decoder is None:
+        return {}
+
+    decoders = {}
+    for out_name, metadata in output_metadata.items():
+        output_type = strip_non_null_from_type(metadata.type)
+        if metadata.folded and isinstance(output_type, GraphQLList):
+            decoders[out_name] = make_fold_decoder(strip_non_null_from_type(output_type.of_type))
+    return decoders
 
 
 def post_process_mssql_folds(
-    query_results: List[Dict[str, Any]], output_metadata: Dict[str, OutputMetadata]
+    query_results: List[Dict[str, Any]],
+    output_metadata: Dict[str, OutputMetadata],
+    fold_strategy: SQLFoldStrategy = XML_PATH_FOLD_STRATEGY,
 ) -> None:
-    r"""Convert XML PATH fold results from a string to a list of the appropriate type.
+    r"""Convert MSSQL fold results from a string to a list of the appropriate type.
 
-    See _get_xml_path_clause in graphql_compiler/compiler/emit_sql.py for an in-depth description
-    of the encoding process.
+    Fold results are decoded according to the fold strategy the query was compiled with. For the
+    XML PATH strategy, see _get_xml_path_clause in graphql_compiler/compiler/emit_sql.py for
+    an in-depth description of the encoding process.
 
-    Post-processing steps:
+    XML PATH post-processing steps:
         1. split on "|",
         2. convert "~" to None
         3. convert caret escaped characters (excluding "^" itself)
@@ -110,13 +228,64 @@ def post_process_mssql_folds(
                        mutated in place
         output_metadata: Dict[str, OutputMetadata], mapping output name to output metadata with
                          information about whether this output is from a fold scope
+        fold_strategy: SQLFoldStrategy with which the query was compiled to SQL, as returned by
+                       get_fold_strategy in compiler/emit_sql.py. Defaults to the XML PATH
+                       strategy, the default for MSSQL.
 
     """
-    for out_name, metadata in output_metadata.items():
-        # If this output is folded and has type GraphQLList (i.e. it is not an _x_count),
-        # post-process the result to list form.
-        if metadata.folded and isinstance(metadata.type, GraphQLList):
-            for query_result in query_results:
-                xml_path_result = query_result[out_name]
-                list_result = _mssql_xml_path_string_to_list(xml_path_result, metadata.type.of_type)
-                query_result[out_name] = list_result
+    decoders = make_fold_output_decoders(output_metadata, fold_strategy)
+    for out_name, decoder in decoders.items():
+        for query_result in query_results:
+            query_result[out_name] = decoder(query_result[out_name])
+
+
+def stream_post_process_mssql_folds(
+    query_results: Iterable[Mapping[str, Any]],
+    output_metadata: Dict[str, OutputMetadata],
+    fold_strategy: SQLFoldStrategy = XML_PATH_FOLD_STRATEGY,
+) -> Iterator[Dict[str, Any]]:
+    """Lazily convert MSSQL fold results from a string to a list of the appropriate type.
+
+    Results are decoded as in post_process_mssql_folds, one at a time and without modifying the
+    input, so arbitrarily many results can be post-processed in constant memory.
+
+    Args:
+        query_results: iterable of results from graphql_query being run with schema_info, such as
+                       a SQLAlchemy ResultProxy or the output of iterate_dbapi_cursor_results.
+                       Each result must be a mapping of output name to value.
+        output_metadata: Dict[str, OutputMetadata], mapping output name to output metadata with
+                         information about whether this output is from a fold scope
+        fold_strategy: SQLFoldStrategy with which the query was compiled to SQL, as in
+                       post_process_mssql_folds
+
+    Yields:
+        Dict[str, Any], a new dict for each result, with all fold outputs converted to lists
+    """
+    decoders = make_fold_output_decoders(output_metadata, fold_strategy)
+    for query_result in query_results:
+        post_processed_result = dict(query_result)
+        for out_name, decoder in decoders.items():
+            post_processed_result[out_name] = decoder(post_processed_result[out_name])
+        yield post_processed_result
+
+
+def iterate_dbapi_cursor_results(cursor: Any, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+    """Yield the results of an executed DBAPI cursor as dicts of column name -> value.
+
+    Args:
+        cursor: DBAPI cursor on which a query has been executed
+        batch_size: int, number of rows to fetch from the cursor at a time
+
+    Yields:
+        Dict[str, Any], one dict per result row
+    """
+    if batch_size < 1:
+        raise AssertionError(f"Expected a positive batch size, received {batch_size}.")
+
+    column_names = [column_description[0] for column_description in cursor.description]
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        for row in rows:
+            yield dict(zip(column_names, row))
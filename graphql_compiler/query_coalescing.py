@@ -0,0 +1,215 @@
+# Copyright 2020-present Kensho Technologies, LLC.
+"""Coalesce concurrent identical query executions into a single execution on the backend.
+
+Under bursts of load, many requests for the same query with the same arguments may arrive at
+the same time. Rather than executing the query once per request, a single-flight executor lets
+the first request execute it, and has all identical requests arriving while that execution is
+in flight wait for it and share its results, or its error.
+
+Requests take serialized arguments, as accepted by deserialize_multiple_arguments, and are
+identical if they have the same GraphQL query string and the same arguments once deserialized
+according to the query's input metadata. For example, the Int arguments 3 and "3" are coalesced,
+as are the Float arguments 5, 5.0 and "5.0". The backend is given the deserialized arguments.
+Executions are only shared while in flight: a request arriving after an execution completes
+executes the query again. To also reuse completed results, combine with QueryResultCache.
+
+SingleFlightQueryExecutor coalesces requests made from multiple threads, and
+AsyncSingleFlightQueryExecutor coalesces requests made from coroutines on one event loop.
+"""
+import asyncio
+from collections import namedtuple
+from concurrent.futures import Future
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Mapping, Tuple
+
+from .compiler.common import CompilationResult
+from .global_utils import BoundedLRUCache
+from .query_formatting.common import deserialize_multiple_arguments, normalize_arguments
+
+
+QueryCoalescingMetrics = namedtuple(
+    "QueryCoalescingMetrics",
+    (
+        "requests",  # int, number of query executions requested
+        "executions",  # int, number of query executions performed by the backend
+        "coalesced_requests",  # int, number of requests that shared an in-flight execution
+        "in_flight",  # int, number of executions currently in flight
+    ),
+)
+
+
+class _SingleFlightExecutorBase(object):
+    def __init__(
+        self, compile_query: Callable[[str], CompilationResult], compilation_cache_size: int
+    ) -> None:
+        """Set up the compilation cache and metrics shared by the single-flight executors."""
+        if compilation_cache_size < 1:
+            raise AssertionError(
+                f"Expected a positive compilation cache size, received {compilation_cache_size}."
+            )
+        self._compile_query = compile_query
+        self._compilation_cache: BoundedLRUCache[str, CompilationResult] = BoundedLRUCache(
+            compilation_cache_size
+        )
+
+        self._lock = Lock()
+
+        self._requests = 0
+        self._executions = 0
+        self._coalesced_requests = 0
+        # Request key -> future of its execution, for every execution currently in flight:
+        # a concurrent.futures.Future for threads, and an asyncio task for coroutines.
+        self._in_flight: Dict[Tuple[str, FrozenSet[Tuple[str, Any]]], Any] = {}
+
+    def compile(self, graphql_query: str) -> CompilationResult:
+        """Return the CompilationResult of the query, compiling it if not cached."""
+        return self._compilation_cache.get_or_create(graphql_query, self._compile_query)
+
+    def _prepare_request(
+        self, graphql_query: str, arguments: Mapping[str, Any]
+    ) -> Tuple[CompilationResult, Dict[str, Any], Tuple[str, FrozenSet[Tuple[str, Any]]]]:
+        """Return the compiled query, the deserialized arguments, and the key of the request.
+
+        Raises:
+            GraphQLInvalidArgumentError, if the arguments are missing or cannot be deserialized
+        """
+        compilation_result = self.compile(graphql_query)
+        deserialized_arguments = deserialize_multiple_arguments(
+            arguments, compilation_result.input_metadata
+        )
+        key = (graphql_query, normalize_arguments(deserialized_arguments))
+        return compilation_result, deserialized_arguments, key
+
+    def get_metrics(self) -> QueryCoalescingMetrics:
+        """Return a snapshot of the number of requests, executions, and coalesced requests."""
+        with self._lock:
+            return QueryCoalescingMetrics(
+                requests=self._requests,
+                executions=self._executions,
+                coalesced_requests=self._coalesced_requests,
+                in_flight=len(self._in_flight),
+            )
+
+
+class SingleFlightQueryExecutor(_SingleFlightExecutorBase):
+    def __init__(
+        self,
+        compile_query: Callable[[str], CompilationResult],
+        execute: Callable[[CompilationResult, Dict[str, Any]], Any],
+        compilation_cache_size: int = 256,
+    ) -> None:
+        """Create an executor coalescing identical queries executed concurrently from threads.
+
+        Args:
+            compile_query: function compiling a GraphQL query string to a CompilationResult,
+                           e.g. functools.partial(compile_graphql_to_sql, sql_schema_info)
+            execute: function executing a CompilationResult with the given deserialized
+                     arguments, and returning its results. It is called in the thread of the
+                     first of the coalesced requests, and must return materialized results
+                     such as a list rather than a single-use iterator, since they are shared.
+            compilation_cache_size: int, maximum number of compiled queries to keep, discarding
+                                    the least recently used ones first
+
+        Returns:
+            new SingleFlightQueryExecutor object
+        """
+        super(SingleFlightQueryExecutor, self).__init__(compile_query, compilation_cache_size)
+        self._execute = execute
+
+    def execute_query(self, graphql_query: str, arguments: Mapping[str, Any]) -> Any:
+        """Return the results of the query, sharing any identical execution in flight.
+
+        Args:
+            graphql_query: str, GraphQL query
+            arguments: Mapping[str, Any], parameter name -> value, for every parameter the query
+                       expects, serialized as accepted by deserialize_multiple_arguments
+
+        Returns:
+            the results returned by the execute function. They are shared by all coalesced
+            requests, and must not be modified.
+
+        Raises:
+            GraphQLInvalidArgumentError, if the arguments are invalid; or the error raised by
+            the execute function, in every coalesced request
+        """
+        compilation_result, deserialized_arguments, key = self._prepare_request(
+            graphql_query, arguments
+        )
+        with self._lock:
+            self._requests += 1
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._coalesced_requests += 1
+                is_leader = False
+            else:
+                future = Future()
+                self._in_flight[key] = future
+                self._executions += 1
+                is_leader = True
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            future.set_result(self._execute(compilation_result, deserialized_arguments))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+        return future.result()
+
+
+class AsyncSingleFlightQueryExecutor(_SingleFlightExecutorBase):
+    def __init__(
+        self,
+        compile_query: Callable[[str], CompilationResult],
+        execute: Callable[[CompilationResult, Dict[str, Any]], Awaitable[Any]],
+        compilation_cache_size: int = 256,
+    ) -> None:
+        """Create an executor coalescing identical queries executed concurrently from coroutines.
+
+        Args:
+            compile_query: function compiling a GraphQL query string to a CompilationResult.
+                           It is called on the event loop the first time each query is seen.
+            execute: coroutine function executing a CompilationResult with the given
+                     deserialized arguments, and returning its results, e.g. the execute_query
+                     method of an AsyncSqlQueryExecutor. It runs as a separate task, so that
+                     cancelling one of the coalesced requests does not cancel the others.
+            compilation_cache_size: int, maximum number of compiled queries to keep, discarding
+                                    the least recently used ones first
+
+        Returns:
+            new AsyncSingleFlightQueryExecutor object
+        """
+        super(AsyncSingleFlightQueryExecutor, self).__init__(compile_query, compilation_cache_size)
+        self._execute = execute
+
+    def _remove_in_flight(self, key: Tuple[str, FrozenSet[Tuple[str, Any]]], _: Any) -> None:
+        """Stop sharing the completed execution with the given key with new requests."""
+        with self._lock:
+            del self._in_flight[key]
+
+    async def execute_query(self, graphql_query: str, arguments: Mapping[str, Any]) -> Any:
+        """Return the results of the query, sharing any identical execution in flight.
+
+        See SingleFlightQueryExecutor.execute_query for details.
+        """
+        compilation_result, deserialized_arguments, key = self._prepare_request(
+            graphql_query, arguments
+        )
+        with self._lock:
+            self._requests += 1
+            task = self._in_flight.get(key)
+            if task is not None:
+                self._coalesced_requests += 1
+            else:
+                task = asyncio.ensure_future(
+                    self._execute(compilation_result, deserialized_arguments)
+                )
+                task.add_done_callback(lambda done_task: self._remove_in_flight(key, done_task))
+                self._in_flight[key] = task
+                self._executions += 1
+
+        # Shielding the shared task keeps a cancelled request from cancelling the execution.
+        return await asyncio.shield(task)
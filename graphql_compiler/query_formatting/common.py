@@ -2,7 +2,18 @@
 """Safely insert runtime arguments into compiled GraphQL queries."""
 import datetime
 import decimal
-from typing import Any, Collection, Dict, Mapping, NoReturn, Type
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    FrozenSet,
+    Mapping,
+    NoReturn,
+    Optional,
+    Tuple,
+    Type,
+)
 
 import arrow
 from graphql import (
@@ -202,4 +213,63 @@ def deserialize_multiple_arguments(
     }
 
 
+def normalize_arguments(arguments: Mapping[str, Any]) -> FrozenSet[Tuple[str, Any]]:
+    """Return a hashable representation of the arguments, equal for equivalent arguments.
+
+    Args:
+        arguments: mapping of argument names to deserialized argument values
+
+    Returns:
+        FrozenSet[Tuple[str, Any]] of argument name and hashable value pairs, where collection
+        values are represented as frozensets. Collection arguments are only compared against
+        as collections, e.g. by "in_collection", so their order and duplicate elements do not
+        affect the results of the query.
+    """
+    return frozenset(
+        (name, frozenset(value) if isinstance(value, (list, tuple, set, frozenset)) else value)
+        for name, value in arguments.items()
+    )
+
+
+def make_parameter_builder(
+    input_metadata: Mapping[str, QueryArgumentGraphQLType],
+    get_value_converter: Callable[[QueryArgumentGraphQLType], Optional[Callable[[Any], Any]]],
+    trusted: bool = False,
+) -> Callable[[Mapping[str, Any]], Dict[str, Any]]:
+    """Return a function building the parameters of a query from its arguments.
+
+    Args:
+        input_metadata: mapping of argument names to the expected GraphQL types
+        get_value_converter: function given the GraphQL type of a query input, and returning
+                             a function converting valid values of the type to the value of
+                             the parameter, or None if valid values are passed as they are.
+                             Since trusted arguments are not validated, the converters should
+                             also accept values commonly passed instead, e.g. numeric IDs.
+                             It is called once per query input, when the builder is created.
+        trusted: bool, if True, the arguments are assumed to be valid and are not validated.
+                 Only use for arguments that are known to be valid, e.g. arguments that were
+                 already validated or that are generated by the application itself.
+
+    Returns:
+        function given a dict mapping argument name to its value, for every parameter the query
+        expects, and returning the parameter dict. Unless trusted is set, it raises
+        GraphQLInvalidArgumentError if the arguments are invalid.
+    """
+    converters = {
+        name: get_value_converter(expected_type) for name, expected_type in input_metadata.items()
+    }
+
+    def build_parameters(arguments: Mapping[str, Any]) -> Dict[str, Any]:
+        """Return the parameter dict for the given query arguments."""
+        if not trusted:
+            validate_arguments(input_metadata, arguments)
+        parameters = {}
+        for name, value in arguments.items():
+            convert = converters.get(name)
+            parameters[name] = value if convert is None or value is None else convert(value)
+        return parameters
+
+    return build_parameters
+
+
 ######
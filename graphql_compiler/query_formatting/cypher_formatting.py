@@ -117,18 +117,28 @@ def _safe_cypher_argument(expected_type, argument_value):
 ######
 
 
-def insert_arguments_into_cypher_query_redisgraph(compilation_result, arguments):
+def insert_arguments_into_cypher_query_redisgraph(
+    compilation_result, arguments, parameter_header=False
+):
     """Insert the arguments into the compiled Cypher query to form a complete query.
 
     This is only for Redisgraph because Neo4j's client can do this on its own.
-    Redisgraph doesn't support parameterized queries (as described in the Github issue:
-    https://github.com/RedisGraph/RedisGraph/issues/544#issuecomment-507963576
-    work is only expected to start in August 2019).
+    Redisgraph versions before 2.0 don't support parameterized queries (as described in the Github
+    issue: https://github.com/RedisGraph/RedisGraph/issues/544#issuecomment-507963576), so by
+    default the arguments are inserted into the query text itself.
+
+    Newer versions of RedisGraph accept the values of the query parameters in a header of the form
+    CYPHER name1=value1 name2=value2 before the query, and cache the execution plans of queries by
+    the text following the header. With parameter_header=True, the compiled query is left as it is
+    and the arguments are represented in such a header instead, so executing the same compiled
+    query with different arguments reuses its cached execution plan.
 
     Args:
         compilation_result: a CompilationResult object derived from the GraphQL compiler
         arguments: dict, str -> any, mapping argument name to its value, for every parameter the
                     query expects.
+        parameter_header: bool, whether to represent the arguments in a CYPHER parameter header
+                          rather than inserting them into the query text.
 
     Returns:
         string, a Cypher query with inserted argument data.
@@ -145,6 +155,15 @@ def insert_arguments_into_cypher_query_redisgraph(compilation_result, arguments)
         for key, value in six.iteritems(arguments)
     }
 
+    if parameter_header:
+        if not sanitized_arguments:
+            return base_query
+        # Parameters are sorted by name, so the header is the same for the same argument values.
+        header_parameters = " ".join(
+            "{}={}".format(key, sanitized_arguments[key]) for key in sorted(sanitized_arguments)
+        )
+        return "CYPHER {} {}".format(header_parameters, base_query)
+
     return Template(base_query).substitute(sanitized_arguments)
 
 
@@ -2,11 +2,13 @@
 """Safely represent arguments for Gremlin-language GraphQL queries."""
 import json
 from string import Template
+from typing import Any, Callable, Dict
 
 from graphql import GraphQLBoolean, GraphQLFloat, GraphQLID, GraphQLInt, GraphQLList, GraphQLString
 import six
 
 from ..compiler import GREMLIN_LANGUAGE
+from ..compiler.emit_gremlin import ParameterizedGremlinQuery
 from ..compiler.helpers import strip_non_null_from_type
 from ..exceptions import GraphQLInvalidArgumentError
 from ..global_utils import is_same_type
@@ -14,6 +16,10 @@ from ..schema import GraphQLDate, GraphQLDateTime, GraphQLDecimal
 from .representations import coerce_to_decimal, represent_float_as_str, type_check_and_str
 
 
+# Type name -> function converting argument values of that type to Gremlin binding values.
+_GREMLIN_BINDING_CONVERTERS: Dict[str, Callable[[Any], Any]] = {}
+
+
 def _safe_gremlin_string(value):
     """Sanitize and represent a string argument in Gremlin."""
     if not isinstance(value, six.string_types):
@@ -130,6 +136,91 @@ def _safe_gremlin_argument(expected_type, argument_value):
         )
 
 
+def _identity(value):
+    """Return the given value."""
+    return value
+
+
+def _convert_id_binding(value):
+    """Return the binding value of an ID argument, which is always represented as a string."""
+    if isinstance(value, bytes):  # likely to only happen in py2
+        return value.decode("utf-8")
+    return six.text_type(value)
+
+
+def _convert_decimal_binding(value):
+    """Return the binding value of a Decimal argument, a string converted to BigDecimal inline."""
+    return str(coerce_to_decimal(value))
+
+
+def _make_serializing_binding_converter(graphql_type):
+    """Return a function that serializes argument values of the given scalar type to strings."""
+
+    def convert(value):
+        """Return the serialized value, which the Gremlin query parses inline."""
+        try:
+            return graphql_type.serialize(value)
+        except ValueError as e:
+            raise GraphQLInvalidArgumentError(e)
+
+    return convert
+
+
+def _make_list_binding_converter(inner_type):
+    """Return a function that converts list argument values of the given element type."""
+    convert_element = _make_gremlin_binding_converter(strip_non_null_from_type(inner_type))
+
+    def convert(value):
+        """Return the list of converted elements of the value."""
+        if not isinstance(value, list):
+            raise GraphQLInvalidArgumentError(
+                "Attempting to represent a non-list as a list: {}".format(value)
+            )
+        return [convert_element(element) for element in value]
+
+    return convert
+
+
+def _make_gremlin_binding_converter(expected_type):
+    """Return a function converting argument values of the type to Gremlin binding values."""
+    if (
+        is_same_type(GraphQLString, expected_type)
+        or is_same_type(GraphQLFloat, expected_type)
+        or is_same_type(GraphQLInt, expected_type)
+        or is_same_type(GraphQLBoolean, expected_type)
+    ):
+        # Values of these types are validated along with the rest of the arguments,
+        # and every Gremlin server serialization format represents them natively.
+        return _identity
+    elif is_same_type(GraphQLID, expected_type):
+        return _convert_id_binding
+    elif is_same_type(GraphQLDecimal, expected_type):
+        return _convert_decimal_binding
+    elif is_same_type(GraphQLDate, expected_type):
+        return _make_serializing_binding_converter(GraphQLDate)
+    elif is_same_type(GraphQLDateTime, expected_type):
+        return _make_serializing_binding_converter(GraphQLDateTime)
+    elif isinstance(expected_type, GraphQLList):
+        return _make_list_binding_converter(expected_type.of_type)
+    else:
+        raise AssertionError(
+            "Could not represent the requested GraphQL type as a Gremlin binding: "
+            "{}".format(expected_type)
+        )
+
+
+def _get_gremlin_binding_converter(expected_type):
+    """Return the converter of argument values of the given type, creating it if needed."""
+    # Types are keyed by their name, e.g. "[Decimal]", since the types of arguments are all built
+    # from the same few scalar types. The cache therefore remains small.
+    type_name = str(expected_type)
+    converter = _GREMLIN_BINDING_CONVERTERS.get(type_name)
+    if converter is None:
+        converter = _make_gremlin_binding_converter(expected_type)
+        _GREMLIN_BINDING_CONVERTERS[type_name] = converter
+    return converter
+
+
 ######
 # Public API
 ######
@@ -151,12 +242,16 @@ def insert_arguments_into_gremlin_query(compilation_result, arguments):
                    query expects.
 
     Returns:
-        string, a Gremlin query with inserted argument data
+        string, a Gremlin query with inserted argument data. If the query was compiled with
+        parameterized=True, a tuple (script, bindings) instead, as described in
+        insert_arguments_into_parameterized_gremlin_query().
     """
     if compilation_result.language != GREMLIN_LANGUAGE:
         raise AssertionError("Unexpected query output language: {}".format(compilation_result))
 
     base_query = compilation_result.query
+    if isinstance(base_query, ParameterizedGremlinQuery):
+        return insert_arguments_into_parameterized_gremlin_query(base_query, arguments)
     argument_types = compilation_result.input_metadata
 
     # The arguments are assumed to have already been validated against the query.
@@ -168,4 +263,31 @@ def insert_arguments_into_gremlin_query(compilation_result, arguments):
     return Template(base_query).substitute(sanitized_arguments)
 
 
+def insert_arguments_into_parameterized_gremlin_query(parameterized_query, arguments):
+    """Return the Gremlin script and bindings for executing the parameterized query.
+
+    The script does not depend on the arguments, so a Gremlin server executing it repeatedly only
+    compiles it once. Argument values are converted to values that all of the server's
+    serialization formats support: Date and DateTime values are serialized as strings that the
+    script parses, and Decimal values as strings that the script converts to BigDecimal.
+
+    Args:
+        parameterized_query: ParameterizedGremlinQuery, the parameterized Gremlin query
+        arguments: dict, str -> any, mapping argument name to its value, for every parameter the
+                   query expects.
+
+    Returns:
+        tuple (script, bindings), where bindings is a dict of binding name -> value. Both can be
+        submitted to a Gremlin server, e.g. as the gremlin and bindings fields of an eval request.
+    """
+    # The arguments are assumed to have already been validated against the query.
+    bindings = {
+        binding_name: _get_gremlin_binding_converter(strip_non_null_from_type(argument_type))(
+            arguments[argument_name]
+        )
+        for argument_name, binding_name, argument_type in parameterized_query.bindings
+    }
+    return parameterized_query.script, bindings
+
+
 ######
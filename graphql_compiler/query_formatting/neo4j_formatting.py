@@ -0,0 +1,95 @@
+# Copyright 2020-present Kensho Technologies, LLC.
+"""Build the parameters of compiled Cypher queries, for execution with the Neo4j Python driver.
+
+Unlike RedisGraph, Neo4j supports query parameters, so compiled Cypher queries are executed
+unchanged, with the query arguments passed to the driver as a parameter dict:
+    build_parameters = make_neo4j_parameter_builder(compilation_result)
+    with neo4j_client.driver.session() as session:
+        session.run(compilation_result.query, build_parameters(arguments))
+The parameter builder looks up the conversion needed for each query input once, based on the
+input metadata of the compilation result, and then converts each set of arguments in a single
+pass over them. Arguments are converted to the Python types the driver maps to Neo4j types:
+    - Date and DateTime arguments, which are validated to be date and naive datetime objects,
+      are passed as they are, and correspond to Neo4j Date and LocalDateTime values;
+    - Decimal arguments are passed as int if they are integral, and as float otherwise, since
+      Neo4j has no decimal type;
+    - ID arguments are passed as strings, and Float arguments as floats.
+"""
+import decimal
+from typing import Any, Callable, Dict, Mapping, Optional
+
+from graphql import GraphQLFloat, GraphQLID, GraphQLList
+
+from ..compiler import CYPHER_LANGUAGE, CompilationResult
+from ..compiler.helpers import strip_non_null_from_type
+from ..global_utils import is_same_type
+from ..schema import GraphQLDecimal
+from ..typedefs import QueryArgumentGraphQLType
+from .common import make_parameter_builder
+
+
+def _convert_decimal(value: Any) -> Any:
+    """Return the Decimal argument value as an int if it is integral, and as a float otherwise."""
+    decimal_value = value if isinstance(value, decimal.Decimal) else decimal.Decimal(value)
+    if decimal_value == decimal_value.to_integral_value():
+        return int(decimal_value)
+    return float(decimal_value)
+
+
+def _get_neo4j_value_converter(
+    expected_type: QueryArgumentGraphQLType,
+) -> Optional[Callable[[Any], Any]]:
+    """Return a function converting values of the type for the Neo4j driver, or None if not needed.
+
+    Args:
+        expected_type: GraphQL type of a query input. All GraphQLNonNull type wrappers are stripped.
+
+    Returns:
+        function converting a valid value of the type to the Python type the Neo4j driver expects,
+        or None if valid values of the type can be passed to the driver as they are
+    """
+    stripped_type = strip_non_null_from_type(expected_type)
+    if isinstance(stripped_type, GraphQLList):
+        element_converter = _get_neo4j_value_converter(stripped_type.of_type)
+        if element_converter is None:
+            return list
+        convert_element = element_converter
+        return lambda value: [convert_element(element) for element in value]
+    elif is_same_type(GraphQLDecimal, stripped_type):
+        return _convert_decimal
+    elif is_same_type(GraphQLID, stripped_type):
+        return str
+    elif is_same_type(GraphQLFloat, stripped_type):
+        return float
+    else:
+        # String, Int, Boolean, Date and DateTime values are passed to the driver as they are.
+        return None
+
+
+######
+# Public API
+######
+
+
+def make_neo4j_parameter_builder(
+    compilation_result: CompilationResult, trusted: bool = False
+) -> Callable[[Mapping[str, Any]], Dict[str, Any]]:
+    """Return a function building the Neo4j driver parameters of the query from its arguments.
+
+    Args:
+        compilation_result: CompilationResult of a query compiled to Cypher
+        trusted: bool, if True, the arguments are assumed to be valid and are not validated,
+                 see make_parameter_builder in query_formatting/common.py
+
+    Returns:
+        function given a dict mapping argument name to its value, for every parameter the query
+        expects, and returning the parameter dict to pass to the Neo4j driver along with
+        the compiled query. Unless trusted is set, it raises GraphQLInvalidArgumentError if
+        the arguments are invalid.
+    """
+    if compilation_result.language != CYPHER_LANGUAGE:
+        raise AssertionError(f"Unexpected query output language: {compilation_result}")
+
+    return make_parameter_builder(
+        compilation_result.input_metadata, _get_neo4j_value_converter, trusted=trusted
+    )
@@ -0,0 +1,141 @@
+# Copyright 2020-present Kensho Technologies, LLC.
+"""Execute compiled MATCH queries on OrientDB with named parameters, rather than inlined arguments.
+
+insert_arguments_into_match_query renders every argument into the query text, so each set of
+arguments produces a different statement, which OrientDB has to parse again and cannot reuse
+from its command cache. Instead, the compiled query can be executed with OrientDB's named
+parameters, with a statement that is the same for every set of arguments:
+    query = get_orientdb_parameterized_query(compilation_result)
+    build_parameters = make_orientdb_parameter_builder(compilation_result)
+    results = execute_with_parameters(query, build_parameters(arguments))
+using any OrientDB client that supports named query parameters. The parameter builder looks up
+the conversion needed for each query input once, based on the input metadata of the compilation
+result. Arguments are passed in the same encodings the inlined arguments use:
+    - Date and DateTime arguments are passed as strings, which the query parses with date();
+    - Decimal arguments are passed as strings, which the query converts with decimal();
+    - ID arguments are passed as strings, and Float arguments as floats.
+Since a list parameter cannot be converted element-wise within the query, lists of Decimal
+arguments are not supported, and their queries must have their arguments inlined instead.
+"""
+from typing import Any, Callable, Dict, Mapping, Optional
+
+from graphql import GraphQLFloat, GraphQLID, GraphQLList
+
+from ..compiler import MATCH_LANGUAGE, CompilationResult
+from ..compiler.helpers import strip_non_null_from_type
+from ..global_utils import is_same_type
+from ..schema import GraphQLDate, GraphQLDateTime, GraphQLDecimal
+from ..typedefs import QueryArgumentGraphQLType
+from .common import make_parameter_builder
+from .representations import coerce_to_decimal
+
+
+def _convert_decimal(value: Any) -> str:
+    """Return the Decimal argument value as a string, to be converted with decimal()."""
+    return str(coerce_to_decimal(value))
+
+
+def _get_orientdb_value_converter(
+    expected_type: QueryArgumentGraphQLType,
+) -> Optional[Callable[[Any], Any]]:
+    """Return a function converting values of the type for OrientDB, or None if not needed.
+
+    Args:
+        expected_type: GraphQL type of a query input. All GraphQLNonNull type wrappers are stripped.
+
+    Returns:
+        function converting a valid value of the type to the value of the OrientDB parameter,
+        or None if valid values of the type can be passed to OrientDB as they are
+    """
+    stripped_type = strip_non_null_from_type(expected_type)
+    if isinstance(stripped_type, GraphQLList):
+        inner_type = strip_non_null_from_type(stripped_type.of_type)
+        if isinstance(inner_type, GraphQLList):
+            raise NotImplementedError(
+                f"MATCH does not currently support nested lists, but type was {expected_type}."
+            )
+        elif is_same_type(GraphQLDecimal, inner_type):
+            raise NotImplementedError(
+                f"Lists of Decimal values cannot be passed as OrientDB parameters, since their "
+                f"elements cannot be converted with decimal() within the query. Type was "
+                f"{expected_type}."
+            )
+        element_converter = _get_orientdb_value_converter(inner_type)
+        if element_converter is None:
+            return list
+        convert_element = element_converter
+        return lambda value: [convert_element(element) for element in value]
+    elif is_same_type(GraphQLDecimal, stripped_type):
+        return _convert_decimal
+    elif is_same_type(GraphQLDate, stripped_type):
+        return GraphQLDate.serialize
+    elif is_same_type(GraphQLDateTime, stripped_type):
+        return GraphQLDateTime.serialize
+    elif is_same_type(GraphQLID, stripped_type):
+        return str
+    elif is_same_type(GraphQLFloat, stripped_type):
+        return float
+    else:
+        # String, Int and Boolean values are passed to OrientDB as they are.
+        return None
+
+
+######
+# Public API
+######
+
+
+def get_orientdb_parameterized_query(compilation_result: CompilationResult) -> str:
+    """Return the compiled MATCH query, with OrientDB named parameters in place of its arguments.
+
+    Args:
+        compilation_result: CompilationResult of a query compiled to MATCH
+
+    Returns:
+        string, a MATCH query referring to each argument as the named parameter ":<name>",
+        which is the same for every set of arguments, and can be cached by OrientDB
+
+    Raises:
+        NotImplementedError, if the query has an input whose values cannot be passed as
+        a parameter, i.e. a list of Decimal values
+    """
+    if compilation_result.language != MATCH_LANGUAGE:
+        raise AssertionError(f"Unexpected query output language: {compilation_result}")
+
+    placeholders = {}
+    for name, expected_type in compilation_result.input_metadata.items():
+        # Ensure the values of the input can be passed as a parameter.
+        _get_orientdb_value_converter(expected_type)
+        if is_same_type(GraphQLDecimal, strip_non_null_from_type(expected_type)):
+            placeholders[name] = f"decimal(:{name})"
+        else:
+            placeholders[name] = f":{name}"
+    return compilation_result.query.format(**placeholders)
+
+
+def make_orientdb_parameter_builder(
+    compilation_result: CompilationResult, trusted: bool = False
+) -> Callable[[Mapping[str, Any]], Dict[str, Any]]:
+    """Return a function building the OrientDB named parameters of the query from its arguments.
+
+    Args:
+        compilation_result: CompilationResult of a query compiled to MATCH
+        trusted: bool, if True, the arguments are assumed to be valid and are not validated,
+                 see make_parameter_builder in query_formatting/common.py
+
+    Returns:
+        function given a dict mapping argument name to its value, for every parameter the query
+        expects, and returning the parameter dict to pass to OrientDB along with the query
+        returned by get_orientdb_parameterized_query. Unless trusted is set, it raises
+        GraphQLInvalidArgumentError if the arguments are invalid.
+
+    Raises:
+        NotImplementedError, if the query has an input whose values cannot be passed as
+        a parameter, i.e. a list of Decimal values
+    """
+    if compilation_result.language != MATCH_LANGUAGE:
+        raise AssertionError(f"Unexpected query output language: {compilation_result}")
+
+    return make_parameter_builder(
+        compilation_result.input_metadata, _get_orientdb_value_converter, trusted=trusted
+    )
@@ -1,5 +1,14 @@
 # Copyright 2018-present Kensho Technologies, LLC.
 from ..compiler.common import SQL_LANGUAGE
+from ..compiler.sqlalchemy_extensions import PrecompiledSqlQuery
+
+
+def _get_expanded_element_names(precompiled_query, parameter_name, element_count):
+    """Return the DBAPI parameter names of the list elements of an expanding bound parameter."""
+    return [
+        precompiled_query.expanded_element_name_format.format(name=parameter_name, index=index)
+        for index in range(1, element_count + 1)
+    ]
 
 
 ######
@@ -15,12 +24,74 @@ def insert_arguments_into_sql_query(compilation_result, arguments):
         arguments: Dict[str, Any], parameter name -> value, for every parameter the query expects.
 
     Returns:
-        SQLAlchemy Selectable, a executable SQL query with parameters bound.
+        SQLAlchemy Selectable, a executable SQL query with parameters bound. If the query was
+        precompiled, a tuple (query string, DBAPI parameters) instead, as described in
+        insert_arguments_into_precompiled_sql_query().
     """
     if compilation_result.language != SQL_LANGUAGE:
         raise AssertionError("Unexpected query output language: {}".format(compilation_result))
     base_query = compilation_result.query
+    if isinstance(base_query, PrecompiledSqlQuery):
+        return insert_arguments_into_precompiled_sql_query(base_query, arguments)
     return base_query.params(**arguments)
 
 
+def insert_arguments_into_precompiled_sql_query(precompiled_query, arguments):
+    """Return the SQL text and DBAPI parameters for executing the precompiled query.
+
+    The SQL text only needs to change when the query has list-valued parameters, since each
+    element of such a list is passed to the DBAPI as a separate parameter.
+
+    Args:
+        precompiled_query: PrecompiledSqlQuery, the precompiled SQL query
+        arguments: Dict[str, Any], parameter name -> value, for every parameter the query expects.
+
+    Returns:
+        tuple (query string, DBAPI parameters) that can be passed to the execute() method of
+        a DBAPI cursor. DBAPI parameters are a tuple for positional paramstyles, and
+        a dict for named paramstyles.
+    """
+    is_named_paramstyle = precompiled_query.positional_parameter_names is None
+
+    dbapi_parameters = dict(arguments) if is_named_paramstyle else None
+    expanding_parameter_names = set()
+    query_string_parts = [precompiled_query.query_string_parts[0]]
+    for (parameter_name, empty_set_expression), query_string_part in zip(
+        precompiled_query.expanding_parameters, precompiled_query.query_string_parts[1:]
+    ):
+        elements = arguments[parameter_name]
+        expanding_parameter_names.add(parameter_name)
+        if elements:
+            element_names = _get_expanded_element_names(
+                precompiled_query, parameter_name, len(elements)
+            )
+            element_placeholders = ", ".join(
+                precompiled_query.expanded_element_placeholder_format.format(
+                    element_name=element_name
+                )
+                for element_name in element_names
+            )
+            if is_named_paramstyle:
+                dbapi_parameters.update(zip(element_names, elements))
+        else:
+            element_placeholders = empty_set_expression
+
+        query_string_parts.append("(" + element_placeholders + ")")
+        query_string_parts.append(query_string_part)
+
+    if is_named_paramstyle:
+        for parameter_name in expanding_parameter_names:
+            dbapi_parameters.pop(parameter_name, None)
+    else:
+        positional_parameters = []
+        for parameter_name in precompiled_query.positional_parameter_names:
+            if parameter_name in expanding_parameter_names:
+                positional_parameters.extend(arguments[parameter_name])
+            else:
+                positional_parameters.append(arguments[parameter_name])
+        dbapi_parameters = tuple(positional_parameters)
+
+    return "".join(query_string_parts), dbapi_parameters
+
+
 ######
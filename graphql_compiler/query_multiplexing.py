@@ -0,0 +1,360 @@
+# Copyright 2020-present Kensho Technologies, LLC.
+"""Batch many executions of a query, differing only in a root equality filter, into one query.
+
+A common pattern is to resolve N entities by executing the same GraphQL query N times, each time
+with a different value of a parameter used in an "=" filter on the root vertex:
+    {
+        Animal {
+            uuid @filter(op_name: "=", value: ["$uuid"])
+            name @output(out_name: "name")
+        }
+    }
+Such queries can be multiplexed: the "=" filter is replaced by an "in_collection" filter over
+the values of all N executions, and the filtered field is output so that each result row can be
+routed back to the executions whose value it matches:
+    {
+        Animal {
+            uuid @filter(op_name: "in_collection", value: ["$uuid_multiplexed"])
+                 @output(out_name: "__multiplexed_key")
+            name @output(out_name: "name")
+        }
+    }
+The multiplexed query is a plain GraphQL query, so it can be compiled once for any backend and
+executed a single time for the whole batch. Use get_multiplexed_query() to rewrite the query,
+multiplex_arguments() to build the arguments of the batch, and demultiplex_results() to split
+the results of the batch into the results of each original execution.
+"""
+from collections import namedtuple
+from copy import copy
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set
+
+from graphql import print_ast
+from graphql.language.ast import (
+    ArgumentNode,
+    DirectiveNode,
+    DocumentNode,
+    FieldNode,
+    ListValueNode,
+    NameNode,
+    StringValueNode,
+)
+from graphql.pyutils import FrozenList
+
+from .ast_manipulation import (
+    get_ast_field_name,
+    get_only_query_definition,
+    get_only_selection_from_ast,
+    safe_parse_graphql,
+)
+from .compiler.compiler_frontend import OutputMetadata, graphql_to_ir
+from .compiler.helpers import get_parameter_name, is_runtime_parameter
+from .exceptions import GraphQLInvalidArgumentError, GraphQLValidationError
+from .post_processing.result_decoding import make_output_converters
+from .schema.schema_info import CommonSchemaInfo
+
+
+MULTIPLEXED_KEY_OUTPUT_NAME = "__multiplexed_key"
+MULTIPLEXED_PARAMETER_SUFFIX = "_multiplexed"
+
+
+MultiplexedQuery = namedtuple(
+    "MultiplexedQuery",
+    (
+        "query",  # str, GraphQL query filtering the root field with "in_collection"
+        "parameter_name",  # str, name of the parameter of the "=" filter in the original query
+        "collection_parameter_name",  # str, name of the parameter of the "in_collection" filter
+        "key_output_name",  # str, name of the output containing the value of the filtered field
+        "key_output_added",  # bool, whether the key output is not an output of the original query
+        "key_type",  # GraphQL type of the filtered field
+    ),
+)
+
+
+def _generate_new_name(base_name: str, taken_names: Set[str]) -> str:
+    """Return the base name, with as few trailing underscores as needed to not be taken."""
+    name = base_name
+    while name in taken_names:
+        name += "_"
+    return name
+
+
+def _get_candidate_parameter_names(ir) -> List[str]:
+    """Return the names of the parameters used only by a single "=" filter on the root vertex."""
+    parameter_use_counts: Dict[str, int] = {}
+    for location, _ in ir.query_metadata_table.registered_locations:
+        for filter_info in ir.query_metadata_table.get_filter_infos(location):
+            for argument in filter_info.args:
+                if is_runtime_parameter(argument):
+                    parameter_name = get_parameter_name(argument)
+                    parameter_use_counts[parameter_name] = (
+                        parameter_use_counts.get(parameter_name, 0) + 1
+                    )
+
+    candidate_parameter_names = []
+    root_location = ir.query_metadata_table.root_location
+    for filter_info in ir.query_metadata_table.get_filter_infos(root_location):
+        if filter_info.op_name != "=" or len(filter_info.fields) != 1:
+            continue
+        (argument,) = filter_info.args
+        if is_runtime_parameter(argument):
+            parameter_name = get_parameter_name(argument)
+            if parameter_use_counts[parameter_name] == 1:
+                candidate_parameter_names.append(parameter_name)
+    return candidate_parameter_names
+
+
+def _is_equality_filter_on_parameter(directive: DirectiveNode, parameter_name: str) -> bool:
+    """Return True if the directive is an "=" filter on the given runtime parameter."""
+    if get_ast_field_name(directive) != "filter":
+        return False
+    arguments = {argument.name.value: argument.value for argument in directive.arguments}
+    op_name = arguments.get("op_name")
+    value = arguments.get("value")
+    return (
+        isinstance(op_name, StringValueNode)
+        and op_name.value == "="
+        and isinstance(value, ListValueNode)
+        and len(value.values) == 1
+        and isinstance(value.values[0], StringValueNode)
+        and value.values[0].value == "$" + parameter_name
+    )
+
+
+def _make_in_collection_filter_directive(parameter_name: str) -> DirectiveNode:
+    """Return an "in_collection" filter directive on the given runtime parameter."""
+    return DirectiveNode(
+        name=NameNode(value="filter"),
+        arguments=[
+            ArgumentNode(
+                name=NameNode(value="op_name"), value=StringValueNode(value="in_collection")
+            ),
+            ArgumentNode(
+                name=NameNode(value="value"),
+                value=ListValueNode(values=[StringValueNode(value="$" + parameter_name)]),
+            ),
+        ],
+    )
+
+
+def _make_output_directive(out_name: str) -> DirectiveNode:
+    """Return an output directive with the given output name."""
+    return DirectiveNode(
+        name=NameNode(value="output"),
+        arguments=[
+            ArgumentNode(name=NameNode(value="out_name"), value=StringValueNode(value=out_name))
+        ],
+    )
+
+
+def _get_output_name(field_ast: FieldNode) -> Optional[str]:
+    """Return the output name of the field, or None if the field is not output."""
+    for directive in field_ast.directives or []:
+        if get_ast_field_name(directive) == "output":
+            for argument in directive.arguments:
+                if argument.name.value == "out_name" and isinstance(
+                    argument.value, StringValueNode
+                ):
+                    return argument.value.value
+    return None
+
+
+def get_multiplexed_query(
+    common_schema_info: CommonSchemaInfo, graphql_query: str, parameter_name: Optional[str] = None
+) -> Optional[MultiplexedQuery]:
+    """Rewrite the query so that a single execution returns the results of a batch of executions.
+
+    The query can be multiplexed if the root vertex field directly selects a property field with
+    an "=" filter on a runtime parameter, and that parameter is not used anywhere else in the query.
+    The filter is replaced by an "in_collection" filter on a new parameter, and the property field
+    is output, unless it already was.
+
+    Args:
+        common_schema_info: GraphQL schema object describing the schema of the graph to be queried
+        graphql_query: str, GraphQL query whose executions to multiplex
+        parameter_name: optional str, name of the parameter whose value differs between
+                        executions. If not specified, the query must have exactly one parameter
+                        that can be multiplexed, which is then used.
+
+    Returns:
+        MultiplexedQuery describing the rewritten query, or None if the query cannot be multiplexed
+        on the given parameter, or if no parameter was given and the query does not have exactly
+        one parameter that can be multiplexed
+
+    Raises:
+        GraphQLError flavors if the query is not valid for the schema, as when compiling it
+    """
+    ir = graphql_to_ir(
+        common_schema_info.schema,
+        graphql_query,
+        type_equivalence_hints=common_schema_info.type_equivalence_hints,
+    )
+    candidate_parameter_names = _get_candidate_parameter_names(ir)
+    if parameter_name is None:
+        if len(candidate_parameter_names) != 1:
+            return None
+        (parameter_name,) = candidate_parameter_names
+    elif parameter_name not in candidate_parameter_names:
+        return None
+
+    document_ast = safe_parse_graphql(graphql_query)
+    definition_ast = get_only_query_definition(document_ast, GraphQLValidationError)
+    root_field_ast = get_only_selection_from_ast(definition_ast, GraphQLValidationError)
+
+    collection_parameter_name = _generate_new_name(
+        parameter_name + MULTIPLEXED_PARAMETER_SUFFIX, set(ir.input_metadata.keys())
+    )
+    key_output_name = None
+    key_output_added = False
+    new_selections = []
+    for selection_ast in root_field_ast.selection_set.selections:
+        if isinstance(selection_ast, FieldNode) and any(
+            _is_equality_filter_on_parameter(directive, parameter_name)
+            for directive in selection_ast.directives or []
+        ):
+            new_directives = [
+                _make_in_collection_filter_directive(collection_parameter_name)
+                if _is_equality_filter_on_parameter(directive, parameter_name)
+                else directive
+                for directive in selection_ast.directives or []
+            ]
+            key_output_name = _get_output_name(selection_ast)
+            if key_output_name is None:
+                key_output_name = _generate_new_name(
+                    MULTIPLEXED_KEY_OUTPUT_NAME, set(ir.output_metadata.keys())
+                )
+                key_output_added = True
+                new_directives.append(_make_output_directive(key_output_name))
+
+            selection_ast = copy(selection_ast)
+            selection_ast.directives = FrozenList(new_directives)
+        new_selections.append(selection_ast)
+
+    if key_output_name is None:
+        # The filter is at the root location, but not directly within the root vertex field,
+        # e.g. because it is within a type coercion.
+        return None
+
+    new_selection_set = copy(root_field_ast.selection_set)
+    new_selection_set.selections = FrozenList(new_selections)
+    new_root_field_ast = copy(root_field_ast)
+    new_root_field_ast.selection_set = new_selection_set
+    new_definition_selection_set = copy(definition_ast.selection_set)
+    new_definition_selection_set.selections = FrozenList([new_root_field_ast])
+    new_definition_ast = copy(definition_ast)
+    new_definition_ast.selection_set = new_definition_selection_set
+
+    return MultiplexedQuery(
+        query=print_ast(DocumentNode(definitions=[new_definition_ast])),
+        parameter_name=parameter_name,
+        collection_parameter_name=collection_parameter_name,
+        key_output_name=key_output_name,
+        key_output_added=key_output_added,
+        key_type=ir.input_metadata[parameter_name],
+    )
+
+
+def multiplex_arguments(
+    multiplexed_query: MultiplexedQuery, arguments_list: Sequence[Mapping[str, Any]]
+) -> Dict[str, Any]:
+    """Return the arguments of the multiplexed query, for the given batch of executions.
+
+    Args:
+        multiplexed_query: MultiplexedQuery, as returned by get_multiplexed_query()
+        arguments_list: the arguments of each execution of the original query. All executions must
+                        have the same arguments, except for the multiplexed parameter.
+
+    Returns:
+        dict, the arguments of the multiplexed query, with the distinct values of the multiplexed
+        parameter in the order in which they first appear in arguments_list
+
+    Raises:
+        GraphQLInvalidArgumentError if the batch is empty, the multiplexed parameter is missing from
+        any arguments, or the other arguments differ between executions
+    """
+    if not arguments_list:
+        raise GraphQLInvalidArgumentError("Cannot multiplex an empty batch of executions.")
+
+    parameter_name = multiplexed_query.parameter_name
+    shared_arguments = None
+    key_values = []
+    seen_key_values = set()
+    for arguments in arguments_list:
+        if parameter_name not in arguments:
+            raise GraphQLInvalidArgumentError(
+                f"Missing value for the multiplexed parameter {parameter_name}: {arguments}"
+            )
+        other_arguments = {
+            name: value for name, value in arguments.items() if name != parameter_name
+        }
+        if shared_arguments is None:
+            shared_arguments = other_arguments
+        elif other_arguments != shared_arguments:
+            raise GraphQLInvalidArgumentError(
+                f"Only executions whose arguments differ solely in the multiplexed parameter "
+                f"{parameter_name} can be multiplexed, but got {shared_arguments} and "
+                f"{other_arguments}."
+            )
+
+        key_value = arguments[parameter_name]
+        if key_value not in seen_key_values:
+            seen_key_values.add(key_value)
+            key_values.append(key_value)
+
+    if shared_arguments is None:
+        raise AssertionError(
+            f"Expected the arguments of a non-empty batch to be set, but got None: {arguments_list}"
+        )
+    multiplexed_arguments = dict(shared_arguments)
+    multiplexed_arguments[multiplexed_query.collection_parameter_name] = key_values
+    return multiplexed_arguments
+
+
+def demultiplex_results(
+    multiplexed_query: MultiplexedQuery,
+    arguments_list: Sequence[Mapping[str, Any]],
+    results: Iterable[Mapping[str, Any]],
+) -> List[List[Dict[str, Any]]]:
+    """Split the results of the multiplexed query into the results of each original execution.
+
+    Args:
+        multiplexed_query: MultiplexedQuery, as returned by get_multiplexed_query()
+        arguments_list: the arguments of each execution of the original query, as given to
+                        multiplex_arguments()
+        results: iterable of the results of executing the multiplexed query with the arguments
+                 returned by multiplex_arguments()
+
+    Returns:
+        list containing the list of results of each execution, in the order of arguments_list.
+        Executions with the same value of the multiplexed parameter get equal results. The key
+        output is removed from the results, unless it is an output of the original query.
+    """
+    # Backends return the values of some types differently, e.g. dates as ISO-8601 strings,
+    # so both the key outputs and the argument values are converted to the same Python types.
+    key_output_name = multiplexed_query.key_output_name
+    convert_key = make_output_converters(
+        {key_output_name: OutputMetadata(multiplexed_query.key_type, False, False)}
+    )[key_output_name]
+
+    results_by_key: Dict[Any, List[Dict[str, Any]]] = {}
+    for arguments in arguments_list:
+        results_by_key.setdefault(convert_key(arguments[multiplexed_query.parameter_name]), [])
+
+    for result in results:
+        demultiplexed_result = dict(result)
+        if multiplexed_query.key_output_added:
+            key_value = demultiplexed_result.pop(key_output_name)
+        else:
+            key_value = demultiplexed_result[key_output_name]
+
+        key_results = results_by_key.get(convert_key(key_value))
+        if key_results is None:
+            raise AssertionError(
+                f"Received a result whose key {key_value} does not match any execution of "
+                f"the multiplexed query {multiplexed_query}: {result}"
+            )
+        key_results.append(demultiplexed_result)
+
+    return [
+        list(results_by_key[convert_key(arguments[multiplexed_query.parameter_name])])
+        for arguments in arguments_list
+    ]
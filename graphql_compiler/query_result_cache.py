@@ -0,0 +1,287 @@
+# Copyright 2020-present Kensho Technologies, LLC.
+"""Cache the results of GraphQL queries, invalidating them when the data they read changes.
+
+Queries over slowly changing data may be served from a QueryResultCache. Each cached entry is
+keyed by the GraphQL query string together with its normalized arguments, and records the names
+of the vertex and edge classes the query touches:
+    - the class at each location of the query, including all of its subclasses, since a query
+      starting at an interface or union reads the vertices of every class belonging to it;
+    - the edge class of each traversal, including traversals within @fold and @recurse scopes.
+When the application writes to the database, it reports the names of the classes it wrote to
+with invalidate_classes(), which discards the entries touching any of them. The cache holds
+a bounded number of entries, discarding the least recently used ones first.
+
+The cache does not execute queries itself, so it can be used with any backend:
+    cache = QueryResultCache(common_schema_info)
+    results = cache.get_or_execute(graphql_query, arguments, execute)
+where execute(graphql_query, arguments) returns the list of results of the query.
+"""
+from collections import OrderedDict, namedtuple
+from functools import partial
+from threading import Lock
+import typing
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, Tuple
+
+from graphql import GraphQLUnionType
+
+from .compiler.compiler_frontend import graphql_to_ir
+from .compiler.helpers import FoldScopeLocation, get_edge_direction_and_name
+from .compiler.subclass import compute_subclass_sets
+from .global_utils import BoundedLRUCache
+from .query_formatting.common import normalize_arguments
+from .schema.schema_info import CommonSchemaInfo
+
+
+QueryResultCacheMetrics = namedtuple(
+    "QueryResultCacheMetrics",
+    (
+        "hits",  # int, number of lookups that found cached results
+        "misses",  # int, number of lookups that did not find cached results
+        "hit_rate",  # float, fraction of lookups that found cached results, or 0.0 if none yet
+        "evictions",  # int, number of entries discarded to keep the cache within its size
+        "invalidations",  # int, number of entries discarded by invalidate_classes()
+        "size",  # int, number of entries currently in the cache
+    ),
+)
+
+
+_CacheEntry = namedtuple(
+    "_CacheEntry",
+    (
+        "results",  # Tuple[Dict[str, Any], ...], the results of the query
+        "touched_classes",  # FrozenSet[str], names of the vertex and edge classes the query reads
+    ),
+)
+
+
+def get_classes_touched_by_query(
+    common_schema_info: CommonSchemaInfo, graphql_query: str
+) -> FrozenSet[str]:
+    """Return the names of the vertex and edge classes whose data the query may read.
+
+    Args:
+        common_schema_info: CommonSchemaInfo of the schema the query is written against
+        graphql_query: str, GraphQL query
+
+    Returns:
+        frozenset of str, names of the vertex classes at every location of the query along with
+        all of their subclasses, and of the edge classes of every traversal in the query
+    """
+    ir = graphql_to_ir(
+        common_schema_info.schema,
+        graphql_query,
+        type_equivalence_hints=common_schema_info.type_equivalence_hints,
+    )
+    subclass_sets = compute_subclass_sets(
+        common_schema_info.schema, type_equivalence_hints=common_schema_info.type_equivalence_hints
+    )
+
+    touched_classes: Set[str] = set()
+    for location, location_info in ir.query_metadata_table.registered_locations:
+        location_type = location_info.type
+        if isinstance(location_type, GraphQLUnionType):
+            member_type_names = {member_type.name for member_type in location_type.types}
+        else:
+            member_type_names = {location_type.name}
+        for type_name in member_type_names:
+            touched_classes.update(subclass_sets.get(type_name, {type_name}))
+        if isinstance(location, FoldScopeLocation):
+            touched_classes.update(edge_name for _, edge_name in location.fold_path)
+        elif len(location.query_path) > 1:
+            _, edge_name = get_edge_direction_and_name(location.query_path[-1])
+            touched_classes.add(edge_name)
+    return frozenset(touched_classes)
+
+
+class QueryResultCache(object):
+    def __init__(self, common_schema_info: CommonSchemaInfo, max_size: int = 1024) -> None:
+        """Create an empty cache of the results of queries against the given schema.
+
+        Args:
+            common_schema_info: CommonSchemaInfo of the schema the cached queries are written
+                                against, used to find the classes each query touches
+            max_size: int, maximum number of cached query results, discarding the least recently
+                      used ones first
+
+        Returns:
+            new QueryResultCache object
+        """
+        if max_size < 1:
+            raise AssertionError(f"Expected a positive cache size, received {max_size}.")
+        self._common_schema_info = common_schema_info
+        self._max_size = max_size
+
+        self._lock = Lock()
+        self._entries: typing.OrderedDict[
+            Tuple[str, FrozenSet[Tuple[str, Any]]], _CacheEntry
+        ] = OrderedDict()
+        # The touched classes of recently cached queries, bounded like the entries themselves.
+        self._touched_classes_by_query: BoundedLRUCache[str, FrozenSet[str]] = BoundedLRUCache(
+            max_size
+        )
+        # Class name -> number of times it was invalidated, and number of times the whole cache
+        # was cleared, to detect writes made while a query was being executed, whose results
+        # may then be stale and must not be cached.
+        self._invalidation_counts: Dict[str, int] = {}
+        self._clear_count = 0
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def _get_touched_classes(self, graphql_query: str) -> FrozenSet[str]:
+        """Return the names of the classes the query touches, computing them if not known."""
+        return self._touched_classes_by_query.get_or_create(
+            graphql_query, partial(get_classes_touched_by_query, self._common_schema_info)
+        )
+
+    def get(
+        self, graphql_query: str, arguments: Mapping[str, Any]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Return the cached results of the query with the given arguments, or None if missing.
+
+        The returned result dicts are shared with the cache, and must not be modified.
+        """
+        key = (graphql_query, normalize_arguments(arguments))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._entries.move_to_end(key)
+            return list(entry.results)
+
+    def _put_if_not_invalidated(
+        self,
+        graphql_query: str,
+        arguments: Mapping[str, Any],
+        results: Iterable[Dict[str, Any]],
+        touched_classes: FrozenSet[str],
+        invalidation_counts: Tuple[int, Dict[str, int]],
+    ) -> None:
+        """Cache the results, unless a touched class was invalidated since the counts were taken."""
+        key = (graphql_query, normalize_arguments(arguments))
+        entry = _CacheEntry(tuple(results), touched_classes)
+        clear_count, class_invalidation_counts = invalidation_counts
+        with self._lock:
+            if self._clear_count != clear_count:
+                return
+            for class_name, invalidation_count in class_invalidation_counts.items():
+                if self._invalidation_counts.get(class_name, 0) != invalidation_count:
+                    return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def _get_invalidation_counts(
+        self, touched_classes: FrozenSet[str]
+    ) -> Tuple[int, Dict[str, int]]:
+        """Return the current number of clears, and invalidation count of each given class."""
+        with self._lock:
+            return (
+                self._clear_count,
+                {
+                    class_name: self._invalidation_counts.get(class_name, 0)
+                    for class_name in touched_classes
+                },
+            )
+
+    def put(
+        self, graphql_query: str, arguments: Mapping[str, Any], results: Iterable[Dict[str, Any]],
+    ) -> None:
+        """Cache the results of the query with the given arguments.
+
+        The results must have been produced by reading the database after the latest write
+        to the classes the query touches was reported with invalidate_classes(). If that cannot be
+        guaranteed, use get_or_execute() instead, which does not cache results that may be stale.
+        """
+        touched_classes = self._get_touched_classes(graphql_query)
+        self._put_if_not_invalidated(
+            graphql_query,
+            arguments,
+            results,
+            touched_classes,
+            self._get_invalidation_counts(touched_classes),
+        )
+
+    def get_or_execute(
+        self,
+        graphql_query: str,
+        arguments: Mapping[str, Any],
+        execute: Callable[[str, Mapping[str, Any]], Iterable[Dict[str, Any]]],
+    ) -> List[Dict[str, Any]]:
+        """Return the results of the query with the given arguments, executing it if not cached.
+
+        Args:
+            graphql_query: str, GraphQL query
+            arguments: Mapping[str, Any], parameter name -> value, for every parameter the query
+                       expects
+            execute: function given the query and arguments, returning the results of the query.
+                     It is called without holding any lock, so concurrent misses of the same
+                     query each execute it. If any class the query touches is invalidated while
+                     it executes, its results are returned but not cached.
+
+        Returns:
+            list of the result dicts of the query. They may be shared with the cache, and must not
+            be modified.
+        """
+        results = self.get(graphql_query, arguments)
+        if results is not None:
+            return results
+
+        touched_classes = self._get_touched_classes(graphql_query)
+        invalidation_counts = self._get_invalidation_counts(touched_classes)
+        results = list(execute(graphql_query, arguments))
+        self._put_if_not_invalidated(
+            graphql_query, arguments, results, touched_classes, invalidation_counts
+        )
+        return results
+
+    def invalidate_classes(self, class_names: Iterable[str]) -> int:
+        """Discard the cached results of all queries touching any of the given classes.
+
+        Args:
+            class_names: iterable of str, names of the vertex and edge classes that were written to
+
+        Returns:
+            int, the number of discarded entries
+        """
+        class_names = frozenset(class_names)
+        with self._lock:
+            for class_name in class_names:
+                self._invalidation_counts[class_name] = (
+                    self._invalidation_counts.get(class_name, 0) + 1
+                )
+            invalidated_keys = [
+                key
+                for key, entry in self._entries.items()
+                if not entry.touched_classes.isdisjoint(class_names)
+            ]
+            for key in invalidated_keys:
+                del self._entries[key]
+            self._invalidations += len(invalidated_keys)
+            return len(invalidated_keys)
+
+    def clear(self) -> None:
+        """Discard all cached results, as if every class was invalidated."""
+        with self._lock:
+            self._clear_count += 1
+            self._invalidations += len(self._entries)
+            self._entries.clear()
+
+    def get_metrics(self) -> QueryResultCacheMetrics:
+        """Return a snapshot of the cache's hit rate, evictions, invalidations, and size."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return QueryResultCacheMetrics(
+                hits=self._hits,
+                misses=self._misses,
+                hit_rate=float(self._hits) / lookups if lookups else 0.0,
+                evictions=self._evictions,
+                invalidations=self._invalidations,
+                size=len(self._entries),
+            )
@@ -1,6 +1,7 @@
 # Copyright 2019-present Kensho Technologies, LLC.
 from abc import ABCMeta
 from collections import namedtuple
+from collections.abc import Mapping
 from dataclasses import dataclass, field
 from enum import Enum, Flag, auto, unique
 from functools import partial
@@ -243,12 +244,119 @@ SQLAlchemySchemaInfo = namedtuple(
         #    tables the join is to be performed on are not specified. They are inferred from
         #    the schema and the tables dictionary.
         "join_descriptors",
+        # optional SQLFoldStrategy (see compiler/emit_sql.py), specifying how the outputs of folds
+        # are aggregated. If None, the default strategy for the dialect is used: ARRAY_AGG for
+        # PostgreSQL and XML PATH for MSSQL.
+        "fold_strategy",
+        # optional SQLRecurseOptions (see compiler/emit_sql.py), controlling the recursive CTEs
+        # emitted for @recurse. If None, the default options are used.
+        "recurse_options",
+        # optional dict, used by the compiler to cache the aliases of each table, so that queries
+        # compiled with this SQLAlchemySchemaInfo share alias objects whose column collections
+        # are already populated (see compiler/emit_sql.py). It should be an empty dict when
+        # the SQLAlchemySchemaInfo is created. If None, every query creates new aliases.
+        "table_alias_pools",
     ),
 )
+# The fold_strategy, recurse_options and table_alias_pools fields are optional.
+SQLAlchemySchemaInfo.__new__.__defaults__ = (None, None, None)  # type: ignore
+
+
+def _validate_sqlalchemy_type(
+    schema, vertex_name_to_table, join_descriptors, validated_type_names, type_name
+):
+    """Raise AssertionError if the table or join descriptors of the given type are invalid.
+
+    Args:
+        schema: GraphQLSchema
+        vertex_name_to_table: dict mapping graphql object and interface type names to tables
+        join_descriptors: dict mapping graphql object and interface type names to dicts mapping
+                          every vertex field name at that type to a DirectJoinDescriptor
+        validated_type_names: optional set of the names of the types already validated, to which
+                              type_name is added once validated. Types in the set are not validated
+                              again.
+        type_name: str, name of the type to validate. Names of types that do not need a table,
+                   or that are not in the schema, are ignored.
+    """
+    if validated_type_names is not None and type_name in validated_type_names:
+        return
+
+    types_to_map = (GraphQLInterfaceType, GraphQLObjectType)
+    builtin_fields = {
+        "_x_count",
+    }
+    # TODO(bojanserafimov): More validation can be done:
+    # - are the types of the columns compatible with the GraphQL type of the property field?
+    # - do joins join on columns on which the (=) operator makes sense?
+    # - do inherited columns have exactly the same type on the parent and child table?
+    # - are all the column types available in this dialect?
+    graphql_type = schema.type_map.get(type_name)
+    if isinstance(graphql_type, types_to_map):
+        if type_name != "RootSchemaQuery" and not type_name.startswith("__"):
+            # Check existence of sqlalchemy table for this type
+            if type_name not in vertex_name_to_table:
+                raise AssertionError("Table for type {} not found".format(type_name))
+            table = vertex_name_to_table[type_name]
+            if not isinstance(table, sqlalchemy.Table):
+                raise AssertionError(
+                    "Table for type {} has wrong type {}".format(type_name, type(table))
+                )
+
+            # Check existence of all fields
+            for field_name in six.iterkeys(graphql_type.fields):
+                if is_vertex_field_name(field_name):
+                    if field_name not in join_descriptors.get(type_name, {}):
+                        raise AssertionError(
+                            "No join descriptor was specified for vertex "
+                            "field {} on type {}".format(field_name, type_name)
+                        )
+                else:
+                    if field_name not in builtin_fields and field_name not in table.c:
+                        raise AssertionError(
+                            "Table for type {} has no column "
+                            "for property field {}".format(type_name, field_name)
+                        )
+
+    if validated_type_names is not None:
+        validated_type_names.add(type_name)
+
+
+class _LazilyValidatedMapping(Mapping):
+    """Read-only mapping of type name to value, validating each type the first time it is used."""
+
+    def __init__(self, mapping, validate_type):
+        """Wrap the mapping, calling validate_type(type_name) before returning any of its values."""
+        self._mapping = mapping
+        self._validate_type = validate_type
+
+    def __getitem__(self, type_name):
+        """Validate the type if it was not validated yet, then return its value."""
+        self._validate_type(type_name)
+        return self._mapping[type_name]
+
+    def __contains__(self, type_name):
+        """Return whether the type has a value, without validating it."""
+        return type_name in self._mapping
+
+    def __iter__(self):
+        """Iterate over the type names in the mapping."""
+        return iter(self._mapping)
+
+    def __len__(self):
+        """Return the number of types in the mapping."""
+        return len(self._mapping)
 
 
 def make_sqlalchemy_schema_info(
-    schema, type_equivalence_hints, dialect, vertex_name_to_table, join_descriptors, validate=True
+    schema,
+    type_equivalence_hints,
+    dialect,
+    vertex_name_to_table,
+    join_descriptors,
+    validate=True,
+    fold_strategy=None,
+    recurse_options=None,
+    lazy_validation=False,
 ):
     """Make a SQLAlchemySchemaInfo if the input provided is valid.
 
@@ -279,51 +387,62 @@ def make_sqlalchemy_schema_info(
                              DirectJoinDescriptor. The tables the join is to be performed on are not
                              specified. They are inferred from the schema and the tables dictionary.
         validate: Optional bool (default True), specifying whether to validate that the given
-                  input is valid for creation of a SQLAlchemySchemaInfo. Consider not validating
-                  to save on performance when dealing with a large schema.
+                  input is valid for creation of a SQLAlchemySchemaInfo. Consider validating
+                  lazily to save on performance when dealing with a large schema.
+        fold_strategy: optional SQLFoldStrategy, specifying how the outputs of folds are
+                       aggregated. If None, the default strategy for the dialect is used.
+        recurse_options: optional SQLRecurseOptions, controlling the recursive CTEs emitted for
+                         @recurse. If None, the default options are used.
+        lazy_validation: Optional bool (default False). If True and validate is True, the table and
+                         join descriptors of each type are only validated the first time they are
+                         looked up, e.g. when compiling the first query using the type, instead of
+                         validating those of all types upfront. The vertex_name_to_table and
+                         join_descriptors of the result are then read-only mappings that perform
+                         this validation.
 
     Returns:
         SQLAlchemySchemaInfo containing the input arguments provided
     """
     if validate:
-        types_to_map = (GraphQLInterfaceType, GraphQLObjectType)
-        builtin_fields = {
-            "_x_count",
-        }
-        # TODO(bojanserafimov): More validation can be done:
-        # - are the types of the columns compatible with the GraphQL type of the property field?
-        # - do joins join on columns on which the (=) operator makes sense?
-        # - do inherited columns have exactly the same type on the parent and child table?
-        # - are all the column types available in this dialect?
-        for type_name, graphql_type in six.iteritems(schema.type_map):
-            if isinstance(graphql_type, types_to_map):
-                if type_name != "RootSchemaQuery" and not type_name.startswith("__"):
-                    # Check existence of sqlalchemy table for this type
-                    if type_name not in vertex_name_to_table:
-                        raise AssertionError("Table for type {} not found".format(type_name))
-                    table = vertex_name_to_table[type_name]
-                    if not isinstance(table, sqlalchemy.Table):
-                        raise AssertionError(
-                            "Table for type {} has wrong type {}".format(type_name, type(table))
-                        )
-
-                    # Check existence of all fields
-                    for field_name in six.iterkeys(graphql_type.fields):
-                        if is_vertex_field_name(field_name):
-                            if field_name not in join_descriptors.get(type_name, {}):
-                                raise AssertionError(
-                                    "No join descriptor was specified for vertex "
-                                    "field {} on type {}".format(field_name, type_name)
-                                )
-                        else:
-                            if field_name not in builtin_fields and field_name not in table.c:
-                                raise AssertionError(
-                                    "Table for type {} has no column "
-                                    "for property field {}".format(type_name, field_name)
-                                )
+        if fold_strategy is not None and not isinstance(dialect, fold_strategy.dialect_type):
+            raise AssertionError(
+                "Fold strategy {} is not supported for dialect {}".format(
+                    fold_strategy.name, dialect.name
+                )
+            )
+        if recurse_options is not None and not recurse_options.is_supported_by_dialect(dialect):
+            raise AssertionError(
+                "Recurse options {} are not supported for dialect {}".format(
+                    recurse_options, dialect.name
+                )
+            )
+
+        if lazy_validation:
+            validated_type_names = set()
+            validate_type = partial(
+                _validate_sqlalchemy_type,
+                schema,
+                vertex_name_to_table,
+                join_descriptors,
+                validated_type_names,
+            )
+            vertex_name_to_table = _LazilyValidatedMapping(vertex_name_to_table, validate_type)
+            join_descriptors = _LazilyValidatedMapping(join_descriptors, validate_type)
+        else:
+            for type_name in six.iterkeys(schema.type_map):
+                _validate_sqlalchemy_type(
+                    schema, vertex_name_to_table, join_descriptors, None, type_name
+                )
 
     return SQLAlchemySchemaInfo(
-        schema, type_equivalence_hints, dialect, vertex_name_to_table, join_descriptors
+        schema,
+        type_equivalence_hints,
+        dialect,
+        vertex_name_to_table,
+        join_descriptors,
+        fold_strategy,
+        recurse_options,
+        {},
     )
 
 
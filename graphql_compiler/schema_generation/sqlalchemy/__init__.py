@@ -6,7 +6,12 @@ from .schema_graph_builder import get_sqlalchemy_schema_graph
 
 
 def get_sqlalchemy_schema_info(
-    vertex_name_to_table, direct_edges, dialect, class_to_field_type_overrides=None
+    vertex_name_to_table,
+    direct_edges,
+    dialect,
+    class_to_field_type_overrides=None,
+    fold_strategy=None,
+    recurse_options=None,
 ):
     """Return a SQLAlchemySchemaInfo from the metadata.
 
@@ -46,6 +51,10 @@ def get_sqlalchemy_schema_info(
                                        (string -> {string -> GraphQLType}). Used to override the
                                        type of a field in the class where it's first defined and all
                                        the class's subclasses.
+        fold_strategy: optional SQLFoldStrategy, specifying how the outputs of folds are
+                       aggregated. If None, the default strategy for the dialect is used.
+        recurse_options: optional SQLRecurseOptions, controlling the recursive CTEs emitted for
+                         @recurse. If None, the default options are used.
 
     Returns:
         SQLAlchemySchemaInfo containing the full information needed to compile SQL queries.
@@ -61,5 +70,12 @@ def get_sqlalchemy_schema_info(
     join_descriptors = get_join_descriptors_from_edge_descriptors(direct_edges)
 
     return SQLAlchemySchemaInfo(
-        graphql_schema, type_equivalence_hints, dialect, vertex_name_to_table, join_descriptors
+        graphql_schema,
+        type_equivalence_hints,
+        dialect,
+        vertex_name_to_table,
+        join_descriptors,
+        fold_strategy,
+        recurse_options,
+        {},
     )
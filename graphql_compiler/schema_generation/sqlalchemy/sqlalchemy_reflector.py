@@ -2,8 +2,15 @@
 import re
 import warnings
 
-from sqlalchemy import Column, Table, text
+from sqlalchemy import Column, ForeignKeyConstraint, Table, text
 from sqlalchemy.dialects.mssql.base import ischema_names
+from sqlalchemy.dialects.postgresql.base import ischema_names as postgresql_ischema_names
+from sqlalchemy.dialects.sqlite.base import ischema_names as sqlite_ischema_names
+
+
+# Pattern matching the type name in a column type declaration of a SQLite table,
+# e.g. VARCHAR in VARCHAR(40).
+_SQLITE_TYPE_NAME_PATTERN = re.compile(r"^\s*([a-zA-Z_ ]*[a-zA-Z_])")
 
 
 def fast_sql_server_reflect(engine, metadata, schema, primary_key_selector=None):
@@ -46,29 +53,90 @@ def fast_sql_server_reflect(engine, metadata, schema, primary_key_selector=None)
     table_to_primary_key_columns = _get_table_to_primary_key_columns(
         table_to_column_metadata, table_to_explicit_primary_key_columns, primary_key_selector
     )
-    for table_name, column_metadata in table_to_column_metadata.items():
-        primary_key_columns = table_to_primary_key_columns[table_name]
-        sqlalchemy_columns = []
-        for column in column_metadata:
-            column_name = column["COLUMN_NAME"]
-            data_type = column["DATA_TYPE"]
-            # Ignore custom database types.
-            maybe_sqlalchemy_type = ischema_names.get(data_type)
-            if maybe_sqlalchemy_type:
-                sqlalchemy_columns.append(
-                    Column(
-                        column_name,
-                        maybe_sqlalchemy_type(),
-                        primary_key=column_name in primary_key_columns,
-                    )
-                )
-            else:
-                warnings.warn(
-                    "Ignoring column {} with custom data type {} in table {} "
-                    "of schema {}.".format(column_name, data_type, table_name, schema)
-                )
-        # Insert specified table into MetaData object
-        Table(table_name, metadata, *sqlalchemy_columns, schema=schema)
+    _add_tables_to_metadata(
+        metadata,
+        schema,
+        table_to_column_metadata,
+        table_to_primary_key_columns,
+        {},
+        ischema_names.get,
+    )
+
+
+def fast_postgresql_reflect(engine, metadata, schema="public", primary_key_selector=None):
+    """Reflect the metadata of a PostgreSQL schema in a quick but shallow manner.
+
+    This function is roughly a faster, but shallower equivalent to the SQLAlchemy metadata.reflect()
+    method. Instead of issuing several queries per table, it issues one query for the columns of
+    all tables in the schema, and one query for all their primary key and foreign key constraints.
+    It reflects: columns, column types, primary keys, and single-schema foreign keys, which can be
+    used with generate_direct_edge_descriptors_from_foreign_keys. Other information is ignored.
+
+    This function mutates the metadata object.
+
+    Args:
+        engine: SQLAlchemy Engine, engine connected to the PostgreSQL database to reflect.
+        metadata: MetaData object to reflect the metadata of the schema to.
+        schema: string, name of the PostgreSQL schema to reflect into the metadata.
+        primary_key_selector: optional function that takes in a table name and list of dicts
+                              specifying column metadata and returns a set of column names to use
+                              as the primary key for the corresponding SQLAlchemy Table object.
+                              See fast_sql_server_reflect for more details.
+    """
+    table_to_column_metadata = _get_postgresql_table_to_column_metadata(engine, schema)
+    table_to_explicit_primary_key_columns, table_to_foreign_keys = _get_postgresql_constraints(
+        engine, schema
+    )
+    table_to_primary_key_columns = _get_table_to_primary_key_columns(
+        table_to_column_metadata, table_to_explicit_primary_key_columns, primary_key_selector
+    )
+    _add_tables_to_metadata(
+        metadata,
+        schema,
+        table_to_column_metadata,
+        table_to_primary_key_columns,
+        table_to_foreign_keys,
+        postgresql_ischema_names.get,
+    )
+
+
+def fast_sqlite_reflect(engine, metadata, primary_key_selector=None):
+    """Reflect the metadata of a SQLite database in a quick but shallow manner.
+
+    This function is roughly a faster, but shallower equivalent to the SQLAlchemy metadata.reflect()
+    method. It issues one query for the columns of all tables in the database, and one query for
+    all their foreign keys, using the table-valued pragma functions of SQLite 3.16 and above.
+    It reflects: columns, column types, primary keys, and foreign keys, which can be used with
+    generate_direct_edge_descriptors_from_foreign_keys. Other information is ignored.
+
+    This function mutates the metadata object.
+
+    Args:
+        engine: SQLAlchemy Engine, engine connected to the SQLite database to reflect.
+        metadata: MetaData object to reflect the metadata of the database to.
+        primary_key_selector: optional function that takes in a table name and list of dicts
+                              specifying column metadata and returns a set of column names to use
+                              as the primary key for the corresponding SQLAlchemy Table object.
+                              See fast_sql_server_reflect for more details.
+    """
+    table_to_column_metadata = _get_sqlite_table_to_column_metadata(engine)
+    table_to_explicit_primary_key_columns = _get_sqlite_table_to_explicit_primary_key_columns(
+        table_to_column_metadata
+    )
+    table_to_foreign_keys = _get_sqlite_table_to_foreign_keys(
+        engine, table_to_explicit_primary_key_columns
+    )
+    table_to_primary_key_columns = _get_table_to_primary_key_columns(
+        table_to_column_metadata, table_to_explicit_primary_key_columns, primary_key_selector
+    )
+    _add_tables_to_metadata(
+        metadata,
+        None,
+        table_to_column_metadata,
+        table_to_primary_key_columns,
+        table_to_foreign_keys,
+        _get_sqlite_column_type,
+    )
 
 
 def get_first_column_in_table(table_name, column_metadata):
@@ -136,6 +204,269 @@ def _get_table_to_explicit_primary_key_columns(engine, database_name, schema_nam
     return table_to_explicit_primary_key_columns
 
 
+def _get_postgresql_table_to_column_metadata(engine, schema_name):
+    """Return a dict mapping the name of each table to a list of column metadata dicts."""
+    columns_query = text(
+        """
+        SELECT
+            table_name AS "TABLE_NAME",
+            column_name AS "COLUMN_NAME",
+            data_type AS "DATA_TYPE",
+            ordinal_position AS "ORDINAL_POSITION"
+        FROM information_schema.columns
+        WHERE table_schema = :schema_name
+        ORDER BY table_name, ordinal_position
+        """
+    )
+
+    result_proxy = engine.execute(columns_query, schema_name=schema_name)
+    table_to_column_metadata = {}
+    for value in result_proxy:
+        table_to_column_metadata.setdefault(value["TABLE_NAME"], []).append(value)
+    return table_to_column_metadata
+
+
+def _get_postgresql_constraints(engine, schema_name):
+    """Return the primary key columns and foreign keys of each table, in a single query.
+
+    Args:
+        engine: SQLAlchemy Engine, engine connected to a PostgreSQL database
+        schema_name: str, name of the schema whose constraints to return
+
+    Returns:
+        tuple of two dicts:
+            - table name -> set of explicit primary key columns of the table
+            - table name -> list of (columns, referred table name, referred columns) tuples for
+              each foreign key of the table referring to a table in the same schema
+    """
+    # The information_schema constraint views are very slow on large databases,
+    # so the pg_catalog tables are queried directly.
+    constraints_query = text(
+        """
+        SELECT
+            source_table.relname AS table_name,
+            table_constraint.conname AS constraint_name,
+            table_constraint.contype AS constraint_type,
+            source_column.attname AS column_name,
+            referred_namespace.nspname AS referred_schema_name,
+            referred_table.relname AS referred_table_name,
+            referred_column.attname AS referred_column_name
+        FROM pg_catalog.pg_constraint AS table_constraint
+        JOIN pg_catalog.pg_class AS source_table
+            ON source_table.oid = table_constraint.conrelid
+        JOIN pg_catalog.pg_namespace AS source_namespace
+            ON source_namespace.oid = source_table.relnamespace
+        CROSS JOIN LATERAL unnest(table_constraint.conkey, table_constraint.confkey)
+            WITH ORDINALITY AS constraint_column(column_number, referred_column_number, position)
+        JOIN pg_catalog.pg_attribute AS source_column
+            ON source_column.attrelid = table_constraint.conrelid
+            AND source_column.attnum = constraint_column.column_number
+        LEFT JOIN pg_catalog.pg_class AS referred_table
+            ON referred_table.oid = table_constraint.confrelid
+        LEFT JOIN pg_catalog.pg_namespace AS referred_namespace
+            ON referred_namespace.oid = referred_table.relnamespace
+        LEFT JOIN pg_catalog.pg_attribute AS referred_column
+            ON referred_column.attrelid = table_constraint.confrelid
+            AND referred_column.attnum = constraint_column.referred_column_number
+        WHERE source_namespace.nspname = :schema_name AND table_constraint.contype IN ('p', 'f')
+        ORDER BY table_name, constraint_name, constraint_column.position
+        """
+    )
+
+    result_proxy = engine.execute(constraints_query, schema_name=schema_name)
+    table_to_explicit_primary_key_columns = {}
+    constraint_to_foreign_key = {}
+    for value in result_proxy:
+        table_name = value["table_name"]
+        if value["constraint_type"] == "p":
+            table_to_explicit_primary_key_columns.setdefault(table_name, set()).add(
+                value["column_name"]
+            )
+        elif value["referred_schema_name"] != schema_name:
+            warnings.warn(
+                "Ignoring foreign key {} of table {} referring to table {} of schema {}, "
+                "which is not being reflected.".format(
+                    value["constraint_name"],
+                    table_name,
+                    value["referred_table_name"],
+                    value["referred_schema_name"],
+                )
+            )
+        else:
+            columns, _, referred_columns = constraint_to_foreign_key.setdefault(
+                (table_name, value["constraint_name"]), ([], value["referred_table_name"], [])
+            )
+            columns.append(value["column_name"])
+            referred_columns.append(value["referred_column_name"])
+
+    table_to_foreign_keys = {}
+    for (table_name, _), foreign_key in constraint_to_foreign_key.items():
+        table_to_foreign_keys.setdefault(table_name, []).append(foreign_key)
+    return table_to_explicit_primary_key_columns, table_to_foreign_keys
+
+
+def _get_sqlite_column_type(data_type):
+    """Return the SQLAlchemy type class for the declared type of a SQLite column, if known."""
+    match = _SQLITE_TYPE_NAME_PATTERN.match(data_type)
+    if match is None:
+        return None
+    return sqlite_ischema_names.get(match.group(1).upper())
+
+
+def _get_sqlite_table_to_column_metadata(engine):
+    """Return a dict mapping the name of each table to a list of column metadata dicts."""
+    columns_query = text(
+        """
+        SELECT
+            table_list.name AS TABLE_NAME,
+            table_column.name AS COLUMN_NAME,
+            table_column.type AS DATA_TYPE,
+            table_column.cid + 1 AS ORDINAL_POSITION,
+            table_column.pk AS PRIMARY_KEY_POSITION
+        FROM sqlite_master AS table_list
+        JOIN pragma_table_info(table_list.name) AS table_column
+        WHERE table_list.type = 'table' AND table_list.name NOT LIKE 'sqlite\\_%' ESCAPE '\\'
+        ORDER BY table_list.name, table_column.cid
+        """
+    )
+
+    result_proxy = engine.execute(columns_query)
+    table_to_column_metadata = {}
+    for value in result_proxy:
+        table_to_column_metadata.setdefault(value["TABLE_NAME"], []).append(value)
+    return table_to_column_metadata
+
+
+def _get_sqlite_table_to_explicit_primary_key_columns(table_to_column_metadata):
+    """Return a dict mapping each table to its set of explicit primary key columns."""
+    table_to_explicit_primary_key_columns = {}
+    for table_name, column_metadata in table_to_column_metadata.items():
+        for column in column_metadata:
+            # The position of the column in the primary key of the table, or 0 if not in it.
+            if column["PRIMARY_KEY_POSITION"]:
+                table_to_explicit_primary_key_columns.setdefault(table_name, set()).add(
+                    column["COLUMN_NAME"]
+                )
+    return table_to_explicit_primary_key_columns
+
+
+def _get_sqlite_table_to_foreign_keys(engine, table_to_explicit_primary_key_columns):
+    """Return a dict mapping each table to a list of (columns, referred table, referred columns)."""
+    foreign_keys_query = text(
+        """
+        SELECT
+            table_list.name AS table_name,
+            foreign_key.id AS foreign_key_id,
+            foreign_key."from" AS column_name,
+            foreign_key."table" AS referred_table_name,
+            foreign_key."to" AS referred_column_name
+        FROM sqlite_master AS table_list
+        JOIN pragma_foreign_key_list(table_list.name) AS foreign_key
+        WHERE table_list.type = 'table'
+        ORDER BY table_list.name, foreign_key.id, foreign_key.seq
+        """
+    )
+
+    result_proxy = engine.execute(foreign_keys_query)
+    constraint_to_foreign_key = {}
+    for value in result_proxy:
+        columns, _, referred_columns = constraint_to_foreign_key.setdefault(
+            (value["table_name"], value["foreign_key_id"]), ([], value["referred_table_name"], [])
+        )
+        columns.append(value["column_name"])
+        referred_columns.append(value["referred_column_name"])
+
+    table_to_foreign_keys = {}
+    for (table_name, _), (columns, referred_table_name, referred_columns) in sorted(
+        constraint_to_foreign_key.items()
+    ):
+        # Foreign keys declared without referred columns refer to the primary key of the table.
+        if any(referred_column is None for referred_column in referred_columns):
+            referred_columns = sorted(
+                table_to_explicit_primary_key_columns.get(referred_table_name, set())
+            )
+        table_to_foreign_keys.setdefault(table_name, []).append(
+            (columns, referred_table_name, referred_columns)
+        )
+    return table_to_foreign_keys
+
+
+def _add_tables_to_metadata(
+    metadata,
+    schema,
+    table_to_column_metadata,
+    table_to_primary_key_columns,
+    table_to_foreign_keys,
+    get_column_type,
+):
+    """Insert a SQLAlchemy Table for each reflected table into the MetaData object.
+
+    Args:
+        metadata: MetaData object to insert the tables into
+        schema: optional string, schema of the tables
+        table_to_column_metadata: dict, table name -> list of dicts specifying column metadata,
+                                  with at least the COLUMN_NAME and DATA_TYPE keys
+        table_to_primary_key_columns: dict, table name -> set of primary key column names
+        table_to_foreign_keys: dict, table name -> list of (columns, referred table name,
+                               referred columns) tuples, one for each foreign key of the table
+        get_column_type: function returning the SQLAlchemy type class for a DATA_TYPE value,
+                         or None if the type is not known to SQLAlchemy
+    """
+    table_to_column_names = {}
+    for table_name, column_metadata in table_to_column_metadata.items():
+        primary_key_columns = table_to_primary_key_columns[table_name]
+        sqlalchemy_columns = []
+        for column in column_metadata:
+            column_name = column["COLUMN_NAME"]
+            data_type = column["DATA_TYPE"]
+            # Ignore custom database types.
+            maybe_sqlalchemy_type = get_column_type(data_type)
+            if maybe_sqlalchemy_type:
+                sqlalchemy_columns.append(
+                    Column(
+                        column_name,
+                        maybe_sqlalchemy_type(),
+                        primary_key=column_name in primary_key_columns,
+                    )
+                )
+            else:
+                warnings.warn(
+                    "Ignoring column {} with custom data type {} in table {} "
+                    "of schema {}.".format(column_name, data_type, table_name, schema)
+                )
+        table_to_column_names[table_name] = {column.name for column in sqlalchemy_columns}
+
+        # Insert specified table into MetaData object
+        Table(table_name, metadata, *sqlalchemy_columns, schema=schema)
+
+    # Foreign keys are added once all tables exist, so that they can refer to any of them.
+    for table_name, foreign_keys in table_to_foreign_keys.items():
+        if table_name not in table_to_column_names:
+            continue
+        table = metadata.tables[table_name if schema is None else schema + "." + table_name]
+        for columns, referred_table_name, referred_columns in foreign_keys:
+            referred_column_names = table_to_column_names.get(referred_table_name, set())
+            if not referred_columns or not (
+                set(columns) <= table_to_column_names[table_name]
+                and set(referred_columns) <= referred_column_names
+            ):
+                warnings.warn(
+                    "Ignoring foreign key from columns {} of table {} to columns {} of table {}, "
+                    "since some of the columns were not reflected.".format(
+                        columns, table_name, referred_columns, referred_table_name
+                    )
+                )
+                continue
+            referred_table = metadata.tables[
+                referred_table_name if schema is None else schema + "." + referred_table_name
+            ]
+            table.append_constraint(
+                ForeignKeyConstraint(
+                    columns, [referred_table.c[column_name] for column_name in referred_columns]
+                )
+            )
+
+
 def _get_table_to_primary_key_columns(
     table_to_column_metadata, table_to_explicit_primary_key_columns, primary_key_selector
 ):
@@ -0,0 +1,338 @@
+# Copyright 2020-present Kensho Technologies, LLC.
+"""Cost estimation for query plans of queries stitched across multiple schemas.
+
+The query plan produced by make_query_plan executes sub-queries in the order given by the
+structure of the query AST: the parent sub-query runs first, and the values of its stitch output
+are sent as an in_collection filter argument (the "join keys") to each of its child sub-queries.
+
+Using a QueryPlanningSchemaInfo for each schema, we estimate the number of results of each
+sub-query as well as the number of join keys sent into each child sub-query. The latter is used
+to choose batch sizes for the in_collection filters, and to choose which side of a stitch
+should be executed first when the stitch is symmetric (i.e. it is not @optional).
+"""
+from collections import namedtuple
+import math
+
+from graphql import print_ast
+
+from ..ast_manipulation import safe_parse_graphql
+from ..compiler.compiler_frontend import ast_to_ir
+from ..cost_estimation.cardinality_estimator import estimate_query_result_cardinality
+from .make_query_plan import _get_plan_and_depth_in_dfs_order, make_query_plan
+from .split_query import SubQueryNode, _add_query_connections
+
+
+# Default upper bound on the number of join keys passed in a single in_collection filter argument.
+DEFAULT_MAX_BATCH_SIZE = 1000
+
+
+SubQueryCostEstimate = namedtuple(
+    "SubQueryCostEstimate",
+    (
+        "sub_query_plan",  # SubQueryPlan, the sub-query whose cost is being estimated
+        "result_size",  # float, the estimated number of result rows of the sub-query
+        "input_key_count",
+        # float or None, the estimated number of distinct join keys sent to this sub-query from
+        # its parent. None for the root sub-query, which does not depend on any other sub-query
+        "batch_size",
+        # int or None, the suggested number of join keys per in_collection filter argument when
+        # executing this sub-query in batches. None for the root sub-query
+        "batch_count",  # int, the number of batches the sub-query is expected to be executed in
+    ),
+)
+
+
+QueryPlanCostEstimate = namedtuple(
+    "QueryPlanCostEstimate",
+    (
+        "sub_query_cost_estimates",
+        # List[SubQueryCostEstimate], one per SubQueryPlan, ordered in a depth-first manner
+        # starting from the root sub-query plan
+        "total_key_count",  # float, the estimated total number of join keys sent between schemas
+    ),
+)
+
+
+class _EstimatedCollection(object):
+    """Stand-in for an in_collection argument whose values are only known at execution time.
+
+    Cost estimation of in_collection filters only inspects the size of the collection, so the
+    estimated number of join keys is all we need to provide.
+    """
+
+    def __init__(self, size):
+        """Create a collection-like object of the given size."""
+        self._size = size
+
+    def __len__(self):
+        """Return the estimated number of elements in the collection."""
+        return self._size
+
+
+def _compile_sub_query_metadata(schema_info, query_ast):
+    """Return the QueryMetadataTable of a sub-query compiled against the schema it targets."""
+    # The ASTs produced by split_query and make_query_plan contain mutable lists of nodes, which
+    # the GraphQL validation performed by the compiler is unable to hash. Round-tripping the AST
+    # through its string form produces an equivalent AST that is safe to compile.
+    query_ast = safe_parse_graphql(print_ast(query_ast))
+    ir_and_metadata = ast_to_ir(
+        schema_info.schema, query_ast, type_equivalence_hints=schema_info.type_equivalence_hints,
+    )
+    return ir_and_metadata.query_metadata_table
+
+
+def _estimate_distinct_output_values(schema_info, query_metadata, output_name, result_size):
+    """Estimate the number of distinct values of an output over the results of a sub-query.
+
+    Args:
+        schema_info: QueryPlanningSchemaInfo for the schema the sub-query targets
+        query_metadata: QueryMetadataTable of the sub-query
+        output_name: str, the out_name of the @output whose values are sent as join keys
+        result_size: float, the estimated number of results of the sub-query
+
+    Returns:
+        float, the estimated number of distinct values, never more than the result size
+    """
+    output_info = query_metadata.get_output_info(output_name)
+    if output_info is None:
+        raise AssertionError(
+            'Expected to find an output named "{}" in the sub-query, but found none. This is '
+            "a bug.".format(output_name)
+        )
+
+    location = output_info.location
+    vertex_type_name = query_metadata.get_location_info(location.at_vertex()).type.name
+    field_name = location.field
+
+    distinct_values = schema_info.statistics.get_distinct_field_values_count(
+        vertex_type_name, field_name
+    )
+    if distinct_values is None:
+        unique_indexes = schema_info.schema_graph.get_unique_indexes_for_class(vertex_type_name)
+        if any(index.fields == frozenset({field_name}) for index in unique_indexes):
+            distinct_values = schema_info.statistics.get_class_count(vertex_type_name)
+
+    if distinct_values is None:
+        return result_size
+    return min(result_size, float(distinct_values))
+
+
+def _get_batch_size_and_count(key_count, max_batch_size):
+    """Return the (batch size, batch count) splitting the keys into evenly-sized batches."""
+    batch_count = max(1, int(math.ceil(key_count / max_batch_size)))
+    batch_size = max(1, int(math.ceil(key_count / batch_count)))
+    return batch_size, batch_count
+
+
+def estimate_query_plan_cost(
+    query_plan_descriptor, schema_id_to_schema_info, parameters, max_batch_size=None
+):
+    """Estimate the result size of each sub-query and the number of join keys flowing between them.
+
+    Args:
+        query_plan_descriptor: QueryPlanDescriptor, as produced by make_query_plan
+        schema_id_to_schema_info: Dict[str, QueryPlanningSchemaInfo], mapping the id of every
+                                  schema targeted by the query plan to the schema information
+                                  (including statistics) of that schema
+        parameters: dict, mapping argument name to its value, for every parameter the original
+                    (unsplit) query expects
+        max_batch_size: optional int, the maximum number of join keys to send in a single
+                        in_collection filter argument. Defaults to DEFAULT_MAX_BATCH_SIZE
+
+    Returns:
+        QueryPlanCostEstimate namedtuple, containing one SubQueryCostEstimate per sub-query
+        plan in depth-first order, and the estimated total number of join keys in the plan
+    """
+    if max_batch_size is None:
+        max_batch_size = DEFAULT_MAX_BATCH_SIZE
+    if max_batch_size < 1:
+        raise ValueError("Expected a positive max_batch_size, got {}.".format(max_batch_size))
+
+    plans_in_dfs_order = [
+        plan
+        for plan, _ in _get_plan_and_depth_in_dfs_order(query_plan_descriptor.root_sub_query_plan)
+    ]
+
+    # make_query_plan records one OutputJoinDescriptor per child sub-query plan, in the same
+    # depth-first order in which the sub-query plans are created.
+    output_join_descriptors = query_plan_descriptor.output_join_descriptors
+    if len(output_join_descriptors) != len(plans_in_dfs_order) - 1:
+        raise AssertionError(
+            "Expected exactly one OutputJoinDescriptor per non-root sub-query plan, but got "
+            "{} descriptors for {} sub-query plans: {}".format(
+                len(output_join_descriptors), len(plans_in_dfs_order), query_plan_descriptor
+            )
+        )
+    parent_output_name_by_plan_id = {
+        id(child_plan): join_descriptor.output_names[0]
+        for child_plan, join_descriptor in zip(plans_in_dfs_order[1:], output_join_descriptors)
+    }
+
+    # Maps the out_name of a stitch output to the estimated number of distinct values it takes
+    estimated_key_counts = {}
+    sub_query_cost_estimates = []
+    for plan in plans_in_dfs_order:
+        schema_info = schema_id_to_schema_info[plan.schema_id]
+        sub_query_parameters = dict(parameters)
+
+        parent_output_name = parent_output_name_by_plan_id.get(id(plan), None)
+        if parent_output_name is None:
+            input_key_count = None
+            batch_size = None
+            batch_count = 1
+        else:
+            input_key_count = estimated_key_counts[parent_output_name]
+            batch_size, batch_count = _get_batch_size_and_count(input_key_count, max_batch_size)
+            # The in_collection filter local variable has the same name as the parent's output.
+            sub_query_parameters[parent_output_name] = _EstimatedCollection(
+                int(math.ceil(input_key_count))
+            )
+
+        query_metadata = _compile_sub_query_metadata(schema_info, plan.query_ast)
+        result_size = estimate_query_result_cardinality(
+            schema_info, query_metadata, sub_query_parameters
+        )
+
+        for child_plan in plan.child_query_plans:
+            child_parent_output_name = parent_output_name_by_plan_id[id(child_plan)]
+            estimated_key_counts[child_parent_output_name] = _estimate_distinct_output_values(
+                schema_info, query_metadata, child_parent_output_name, result_size
+            )
+
+        sub_query_cost_estimates.append(
+            SubQueryCostEstimate(
+                sub_query_plan=plan,
+                result_size=result_size,
+                input_key_count=input_key_count,
+                batch_size=batch_size,
+                batch_count=batch_count,
+            )
+        )
+
+    total_key_count = sum(
+        estimate.input_key_count
+        for estimate in sub_query_cost_estimates
+        if estimate.input_key_count is not None
+    )
+    return QueryPlanCostEstimate(
+        sub_query_cost_estimates=sub_query_cost_estimates, total_key_count=total_key_count,
+    )
+
+
+def _copy_sub_query_node_tree(sub_query_node):
+    """Return a copy of the tree of SubQueryNodes rooted at the input, sharing the query ASTs."""
+    new_sub_query_node = SubQueryNode(sub_query_node.query_ast)
+    new_sub_query_node.schema_id = sub_query_node.schema_id
+    for child_query_connection in sub_query_node.child_query_connections:
+        new_child_sub_query_node = _copy_sub_query_node_tree(child_query_connection.sink_query_node)
+        _add_query_connections(
+            new_sub_query_node,
+            new_child_sub_query_node,
+            child_query_connection.source_field_out_name,
+            child_query_connection.sink_field_out_name,
+        )
+    return new_sub_query_node
+
+
+def _reroot_at_child(root_sub_query_node, child_index):
+    """Return a copy of the SubQueryNode tree where the given child of the root runs first.
+
+    The input tree is not modified. The old root becomes a child of the new root, keeping all of
+    its other children, and the stitch between them is reversed.
+
+    Args:
+        root_sub_query_node: SubQueryNode, the root of the tree to re-root
+        child_index: int, index of the child query connection of the root whose sink query node
+                     will become the new root
+
+    Returns:
+        SubQueryNode, the root of the re-rooted copy of the tree
+    """
+    old_root = _copy_sub_query_node_tree(root_sub_query_node)
+    query_connection = old_root.child_query_connections.pop(child_index)
+    new_root = query_connection.sink_query_node
+    new_root.parent_query_connection = None
+    _add_query_connections(
+        new_root,
+        old_root,
+        query_connection.sink_field_out_name,
+        query_connection.source_field_out_name,
+    )
+    return new_root
+
+
+def _is_stitch_symmetric(
+    parent_schema_info, parent_query_ast, child_schema_info, child_query_ast, query_connection
+):
+    """Return True if the stitch may be executed in either direction without changing results.
+
+    A stitch is symmetric if neither of the stitched fields is within an @optional scope, since
+    then the stitch is an inner join on the stitched fields.
+    """
+    parent_output_info = _compile_sub_query_metadata(
+        parent_schema_info, parent_query_ast
+    ).get_output_info(query_connection.source_field_out_name)
+    child_output_info = _compile_sub_query_metadata(
+        child_schema_info, child_query_ast
+    ).get_output_info(query_connection.sink_field_out_name)
+    return not parent_output_info.optional and not child_output_info.optional
+
+
+def make_cost_based_query_plan(
+    root_sub_query_node,
+    intermediate_output_names,
+    schema_id_to_schema_info,
+    parameters,
+    max_batch_size=None,
+):
+    """Return a QueryPlanDescriptor that sends the fewest estimated join keys across schemas.
+
+    The plan produced by make_query_plan always executes the root of the SubQueryNode tree
+    first. If a stitch between the root and one of its children is symmetric, executing the child
+    first and sending its join keys into the root sub-query produces the same results, and may be
+    much cheaper, for example when the child sub-query is very selective. This function
+    estimates the cost of each such alternative using the given statistics, and returns the
+    plan with the smallest estimated total number of join keys, together with its cost estimate.
+
+    ASTs contained in the input node and its children nodes will not be modified.
+
+    Args:
+        root_sub_query_node: SubQueryNode, representing the base of a query split into pieces
+                             that we want to turn into a query plan
+        intermediate_output_names: frozenset[str], names of outputs to be removed at the end
+        schema_id_to_schema_info: Dict[str, QueryPlanningSchemaInfo], mapping the id of every
+                                  schema targeted by the query to the schema information
+                                  (including statistics) of that schema
+        parameters: dict, mapping argument name to its value, for every parameter the query
+                    expects
+        max_batch_size: optional int, the maximum number of join keys to send in a single
+                        in_collection filter argument. Defaults to DEFAULT_MAX_BATCH_SIZE
+
+    Returns:
+        tuple (QueryPlanDescriptor, QueryPlanCostEstimate), the chosen plan and its cost estimate
+    """
+    candidate_root_nodes = [root_sub_query_node]
+    for child_index, query_connection in enumerate(root_sub_query_node.child_query_connections):
+        child_sub_query_node = query_connection.sink_query_node
+        if _is_stitch_symmetric(
+            schema_id_to_schema_info[root_sub_query_node.schema_id],
+            root_sub_query_node.query_ast,
+            schema_id_to_schema_info[child_sub_query_node.schema_id],
+            child_sub_query_node.query_ast,
+            query_connection,
+        ):
+            candidate_root_nodes.append(_reroot_at_child(root_sub_query_node, child_index))
+
+    best_plan_and_cost = None
+    for candidate_root_node in candidate_root_nodes:
+        query_plan_descriptor = make_query_plan(candidate_root_node, intermediate_output_names)
+        cost_estimate = estimate_query_plan_cost(
+            query_plan_descriptor, schema_id_to_schema_info, parameters, max_batch_size
+        )
+        # Ties are resolved in favor of the earliest candidate, i.e. the original plan.
+        if best_plan_and_cost is None or cost_estimate.total_key_count < (
+            best_plan_and_cost[1].total_key_count
+        ):
+            best_plan_and_cost = (query_plan_descriptor, cost_estimate)
+
+    return best_plan_and_cost
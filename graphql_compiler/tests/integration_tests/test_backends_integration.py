@@ -17,6 +17,7 @@ import pytest
 from sqlalchemy import Column, Integer, MetaData, String, Table
 
 from ...compiler.compiler_frontend import OutputMetadata
+from ...compiler.emit_sql import SQLRecurseOptions
 from ...post_processing.sql_post_processing import post_process_mssql_folds
 from ...schema.schema_info import CommonSchemaInfo
 from ...schema_generation.orientdb.schema_properties import ORIENTDB_BASE_VERTEX_CLASS_NAME
@@ -433,6 +434,18 @@ class IntegrationTests(TestCase):
         for graphql_query, expected_results in queries:
             self.assertResultsEqual(graphql_query, parameters, test_backend.MSSQL, expected_results)
 
+        # Recursing over the key columns only, and joining the output columns afterward,
+        # produces the same results.
+        engine = self.sql_backend_name_to_engine[test_backend.MSSQL]  # type: ignore
+        keys_only_schema_info = self.sql_schema_info._replace(  # type: ignore
+            recurse_options=SQLRecurseOptions(recurse_over_keys_only=True)
+        )
+        for graphql_query, expected_results in queries:
+            results, _ = compile_and_run_sql_query(
+                keys_only_schema_info, graphql_query, parameters, engine
+            )
+            self.assertListEqual(sort_db_results(expected_results), sort_db_results(results))
+
     @use_all_backends(except_backends=(test_backend.REDISGRAPH,))  # Not implemented yet
     @integration_fixtures
     def test_fold_basic(self, backend_name: str) -> None:
@@ -11,6 +11,7 @@ from sqlalchemy import (
     MetaData,
     PrimaryKeyConstraint,
     Table,
+    create_engine,
 )
 from sqlalchemy.dialects.mssql import TINYINT, dialect
 from sqlalchemy.types import TIMESTAMP, DateTime, Integer, LargeBinary, String
@@ -31,6 +32,10 @@ from ...schema_generation.sqlalchemy.edge_descriptors import (
 )
 from ...schema_generation.sqlalchemy.scalar_type_mapper import try_get_graphql_scalar_type
 from ...schema_generation.sqlalchemy.schema_graph_builder import get_sqlalchemy_schema_graph
+from ...schema_generation.sqlalchemy.sqlalchemy_reflector import (
+    fast_sqlite_reflect,
+    get_first_column_in_table,
+)
 
 
 def _get_test_vertex_name_to_table():
@@ -277,6 +282,71 @@ class SQLAlchemyForeignKeyEdgeGenerationTests(unittest.TestCase):
         self.assertEqual(direct_edge_descriptors, set())
 
 
+class SQLAlchemyFastReflectionTests(unittest.TestCase):
+    def test_fast_sqlite_reflect(self):
+        engine = create_engine("sqlite://")
+        engine.execute(
+            "CREATE TABLE Species (uuid VARCHAR(36) PRIMARY KEY, name VARCHAR(40) NOT NULL)"
+        )
+        engine.execute(
+            """
+            CREATE TABLE Animal (
+                uuid VARCHAR(36),
+                species VARCHAR(36) REFERENCES Species,
+                parent VARCHAR(36) REFERENCES Animal (uuid),
+                location GEOMETRY,
+                net_worth INTEGER,
+                PRIMARY KEY (uuid)
+            )"""
+        )
+        engine.execute(
+            """
+            CREATE TABLE TableWithManyPrimaryKeyColumns (
+                primary_key_column1 INTEGER,
+                primary_key_column2 INTEGER,
+                PRIMARY KEY (primary_key_column1, primary_key_column2)
+            )"""
+        )
+        engine.execute("CREATE TABLE TableWithoutPrimaryKey (first_column INTEGER, name TEXT)")
+
+        metadata = MetaData()
+        with pytest.warns(UserWarning, match="Ignoring column location"):
+            fast_sqlite_reflect(engine, metadata, primary_key_selector=get_first_column_in_table)
+
+        self.assertEqual(
+            {"Animal", "Species", "TableWithManyPrimaryKeyColumns", "TableWithoutPrimaryKey"},
+            set(metadata.tables.keys()),
+        )
+        animal_table = metadata.tables["Animal"]
+        self.assertEqual(["uuid", "species", "parent", "net_worth"], animal_table.columns.keys())
+        self.assertIsInstance(animal_table.c["uuid"].type, String)
+        self.assertIsInstance(animal_table.c["net_worth"].type, Integer)
+
+        # Explicit primary keys are reflected, and missing ones are selected.
+        primary_key_columns = {
+            table_name: {column.name for column in table.primary_key}
+            for table_name, table in metadata.tables.items()
+        }
+        self.assertEqual(
+            {
+                "Animal": {"uuid"},
+                "Species": {"uuid"},
+                "TableWithManyPrimaryKeyColumns": {"primary_key_column1", "primary_key_column2"},
+                "TableWithoutPrimaryKey": {"first_column"},
+            },
+            primary_key_columns,
+        )
+
+        # Foreign keys are reflected, including those implicitly referring to a primary key.
+        self.assertEqual(
+            {
+                DirectEdgeDescriptor("Animal", "parent", "Animal", "uuid"),
+                DirectEdgeDescriptor("Animal", "species", "Species", "uuid"),
+            },
+            generate_direct_edge_descriptors_from_foreign_keys(dict(metadata.tables)),
+        )
+
+
 class SQLAlchemySchemaInfoGenerationErrorTests(unittest.TestCase):
     def setUp(self):
         self.vertex_name_to_table = _get_test_vertex_name_to_table()
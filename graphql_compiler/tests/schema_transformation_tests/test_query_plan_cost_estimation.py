@@ -0,0 +1,232 @@
+# Copyright 2020-present Kensho Technologies, LLC.
+from collections import OrderedDict
+from textwrap import dedent
+import unittest
+
+from graphql import parse, print_ast
+from graphql.utilities import print_schema
+from sqlalchemy import Column, Integer, MetaData, String, Table
+
+from ...cost_estimation.statistics import LocalStatistics
+from ...schema.schema_info import QueryPlanningSchemaInfo
+from ...schema_generation.graphql_schema import get_graphql_schema_from_schema_graph
+from ...schema_generation.sqlalchemy.schema_graph_builder import get_sqlalchemy_schema_graph
+from ...schema_transformation.make_query_plan import make_query_plan
+from ...schema_transformation.merge_schemas import (
+    CrossSchemaEdgeDescriptor,
+    FieldReference,
+    merge_schemas,
+)
+from ...schema_transformation.query_plan_cost_estimation import (
+    estimate_query_plan_cost,
+    make_cost_based_query_plan,
+)
+from ...schema_transformation.split_query import split_query
+
+
+def _make_single_table_schema_info(vertex_name, columns, statistics):
+    """Return a QueryPlanningSchemaInfo for a schema with a single table."""
+    table = Table(vertex_name.lower(), MetaData(), *columns)
+    schema_graph = get_sqlalchemy_schema_graph({vertex_name: table}, {})
+    graphql_schema, type_equivalence_hints = get_graphql_schema_from_schema_graph(schema_graph)
+    return QueryPlanningSchemaInfo(
+        schema=graphql_schema,
+        type_equivalence_hints=type_equivalence_hints,
+        schema_graph=schema_graph,
+        statistics=statistics,
+        pagination_keys={},
+        uuid4_field_info={},
+    )
+
+
+class QueryPlanCostEstimationTests(unittest.TestCase):
+    def setUp(self):
+        """Create two single-table schemas stitched together on Person.id and Account.owner_id."""
+        self.maxDiff = None
+        person_schema_info = _make_single_table_schema_info(
+            "Person",
+            [Column("id", Integer, primary_key=True), Column("name", String)],
+            LocalStatistics(
+                {"Person": 10000}, distinct_field_values_counts={("Person", "name"): 10000},
+            ),
+        )
+        account_schema_info = _make_single_table_schema_info(
+            "Account",
+            [
+                Column("account_id", Integer, primary_key=True),
+                Column("owner_id", Integer),
+                Column("kind", String),
+            ],
+            LocalStatistics(
+                {"Account": 50000},
+                distinct_field_values_counts={
+                    ("Account", "owner_id"): 10000,
+                    ("Account", "kind"): 5000,
+                },
+            ),
+        )
+        self.schema_id_to_schema_info = {
+            "people": person_schema_info,
+            "accounts": account_schema_info,
+        }
+        self.merged_schema = merge_schemas(
+            OrderedDict(
+                [
+                    ("people", parse(print_schema(person_schema_info.schema))),
+                    ("accounts", parse(print_schema(account_schema_info.schema))),
+                ]
+            ),
+            [
+                CrossSchemaEdgeDescriptor(
+                    edge_name="Person_Account",
+                    outbound_field_reference=FieldReference(
+                        schema_id="people", type_name="Person", field_name="id",
+                    ),
+                    inbound_field_reference=FieldReference(
+                        schema_id="accounts", type_name="Account", field_name="owner_id",
+                    ),
+                    out_edge_only=False,
+                ),
+            ],
+        )
+
+    def test_estimate_query_plan_cost(self):
+        query_str = dedent(
+            """\
+            {
+              Person {
+                name @output(out_name: "name") @filter(op_name: "=", value: ["$name"])
+                out_Person_Account {
+                  kind @output(out_name: "kind")
+                }
+              }
+            }
+        """
+        )
+        query_node, intermediate_outputs = split_query(parse(query_str), self.merged_schema)
+        query_plan_descriptor = make_query_plan(query_node, intermediate_outputs)
+        cost_estimate = estimate_query_plan_cost(
+            query_plan_descriptor, self.schema_id_to_schema_info, {"name": "Alice"}
+        )
+
+        root_estimate, child_estimate = cost_estimate.sub_query_cost_estimates
+        self.assertIs(root_estimate.sub_query_plan, query_plan_descriptor.root_sub_query_plan)
+        self.assertAlmostEqual(1.0, root_estimate.result_size)
+        self.assertIsNone(root_estimate.input_key_count)
+        self.assertIsNone(root_estimate.batch_size)
+        self.assertEqual(1, root_estimate.batch_count)
+
+        # One Person is expected to have 50000 / 10000 accounts.
+        self.assertAlmostEqual(1.0, child_estimate.input_key_count)
+        self.assertAlmostEqual(5.0, child_estimate.result_size)
+        self.assertEqual(1, child_estimate.batch_size)
+        self.assertEqual(1, child_estimate.batch_count)
+        self.assertAlmostEqual(1.0, cost_estimate.total_key_count)
+
+    def test_estimate_query_plan_cost_batches(self):
+        query_str = dedent(
+            """\
+            {
+              Person {
+                name @output(out_name: "name")
+                out_Person_Account {
+                  kind @output(out_name: "kind")
+                }
+              }
+            }
+        """
+        )
+        query_node, intermediate_outputs = split_query(parse(query_str), self.merged_schema)
+        query_plan_descriptor = make_query_plan(query_node, intermediate_outputs)
+        cost_estimate = estimate_query_plan_cost(
+            query_plan_descriptor, self.schema_id_to_schema_info, {}, max_batch_size=3000
+        )
+
+        root_estimate, child_estimate = cost_estimate.sub_query_cost_estimates
+        self.assertAlmostEqual(10000.0, root_estimate.result_size)
+        # Person.id is the primary key, so all 10000 keys are distinct.
+        self.assertAlmostEqual(10000.0, child_estimate.input_key_count)
+        self.assertAlmostEqual(50000.0, child_estimate.result_size)
+        self.assertEqual(2500, child_estimate.batch_size)
+        self.assertEqual(4, child_estimate.batch_count)
+
+    def test_cost_based_query_plan_keeps_cheaper_direction(self):
+        query_str = dedent(
+            """\
+            {
+              Person {
+                name @output(out_name: "name") @filter(op_name: "=", value: ["$name"])
+                out_Person_Account {
+                  kind @output(out_name: "kind")
+                }
+              }
+            }
+        """
+        )
+        query_node, intermediate_outputs = split_query(parse(query_str), self.merged_schema)
+        query_plan_descriptor, cost_estimate = make_cost_based_query_plan(
+            query_node, intermediate_outputs, self.schema_id_to_schema_info, {"name": "Alice"}
+        )
+        self.assertEqual("people", query_plan_descriptor.root_sub_query_plan.schema_id)
+        self.assertAlmostEqual(1.0, cost_estimate.total_key_count)
+
+    def test_cost_based_query_plan_reverses_symmetric_stitch(self):
+        query_str = dedent(
+            """\
+            {
+              Person {
+                name @output(out_name: "name")
+                out_Person_Account {
+                  kind @output(out_name: "kind") @filter(op_name: "=", value: ["$kind"])
+                }
+              }
+            }
+        """
+        )
+        expected_root_str = dedent(
+            """\
+            {
+              Account {
+                kind @output(out_name: "kind") @filter(op_name: "=", value: ["$kind"])
+                owner_id @output(out_name: "__intermediate_output_1")
+              }
+            }
+        """
+        )
+        expected_child_str = dedent(
+            """\
+            {
+              Person {
+                name @output(out_name: "name")
+                id @output(out_name: "__intermediate_output_0") \
+@filter(op_name: "in_collection", value: ["$__intermediate_output_1"])
+              }
+            }
+        """
+        )
+        query_node, intermediate_outputs = split_query(parse(query_str), self.merged_schema)
+        query_plan_descriptor, cost_estimate = make_cost_based_query_plan(
+            query_node, intermediate_outputs, self.schema_id_to_schema_info, {"kind": "savings"}
+        )
+
+        root_plan = query_plan_descriptor.root_sub_query_plan
+        self.assertEqual("accounts", root_plan.schema_id)
+        self.assertEqual(expected_root_str, print_ast(root_plan.query_ast))
+        self.assertEqual(1, len(root_plan.child_query_plans))
+        child_plan = root_plan.child_query_plans[0]
+        self.assertEqual("people", child_plan.schema_id)
+        self.assertEqual(expected_child_str, print_ast(child_plan.query_ast))
+        self.assertEqual(
+            [("__intermediate_output_1", "__intermediate_output_0")],
+            [
+                join_descriptor.output_names
+                for join_descriptor in query_plan_descriptor.output_join_descriptors
+            ],
+        )
+        # 50000 accounts / 5000 distinct kinds = 10 accounts, much fewer than 10000 people.
+        self.assertAlmostEqual(10.0, cost_estimate.total_key_count)
+
+        # The input SubQueryNode tree is not modified.
+        self.assertEqual("people", query_node.schema_id)
+        self.assertIsNone(query_node.parent_query_connection)
+        self.assertEqual(1, len(query_node.child_query_connections))
@@ -0,0 +1,147 @@
+# Copyright 2020-present Kensho Technologies, LLC.
+import asyncio
+import unittest
+
+import sqlalchemy
+
+from .. import get_sqlalchemy_schema_info
+from ..api.sql import AsyncSqlQueryExecutor
+from ..exceptions import GraphQLInvalidArgumentError
+from ..schema_generation.sqlalchemy.edge_descriptors import DirectEdgeDescriptor
+from .test_helpers import get_sqlalchemy_schema_info as get_common_sqlalchemy_schema_info
+
+
+class AsyncSqlExecutionTests(unittest.TestCase):
+    def setUp(self):
+        """Create an event loop, and an in-memory SQLite database of animals."""
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+        # All connections share the same in-memory database, and may be used from any thread.
+        self.engine = sqlalchemy.create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=sqlalchemy.pool.StaticPool,
+        )
+        metadata = sqlalchemy.MetaData()
+        animal_table = sqlalchemy.Table(
+            "Animal",
+            metadata,
+            sqlalchemy.Column("uuid", sqlalchemy.Integer, primary_key=True),
+            sqlalchemy.Column("name", sqlalchemy.String(40), nullable=False),
+            sqlalchemy.Column("parent", sqlalchemy.Integer, nullable=True),
+        )
+        metadata.create_all(self.engine)
+        self.engine.execute(
+            animal_table.insert(),
+            [
+                {"uuid": 1, "name": "Animal 1", "parent": None},
+                {"uuid": 2, "name": "Animal 2", "parent": 1},
+                {"uuid": 3, "name": "Animal 3", "parent": 1},
+                {"uuid": 4, "name": "Animal 4", "parent": 2},
+            ],
+        )
+        self.sql_schema_info = get_sqlalchemy_schema_info(
+            {"Animal": animal_table},
+            {"Animal_ParentOf": DirectEdgeDescriptor("Animal", "uuid", "Animal", "parent")},
+            self.engine.dialect,
+        )
+
+    def test_execute_with_dbapi_connections(self):
+        executor = AsyncSqlQueryExecutor(
+            self.sql_schema_info, connect=self.engine.raw_connection, max_workers=2, batch_size=1
+        )
+        self.addCleanup(executor.shutdown)
+        graphql_query = """{
+            Animal {
+                name @output(out_name: "name")
+                     @filter(op_name: "in_collection", value: ["$names"])
+                out_Animal_ParentOf {
+                    name @output(out_name: "child_name")
+                }
+            }
+        }"""
+
+        async def run_queries():
+            """Run the query concurrently with different arguments, and check the results."""
+            all_results = await asyncio.gather(
+                executor.execute_query(graphql_query, {"names": ["Animal 1"]}),
+                executor.execute_query(graphql_query, {"names": ["Animal 2", "Animal 3"]}),
+                executor.execute_query(graphql_query, {"names": []}),
+            )
+            self.assertEqual(
+                [
+                    [
+                        {"name": "Animal 1", "child_name": "Animal 2"},
+                        {"name": "Animal 1", "child_name": "Animal 3"},
+                    ],
+                    [{"name": "Animal 2", "child_name": "Animal 4"}],
+                    [],
+                ],
+                [
+                    sorted(results, key=lambda result: result["child_name"])
+                    for results in all_results
+                ],
+            )
+
+            # Results can be streamed, and their connection is released if not fully consumed.
+            async for result in executor.stream_query(graphql_query, {"names": ["Animal 1"]}):
+                self.assertEqual("Animal 1", result["name"])
+                break
+
+            with self.assertRaises(GraphQLInvalidArgumentError):
+                await executor.execute_query(graphql_query, {"names": "Animal 1"})
+
+            self.assertIs(
+                await executor.compile(graphql_query), await executor.compile(graphql_query)
+            )
+
+        self.loop.run_until_complete(run_queries())
+
+    def test_execute_with_async_driver(self):
+        sql_schema_info = get_common_sqlalchemy_schema_info("mssql")
+        executed_queries = []
+
+        async def fetch(query_string, parameters):
+            """Yield a single XML PATH encoded result, recording the query that was executed."""
+            executed_queries.append((query_string, parameters))
+            yield {"name": "Animal 1", "child_names": "|Animal 2|~|a^db"}
+
+        executor = AsyncSqlQueryExecutor(sql_schema_info, fetch=fetch, compilation_cache_size=1)
+        self.addCleanup(executor.shutdown)
+        graphql_query = """{
+            Animal {
+                name @output(out_name: "name")
+                     @filter(op_name: "=", value: ["$name"])
+                out_Animal_ParentOf @fold {
+                    name @output(out_name: "child_names")
+                }
+            }
+        }"""
+        other_graphql_query = """{
+            Animal {
+                uuid @output(out_name: "uuid")
+            }
+        }"""
+
+        async def run_queries():
+            """Run the queries, and check the results and compilation cache."""
+            self.assertEqual(
+                [{"name": "Animal 1", "child_names": ["Animal 2", None, "a|b"]}],
+                await executor.execute_query(graphql_query, {"name": "Animal 1"}),
+            )
+            self.assertEqual(1, len(executed_queries))
+            self.assertIn("FOR XML PATH", executed_queries[0][0])
+
+            compilation_result = await executor.compile(graphql_query)
+            await executor.compile(other_graphql_query)
+            # The cache holds a single query, so the first one is compiled again.
+            self.assertIsNot(compilation_result, await executor.compile(graphql_query))
+            self.assertEqual(compilation_result, await executor.compile(graphql_query))
+
+        self.loop.run_until_complete(run_queries())
+
+        with self.assertRaises(AssertionError):
+            AsyncSqlQueryExecutor(sql_schema_info)
+        with self.assertRaises(AssertionError):
+            AsyncSqlQueryExecutor(sql_schema_info, connect=self.engine.raw_connection, fetch=fetch)
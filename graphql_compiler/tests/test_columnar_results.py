@@ -0,0 +1,212 @@
+# Copyright 2020-present Kensho Technologies, LLC.
+from array import array
+import datetime
+from decimal import Decimal
+import sqlite3
+import unittest
+
+from graphql import GraphQLBoolean, GraphQLFloat, GraphQLID, GraphQLInt, GraphQLList, GraphQLString
+
+from .. import GraphQLDate, GraphQLDateTime, GraphQLDecimal
+from ..compiler.compiler_frontend import OutputMetadata
+from ..compiler.emit_sql import XML_PATH_FOLD_STRATEGY
+from ..post_processing.columnar_results import (
+    COLUMN_KIND_BOOL,
+    COLUMN_KIND_DATE,
+    COLUMN_KIND_DATETIME,
+    COLUMN_KIND_DICTIONARY,
+    COLUMN_KIND_FLOAT64,
+    COLUMN_KIND_INT64,
+    COLUMN_KIND_OBJECT,
+    ColumnarResultBuilder,
+    column_to_list,
+)
+
+
+class ColumnarResultsTests(unittest.TestCase):
+    def setUp(self):
+        self.output_metadata = {
+            "name": OutputMetadata(type=GraphQLString, optional=False, folded=False),
+            "uuid": OutputMetadata(type=GraphQLID, optional=True, folded=False),
+            "age": OutputMetadata(type=GraphQLInt, optional=False, folded=False),
+            "weight": OutputMetadata(type=GraphQLFloat, optional=True, folded=False),
+            "is_alive": OutputMetadata(type=GraphQLBoolean, optional=False, folded=False),
+            "birthday": OutputMetadata(type=GraphQLDate, optional=True, folded=False),
+            "event_time": OutputMetadata(type=GraphQLDateTime, optional=False, folded=False),
+            "net_worth": OutputMetadata(type=GraphQLDecimal, optional=False, folded=False),
+            "child_names": OutputMetadata(
+                type=GraphQLList(GraphQLString), optional=False, folded=True
+            ),
+        }
+        self.results = [
+            {
+                "name": "Animal 1",
+                "uuid": None,
+                "age": 3,
+                "weight": 1.5,
+                "is_alive": True,
+                "birthday": "2000-02-29",
+                "event_time": datetime.datetime(1969, 12, 31, 23, 59, 59, 500000),
+                "net_worth": "100.5",
+                "child_names": ["Animal 2"],
+            },
+            {
+                "name": "Animal 2",
+                "uuid": "cfc6e625-8594-0927-468f-f53d864a7a51",
+                "age": "4",
+                "weight": None,
+                "is_alive": False,
+                "birthday": None,
+                "event_time": "2019-01-01T12:34:56",
+                "net_worth": Decimal("7"),
+                "child_names": [],
+            },
+            {
+                "name": "Animal 1",
+                "uuid": "cfc6e625-8594-0927-468f-f53d864a7a51",
+                "age": 5,
+                "weight": 2.0,
+                "is_alive": True,
+                "birthday": datetime.date(1970, 1, 2),
+                "event_time": "1970-01-01T00:00:01",
+                "net_worth": "0",
+                "child_names": None,
+            },
+        ]
+
+    def test_columns_from_results(self):
+        builder = ColumnarResultBuilder(self.output_metadata)
+        builder.add_results(self.results[:1])
+        builder.add_results(iter(self.results[1:]))
+        columnar_results = builder.build()
+
+        self.assertEqual(3, columnar_results.row_count)
+        self.assertEqual(list(self.output_metadata.keys()), list(columnar_results.columns.keys()))
+        columns = columnar_results.columns
+
+        self.assertEqual(
+            {
+                "name": COLUMN_KIND_DICTIONARY,
+                "uuid": COLUMN_KIND_DICTIONARY,
+                "age": COLUMN_KIND_INT64,
+                "weight": COLUMN_KIND_FLOAT64,
+                "is_alive": COLUMN_KIND_BOOL,
+                "birthday": COLUMN_KIND_DATE,
+                "event_time": COLUMN_KIND_DATETIME,
+                "net_worth": COLUMN_KIND_OBJECT,
+                "child_names": COLUMN_KIND_OBJECT,
+            },
+            {name: column.kind for name, column in columns.items()},
+        )
+
+        self.assertEqual(array("q", [0, 1, 0]), columns["name"].values)
+        self.assertEqual(["Animal 1", "Animal 2"], columns["name"].dictionary)
+        self.assertIsNone(columns["name"].null_mask)
+        self.assertEqual(array("q", [0, 0, 0]), columns["uuid"].values)
+        self.assertEqual(bytearray([1, 0, 0]), columns["uuid"].null_mask)
+        self.assertEqual(array("q", [3, 4, 5]), columns["age"].values)
+        self.assertEqual(array("d", [1.5, 0.0, 2.0]), columns["weight"].values)
+        self.assertEqual(bytearray([0, 1, 0]), columns["weight"].null_mask)
+        self.assertEqual(array("B", [1, 0, 1]), columns["is_alive"].values)
+        self.assertEqual(array("q", [11016, 0, 1]), columns["birthday"].values)
+        self.assertEqual(
+            array("q", [-500000, 1546346096000000, 1000000]), columns["event_time"].values
+        )
+        self.assertEqual(
+            [Decimal("100.5"), Decimal("7"), Decimal("0")], columns["net_worth"].values
+        )
+        self.assertEqual([["Animal 2"], [], None], columns["child_names"].values)
+        self.assertEqual(bytearray([0, 0, 1]), columns["child_names"].null_mask)
+
+        # Converting the columns back to lists produces the same values as ResultDecoder.
+        self.assertEqual(
+            [datetime.date(2000, 2, 29), None, datetime.date(1970, 1, 2)],
+            column_to_list(columns["birthday"]),
+        )
+        self.assertEqual(
+            [
+                datetime.datetime(1969, 12, 31, 23, 59, 59, 500000),
+                datetime.datetime(2019, 1, 1, 12, 34, 56),
+                datetime.datetime(1970, 1, 1, 0, 0, 1),
+            ],
+            column_to_list(columns["event_time"]),
+        )
+        self.assertEqual(
+            [None, "cfc6e625-8594-0927-468f-f53d864a7a51", "cfc6e625-8594-0927-468f-f53d864a7a51"],
+            column_to_list(columns["uuid"]),
+        )
+        self.assertEqual([1.5, None, 2.0], column_to_list(columns["weight"]))
+        self.assertEqual([True, False, True], column_to_list(columns["is_alive"]))
+
+        with self.assertRaises(AssertionError):
+            builder.add_results(self.results)
+
+    def test_timezone_aware_datetimes(self):
+        output_metadata = {
+            "event_time": OutputMetadata(type=GraphQLDateTime, optional=False, folded=False),
+        }
+        eastern_time = datetime.timezone(datetime.timedelta(hours=-5))
+        builder = ColumnarResultBuilder(output_metadata)
+        builder.add_results(
+            [
+                {"event_time": datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)},
+                {"event_time": datetime.datetime(1969, 12, 31, 19, 0, 1, tzinfo=eastern_time)},
+                {"event_time": datetime.datetime(1970, 1, 1, 0, 0, 2)},
+            ]
+        )
+        column = builder.build().columns["event_time"]
+
+        self.assertEqual(COLUMN_KIND_DATETIME, column.kind)
+        self.assertEqual(array("q", [0, 1000000, 2000000]), column.values)
+        self.assertEqual(
+            [
+                datetime.datetime(1970, 1, 1),
+                datetime.datetime(1970, 1, 1, 0, 0, 1),
+                datetime.datetime(1970, 1, 1, 0, 0, 2),
+            ],
+            column_to_list(column),
+        )
+
+    def test_all_null_and_overflowing_columns(self):
+        output_metadata = {
+            "name": OutputMetadata(type=GraphQLString, optional=True, folded=False),
+            "count": OutputMetadata(type=GraphQLInt, optional=True, folded=False),
+        }
+        builder = ColumnarResultBuilder(output_metadata)
+        builder.add_results([{"count": 1}, {"count": None}, {"count": 2 ** 70}])
+        columns = builder.build().columns
+
+        self.assertEqual([None, None, None], column_to_list(columns["name"]))
+        self.assertEqual(COLUMN_KIND_OBJECT, columns["count"].kind)
+        self.assertEqual([1, None, 2 ** 70], columns["count"].values)
+        self.assertEqual([1, None, 2 ** 70], column_to_list(columns["count"]))
+
+    def test_columns_from_dbapi_cursor(self):
+        connection = sqlite3.connect(":memory:")
+        self.addCleanup(connection.close)
+        cursor = connection.cursor()
+        cursor.execute(
+            "SELECT 'Animal 1' AS name, 3 AS age, '|Animal 2|^d' AS child_names "
+            "UNION ALL SELECT 'Animal 2', NULL, '' "
+            "UNION ALL SELECT 'Animal 3', 5, '|~'"
+        )
+        output_metadata = {
+            "child_names": OutputMetadata(
+                type=GraphQLList(GraphQLString), optional=False, folded=True
+            ),
+            "age": OutputMetadata(type=GraphQLInt, optional=True, folded=False),
+        }
+        builder = ColumnarResultBuilder(output_metadata, fold_strategy=XML_PATH_FOLD_STRATEGY)
+        builder.add_dbapi_cursor_results(cursor, batch_size=2)
+        columnar_results = builder.build()
+
+        self.assertEqual(3, columnar_results.row_count)
+        self.assertEqual(
+            [["Animal 2", "|"], [], [None]],
+            column_to_list(columnar_results.columns["child_names"]),
+        )
+        self.assertEqual([3, None, 5], column_to_list(columnar_results.columns["age"]))
+
+        cursor.execute("SELECT 1 AS age")
+        with self.assertRaises(AssertionError):
+            ColumnarResultBuilder(output_metadata).add_dbapi_cursor_results(cursor)
@@ -5,6 +5,7 @@ import unittest
 
 from graphql import GraphQLID, GraphQLString
 import six
+from sqlalchemy import Column, Integer, MetaData, String, Table
 
 from . import test_input_data
 from ..compiler import (
@@ -12,11 +13,16 @@ from ..compiler import (
     compile_graphql_to_cypher,
     compile_graphql_to_gremlin,
     compile_graphql_to_match,
+    compile_graphql_to_match_with_statistics,
     compile_graphql_to_sql,
 )
 from ..compiler.sqlalchemy_extensions import print_sqlalchemy_query_string
+from ..cost_estimation.statistics import LocalStatistics
 from ..exceptions import GraphQLCompilationError, GraphQLValidationError
-from ..schema.schema_info import CommonSchemaInfo
+from ..schema.schema_info import CommonSchemaInfo, QueryPlanningSchemaInfo
+from ..schema_generation.graphql_schema import get_graphql_schema_from_schema_graph
+from ..schema_generation.sqlalchemy.edge_descriptors import DirectEdgeDescriptor
+from ..schema_generation.sqlalchemy.schema_graph_builder import get_sqlalchemy_schema_graph
 from .test_helpers import (
     SKIP_TEST,
     compare_cypher,
@@ -10697,3 +10703,139 @@ class CompilerTests(unittest.TestCase):
             expected_cypher,
             expected_sql,
         )
+
+
+class MatchStartPointSelectionTests(unittest.TestCase):
+    def setUp(self):
+        """Create the schema of a graph of people and the accounts they own."""
+        metadata = MetaData()
+        person_table = Table(
+            "person",
+            metadata,
+            Column("person_id", Integer, primary_key=True),
+            Column("name", String),
+        )
+        account_table = Table(
+            "account",
+            metadata,
+            Column("account_id", Integer, primary_key=True),
+            Column("owner_id", Integer),
+            Column("kind", String),
+        )
+        self.schema_graph = get_sqlalchemy_schema_graph(
+            {"Person": person_table, "Account": account_table},
+            {"Person_Owns": DirectEdgeDescriptor("Person", "person_id", "Account", "owner_id")},
+        )
+        self.schema, self.type_equivalence_hints = get_graphql_schema_from_schema_graph(
+            self.schema_graph
+        )
+        self.graphql_query = """{
+            Person {
+                name @filter(op_name: "=", value: ["$name"])
+                     @output(out_name: "name")
+                out_Person_Owns {
+                    kind @filter(op_name: "=", value: ["$kind"])
+                         @output(out_name: "kind")
+                }
+            }
+        }"""
+        self.parameters = {"name": "Alice", "kind": "checking"}
+
+    def _get_query_planning_schema_info(self, class_counts, distinct_field_values_counts):
+        """Return a QueryPlanningSchemaInfo for the schema with the given statistics."""
+        return QueryPlanningSchemaInfo(
+            schema=self.schema,
+            type_equivalence_hints=self.type_equivalence_hints,
+            schema_graph=self.schema_graph,
+            statistics=LocalStatistics(
+                class_counts, distinct_field_values_counts=distinct_field_values_counts
+            ),
+            pagination_keys={},
+            uuid4_field_info={},
+        )
+
+    def _get_expected_match(self, person_clauses, account_clauses):
+        """Return the expected MATCH query, with the given class and where clauses."""
+        return """
+            SELECT
+                Person__out_Person_Owns___1.kind AS `kind`,
+                Person___1.name AS `name`
+            FROM (
+                MATCH {{
+                    %s
+                    as: Person___1
+                }}.out('Person_Owns') {{
+                    %s
+                    as: Person__out_Person_Owns___1
+                }}
+                RETURN $matches
+            )
+        """ % (
+            person_clauses,
+            account_clauses,
+        )
+
+    def test_start_at_location_with_fewest_estimated_vertices(self):
+        # Without statistics, both locations with filters are exposed as start points.
+        compilation_result = compile_graphql_to_match(
+            CommonSchemaInfo(self.schema, self.type_equivalence_hints), self.graphql_query
+        )
+        compare_match(
+            self,
+            self._get_expected_match(
+                "class: Person, where: ((name = {name})),",
+                "class: Account, where: ((kind = {kind})),",
+            ),
+            compilation_result.query,
+        )
+
+        # Names are almost unique, so the filter on the name matches a single person,
+        # whereas the filter on the kind matches many accounts.
+        query_planning_schema_info = self._get_query_planning_schema_info(
+            {"Person": 10000, "Account": 50000},
+            {("Person", "name"): 10000, ("Account", "kind"): 5},
+        )
+        compilation_result = compile_graphql_to_match_with_statistics(
+            query_planning_schema_info, self.graphql_query, self.parameters
+        )
+        compare_match(
+            self,
+            self._get_expected_match(
+                "class: Person, where: ((name = {name})),", "where: ((kind = {kind})),"
+            ),
+            compilation_result.query,
+        )
+
+        # If names are shared by many people, starting at the accounts of a rare kind is better.
+        query_planning_schema_info = self._get_query_planning_schema_info(
+            {"Person": 10000, "Account": 50000},
+            {("Person", "name"): 2, ("Account", "kind"): 50000},
+        )
+        compilation_result = compile_graphql_to_match_with_statistics(
+            query_planning_schema_info, self.graphql_query, self.parameters
+        )
+        compare_match(
+            self,
+            self._get_expected_match(
+                "where: (((@this INSTANCEOF 'Person') AND (name = {name}))),",
+                "class: Account, where: ((kind = {kind})),",
+            ),
+            compilation_result.query,
+        )
+
+    def test_start_point_selection_without_class_counts(self):
+        # If the count of any candidate class is unknown, all locations with filters are exposed.
+        query_planning_schema_info = self._get_query_planning_schema_info(
+            {"Person": 10000}, {("Person", "name"): 10000}
+        )
+        compilation_result = compile_graphql_to_match_with_statistics(
+            query_planning_schema_info, self.graphql_query, self.parameters
+        )
+        compare_match(
+            self,
+            self._get_expected_match(
+                "class: Person, where: ((name = {name})),",
+                "class: Account, where: ((kind = {kind})),",
+            ),
+            compilation_result.query,
+        )
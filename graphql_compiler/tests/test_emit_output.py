@@ -2,9 +2,17 @@
 import unittest
 
 from graphql import GraphQLString
+import sqlalchemy
 from sqlalchemy.dialects.mssql.base import MSDialect
 
-from ..compiler import emit_cypher, emit_gremlin, emit_match, emit_sql
+from .. import compile_graphql_to_sql, get_sqlalchemy_schema_info as make_sqlalchemy_schema_info
+from ..compiler import (
+    compile_graphql_to_sql_with_keyset_pagination,
+    emit_cypher,
+    emit_gremlin,
+    emit_match,
+    emit_sql,
+)
 from ..compiler.blocks import (
     Backtrack,
     CoerceType,
@@ -31,7 +39,12 @@ from ..compiler.ir_lowering_match.utils import CompoundMatchQuery
 from ..compiler.match_query import convert_to_match_query
 from ..compiler.metadata import LocationInfo, QueryMetadataTable
 from ..compiler.sqlalchemy_extensions import print_sqlalchemy_query_string
+from ..query_formatting.sql_formatting import insert_arguments_into_sql_query
 from ..schema import GraphQLDateTime
+from ..schema.schema_info import (
+    make_sqlalchemy_schema_info as make_validated_sqlalchemy_schema_info,
+)
+from ..schema_generation.sqlalchemy.edge_descriptors import DirectEdgeDescriptor
 from .test_helpers import (
     compare_cypher,
     compare_gremlin,
@@ -741,3 +754,485 @@ class EmitSQLTests(unittest.TestCase):
 
         self.assertEqual({"uuid", "fold_output_name"}, set(subquery.c.keys()))
         self.assertEqual(fold_scope_location, output_location)
+
+    def test_fold_subquery_builder_with_json_path_fold_strategy(self) -> None:
+        dialect = MSDialect()
+        table = self.schema_infos["mssql"].vertex_name_to_table["Animal"]
+        join_descriptor = self.schema_infos["mssql"].join_descriptors["Animal"][
+            "out_Animal_ParentOf"
+        ]
+        from_alias = table.alias()
+        to_alias = table.alias()
+        fold_scope_location = Location(("Animal",)).navigate_to_fold("out_Animal_ParentOf")
+
+        builder = emit_sql.FoldSubqueryBuilder(
+            dialect, from_alias, "uuid", fold_strategy=emit_sql.JSON_PATH_FOLD_STRATEGY
+        )
+        builder.add_traversal(join_descriptor, from_alias, to_alias)
+        builder.mark_output_location_and_fields(to_alias, fold_scope_location, {"name"})
+        subquery, output_location = builder.end_fold()
+
+        expected_mssql = """
+            SELECT
+                [Animal_1].uuid,
+                coalesce((
+                    SELECT [Animal_2].name AS value
+                FROM
+                    db_1.schema_1.[Animal] AS [Animal_2]
+                WHERE
+                    [Animal_1].uuid = [Animal_2].parent
+                FOR JSON PATH, INCLUDE_NULL_VALUES
+                ), '[]') AS fold_output_name
+            FROM
+                db_1.schema_1.[Animal] AS [Animal_1]
+        """
+        string_result = print_sqlalchemy_query_string(subquery, dialect)
+        compare_sql(self, expected_mssql, string_result)
+        self.assertEqual({"uuid", "fold_output_name"}, set(subquery.c.keys()))
+        self.assertEqual(fold_scope_location, output_location)
+
+        # Fold strategies can only be used with the dialects that support them.
+        with self.assertRaises(NotImplementedError):
+            emit_sql.FoldSubqueryBuilder(
+                dialect, from_alias, "uuid", fold_strategy=emit_sql.ARRAY_AGG_FOLD_STRATEGY
+            )
+
+    def test_fold_strategy_selection(self) -> None:
+        mssql_schema_info = self.schema_infos["mssql"]
+        postgresql_schema_info = self.schema_infos["postgresql"]
+        self.assertIs(
+            emit_sql.XML_PATH_FOLD_STRATEGY, emit_sql.get_fold_strategy(mssql_schema_info)
+        )
+        self.assertIs(
+            emit_sql.ARRAY_AGG_FOLD_STRATEGY, emit_sql.get_fold_strategy(postgresql_schema_info)
+        )
+
+        json_path_schema_info = mssql_schema_info._replace(
+            fold_strategy=emit_sql.JSON_PATH_FOLD_STRATEGY
+        )
+        self.assertIs(
+            emit_sql.JSON_PATH_FOLD_STRATEGY, emit_sql.get_fold_strategy(json_path_schema_info)
+        )
+
+        graphql_query = """{
+            Animal {
+                name @output(out_name: "name")
+                out_Animal_ParentOf @fold {
+                    out_Animal_LivesIn {
+                        name @output(out_name: "homes")
+                    }
+                }
+            }
+        }"""
+        expected_mssql = """
+            SELECT
+                folded_subquery_1.fold_output_name AS homes,
+                [Animal_1].name AS name
+            FROM db_1.schema_1.[Animal] AS [Animal_1]
+            JOIN (
+                SELECT
+                    [Animal_2].uuid AS uuid,
+                    coalesce((
+                        SELECT [Location_1].name AS value
+                        FROM db_1.schema_1.[Animal] AS [Animal_3]
+                        JOIN db_1.schema_1.[Location] AS [Location_1]
+                            ON [Animal_3].lives_in = [Location_1].uuid
+                        WHERE [Animal_2].uuid = [Animal_3].parent
+                        FOR JSON PATH, INCLUDE_NULL_VALUES
+                    ), '[]') AS fold_output_name
+                FROM db_1.schema_1.[Animal] AS [Animal_2]
+            ) AS folded_subquery_1
+            ON [Animal_1].uuid = folded_subquery_1.uuid
+        """
+        compilation_result = compile_graphql_to_sql(json_path_schema_info, graphql_query)
+        string_result = print_sqlalchemy_query_string(
+            compilation_result.query, json_path_schema_info.dialect
+        )
+        compare_sql(self, expected_mssql, string_result)
+
+    def test_keyset_paginated_query(self) -> None:
+        schema_info = self.schema_infos["postgresql"]
+        graphql_query = """{
+            Animal {
+                name @output(out_name: "name")
+                     @filter(op_name: "has_substring", value: ["$substring"])
+                out_Animal_LivesIn {
+                    name @output(out_name: "home")
+                }
+            }
+        }"""
+        expected_next_page_query = """
+            SELECT
+                "Animal_1".uuid AS __keyset_key_0,
+                "Location_1".uuid AS __keyset_key_1,
+                "Location_1".name AS home,
+                "Animal_1".name AS name
+            FROM schema_1."Animal" AS "Animal_1"
+            JOIN schema_1."Location" AS "Location_1"
+                ON "Animal_1".lives_in = "Location_1".uuid
+            WHERE ("Animal_1".name LIKE '%%' || %(substring)s || '%%') AND (
+                "Animal_1".uuid > %(__keyset_last_key_0)s OR
+                "Animal_1".uuid = %(__keyset_last_key_0)s AND
+                "Location_1".uuid > %(__keyset_last_key_1)s
+            )
+            ORDER BY "Animal_1".uuid, "Location_1".uuid
+            LIMIT %(param_1)s
+        """
+        compilation_result = compile_graphql_to_sql_with_keyset_pagination(
+            schema_info, graphql_query, 10
+        )
+        paginated_query = compilation_result.query
+        self.assertEqual(("__keyset_key_0", "__keyset_key_1"), paginated_query.key_output_names)
+        self.assertEqual(10, paginated_query.page_size)
+        self.assertEqual({"substring": GraphQLString}, compilation_result.input_metadata)
+        string_result = print_sqlalchemy_query_string(
+            paginated_query.next_page_query, schema_info.dialect
+        )
+        compare_sql(self, expected_next_page_query, string_result)
+
+        arguments = {"substring": "Bob"}
+        self.assertEqual(
+            (paginated_query.first_page_query, arguments),
+            emit_sql.get_keyset_page_query_and_arguments(paginated_query, arguments),
+        )
+        last_result = {"__keyset_key_0": "a", "__keyset_key_1": "b", "name": "Bob", "home": "c"}
+        self.assertEqual(
+            (
+                paginated_query.next_page_query,
+                {"substring": "Bob", "__keyset_last_key_0": "a", "__keyset_last_key_1": "b"},
+            ),
+            emit_sql.get_keyset_page_query_and_arguments(paginated_query, arguments, last_result),
+        )
+
+    def test_keyset_paginated_query_unsupported(self) -> None:
+        schema_info = self.schema_infos["mssql"]
+        unsupported_queries = (
+            """{
+                Animal {
+                    name @output(out_name: "name")
+                    out_Animal_LivesIn @optional {
+                        name @output(out_name: "home")
+                    }
+                }
+            }""",
+            """{
+                Animal {
+                    out_Animal_ParentOf @recurse(depth: 1) {
+                        name @output(out_name: "name")
+                    }
+                }
+            }""",
+        )
+        for graphql_query in unsupported_queries:
+            with self.assertRaises(NotImplementedError):
+                compile_graphql_to_sql_with_keyset_pagination(schema_info, graphql_query, 10)
+
+        with self.assertRaises(ValueError):
+            compile_graphql_to_sql_with_keyset_pagination(
+                schema_info, '{ Animal { name @output(out_name: "name") } }', 0
+            )
+
+    def test_execute_keyset_paginated_query(self) -> None:
+        metadata = sqlalchemy.MetaData()
+        animal_table = sqlalchemy.Table(
+            "Animal",
+            metadata,
+            sqlalchemy.Column("uuid", sqlalchemy.Integer, primary_key=True),
+            sqlalchemy.Column("name", sqlalchemy.String(40)),
+        )
+        friendship_table = sqlalchemy.Table(
+            "Friendship",
+            metadata,
+            sqlalchemy.Column("from_uuid", sqlalchemy.Integer, primary_key=True),
+            sqlalchemy.Column("to_uuid", sqlalchemy.Integer, primary_key=True),
+        )
+        engine = sqlalchemy.create_engine("sqlite://")
+        metadata.create_all(engine)
+        engine.execute(
+            animal_table.insert(),
+            [{"uuid": uuid, "name": f"Animal {uuid}"} for uuid in range(1, 8)],
+        )
+        engine.execute(
+            friendship_table.insert(),
+            [
+                {"from_uuid": from_uuid, "to_uuid": to_uuid}
+                for from_uuid in range(1, 8)
+                for to_uuid in range(from_uuid % 3, 4)
+            ],
+        )
+        direct_edges = {
+            "Animal_Befriended": DirectEdgeDescriptor("Animal", "uuid", "Friendship", "from_uuid"),
+            "Friendship_Befriends": DirectEdgeDescriptor("Friendship", "to_uuid", "Animal", "uuid"),
+        }
+        sql_schema_info = make_sqlalchemy_schema_info(
+            {"Animal": animal_table, "Friendship": friendship_table}, direct_edges, engine.dialect
+        )
+        graphql_query = """{
+            Animal {
+                name @output(out_name: "name")
+                     @filter(op_name: "!=", value: ["$excluded_name"])
+                out_Animal_Befriended {
+                    out_Friendship_Befriends {
+                        name @output(out_name: "friend_name")
+                    }
+                }
+            }
+        }"""
+        arguments = {"excluded_name": "Animal 2"}
+        expected_results = sorted(
+            tuple(row)
+            for row in engine.execute(
+                insert_arguments_into_sql_query(
+                    compile_graphql_to_sql(sql_schema_info, graphql_query), arguments
+                )
+            )
+        )
+
+        paginated_query = compile_graphql_to_sql_with_keyset_pagination(
+            sql_schema_info, graphql_query, 3
+        ).query
+        results = []
+        page_sizes = []
+        last_result = None
+        while True:
+            query, page_arguments = emit_sql.get_keyset_page_query_and_arguments(
+                paginated_query, arguments, last_result
+            )
+            page = [dict(row) for row in engine.execute(query.params(**page_arguments))]
+            if not page:
+                break
+            page_sizes.append(len(page))
+            results.extend(page)
+            last_result = page[-1]
+
+        # The composite primary key of Friendship makes each result unique, so that pages
+        # split the results of each animal without skipping or repeating any of them.
+        self.assertEqual(
+            ["__keyset_key_0", "__keyset_key_1", "__keyset_key_2", "__keyset_key_3"],
+            list(paginated_query.key_output_names),
+        )
+        self.assertEqual(len(expected_results), len(results))
+        self.assertEqual([3] * (len(page_sizes) - 1), page_sizes[:-1])
+        self.assertEqual(
+            expected_results, sorted((result["friend_name"], result["name"]) for result in results),
+        )
+
+    def test_recurse_options(self) -> None:
+        graphql_query = """{
+            Animal {
+                name @filter(op_name: "=", value: ["$animal_name"])
+                out_Animal_ParentOf @recurse(depth: 2) {
+                    name @output(out_name: "relation_name")
+                    color @output(out_name: "animal_color")
+                }
+            }
+        }"""
+        expected_mssql = """
+            WITH anon_3 AS (
+                SELECT
+                    [Animal_2].color AS [Animal__color],
+                    [Animal_2].name AS [Animal__name],
+                    [Animal_2].parent AS [Animal__parent],
+                    [Animal_2].uuid AS [Animal__uuid]
+                FROM db_1.schema_1.[Animal] AS [Animal_2]
+                WHERE [Animal_2].name = :animal_name
+            ),
+            anon_2(uuid, __cte_key, __cte_depth) AS (
+                SELECT
+                    anon_3.[Animal__uuid] AS uuid,
+                    anon_3.[Animal__uuid] AS __cte_key,
+                    0 AS __cte_depth
+                FROM anon_3
+                UNION ALL
+                SELECT
+                    [Animal_3].uuid AS uuid,
+                    anon_2.__cte_key AS __cte_key,
+                    anon_2.__cte_depth + 1 AS __cte_depth
+                FROM anon_2
+                JOIN db_1.schema_1.[Animal] AS [Animal_3] ON anon_2.uuid = [Animal_3].parent
+                WHERE anon_2.__cte_depth < 2
+            )
+            SELECT
+                anon_1.color AS animal_color,
+                anon_1.name AS relation_name
+            FROM (
+                SELECT
+                    [Animal_1].color AS color,
+                    [Animal_1].name AS name,
+                    [Animal_1].parent AS parent,
+                    [Animal_1].uuid AS uuid,
+                    anon_2.__cte_key AS __cte_key,
+                    anon_2.__cte_depth AS __cte_depth
+                FROM anon_2
+                JOIN db_1.schema_1.[Animal] AS [Animal_1] ON anon_2.uuid = [Animal_1].uuid
+            ) AS anon_1
+        """
+        mssql_schema_info = self.schema_infos["mssql"]._replace(
+            recurse_options=emit_sql.SQLRecurseOptions(recurse_over_keys_only=True)
+        )
+        string_result = print_sqlalchemy_query_string(
+            compile_graphql_to_sql(mssql_schema_info, graphql_query).query,
+            mssql_schema_info.dialect,
+        )
+        compare_sql(self, expected_mssql, string_result)
+
+        postgresql_schema_info = self.schema_infos["postgresql"]._replace(
+            recurse_options=emit_sql.SQLRecurseOptions(
+                deduplicate_paths=True, materialize_prefix_cte=False
+            )
+        )
+        string_result = print_sqlalchemy_query_string(
+            compile_graphql_to_sql(postgresql_schema_info, graphql_query).query,
+            postgresql_schema_info.dialect,
+        )
+        self.assertIn("anon_2 AS NOT MATERIALIZED", string_result)
+        self.assertIn("FROM anon_2 UNION SELECT", string_result)
+
+        # MSSQL does not support UNION in recursive CTEs, nor materialization hints.
+        for unsupported_options in (
+            emit_sql.SQLRecurseOptions(deduplicate_paths=True),
+            emit_sql.SQLRecurseOptions(materialize_prefix_cte=True),
+        ):
+            with self.assertRaises(NotImplementedError):
+                compile_graphql_to_sql(
+                    self.schema_infos["mssql"]._replace(recurse_options=unsupported_options),
+                    graphql_query,
+                )
+
+    def test_execute_recurse_options(self) -> None:
+        metadata = sqlalchemy.MetaData()
+        animal_table = sqlalchemy.Table(
+            "Animal",
+            metadata,
+            sqlalchemy.Column("uuid", sqlalchemy.Integer, primary_key=True),
+            sqlalchemy.Column("name", sqlalchemy.String(40)),
+            sqlalchemy.Column("parent", sqlalchemy.Integer),
+        )
+        engine = sqlalchemy.create_engine("sqlite://")
+        metadata.create_all(engine)
+        engine.execute(
+            animal_table.insert(),
+            [
+                {"uuid": 1, "name": "Animal 1", "parent": None},
+                {"uuid": 2, "name": "Animal 2", "parent": 1},
+                {"uuid": 3, "name": "Animal 3", "parent": 1},
+                {"uuid": 4, "name": "Animal 4", "parent": 2},
+                {"uuid": 5, "name": "Animal 5", "parent": 3},
+                {"uuid": 6, "name": "Animal 6", "parent": 5},
+            ],
+        )
+        direct_edges = {
+            "Animal_ParentOf": DirectEdgeDescriptor("Animal", "uuid", "Animal", "parent"),
+        }
+        graphql_query = """{
+            Animal {
+                name @filter(op_name: "=", value: ["$animal_name"])
+                out_Animal_ParentOf @recurse(depth: 3) {
+                    name @output(out_name: "descendant_name")
+                }
+            }
+        }"""
+        arguments = {"animal_name": "Animal 1"}
+
+        def get_descendant_names(recurse_options):
+            """Return the sorted results of the query compiled with the given recurse options."""
+            sql_schema_info = make_sqlalchemy_schema_info(
+                {"Animal": animal_table},
+                direct_edges,
+                engine.dialect,
+                recurse_options=recurse_options,
+            )
+            query = insert_arguments_into_sql_query(
+                compile_graphql_to_sql(sql_schema_info, graphql_query), arguments
+            )
+            return sorted(row["descendant_name"] for row in engine.execute(query))
+
+        expected_names = [f"Animal {index}" for index in range(1, 7)]
+        self.assertEqual(expected_names, get_descendant_names(None))
+        for recurse_over_keys_only in (False, True):
+            for deduplicate_paths in (False, True):
+                recurse_options = emit_sql.SQLRecurseOptions(
+                    recurse_over_keys_only=recurse_over_keys_only,
+                    deduplicate_paths=deduplicate_paths,
+                )
+                self.assertEqual(expected_names, get_descendant_names(recurse_options))
+
+    def test_lazy_schema_info_validation(self) -> None:
+        common_schema_info = self.schema_infos["mssql"]
+        vertex_name_to_table = dict(common_schema_info.vertex_name_to_table)
+        del vertex_name_to_table["Animal"]
+
+        def make_schema_info(lazy_validation):
+            """Return a SQLAlchemySchemaInfo in which the Animal type has no table."""
+            return make_validated_sqlalchemy_schema_info(
+                common_schema_info.schema,
+                common_schema_info.type_equivalence_hints,
+                common_schema_info.dialect,
+                vertex_name_to_table,
+                common_schema_info.join_descriptors,
+                lazy_validation=lazy_validation,
+            )
+
+        with self.assertRaises(AssertionError):
+            make_schema_info(False)
+        sql_schema_info = make_schema_info(True)
+        self.assertIn("Species", sql_schema_info.vertex_name_to_table)
+        self.assertNotIn("Animal", sql_schema_info.vertex_name_to_table)
+
+        # Queries using only valid types compile as they would with eager validation.
+        species_query = """{
+            Species {
+                name @output(out_name: "species_name")
+                limbs @filter(op_name: ">=", value: ["$min_limbs"])
+            }
+        }"""
+        self.assertEqual(
+            str(compile_graphql_to_sql(common_schema_info, species_query).query),
+            str(compile_graphql_to_sql(sql_schema_info, species_query).query),
+        )
+
+        animal_query = """{
+            Animal {
+                name @output(out_name: "name")
+            }
+        }"""
+        with self.assertRaises(AssertionError):
+            compile_graphql_to_sql(sql_schema_info, animal_query)
+
+    def test_table_aliases_are_reused(self) -> None:
+        graphql_query = """{
+            Animal {
+                name @output(out_name: "name")
+                out_Animal_ParentOf {
+                    name @output(out_name: "child_name")
+                }
+                in_Animal_ParentOf @optional {
+                    name @output(out_name: "parent_name")
+                }
+            }
+        }"""
+
+        def get_query_aliases(query):
+            """Return the set of table aliases used in the given SQLAlchemy query."""
+            return {
+                element
+                for element in sqlalchemy.sql.visitors.iterate(query, {})
+                if isinstance(element, sqlalchemy.sql.expression.Alias)
+            }
+
+        sql_schema_info = self.schema_infos["mssql"]
+        first_query = compile_graphql_to_sql(sql_schema_info, graphql_query).query
+        second_query = compile_graphql_to_sql(sql_schema_info, graphql_query).query
+        self.assertEqual(str(first_query), str(second_query))
+
+        first_aliases = get_query_aliases(first_query)
+        self.assertEqual(3, len(first_aliases))
+        self.assertEqual(first_aliases, get_query_aliases(second_query))
+
+        # The aliases are cached in the SQLAlchemySchemaInfo, leaving the tables unchanged.
+        for table in sql_schema_info.vertex_name_to_table.values():
+            self.assertEqual({}, table.info)
+        unpooled_schema_info = sql_schema_info._replace(table_alias_pools=None)
+        unpooled_query = compile_graphql_to_sql(unpooled_schema_info, graphql_query).query
+        self.assertEqual(str(first_query), str(unpooled_query))
+        self.assertEqual(set(), first_aliases & get_query_aliases(unpooled_query))
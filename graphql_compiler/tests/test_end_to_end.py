@@ -17,8 +17,12 @@ from graphql import (
 import pytz
 import six
 
-from .. import graphql_to_gremlin, graphql_to_match
-from ..compiler import compile_graphql_to_gremlin, compile_graphql_to_match
+from .. import graphql_to_gremlin, graphql_to_match, graphql_to_redisgraph_cypher
+from ..compiler import (
+    compile_graphql_to_cypher,
+    compile_graphql_to_gremlin,
+    compile_graphql_to_match,
+)
 from ..exceptions import GraphQLInvalidArgumentError
 from ..query_formatting import insert_arguments_into_query
 from ..query_formatting.common import (
@@ -26,10 +30,15 @@ from ..query_formatting.common import (
     deserialize_multiple_arguments,
     validate_argument_type,
 )
+from ..query_formatting.neo4j_formatting import make_neo4j_parameter_builder
+from ..query_formatting.orientdb_formatting import (
+    get_orientdb_parameterized_query,
+    make_orientdb_parameter_builder,
+)
 from ..schema import GraphQLDate, GraphQLDateTime, GraphQLDecimal, GraphQLSchemaFieldType
 from ..schema.schema_info import CommonSchemaInfo
 from ..typedefs import QueryArgumentGraphQLType
-from .test_helpers import compare_gremlin, compare_match, get_schema
+from .test_helpers import compare_gremlin, compare_match, get_common_schema_info, get_schema
 
 
 EXAMPLE_GRAPHQL_QUERY = """{
@@ -419,3 +428,175 @@ class QueryFormattingTests(unittest.TestCase):
             [datetime.date(2014, 2, 5)],
             deserialize_argument("dates", GraphQLList(GraphQLDate), ["2014-02-05"]),
         )
+
+    def test_redisgraph_parameter_header(self) -> None:
+        common_schema_info = get_common_schema_info()
+        graphql_query = """{
+            Animal {
+                name @filter(op_name: "in_collection", value: ["$names"])
+                     @output(out_name: "name")
+                out_Animal_ParentOf {
+                    name @filter(op_name: "=", value: ["$child_name"])
+                }
+            }
+        }"""
+        compiled_query = compile_graphql_to_cypher(common_schema_info, graphql_query).query
+        parameters = {"names": ["Animal 1", 'Animal "2"'], "child_name": "Animal 3"}
+
+        expected_query = (
+            'CYPHER child_name="Animal 3" names=["Animal 1","Animal \\"2\\""] ' + compiled_query
+        )
+        self.assertEqual(
+            expected_query,
+            graphql_to_redisgraph_cypher(
+                common_schema_info, graphql_query, parameters, parameter_header=True
+            ).query,
+        )
+        # The text of the query following the header does not depend on the parameters.
+        self.assertEqual(
+            'CYPHER child_name="Animal 4" names=[] ' + compiled_query,
+            graphql_to_redisgraph_cypher(
+                common_schema_info,
+                graphql_query,
+                {"names": [], "child_name": "Animal 4"},
+                parameter_header=True,
+            ).query,
+        )
+
+        with self.assertRaises(GraphQLInvalidArgumentError):
+            graphql_to_redisgraph_cypher(
+                common_schema_info,
+                graphql_query,
+                {"names": "Animal 1", "child_name": "Animal 3"},
+                parameter_header=True,
+            )
+
+    def test_neo4j_parameter_builder(self) -> None:
+        graphql_query = """{
+            Animal {
+                uuid @filter(op_name: "in_collection", value: ["$uuids"])
+                name @output(out_name: "name")
+                     @filter(op_name: "=", value: ["$name"])
+                net_worth @filter(op_name: ">=", value: ["$min_worth"])
+                          @filter(op_name: "<=", value: ["$max_worth"])
+                birthday @filter(op_name: ">", value: ["$birthday"])
+            }
+        }"""
+        compilation_result = compile_graphql_to_cypher(get_common_schema_info(), graphql_query)
+        build_parameters = make_neo4j_parameter_builder(compilation_result)
+        arguments = {
+            "uuids": ["uuid 1", "uuid 2"],
+            "name": "Animal 1",
+            "min_worth": Decimal("100"),
+            "max_worth": Decimal("200.5"),
+            "birthday": datetime.date(2000, 1, 1),
+        }
+        parameters = build_parameters(arguments)
+        self.assertEqual(
+            {
+                "uuids": ["uuid 1", "uuid 2"],
+                "name": "Animal 1",
+                "min_worth": 100,
+                "max_worth": 200.5,
+                "birthday": datetime.date(2000, 1, 1),
+            },
+            parameters,
+        )
+        self.assertIsInstance(parameters["min_worth"], int)
+        self.assertIsInstance(parameters["max_worth"], float)
+        # The list argument is copied rather than shared with the caller.
+        self.assertIsNot(arguments["uuids"], parameters["uuids"])
+
+        with self.assertRaises(GraphQLInvalidArgumentError):
+            build_parameters(dict(arguments, birthday="2000-01-01"))
+        with self.assertRaises(GraphQLInvalidArgumentError):
+            build_parameters({"name": "Animal 1"})
+
+        # Trusted arguments are converted without being validated.
+        trusted_build_parameters = make_neo4j_parameter_builder(compilation_result, trusted=True)
+        self.assertEqual(
+            ["1", "2"], trusted_build_parameters(dict(arguments, uuids=[1, 2]))["uuids"]
+        )
+
+        with self.assertRaises(AssertionError):
+            make_neo4j_parameter_builder(
+                compile_graphql_to_match(get_common_schema_info(), graphql_query)
+            )
+
+    def test_orientdb_parameterized_query(self) -> None:
+        graphql_query = """{
+            Animal {
+                uuid @filter(op_name: "in_collection", value: ["$uuids"])
+                name @output(out_name: "name")
+                     @filter(op_name: "=", value: ["$name"])
+                net_worth @filter(op_name: ">=", value: ["$min_worth"])
+                birthday @filter(op_name: ">", value: ["$birthday"])
+            }
+        }"""
+        compilation_result = compile_graphql_to_match(get_common_schema_info(), graphql_query)
+        expected_query = """
+            SELECT Animal___1.name AS `name` FROM (
+                MATCH {
+                    class: Animal,
+                    where: ((
+                        (((:uuids CONTAINS uuid) AND (name = :name)) AND
+                        (net_worth >= decimal(:min_worth))) AND
+                        (birthday > date(:birthday, "yyyy-MM-dd"))
+                    )),
+                    as: Animal___1
+                }
+                RETURN $matches
+            )
+        """
+        compare_match(self, expected_query, get_orientdb_parameterized_query(compilation_result))
+
+        build_parameters = make_orientdb_parameter_builder(compilation_result)
+        arguments = {
+            "uuids": ["uuid 1", "uuid 2"],
+            "name": "Animal 1",
+            "min_worth": Decimal("100.5"),
+            "birthday": datetime.date(2000, 1, 1),
+        }
+        parameters = build_parameters(arguments)
+        self.assertEqual(
+            {
+                "uuids": ["uuid 1", "uuid 2"],
+                "name": "Animal 1",
+                "min_worth": "100.5",
+                "birthday": "2000-01-01",
+            },
+            parameters,
+        )
+        # The list argument is copied rather than shared with the caller.
+        self.assertIsNot(arguments["uuids"], parameters["uuids"])
+
+        with self.assertRaises(GraphQLInvalidArgumentError):
+            build_parameters(dict(arguments, birthday="2000-01-01"))
+        with self.assertRaises(GraphQLInvalidArgumentError):
+            build_parameters({"name": "Animal 1"})
+
+        # Trusted arguments are converted without being validated.
+        trusted_build_parameters = make_orientdb_parameter_builder(compilation_result, trusted=True)
+        self.assertEqual(
+            ["1", "2"], trusted_build_parameters(dict(arguments, uuids=[1, 2]))["uuids"]
+        )
+
+        # Lists of Decimal values can only be inlined into the query.
+        decimal_list_query = """{
+            Animal {
+                name @output(out_name: "name")
+                net_worth @filter(op_name: "in_collection", value: ["$net_worths"])
+            }
+        }"""
+        decimal_list_compilation_result = compile_graphql_to_match(
+            get_common_schema_info(), decimal_list_query
+        )
+        with self.assertRaises(NotImplementedError):
+            get_orientdb_parameterized_query(decimal_list_compilation_result)
+        with self.assertRaises(NotImplementedError):
+            make_orientdb_parameter_builder(decimal_list_compilation_result)
+
+        with self.assertRaises(AssertionError):
+            make_orientdb_parameter_builder(
+                compile_graphql_to_cypher(get_common_schema_info(), graphql_query)
+            )
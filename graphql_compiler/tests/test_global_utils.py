@@ -1,7 +1,7 @@
 # Copyright 2020-present Kensho Technologies, LLC.
 import unittest
 
-from ..global_utils import assert_set_equality
+from ..global_utils import BoundedLRUCache, assert_set_equality
 
 
 class GlobalUtilTests(unittest.TestCase):
@@ -24,3 +24,30 @@ class GlobalUtilTests(unittest.TestCase):
         # Different types
         with self.assertRaises(AssertionError):
             assert_set_equality({"a"}, {1})
+
+    def test_bounded_lru_cache(self):
+        cache = BoundedLRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(1, cache.get("a"))
+
+        # The least recently used value is discarded first.
+        cache.put("c", 3)
+        self.assertEqual(2, len(cache))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(1, cache.get("a"))
+
+        created_keys = []
+
+        def create(key):
+            """Record the key, and return its value."""
+            created_keys.append(key)
+            return key * 2
+
+        self.assertEqual(3, cache.get_or_create("c", create))
+        self.assertEqual("dd", cache.get_or_create("d", create))
+        self.assertEqual(["d"], created_keys)
+        self.assertIsNone(cache.get("a"))
+
+        with self.assertRaises(AssertionError):
+            BoundedLRUCache(0)
@@ -0,0 +1,240 @@
+# Copyright 2020-present Kensho Technologies, LLC.
+import datetime
+import unittest
+
+import sqlalchemy
+
+from .. import get_sqlalchemy_schema_info
+from ..compiler import compile_graphql_to_interpreter, compile_graphql_to_sql
+from ..exceptions import GraphQLInvalidArgumentError
+from ..interpreter import HASH_INDEX, SORTED_INDEX, InMemoryGraph, execute_query
+from ..query_formatting import insert_arguments_into_query
+from ..schema.schema_info import CommonSchemaInfo
+from ..schema_generation.sqlalchemy.edge_descriptors import DirectEdgeDescriptor
+from .test_helpers import get_common_schema_info
+
+
+def _sort_results(results):
+    """Return the results in a canonical order, for comparisons regardless of ordering."""
+    return sorted(results, key=lambda result: repr(sorted(result.items())))
+
+
+class InterpreterTests(unittest.TestCase):
+    def setUp(self):
+        """Create the same graph of animals in SQLite and in memory."""
+        animals = [
+            {"uuid": 1, "name": "Animal 1", "birthday": datetime.date(2001, 1, 1), "parent": None},
+            {"uuid": 2, "name": "Animal 2", "birthday": datetime.date(2002, 1, 1), "parent": 1},
+            {"uuid": 3, "name": "Animal 3", "birthday": datetime.date(2003, 1, 1), "parent": 1},
+            {"uuid": 4, "name": "Animal 4", "birthday": datetime.date(2004, 1, 1), "parent": 2},
+            {"uuid": 5, "name": "Animal 5", "birthday": datetime.date(2005, 1, 1), "parent": 4},
+        ]
+
+        self.engine = sqlalchemy.create_engine("sqlite://")
+        metadata = sqlalchemy.MetaData()
+        animal_table = sqlalchemy.Table(
+            "Animal",
+            metadata,
+            sqlalchemy.Column("uuid", sqlalchemy.Integer, primary_key=True),
+            sqlalchemy.Column("name", sqlalchemy.String(40), nullable=False),
+            sqlalchemy.Column("birthday", sqlalchemy.Date, nullable=False),
+            sqlalchemy.Column("parent", sqlalchemy.Integer, nullable=True),
+        )
+        metadata.create_all(self.engine)
+        self.engine.execute(animal_table.insert(), animals)
+        self.sql_schema_info = get_sqlalchemy_schema_info(
+            {"Animal": animal_table},
+            {"Animal_ParentOf": DirectEdgeDescriptor("Animal", "uuid", "Animal", "parent")},
+            self.engine.dialect,
+        )
+        self.common_schema_info = CommonSchemaInfo(
+            self.sql_schema_info.schema, self.sql_schema_info.type_equivalence_hints
+        )
+
+        self.graph = InMemoryGraph()
+        for animal in animals:
+            properties = {key: value for key, value in animal.items() if key != "parent"}
+            self.graph.add_vertex("Animal", animal["uuid"], properties)
+        for animal in animals:
+            if animal["parent"] is not None:
+                self.graph.add_edge("Animal_ParentOf", animal["parent"], animal["uuid"])
+
+    def _execute_interpreter(self, graphql_query, arguments):
+        """Return the results of the query over the in-memory graph."""
+        compilation_result = compile_graphql_to_interpreter(self.common_schema_info, graphql_query)
+        return list(execute_query(self.graph, compilation_result, arguments))
+
+    def _execute_sql(self, graphql_query, arguments):
+        """Return the results of the query over the SQLite database."""
+        compilation_result = compile_graphql_to_sql(self.sql_schema_info, graphql_query)
+        query = insert_arguments_into_query(compilation_result, arguments)
+        return [dict(row) for row in self.engine.execute(query)]
+
+    def _assert_same_results_as_sql(self, graphql_query, arguments, expected_results):
+        """Assert that the interpreter and SQLite both produce the expected results."""
+        self.assertEqual(
+            _sort_results(expected_results),
+            _sort_results(self._execute_sql(graphql_query, arguments)),
+        )
+        self.assertEqual(
+            _sort_results(expected_results),
+            _sort_results(self._execute_interpreter(graphql_query, arguments)),
+        )
+
+    def test_filters_and_traversals(self):
+        graphql_query = """{
+            Animal {
+                name @output(out_name: "name")
+                birthday @filter(op_name: "<", value: ["$birthday"])
+                out_Animal_ParentOf {
+                    name @output(out_name: "child_name")
+                         @filter(op_name: "has_substring", value: ["$substring"])
+                }
+            }
+        }"""
+        arguments = {"birthday": datetime.date(2003, 1, 1), "substring": "2"}
+        expected_results = [{"name": "Animal 1", "child_name": "Animal 2"}]
+        self._assert_same_results_as_sql(graphql_query, arguments, expected_results)
+
+    def test_optional_traversal_and_tags(self):
+        graphql_query = """{
+            Animal {
+                name @output(out_name: "name")
+                birthday @tag(tag_name: "birthday")
+                out_Animal_ParentOf @optional {
+                    name @output(out_name: "child_name")
+                    birthday @filter(op_name: ">", value: ["%birthday"])
+                }
+            }
+        }"""
+        expected_results = [
+            {"name": "Animal 1", "child_name": "Animal 2"},
+            {"name": "Animal 1", "child_name": "Animal 3"},
+            {"name": "Animal 2", "child_name": "Animal 4"},
+            {"name": "Animal 3", "child_name": None},
+            {"name": "Animal 4", "child_name": "Animal 5"},
+            {"name": "Animal 5", "child_name": None},
+        ]
+        self._assert_same_results_as_sql(graphql_query, {}, expected_results)
+
+    def test_recurse(self):
+        graphql_query = """{
+            Animal {
+                name @output(out_name: "name")
+                     @filter(op_name: "=", value: ["$name"])
+                out_Animal_ParentOf @recurse(depth: 2) {
+                    name @output(out_name: "descendant_name")
+                }
+            }
+        }"""
+        expected_results = [
+            {"name": "Animal 2", "descendant_name": "Animal 2"},
+            {"name": "Animal 2", "descendant_name": "Animal 4"},
+            {"name": "Animal 2", "descendant_name": "Animal 5"},
+        ]
+        self._assert_same_results_as_sql(graphql_query, {"name": "Animal 2"}, expected_results)
+
+    def test_fold(self):
+        graphql_query = """{
+            Animal {
+                name @output(out_name: "name")
+                     @filter(op_name: "in_collection", value: ["$names"])
+                out_Animal_ParentOf @fold {
+                    _x_count @output(out_name: "child_count")
+                    name @output(out_name: "child_names")
+                }
+            }
+        }"""
+        results = self._execute_interpreter(graphql_query, {"names": ["Animal 1", "Animal 5"]})
+        self.assertEqual(
+            _sort_results(
+                [
+                    {"name": "Animal 1", "child_count": 2, "child_names": ["Animal 2", "Animal 3"]},
+                    {"name": "Animal 5", "child_count": 0, "child_names": []},
+                ]
+            ),
+            _sort_results(results),
+        )
+
+    def test_index_lookups_give_the_same_results(self):
+        graphql_query = """{
+            Animal {
+                name @output(out_name: "name")
+                     @filter(op_name: "in_collection", value: ["$names"])
+                birthday @filter(op_name: ">=", value: ["$birthday"])
+            }
+        }"""
+        arguments = {
+            "names": ["Animal 1", "Animal 3", "Animal 4", "Animal 6"],
+            "birthday": datetime.date(2003, 1, 1),
+        }
+        expected_results = [{"name": "Animal 3"}, {"name": "Animal 4"}]
+        self.assertEqual(
+            expected_results, _sort_results(self._execute_interpreter(graphql_query, arguments))
+        )
+
+        # Either filter may be answered by an index, with the other one applied afterwards.
+        self.graph.create_property_index("Animal", "birthday", kind=SORTED_INDEX)
+        self.assertEqual(
+            expected_results, _sort_results(self._execute_interpreter(graphql_query, arguments))
+        )
+        self.graph.create_property_index("Animal", "name", kind=HASH_INDEX)
+        self.assertEqual(
+            expected_results, _sort_results(self._execute_interpreter(graphql_query, arguments))
+        )
+
+        # Indexes are kept up to date as vertices are added.
+        self.graph.add_vertex(
+            "Animal", 6, {"name": "Animal 6", "birthday": datetime.date(2006, 1, 1)}
+        )
+        self.assertEqual(
+            expected_results + [{"name": "Animal 6"}],
+            _sort_results(self._execute_interpreter(graphql_query, arguments)),
+        )
+        self.assertEqual(
+            [self.graph.get_vertex(1)],
+            self.graph.find_vertices({"Animal"}, "birthday", "<", datetime.date(2002, 1, 1)),
+        )
+        self.assertIsNone(self.graph.find_vertices({"Animal"}, "uuid", "=", 1))
+
+    def test_invalid_arguments(self):
+        graphql_query = """{
+            Animal {
+                name @output(out_name: "name")
+                     @filter(op_name: "=", value: ["$name"])
+            }
+        }"""
+        compilation_result = compile_graphql_to_interpreter(self.common_schema_info, graphql_query)
+        with self.assertRaises(GraphQLInvalidArgumentError):
+            execute_query(self.graph, compilation_result, {})
+        with self.assertRaises(GraphQLInvalidArgumentError):
+            execute_query(self.graph, compilation_result, {"name": 1})
+
+        sql_compilation_result = compile_graphql_to_sql(self.sql_schema_info, graphql_query)
+        with self.assertRaises(AssertionError):
+            execute_query(self.graph, sql_compilation_result, {"name": "Animal 1"})
+
+    def test_type_coercion_and_typename(self):
+        graph = InMemoryGraph()
+        graph.add_vertex("Animal", "a1", {"name": "Animal 1"})
+        graph.add_vertex("Species", "s1", {"name": "Species 1", "limbs": 4})
+        graph.add_vertex("Food", "f1", {"name": "Food 1"})
+        graph.add_edge("Entity_Related", "a1", "s1")
+        graph.add_edge("Entity_Related", "a1", "f1")
+        graphql_query = """{
+            Entity {
+                name @output(out_name: "name")
+                __typename @output(out_name: "type")
+                out_Entity_Related {
+                    ... on Species {
+                        name @output(out_name: "related_species")
+                        limbs @output(out_name: "limbs")
+                    }
+                }
+            }
+        }"""
+        compilation_result = compile_graphql_to_interpreter(get_common_schema_info(), graphql_query)
+        self.assertEqual(
+            [{"name": "Animal 1", "type": "Animal", "related_species": "Species 1", "limbs": 4}],
+            list(execute_query(graph, compilation_result, {})),
+        )
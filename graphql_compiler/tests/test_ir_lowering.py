@@ -2,9 +2,9 @@
 from pprint import pformat
 import unittest
 
-from graphql import GraphQLID, GraphQLString
+from graphql import GraphQLID, GraphQLList, GraphQLString
 
-from ..compiler import ir_lowering_gremlin, ir_lowering_match, ir_sanity_checks
+from ..compiler import ir_lowering_match, ir_sanity_checks
 from ..compiler.blocks import (
     Backtrack,
     CoerceType,
@@ -15,6 +15,7 @@ from ..compiler.blocks import (
     QueryRoot,
     Traverse,
 )
+from ..compiler.compiler_entities import InterningTable
 from ..compiler.compiler_frontend import IrAndMetadata, OutputMetadata
 from ..compiler.expressions import (
     BinaryComposition,
@@ -33,10 +34,22 @@ from ..compiler.expressions import (
 )
 from ..compiler.helpers import Location
 from ..compiler.ir_lowering_common.common import (
+    LOWER_CONTEXT_FIELD_EXISTENCE_RULE,
+    MERGE_CONSECUTIVE_FILTER_CLAUSES_PASS,
+    OPTIMIZE_BOOLEAN_EXPRESSION_COMPARISONS_RULE,
     OutputContextVertex,
+    intern_ir_block_expressions,
+    lower_context_field_existence,
     merge_consecutive_filter_clauses,
     optimize_boolean_expression_comparisons,
 )
+from ..compiler.ir_lowering_common.pass_manager import IrLoweringPassManager
+from ..compiler.ir_lowering_match.ir_lowering import (
+    LOWER_STRING_OPERATORS_RULE,
+    REWRITE_BINARY_COMPOSITION_INSIDE_TERNARY_CONDITIONAL_RULE,
+    lower_string_operators,
+    rewrite_binary_composition_inside_ternary_conditional,
+)
 from ..compiler.ir_lowering_match.utils import BetweenClause, CompoundMatchQuery
 from ..compiler.match_query import MatchQuery, convert_to_match_query
 from ..compiler.metadata import LocationInfo, QueryMetadataTable
@@ -105,6 +118,220 @@ class CommonIrLoweringTests(unittest.TestCase):
             actual_ir_blocks = optimize_boolean_expression_comparisons(ir_blocks)
             check_test_data(self, expected_ir_blocks, actual_ir_blocks)
 
+    def test_structural_hashing(self):
+        base_location = Location(("Animal",))
+        name_location = base_location.navigate_to_field("name")
+
+        def make_predicate():
+            """Return a new predicate object, equal to all others returned by this function."""
+            return BinaryComposition(
+                "&&",
+                BinaryComposition(
+                    "=", LocalField("name", GraphQLString), Variable("$name", GraphQLString)
+                ),
+                BinaryComposition(
+                    "contains",
+                    Variable("$names", GraphQLList(GraphQLString)),
+                    ContextField(name_location, GraphQLString),
+                ),
+            )
+
+        first_predicate = make_predicate()
+        second_predicate = make_predicate()
+        self.assertIsNot(first_predicate, second_predicate)
+        self.assertEqual(first_predicate, second_predicate)
+        self.assertEqual(hash(first_predicate), hash(second_predicate))
+        self.assertEqual(hash(Filter(first_predicate)), hash(Filter(second_predicate)))
+        self.assertEqual(
+            hash(ConstructResult({"name": OutputContextField(name_location, GraphQLString)})),
+            hash(ConstructResult({"name": OutputContextField(name_location, GraphQLString)})),
+        )
+        self.assertEqual(hash(Literal(["a", "b"])), hash(Literal(["a", "b"])))
+
+        different_predicate = BinaryComposition(
+            "=", LocalField("name", GraphQLString), Variable("$other_name", GraphQLString)
+        )
+        self.assertNotEqual(first_predicate, different_predicate)
+        self.assertEqual(
+            {first_predicate, different_predicate},
+            {second_predicate, different_predicate, first_predicate},
+        )
+
+    def test_merge_consecutive_filter_clauses_drops_duplicates(self):
+        base_location = Location(("Animal",))
+        name_filter = Filter(
+            BinaryComposition(
+                "=", LocalField("name", GraphQLString), Variable("$name", GraphQLString)
+            )
+        )
+        color_filter = Filter(
+            BinaryComposition(
+                "=", LocalField("color", GraphQLString), Variable("$color", GraphQLString)
+            )
+        )
+        ir_blocks = [
+            QueryRoot({"Animal"}),
+            name_filter,
+            color_filter,
+            Filter(name_filter.predicate.visit_and_update(lambda expression: expression)),
+            MarkLocation(base_location),
+            name_filter,
+            ConstructResult({}),
+        ]
+        expected_final_blocks = [
+            QueryRoot({"Animal"}),
+            Filter(BinaryComposition("&&", name_filter.predicate, color_filter.predicate)),
+            MarkLocation(base_location),
+            name_filter,
+            ConstructResult({}),
+        ]
+
+        final_blocks = merge_consecutive_filter_clauses(ir_blocks)
+        check_test_data(self, expected_final_blocks, final_blocks)
+
+    def test_intern_ir_block_expressions(self):
+        base_location = Location(("Animal",))
+        name_location = base_location.navigate_to_field("name")
+        ir_blocks = [
+            QueryRoot({"Animal"}),
+            Filter(
+                BinaryComposition(
+                    "=", LocalField("name", GraphQLString), Variable("$name", GraphQLString)
+                )
+            ),
+            Filter(
+                BinaryComposition(
+                    "=", LocalField("name", GraphQLString), Variable("$name", GraphQLString)
+                )
+            ),
+            MarkLocation(base_location),
+            ConstructResult(
+                {
+                    "first_name": OutputContextField(name_location, GraphQLString),
+                    "second_name": OutputContextField(name_location, GraphQLString),
+                }
+            ),
+        ]
+
+        interning_table = InterningTable()
+        final_blocks = intern_ir_block_expressions(ir_blocks, interning_table=interning_table)
+        check_test_data(self, ir_blocks, final_blocks)
+
+        self.assertIs(final_blocks[1].predicate, final_blocks[2].predicate)
+        self.assertIs(final_blocks[4].fields["first_name"], final_blocks[4].fields["second_name"])
+        # LocalField, Variable, BinaryComposition and OutputContextField.
+        self.assertEqual(4, len(interning_table))
+
+    def test_pass_manager_fuses_compatible_passes(self):
+        pass_manager = IrLoweringPassManager(
+            [
+                LOWER_CONTEXT_FIELD_EXISTENCE_RULE,
+                OPTIMIZE_BOOLEAN_EXPRESSION_COMPARISONS_RULE,
+                REWRITE_BINARY_COMPOSITION_INSIDE_TERNARY_CONDITIONAL_RULE,
+                MERGE_CONSECUTIVE_FILTER_CLAUSES_PASS,
+                LOWER_STRING_OPERATORS_RULE,
+            ]
+        )
+        expected_fusion_groups = [
+            ["lower_context_field_existence", "optimize_boolean_expression_comparisons"],
+            # This rule produces BinaryCompositions, which trigger the previous rule.
+            ["rewrite_binary_composition_inside_ternary_conditional"],
+            ["merge_consecutive_filter_clauses"],
+            ["lower_string_operators"],
+        ]
+        self.assertEqual(
+            expected_fusion_groups,
+            [
+                [lowering_pass.name for lowering_pass in fusion_group]
+                for fusion_group in pass_manager.fusion_groups
+            ],
+        )
+
+    def test_pass_manager_matches_sequential_passes(self):
+        base_location = Location(("Animal",))
+        child_location = base_location.navigate_to_subpath("out_Animal_ParentOf")
+        animal_graphql_type = self.schema.get_type("Animal")
+        query_metadata_table = QueryMetadataTable(
+            base_location, LocationInfo(None, animal_graphql_type, None, 0, 0, False)
+        )
+        query_metadata_table.register_location(
+            child_location, LocationInfo(base_location, animal_graphql_type, None, 1, 0, False)
+        )
+
+        ir_blocks = [
+            QueryRoot({"Animal"}),
+            MarkLocation(base_location),
+            Traverse("out", "Animal_ParentOf", optional=True),
+            MarkLocation(child_location),
+            EndOptional(),
+            Backtrack(base_location, optional=True),
+            Filter(BinaryComposition("=", ContextFieldExistence(child_location), FalseLiteral)),
+            Filter(
+                BinaryComposition(
+                    "=", LocalField("name", GraphQLString), Variable("$name", GraphQLString)
+                )
+            ),
+            ConstructResult({"child_exists": ContextFieldExistence(child_location)}),
+        ]
+        expected_final_blocks = merge_consecutive_filter_clauses(
+            optimize_boolean_expression_comparisons(
+                lower_context_field_existence(ir_blocks, query_metadata_table)
+            )
+        )
+
+        pass_manager = IrLoweringPassManager(
+            [
+                LOWER_CONTEXT_FIELD_EXISTENCE_RULE,
+                OPTIMIZE_BOOLEAN_EXPRESSION_COMPARISONS_RULE,
+                MERGE_CONSECUTIVE_FILTER_CLAUSES_PASS,
+                LOWER_STRING_OPERATORS_RULE,
+            ]
+        )
+        result = pass_manager.run(ir_blocks, query_metadata_table)
+        check_test_data(self, expected_final_blocks, result.ir_blocks)
+        self.assertEqual(
+            [
+                "lower_context_field_existence",
+                "optimize_boolean_expression_comparisons",
+                "merge_consecutive_filter_clauses",
+                "lower_string_operators",
+            ],
+            result.run_passes,
+        )
+        self.assertEqual([], result.skipped_passes)
+
+    def test_pass_manager_skips_passes_without_triggers(self):
+        base_location = Location(("Animal",))
+        query_metadata_table = QueryMetadataTable(
+            base_location, LocationInfo(None, self.schema.get_type("Animal"), None, 0, 0, False)
+        )
+        ir_blocks = [
+            QueryRoot({"Animal"}),
+            MarkLocation(base_location),
+            ConstructResult(
+                {"name": OutputContextField(base_location.navigate_to_field("name"), GraphQLString)}
+            ),
+        ]
+
+        pass_manager = IrLoweringPassManager(
+            [
+                LOWER_CONTEXT_FIELD_EXISTENCE_RULE,
+                OPTIMIZE_BOOLEAN_EXPRESSION_COMPARISONS_RULE,
+                MERGE_CONSECUTIVE_FILTER_CLAUSES_PASS,
+            ]
+        )
+        result = pass_manager.run(ir_blocks, query_metadata_table)
+        check_test_data(self, ir_blocks, result.ir_blocks)
+        self.assertEqual(
+            [
+                "lower_context_field_existence",
+                "optimize_boolean_expression_comparisons",
+                "merge_consecutive_filter_clauses",
+            ],
+            result.skipped_passes,
+        )
+        self.assertEqual([], result.run_passes)
+
 
 class MatchIrLoweringTests(unittest.TestCase):
     def setUp(self):
@@ -161,9 +388,7 @@ class MatchIrLoweringTests(unittest.TestCase):
             }
         )
 
-        final_blocks = ir_lowering_match.lower_context_field_existence(
-            ir_blocks, query_metadata_table
-        )
+        final_blocks = lower_context_field_existence(ir_blocks, query_metadata_table)
         check_test_data(self, expected_final_blocks, final_blocks)
 
     def test_context_field_existence_lowering_in_filter(self):
@@ -244,9 +469,7 @@ class MatchIrLoweringTests(unittest.TestCase):
             ),
         ]
 
-        final_blocks = ir_lowering_match.lower_context_field_existence(
-            ir_blocks, query_metadata_table
-        )
+        final_blocks = lower_context_field_existence(ir_blocks, query_metadata_table)
         check_test_data(self, expected_final_blocks, final_blocks)
 
     def test_backtrack_block_lowering_simple(self):
@@ -733,9 +956,7 @@ class MatchIrLoweringTests(unittest.TestCase):
             )
         ]
 
-        final_blocks = ir_lowering_match.rewrite_binary_composition_inside_ternary_conditional(
-            special_ir_block
-        )
+        final_blocks = rewrite_binary_composition_inside_ternary_conditional(special_ir_block)
         check_test_data(self, expected_final_blocks, final_blocks)
 
     def test_lower_has_substring_binary_compositions(self):
@@ -778,7 +999,7 @@ class MatchIrLoweringTests(unittest.TestCase):
             )
         ]
 
-        final_block = ir_lowering_match.lower_string_operators(special_ir_block)
+        final_block = lower_string_operators(special_ir_block)
         check_test_data(self, expected_final_blocks, final_block)
 
     def test_between_lowering_inverted_inequalities(self):
@@ -1007,7 +1228,5 @@ class GremlinIrLoweringTests(unittest.TestCase):
             )
         )
 
-        final_blocks = ir_lowering_gremlin.lower_context_field_existence(
-            ir_blocks, query_metadata_table
-        )
+        final_blocks = lower_context_field_existence(ir_blocks, query_metadata_table)
         check_test_data(self, expected_final_blocks, final_blocks)
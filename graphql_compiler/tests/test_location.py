@@ -1,4 +1,6 @@
 # Copyright 2017-present Kensho Technologies, LLC.
+from copy import deepcopy
+import pickle
 from typing import List
 import unittest
 
@@ -111,3 +113,55 @@ class LocationTests(unittest.TestCase):
         ]
 
         compare_sorted_locations_list(self, sorted_locations)
+
+    def test_location_navigation_reuses_location_objects(self) -> None:
+        base_location = Location(("Animal",))
+        child_location = base_location.navigate_to_subpath("out_Animal_ParentOf")
+        self.assertIs(child_location, base_location.navigate_to_subpath("out_Animal_ParentOf"))
+        self.assertIs(child_location.revisit(), child_location.revisit())
+
+        field_location = child_location.navigate_to_field("name")
+        self.assertIs(field_location, child_location.navigate_to_field("name"))
+        self.assertIs(child_location, field_location.at_vertex())
+
+        fold_location = base_location.navigate_to_fold("out_Animal_ParentOf")
+        self.assertIs(fold_location, base_location.navigate_to_fold("out_Animal_ParentOf"))
+        fold_child_location = fold_location.navigate_to_subpath("in_Animal_OfSpecies")
+        self.assertIs(fold_child_location, fold_location.navigate_to_subpath("in_Animal_OfSpecies"))
+        fold_field_location = fold_child_location.navigate_to_field("name")
+        self.assertIs(fold_field_location, fold_child_location.navigate_to_field("name"))
+        self.assertIs(fold_child_location, fold_field_location.at_vertex())
+
+        # Locations constructed independently are still equal to the navigated ones.
+        self.assertEqual(Location(("Animal", "out_Animal_ParentOf"), "name"), field_location)
+        self.assertEqual(
+            hash(Location(("Animal", "out_Animal_ParentOf"), "name")), hash(field_location)
+        )
+        self.assertEqual(Location(("Animal", "out_Animal_ParentOf")), field_location.at_vertex())
+
+    def test_locations_are_immutable(self) -> None:
+        location = Location(("Animal",), "name")
+        fold_scope_location = FoldScopeLocation(
+            Location(("Animal",)), (("out", "Animal_ParentOf"),)
+        )
+
+        with self.assertRaises(AttributeError):
+            location.field = "uuid"  # type: ignore
+        with self.assertRaises(AttributeError):
+            fold_scope_location.fold_path = ()  # type: ignore
+        with self.assertRaises(AttributeError):
+            location.unknown_attribute = 1  # type: ignore
+
+        self.assertIs(location, deepcopy(location))
+        self.assertIs(fold_scope_location, deepcopy(fold_scope_location))
+
+    def test_location_pickling(self) -> None:
+        locations = [
+            Location(("Animal",)),
+            Location(("Animal", "out_Animal_ParentOf"), "name", 2),
+            FoldScopeLocation(Location(("Animal",)), (("out", "Animal_ParentOf"),), "name"),
+        ]
+        for location in locations:
+            unpickled_location = pickle.loads(pickle.dumps(location))
+            self.assertEqual(location, unpickled_location)
+            self.assertEqual(hash(location), hash(unpickled_location))
@@ -0,0 +1,252 @@
+# Copyright 2020-present Kensho Technologies, LLC.
+from collections import namedtuple
+import threading
+import time
+import unittest
+
+import sqlalchemy
+
+from .. import get_sqlalchemy_schema_info
+from ..api import ConnectionPool, PooledQueryExecutor, QueryBackend
+from ..api.redisgraph import RedisGraphQueryBackend
+from ..api.sql import SqlQueryBackend
+from ..compiler import compile_graphql_to_match
+from ..exceptions import GraphQLInvalidArgumentError
+from ..schema_generation.sqlalchemy.edge_descriptors import DirectEdgeDescriptor
+from .test_helpers import get_common_schema_info
+
+
+GRAPHQL_QUERY = """{
+    Animal {
+        name @output(out_name: "name")
+             @filter(op_name: "=", value: ["$name"])
+    }
+}"""
+
+
+class _FakeConnection(object):
+    def __init__(self, connection_id):
+        """Create an open, healthy fake connection."""
+        self.connection_id = connection_id
+        self.healthy = True
+        self.closed = False
+
+
+class _FakeBackend(QueryBackend):
+    def __init__(self):
+        """Create a fake backend, returning the id of the connection each query ran on."""
+        self.connections = []
+        self.failures = []  # Errors to raise on the next executions, in order.
+        self.release_execution = threading.Event()
+        self.release_execution.set()
+
+    def compile(self, graphql_query):
+        """Compile the query to MATCH, which the fake backend does not actually parse."""
+        return compile_graphql_to_match(get_common_schema_info(), graphql_query)
+
+    def connect(self):
+        """Return a new fake connection."""
+        connection = _FakeConnection(len(self.connections))
+        self.connections.append(connection)
+        return connection
+
+    def close(self, connection):
+        """Mark the fake connection as closed."""
+        connection.closed = True
+
+    def check_health(self, connection):
+        """Return whether the fake connection was marked as healthy."""
+        return connection.healthy
+
+    def execute(self, connection, compilation_result, bound_query):
+        """Wait until executions are released, and then fail or return the connection id."""
+        self.release_execution.wait()
+        if connection.closed:
+            raise AssertionError(f"Executing on a closed connection {connection}.")
+        if self.failures:
+            raise self.failures.pop(0)
+        return [{"connection_id": connection.connection_id}]
+
+    def is_connection_error(self, error):
+        """Return whether the error is a ConnectionError."""
+        return isinstance(error, ConnectionError)
+
+
+_RedisGraph1QueryResult = namedtuple("_RedisGraph1QueryResult", ("result_set",))
+_RedisGraph2QueryResult = namedtuple("_RedisGraph2QueryResult", ("header", "result_set"))
+
+
+class _FakeRedisGraphClient(object):
+    def __init__(self, query_result):
+        """Create a fake redisgraph Graph client, returning the given result for every query."""
+        self.query_result = query_result
+
+    def query(self, query):
+        """Return the result given to the client."""
+        return self.query_result
+
+
+class PooledExecutionTests(unittest.TestCase):
+    def test_sql_backend(self):
+        # All connections share the same in-memory database, and may be used from any thread.
+        engine = sqlalchemy.create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=sqlalchemy.pool.StaticPool,
+        )
+        metadata = sqlalchemy.MetaData()
+        animal_table = sqlalchemy.Table(
+            "Animal",
+            metadata,
+            sqlalchemy.Column("uuid", sqlalchemy.Integer, primary_key=True),
+            sqlalchemy.Column("name", sqlalchemy.String(40), nullable=False),
+            sqlalchemy.Column("parent", sqlalchemy.Integer, nullable=True),
+        )
+        metadata.create_all(engine)
+        engine.execute(
+            animal_table.insert(),
+            [
+                {"uuid": 1, "name": "Animal 1", "parent": None},
+                {"uuid": 2, "name": "Animal 2", "parent": 1},
+                {"uuid": 3, "name": "Animal 3", "parent": 1},
+            ],
+        )
+        sql_schema_info = get_sqlalchemy_schema_info(
+            {"Animal": animal_table},
+            {"Animal_ParentOf": DirectEdgeDescriptor("Animal", "uuid", "Animal", "parent")},
+            engine.dialect,
+        )
+        executor = PooledQueryExecutor(
+            SqlQueryBackend(sql_schema_info, engine),
+            pool_size=2,
+            prewarm_size=1,
+            health_check_interval=0,
+        )
+        self.addCleanup(executor.close)
+        self.assertEqual((2, 1, 1, 0), tuple(executor.get_pool_metrics()))
+
+        graphql_query = """{
+            Animal {
+                name @output(out_name: "name")
+                     @filter(op_name: "=", value: ["$name"])
+                out_Animal_ParentOf {
+                    name @output(out_name: "child_name")
+                }
+            }
+        }"""
+        results = executor.execute_query(graphql_query, {"name": "Animal 1"})
+        self.assertEqual(
+            [
+                {"name": "Animal 1", "child_name": "Animal 2"},
+                {"name": "Animal 1", "child_name": "Animal 3"},
+            ],
+            sorted(results, key=lambda result: result["child_name"]),
+        )
+        self.assertEqual(
+            [], executor.execute_query(graphql_query, {"name": "Animal 2"}, timeout=10)
+        )
+        self.assertIs(executor.compile(graphql_query), executor.compile(graphql_query))
+
+        with self.assertRaises(GraphQLInvalidArgumentError):
+            executor.execute_query(graphql_query, {"name": 1})
+        # Connections passing their health check are reused.
+        self.assertEqual((2, 1, 1, 0), tuple(executor.get_pool_metrics()))
+
+    def test_pool_reuses_connections_and_replaces_unhealthy_ones(self):
+        backend = _FakeBackend()
+        pool = ConnectionPool(
+            backend.connect,
+            backend.close,
+            backend.check_health,
+            max_size=2,
+            prewarm_size=2,
+            health_check_interval=0,
+        )
+        first_connection = pool.acquire()
+        second_connection = pool.acquire()
+        self.assertEqual(2, len(backend.connections))
+        with self.assertRaises(TimeoutError):
+            pool.acquire(timeout=0.01)
+
+        pool.release(second_connection)
+        self.assertIs(second_connection, pool.acquire())
+        pool.release(second_connection)
+
+        # Unhealthy connections are closed, and replaced with new ones.
+        second_connection.healthy = False
+        third_connection = pool.acquire()
+        self.assertTrue(second_connection.closed)
+        self.assertEqual(2, third_connection.connection_id)
+        self.assertEqual((2, 2, 0, 1), tuple(pool.get_metrics()))
+
+        # Waiting for a connection succeeds once another thread releases one.
+        threading.Timer(0.01, pool.release, args=(first_connection,)).start()
+        self.assertIs(first_connection, pool.acquire(timeout=10))
+
+        pool.release(first_connection)
+        pool.close()
+        self.assertTrue(first_connection.closed)
+        pool.release(third_connection)
+        self.assertTrue(third_connection.closed)
+        self.assertEqual(0, pool.get_metrics().size)
+        with self.assertRaises(AssertionError):
+            pool.acquire()
+
+    def test_retries_on_connection_errors(self):
+        backend = _FakeBackend()
+        executor = PooledQueryExecutor(backend, pool_size=1, max_retries=1)
+        self.addCleanup(executor.close)
+
+        backend.failures = [ConnectionError("Connection reset.")]
+        self.assertEqual(
+            [{"connection_id": 1}], executor.execute_query(GRAPHQL_QUERY, {"name": "Animal 1"})
+        )
+        self.assertTrue(backend.connections[0].closed)
+
+        # Other errors are not retried, and leave the connection in the pool.
+        backend.failures = [ValueError("Invalid query.")]
+        with self.assertRaises(ValueError):
+            executor.execute_query(GRAPHQL_QUERY, {"name": "Animal 1"})
+        self.assertFalse(backend.connections[1].closed)
+
+        backend.failures = [ConnectionError("Connection reset.")] * 2
+        with self.assertRaises(ConnectionError):
+            executor.execute_query(GRAPHQL_QUERY, {"name": "Animal 1"})
+        self.assertEqual(3, len(backend.connections))
+
+    def test_query_timeout(self):
+        backend = _FakeBackend()
+        executor = PooledQueryExecutor(backend, pool_size=1, query_timeout=0.05)
+        self.addCleanup(executor.close)
+        self.addCleanup(backend.release_execution.set)
+
+        backend.release_execution.clear()
+        start_time = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            executor.execute_query(GRAPHQL_QUERY, {"name": "Animal 1"})
+        self.assertLess(time.monotonic() - start_time, 5)
+
+        # The connection returns to the pool once the query completes on the backend.
+        backend.release_execution.set()
+        self.assertEqual(
+            [{"connection_id": 0}],
+            executor.execute_query(GRAPHQL_QUERY, {"name": "Animal 1"}, timeout=10),
+        )
+        self.assertEqual(1, len(backend.connections))
+
+    def test_redisgraph_result_layouts(self):
+        backend = RedisGraphQueryBackend(get_common_schema_info(), connect=None)
+        compilation_result = backend.compile(GRAPHQL_QUERY)
+        expected_results = [{"name": "Animal 1", "uuid": 1}, {"name": "Animal 2", "uuid": 2}]
+
+        # RedisGraph 1.x clients return the column names as the first row of the result set.
+        client = _FakeRedisGraphClient(
+            _RedisGraph1QueryResult([[b"name", b"uuid"], [b"Animal 1", 1], [b"Animal 2", 2]])
+        )
+        self.assertEqual(expected_results, backend.execute(client, compilation_result, ""))
+
+        # RedisGraph 2.x clients return them in the header, with their column types.
+        client = _FakeRedisGraphClient(
+            _RedisGraph2QueryResult([[1, "name"], [1, "uuid"]], [["Animal 1", 1], [b"Animal 2", 2]])
+        )
+        self.assertEqual(expected_results, backend.execute(client, compilation_result, ""))
@@ -1,5 +1,7 @@
 # Copyright 2019-present Kensho Technologies, LLC.
 import datetime
+from decimal import Decimal
+import sqlite3
 from unittest import TestCase
 
 from graphql import GraphQLBoolean, GraphQLFloat, GraphQLID, GraphQLInt, GraphQLList, GraphQLString
@@ -7,7 +9,13 @@ from graphql import GraphQLBoolean, GraphQLFloat, GraphQLID, GraphQLInt, GraphQL
 from graphql_compiler import GraphQLDate, GraphQLDateTime, GraphQLDecimal
 
 from ..compiler.compiler_frontend import OutputMetadata
-from ..post_processing.sql_post_processing import post_process_mssql_folds
+from ..compiler.emit_sql import JSON_PATH_FOLD_STRATEGY
+from ..post_processing.sql_post_processing import (
+    iterate_dbapi_cursor_results,
+    make_mssql_json_path_decoder,
+    post_process_mssql_folds,
+    stream_post_process_mssql_folds,
+)
 from .test_helpers import get_sqlalchemy_schema_info
 
 
@@ -464,3 +472,108 @@ class MssqlXmlPathTests(TestCase):
 
         with self.assertRaises(AssertionError):
             post_process_mssql_folds(query_output, output_metadata)
+
+    def test_convert_uncommon_ampersand_escapes(self):
+        """Test ampersand escapes other than the ones XML PATH usually produces are decoded."""
+        query_output = [{"child_names": "|&#x1F600;^e&#x0D;|&quot;&amp;lt;&#x26;|&x^d"}]
+        output_metadata = {
+            "child_names": OutputMetadata(
+                type=GraphQLList(GraphQLString), optional=False, folded=True
+            ),
+        }
+        expected_result = [{"child_names": ["\U0001F600^\r", '"&lt;&', "&x|"]}]
+
+        post_process_mssql_folds(query_output, output_metadata)
+        self.assertEqual(query_output, expected_result)
+
+    def test_stream_post_processing(self):
+        """Test results are lazily decoded into new dicts, leaving the input unchanged."""
+        query_output = [
+            {"name": "Animal 1", "child_net_worths": "|200|~", "child_count": 2},
+            {"name": "Animal 2", "child_net_worths": "", "child_count": 0},
+        ]
+        output_metadata = {
+            "name": OutputMetadata(type=GraphQLString, optional=False, folded=False),
+            "child_net_worths": OutputMetadata(
+                type=GraphQLList(GraphQLInt), optional=False, folded=True
+            ),
+            "child_count": OutputMetadata(type=GraphQLInt, optional=False, folded=True),
+        }
+        expected_result = [
+            {"name": "Animal 1", "child_net_worths": [200, None], "child_count": 2},
+            {"name": "Animal 2", "child_net_worths": [], "child_count": 0},
+        ]
+
+        result_iterator = stream_post_process_mssql_folds(iter(query_output), output_metadata)
+        self.assertEqual(expected_result[0], next(result_iterator))
+        self.assertEqual(expected_result[1:], list(result_iterator))
+        self.assertEqual("|200|~", query_output[0]["child_net_worths"])
+
+    def test_post_processing_with_fold_strategy(self):
+        """Test fold results are decoded according to the fold strategy of the query."""
+        output_metadata = {
+            "child_names": OutputMetadata(
+                type=GraphQLList(GraphQLString), optional=False, folded=True
+            ),
+        }
+        json_path_output = [{"child_names": '[{"value":"Animal|1"},{"value":null}]'}]
+        expected_result = [{"child_names": ["Animal|1", None]}]
+
+        self.assertEqual(
+            expected_result,
+            list(
+                stream_post_process_mssql_folds(
+                    json_path_output, output_metadata, JSON_PATH_FOLD_STRATEGY
+                )
+            ),
+        )
+        post_process_mssql_folds(json_path_output, output_metadata, JSON_PATH_FOLD_STRATEGY)
+        self.assertEqual(expected_result, json_path_output)
+
+    def test_stream_post_processing_from_dbapi_cursor(self):
+        """Test results can be streamed directly from a DBAPI cursor."""
+        connection = sqlite3.connect(":memory:")
+        self.addCleanup(connection.close)
+        cursor = connection.cursor()
+        cursor.execute(
+            "SELECT 'Animal 1' AS name, '|Animal 2|^d^e' AS child_names "
+            "UNION ALL SELECT 'Animal 3', '|~' "
+            "UNION ALL SELECT 'Animal 4', ''"
+        )
+        output_metadata = {
+            "name": OutputMetadata(type=GraphQLString, optional=False, folded=False),
+            "child_names": OutputMetadata(
+                type=GraphQLList(GraphQLString), optional=False, folded=True
+            ),
+        }
+        expected_result = [
+            {"name": "Animal 1", "child_names": ["Animal 2", "|^"]},
+            {"name": "Animal 3", "child_names": [None]},
+            {"name": "Animal 4", "child_names": []},
+        ]
+
+        results = stream_post_process_mssql_folds(
+            iterate_dbapi_cursor_results(cursor, batch_size=2), output_metadata
+        )
+        self.assertEqual(expected_result, list(results))
+
+    def test_json_path_decoding(self):
+        """Test JSON PATH fold results are decoded to lists of the appropriate type."""
+        self.assertEqual(
+            ["^complex&|~name\x06", None, "", "<simple name>"],
+            make_mssql_json_path_decoder(GraphQLString)(
+                '[{"value":"^complex&|~name\\u0006"},{"value":null},{"value":""},'
+                '{"value":"<simple name>"}]'
+            ),
+        )
+        self.assertEqual(
+            [Decimal("200.10000000000000000001"), None],
+            make_mssql_json_path_decoder(GraphQLDecimal)(
+                '[{"value":200.10000000000000000001},{"value":null}]'
+            ),
+        )
+        self.assertEqual(
+            [datetime.date(2020, 1, 1)],
+            make_mssql_json_path_decoder(GraphQLDate)('[{"value":"2020-01-01"}]'),
+        )
+        self.assertEqual([], make_mssql_json_path_decoder(GraphQLInt)("[]"))
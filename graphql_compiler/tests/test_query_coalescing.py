@@ -0,0 +1,162 @@
+# Copyright 2020-present Kensho Technologies, LLC.
+import asyncio
+from decimal import Decimal
+from functools import partial
+import threading
+import time
+import unittest
+
+from ..compiler import compile_graphql_to_match
+from ..exceptions import GraphQLInvalidArgumentError
+from ..query_coalescing import AsyncSingleFlightQueryExecutor, SingleFlightQueryExecutor
+from .test_helpers import get_common_schema_info
+
+
+GRAPHQL_QUERY = """{
+    Animal {
+        name @output(out_name: "name")
+             @filter(op_name: "in_collection", value: ["$names"])
+        net_worth @filter(op_name: ">=", value: ["$net_worth"])
+    }
+}"""
+
+
+class QueryCoalescingTests(unittest.TestCase):
+    def setUp(self):
+        """Set up a compile function, and a record of the executions made on the backend."""
+        self.compile_query = partial(compile_graphql_to_match, get_common_schema_info())
+        self.executed_arguments = []
+
+    def _wait_for_requests(self, executor, expected_requests):
+        """Wait until the executor has received the expected number of requests."""
+        deadline = time.time() + 10
+        while executor.get_metrics().requests < expected_requests:
+            if time.time() > deadline:
+                raise AssertionError(f"Timed out waiting for requests: {executor.get_metrics()}")
+            time.sleep(0.001)
+
+    def test_coalesce_threads(self):
+        release_execution = threading.Event()
+
+        def execute(compilation_result, arguments):
+            """Record the arguments, and block until released."""
+            self.executed_arguments.append(arguments)
+            release_execution.wait()
+            return [{"name": name} for name in sorted(arguments["names"])]
+
+        executor = SingleFlightQueryExecutor(self.compile_query, execute)
+        # Equivalent serialized arguments, which are coalesced into a single execution.
+        all_arguments = [
+            {"names": ["a", "b"], "net_worth": 5},
+            {"names": ["b", "a"], "net_worth": "5.0"},
+            {"names": ["a", "b", "b"], "net_worth": "5"},
+            {"names": ["a", "b"], "net_worth": 5.0},
+        ]
+        all_results = [None] * len(all_arguments)
+
+        def request(index):
+            """Execute the query with the arguments at the index, and record the results."""
+            all_results[index] = executor.execute_query(GRAPHQL_QUERY, all_arguments[index])
+
+        threads = [threading.Thread(target=request, args=(index,)) for index in range(4)]
+        for thread in threads:
+            thread.start()
+        self._wait_for_requests(executor, len(threads))
+        metrics = executor.get_metrics()
+        self.assertEqual((4, 1, 3, 1), tuple(metrics))
+
+        release_execution.set()
+        for thread in threads:
+            thread.join()
+
+        # All requests share the same results, and the backend got the deserialized arguments.
+        self.assertEqual([{"name": "a"}, {"name": "b"}], all_results[0])
+        for results in all_results:
+            self.assertIs(all_results[0], results)
+        self.assertEqual(1, len(self.executed_arguments))
+        self.assertEqual(Decimal(5), self.executed_arguments[0]["net_worth"])
+        self.assertIsInstance(self.executed_arguments[0]["net_worth"], Decimal)
+
+        # Completed executions are not shared with later requests.
+        executor.execute_query(GRAPHQL_QUERY, all_arguments[0])
+        self.assertEqual((5, 2, 3, 0), tuple(executor.get_metrics()))
+
+        with self.assertRaises(GraphQLInvalidArgumentError):
+            executor.execute_query(GRAPHQL_QUERY, {"names": ["a"]})
+        with self.assertRaises(GraphQLInvalidArgumentError):
+            executor.execute_query(GRAPHQL_QUERY, {"names": ["a"], "net_worth": True})
+        self.assertIs(executor.compile(GRAPHQL_QUERY), executor.compile(GRAPHQL_QUERY))
+
+    def test_coalesced_threads_share_errors(self):
+        release_execution = threading.Event()
+
+        def execute(compilation_result, arguments):
+            """Block until released, then fail."""
+            self.executed_arguments.append(arguments)
+            release_execution.wait()
+            raise RuntimeError("Database unavailable.")
+
+        executor = SingleFlightQueryExecutor(self.compile_query, execute)
+        errors = []
+
+        def request():
+            """Execute the query, and record the error it raises."""
+            try:
+                executor.execute_query(GRAPHQL_QUERY, {"names": ["a"], "net_worth": 1})
+            except RuntimeError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=request) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        self._wait_for_requests(executor, len(threads))
+        release_execution.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(3, len(errors))
+        self.assertEqual(1, len(self.executed_arguments))
+        self.assertEqual(0, executor.get_metrics().in_flight)
+
+    def test_coalesce_coroutines(self):
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+
+        async def execute(compilation_result, arguments):
+            """Record the arguments, and yield to the event loop before returning results."""
+            self.executed_arguments.append(arguments)
+            await asyncio.sleep(0.01)
+            return [{"name": name} for name in sorted(arguments["names"])]
+
+        executor = AsyncSingleFlightQueryExecutor(self.compile_query, execute)
+
+        async def run_queries():
+            """Run identical and different queries concurrently, and check the results."""
+            first_request = asyncio.ensure_future(
+                executor.execute_query(GRAPHQL_QUERY, {"names": ["a"], "net_worth": 1})
+            )
+            all_results = await asyncio.gather(
+                executor.execute_query(GRAPHQL_QUERY, {"names": ["a"], "net_worth": "1"}),
+                executor.execute_query(GRAPHQL_QUERY, {"names": ["b"], "net_worth": 1}),
+                executor.execute_query(GRAPHQL_QUERY, {"names": ["a"], "net_worth": 1.0}),
+            )
+            self.assertEqual(
+                [[{"name": "a"}], [{"name": "b"}], [{"name": "a"}]], all_results,
+            )
+            self.assertIs(all_results[0], all_results[2])
+            # Cancelling one of the coalesced requests does not cancel the others.
+            first_request.cancel()
+
+            cancelled_request = asyncio.ensure_future(
+                executor.execute_query(GRAPHQL_QUERY, {"names": ["c"], "net_worth": 1})
+            )
+            other_request = asyncio.ensure_future(
+                executor.execute_query(GRAPHQL_QUERY, {"names": ["c"], "net_worth": 1})
+            )
+            await asyncio.sleep(0)
+            cancelled_request.cancel()
+            self.assertEqual([{"name": "c"}], await other_request)
+
+        loop.run_until_complete(run_queries())
+        self.assertEqual(3, len(self.executed_arguments))
+        self.assertEqual((6, 3, 3, 0), tuple(executor.get_metrics()))
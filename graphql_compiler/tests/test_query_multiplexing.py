@@ -0,0 +1,216 @@
+# Copyright 2020-present Kensho Technologies, LLC.
+import datetime
+import unittest
+
+import sqlalchemy
+
+from .. import get_sqlalchemy_schema_info
+from ..compiler import compile_graphql_to_match, compile_graphql_to_sql
+from ..exceptions import GraphQLInvalidArgumentError
+from ..query_formatting import insert_arguments_into_query
+from ..query_multiplexing import demultiplex_results, get_multiplexed_query, multiplex_arguments
+from ..schema.schema_info import CommonSchemaInfo
+from ..schema_generation.sqlalchemy.edge_descriptors import DirectEdgeDescriptor
+from .test_helpers import compare_graphql, get_common_schema_info
+
+
+class QueryMultiplexingTests(unittest.TestCase):
+    def setUp(self):
+        """Create an in-memory SQLite database of animals."""
+        self.engine = sqlalchemy.create_engine("sqlite://")
+        metadata = sqlalchemy.MetaData()
+        animal_table = sqlalchemy.Table(
+            "Animal",
+            metadata,
+            sqlalchemy.Column("uuid", sqlalchemy.Integer, primary_key=True),
+            sqlalchemy.Column("name", sqlalchemy.String(40), nullable=False),
+            sqlalchemy.Column("birthday", sqlalchemy.Date, nullable=False),
+            sqlalchemy.Column("parent", sqlalchemy.Integer, nullable=True),
+        )
+        metadata.create_all(self.engine)
+        self.engine.execute(
+            animal_table.insert(),
+            [
+                {
+                    "uuid": 1,
+                    "name": "Animal 1",
+                    "birthday": datetime.date(2001, 1, 1),
+                    "parent": None,
+                },
+                {"uuid": 2, "name": "Animal 2", "birthday": datetime.date(2002, 1, 1), "parent": 1},
+                {"uuid": 3, "name": "Animal 3", "birthday": datetime.date(2003, 1, 1), "parent": 1},
+                {"uuid": 4, "name": "Animal 4", "birthday": datetime.date(2001, 1, 1), "parent": 2},
+            ],
+        )
+        self.sql_schema_info = get_sqlalchemy_schema_info(
+            {"Animal": animal_table},
+            {"Animal_ParentOf": DirectEdgeDescriptor("Animal", "uuid", "Animal", "parent")},
+            self.engine.dialect,
+        )
+        self.common_schema_info = CommonSchemaInfo(
+            self.sql_schema_info.schema, self.sql_schema_info.type_equivalence_hints
+        )
+
+    def _execute(self, graphql_query, arguments):
+        """Compile the query to SQL, and return its results with the given arguments."""
+        compilation_result = compile_graphql_to_sql(self.sql_schema_info, graphql_query)
+        query = insert_arguments_into_query(compilation_result, arguments)
+        return [dict(row) for row in self.engine.execute(query)]
+
+    def test_multiplex_query(self):
+        graphql_query = """{
+            Animal {
+                name @filter(op_name: "=", value: ["$name"])
+                     @filter(op_name: "has_substring", value: ["$substring"])
+                out_Animal_ParentOf {
+                    name @output(out_name: "child_name")
+                }
+            }
+        }"""
+        expected_query = """{
+            Animal {
+                name @filter(op_name: "in_collection", value: ["$name_multiplexed"])
+                     @filter(op_name: "has_substring", value: ["$substring"])
+                     @output(out_name: "__multiplexed_key")
+                out_Animal_ParentOf {
+                    name @output(out_name: "child_name")
+                }
+            }
+        }"""
+        multiplexed_query = get_multiplexed_query(self.common_schema_info, graphql_query)
+        compare_graphql(self, expected_query, multiplexed_query.query)
+        self.assertEqual("name", multiplexed_query.parameter_name)
+
+        arguments_list = [
+            {"name": "Animal 2", "substring": "Animal"},
+            {"name": "Animal 1", "substring": "Animal"},
+            {"name": "Animal 3", "substring": "Animal"},
+            {"name": "Animal 1", "substring": "Animal"},
+        ]
+        multiplexed_arguments = multiplex_arguments(multiplexed_query, arguments_list)
+        self.assertEqual(
+            {"name_multiplexed": ["Animal 2", "Animal 1", "Animal 3"], "substring": "Animal"},
+            multiplexed_arguments,
+        )
+
+        # Demultiplexing the results of the single query gives the results of each execution.
+        multiplexed_results = self._execute(multiplexed_query.query, multiplexed_arguments)
+        demultiplexed_results = demultiplex_results(
+            multiplexed_query, arguments_list, multiplexed_results
+        )
+        expected_results = [self._execute(graphql_query, arguments) for arguments in arguments_list]
+        self.assertEqual(
+            [
+                [{"child_name": "Animal 4"}],
+                [{"child_name": "Animal 2"}, {"child_name": "Animal 3"}],
+            ],
+            expected_results[:2],
+        )
+        self.assertEqual(
+            [sorted(results, key=repr) for results in expected_results],
+            [sorted(results, key=repr) for results in demultiplexed_results],
+        )
+
+        with self.assertRaises(GraphQLInvalidArgumentError):
+            multiplex_arguments(multiplexed_query, [])
+        with self.assertRaises(GraphQLInvalidArgumentError):
+            multiplex_arguments(
+                multiplexed_query,
+                [
+                    {"name": "Animal 1", "substring": "Animal"},
+                    {"name": "Animal 2", "substring": ""},
+                ],
+            )
+
+    def test_multiplex_query_with_output_key(self):
+        graphql_query = """{
+            Animal {
+                birthday @filter(op_name: "=", value: ["$birthday"])
+                         @output(out_name: "birthday")
+                name @output(out_name: "name")
+            }
+        }"""
+        multiplexed_query = get_multiplexed_query(self.common_schema_info, graphql_query)
+        self.assertEqual("birthday", multiplexed_query.key_output_name)
+        self.assertFalse(multiplexed_query.key_output_added)
+
+        # The key values are matched regardless of how the backend represents them.
+        arguments_list = [
+            {"birthday": datetime.date(2001, 1, 1)},
+            {"birthday": datetime.date(2005, 1, 1)},
+        ]
+        multiplexed_results = [
+            {"birthday": "2001-01-01", "name": "Animal 1"},
+            {"birthday": datetime.date(2001, 1, 1), "name": "Animal 4"},
+        ]
+        self.assertEqual(
+            [
+                [
+                    {"birthday": "2001-01-01", "name": "Animal 1"},
+                    {"birthday": datetime.date(2001, 1, 1), "name": "Animal 4"},
+                ],
+                [],
+            ],
+            demultiplex_results(multiplexed_query, arguments_list, multiplexed_results),
+        )
+
+    def test_multiplexed_query_compiles_to_any_backend(self):
+        graphql_query = """{
+            Animal {
+                uuid @filter(op_name: "=", value: ["$uuid"])
+                name @output(out_name: "name")
+            }
+        }"""
+        common_schema_info = get_common_schema_info()
+        multiplexed_query = get_multiplexed_query(common_schema_info, graphql_query)
+        compilation_result = compile_graphql_to_match(common_schema_info, multiplexed_query.query)
+        self.assertEqual(
+            {"name", "__multiplexed_key"}, set(compilation_result.output_metadata.keys())
+        )
+        self.assertIn("uuid_multiplexed", compilation_result.input_metadata)
+
+    def test_queries_that_cannot_be_multiplexed(self):
+        unsupported_queries = [
+            # The root vertex has no "=" filter.
+            """{
+                Animal {
+                    name @filter(op_name: "has_substring", value: ["$name"])
+                         @output(out_name: "name")
+                }
+            }""",
+            # The "=" filter is not at the root vertex.
+            """{
+                Animal {
+                    name @output(out_name: "name")
+                    out_Animal_ParentOf {
+                        name @filter(op_name: "=", value: ["$name"])
+                    }
+                }
+            }""",
+            # The parameter is used by another filter as well.
+            """{
+                Animal {
+                    name @filter(op_name: "=", value: ["$name"])
+                         @output(out_name: "name")
+                    out_Animal_ParentOf {
+                        name @filter(op_name: "=", value: ["$name"])
+                    }
+                }
+            }""",
+            # It is ambiguous which parameter differs between executions.
+            """{
+                Animal {
+                    name @filter(op_name: "=", value: ["$name"])
+                         @output(out_name: "name")
+                    uuid @filter(op_name: "=", value: ["$uuid"])
+                }
+            }""",
+        ]
+        for graphql_query in unsupported_queries:
+            self.assertIsNone(get_multiplexed_query(self.common_schema_info, graphql_query))
+
+        # Specifying the parameter resolves the ambiguity.
+        multiplexed_query = get_multiplexed_query(
+            self.common_schema_info, unsupported_queries[-1], parameter_name="uuid"
+        )
+        self.assertEqual("uuid_multiplexed", multiplexed_query.collection_parameter_name)
@@ -0,0 +1,144 @@
+# Copyright 2020-present Kensho Technologies, LLC.
+import unittest
+
+from ..exceptions import GraphQLValidationError
+from ..query_result_cache import QueryResultCache, get_classes_touched_by_query
+from .test_helpers import get_common_schema_info
+
+
+class QueryResultCacheTests(unittest.TestCase):
+    def setUp(self):
+        """Create a cache over the test schema, and a fake backend recording executed queries."""
+        self.common_schema_info = get_common_schema_info()
+        self.executed_queries = []
+
+    def _execute(self, graphql_query, arguments):
+        """Record the execution, and return a single result echoing the arguments."""
+        self.executed_queries.append((graphql_query, arguments))
+        return [{"arguments": dict(arguments)}]
+
+    def test_touched_classes(self):
+        graphql_query = """{
+            Species {
+                name @output(out_name: "name")
+                in_Animal_OfSpecies @fold {
+                    name @output(out_name: "animal_names")
+                }
+                out_Species_Eats {
+                    ... on Food {
+                        name @output(out_name: "food_name")
+                    }
+                }
+                out_Entity_Related @recurse(depth: 1) {
+                    name @output(out_name: "related_name")
+                }
+            }
+        }"""
+        touched_classes = get_classes_touched_by_query(self.common_schema_info, graphql_query)
+        for expected_class in (
+            "Species",
+            "Animal",
+            "Food",
+            "Animal_OfSpecies",
+            "Species_Eats",
+            "Entity_Related",
+            # The union at out_Species_Eats before the coercion, and every subclass of Entity.
+            "FoodOrSpecies",
+            "Event",
+            "BirthEvent",
+        ):
+            self.assertIn(expected_class, touched_classes)
+        self.assertNotIn("Animal_ParentOf", touched_classes)
+
+        with self.assertRaises(GraphQLValidationError):
+            get_classes_touched_by_query(self.common_schema_info, "{ Foo { bar } }")
+
+    def test_hits_misses_and_invalidation(self):
+        cache = QueryResultCache(self.common_schema_info)
+        animal_query = """{
+            Animal {
+                name @output(out_name: "name")
+                     @filter(op_name: "in_collection", value: ["$names"])
+                out_Animal_ParentOf {
+                    name @output(out_name: "child_name")
+                }
+            }
+        }"""
+        species_query = """{
+            Species {
+                name @output(out_name: "name")
+            }
+        }"""
+
+        self.assertEqual(
+            [{"arguments": {"names": ["a", "b"]}}],
+            cache.get_or_execute(animal_query, {"names": ["a", "b"]}, self._execute),
+        )
+        # Equivalent arguments hit the same entry, regardless of the order of collections.
+        self.assertEqual(
+            [{"arguments": {"names": ["a", "b"]}}],
+            cache.get_or_execute(animal_query, {"names": ["b", "a", "a"]}, self._execute),
+        )
+        cache.get_or_execute(animal_query, {"names": ["c"]}, self._execute)
+        cache.get_or_execute(species_query, {}, self._execute)
+        self.assertEqual(3, len(self.executed_queries))
+
+        metrics = cache.get_metrics()
+        self.assertEqual(
+            (1, 3, 0.25, 3), (metrics.hits, metrics.misses, metrics.hit_rate, metrics.size)
+        )
+
+        # Writes to classes the query does not touch keep its results cached.
+        self.assertEqual(0, cache.invalidate_classes({"Location", "Animal_LivesIn"}))
+        self.assertEqual(2, cache.invalidate_classes({"Animal_ParentOf"}))
+        self.assertIsNone(cache.get(animal_query, {"names": ["a", "b"]}))
+        self.assertEqual([{"arguments": {}}], cache.get(species_query, {}))
+        self.assertEqual(2, cache.get_metrics().invalidations)
+
+        cache.clear()
+        self.assertIsNone(cache.get(species_query, {}))
+        self.assertEqual(0, cache.get_metrics().size)
+
+    def test_lru_eviction(self):
+        cache = QueryResultCache(self.common_schema_info, max_size=2)
+        graphql_query = """{
+            Animal {
+                name @output(out_name: "name")
+                     @filter(op_name: "=", value: ["$name"])
+            }
+        }"""
+        cache.put(graphql_query, {"name": "a"}, [{"name": "a"}])
+        cache.put(graphql_query, {"name": "b"}, [{"name": "b"}])
+        # Using the first entry makes the second one the least recently used.
+        self.assertEqual([{"name": "a"}], cache.get(graphql_query, {"name": "a"}))
+        cache.put(graphql_query, {"name": "c"}, [{"name": "c"}])
+
+        self.assertIsNone(cache.get(graphql_query, {"name": "b"}))
+        self.assertEqual([{"name": "a"}], cache.get(graphql_query, {"name": "a"}))
+        self.assertEqual([{"name": "c"}], cache.get(graphql_query, {"name": "c"}))
+        self.assertEqual(1, cache.get_metrics().evictions)
+
+        with self.assertRaises(AssertionError):
+            QueryResultCache(self.common_schema_info, max_size=0)
+
+    def test_results_of_queries_racing_with_writes_are_not_cached(self):
+        cache = QueryResultCache(self.common_schema_info)
+        graphql_query = """{
+            Animal {
+                name @output(out_name: "name")
+            }
+        }"""
+
+        def execute_during_write(query, arguments):
+            """Simulate a write to the queried class reported while the query executes."""
+            cache.invalidate_classes({"Animal"})
+            return [{"name": "stale"}]
+
+        def execute_during_clear(query, arguments):
+            """Simulate the cache being cleared while the query executes."""
+            cache.clear()
+            return [{"name": "stale"}]
+
+        for execute in (execute_during_write, execute_during_clear):
+            self.assertEqual([{"name": "stale"}], cache.get_or_execute(graphql_query, {}, execute))
+            self.assertIsNone(cache.get(graphql_query, {}))
@@ -0,0 +1,218 @@
+# Copyright 2020-present Kensho Technologies, LLC.
+import datetime
+from decimal import Decimal
+import unittest
+
+from graphql import (
+    GraphQLBoolean,
+    GraphQLFloat,
+    GraphQLID,
+    GraphQLInt,
+    GraphQLList,
+    GraphQLNonNull,
+    GraphQLString,
+)
+import neotime
+import pytz
+
+from .. import GraphQLDate, GraphQLDateTime, GraphQLDecimal, compile_graphql_to_match
+from ..compiler.compiler_frontend import OutputMetadata
+from ..compiler.emit_sql import JSON_PATH_FOLD_STRATEGY, XML_PATH_FOLD_STRATEGY
+from ..post_processing.result_decoding import ResultDecoder
+from .test_helpers import get_common_schema_info
+
+
+class ResultDecoderTests(unittest.TestCase):
+    def setUp(self):
+        self.output_metadata = {
+            "birthday": OutputMetadata(type=GraphQLDate, optional=False, folded=False),
+            "event_time": OutputMetadata(type=GraphQLDateTime, optional=True, folded=False),
+            "net_worth": OutputMetadata(type=GraphQLDecimal, optional=False, folded=False),
+            "uuid": OutputMetadata(type=GraphQLNonNull(GraphQLID), optional=False, folded=False),
+            "is_alive": OutputMetadata(type=GraphQLBoolean, optional=False, folded=False),
+            "child_names": OutputMetadata(
+                type=GraphQLList(GraphQLString), optional=False, folded=True
+            ),
+            "child_ages": OutputMetadata(type=GraphQLList(GraphQLInt), optional=False, folded=True),
+            "child_count": OutputMetadata(type=GraphQLInt, optional=False, folded=True),
+        }
+        self.expected_result = {
+            "birthday": datetime.date(2000, 2, 29),
+            "event_time": None,
+            "net_worth": Decimal("123.45"),
+            "uuid": "13d72846-1777-6c3a-5743-5d9ced3032ed",
+            "is_alive": True,
+            "child_names": ["Animal 1", None],
+            "child_ages": [3, 5],
+            "child_count": 2,
+        }
+
+    def test_decode_string_representations(self):
+        result = {
+            "birthday": "2000-02-29",
+            "event_time": None,
+            "net_worth": "123.45",
+            "uuid": "13d72846-1777-6c3a-5743-5d9ced3032ed",
+            "is_alive": "true",
+            "child_names": ["Animal 1", None],
+            "child_ages": ["3", 5],
+            "child_count": "2",
+        }
+        decoded_result = ResultDecoder(self.output_metadata).decode_result(result)
+        self.assertEqual(self.expected_result, decoded_result)
+        self.assertIsNot(result, decoded_result)
+        self.assertEqual("2000-02-29", result["birthday"])
+
+    def test_decode_native_representations(self):
+        result = dict(self.expected_result, child_names=("Animal 1", None))
+        decoded_result = ResultDecoder(self.output_metadata).decode_result(result)
+        self.assertEqual(self.expected_result, decoded_result)
+        self.assertIs(result["net_worth"], decoded_result["net_worth"])
+
+    def test_decode_datetime_and_id(self):
+        output_metadata = {
+            "event_time": OutputMetadata(type=GraphQLDateTime, optional=False, folded=False),
+            "uuid": OutputMetadata(type=GraphQLID, optional=False, folded=False),
+            "weight": OutputMetadata(type=GraphQLFloat, optional=False, folded=False),
+        }
+        decoded_results = ResultDecoder(output_metadata).decode_results(
+            [{"event_time": "2019-01-01T12:34:56", "uuid": 123, "weight": "1.5", "extra": 1}]
+        )
+        self.assertEqual(
+            [
+                {
+                    "event_time": datetime.datetime(2019, 1, 1, 12, 34, 56),
+                    "uuid": "123",
+                    "weight": 1.5,
+                    "extra": 1,
+                }
+            ],
+            decoded_results,
+        )
+
+    def test_decode_timezone_aware_datetimes(self):
+        output_metadata = {
+            "event_time": OutputMetadata(type=GraphQLDateTime, optional=False, folded=False),
+            "event_times": OutputMetadata(
+                type=GraphQLList(GraphQLDateTime), optional=False, folded=True
+            ),
+        }
+        eastern_time = datetime.timezone(datetime.timedelta(hours=-5))
+        decoded_result = ResultDecoder(output_metadata).decode_result(
+            {
+                "event_time": datetime.datetime(2001, 1, 1, tzinfo=datetime.timezone.utc),
+                "event_times": [
+                    datetime.datetime(2001, 1, 1, 19, tzinfo=eastern_time),
+                    datetime.datetime(2001, 1, 1, 12),
+                ],
+            }
+        )
+        self.assertEqual(
+            {
+                "event_time": datetime.datetime(2001, 1, 1),
+                "event_times": [datetime.datetime(2001, 1, 2), datetime.datetime(2001, 1, 1, 12)],
+            },
+            decoded_result,
+        )
+        self.assertIsNone(decoded_result["event_time"].tzinfo)
+        self.assertIsNone(decoded_result["event_times"][0].tzinfo)
+
+    def test_decode_neo4j_temporal_values(self):
+        output_metadata = {
+            "birthday": OutputMetadata(type=GraphQLDate, optional=False, folded=False),
+            "event_time": OutputMetadata(type=GraphQLDateTime, optional=False, folded=False),
+            "event_times": OutputMetadata(
+                type=GraphQLList(GraphQLDateTime), optional=False, folded=True
+            ),
+        }
+        decoded_result = ResultDecoder(output_metadata).decode_result(
+            {
+                "birthday": neotime.Date(2000, 2, 29),
+                "event_time": neotime.DateTime(2001, 1, 1, 12, 34, 56.5),
+                "event_times": [
+                    pytz.FixedOffset(-300).localize(neotime.DateTime(2001, 1, 1, 19, 0, 0)),
+                ],
+            }
+        )
+        self.assertEqual(
+            {
+                "birthday": datetime.date(2000, 2, 29),
+                "event_time": datetime.datetime(2001, 1, 1, 12, 34, 56, 500000),
+                "event_times": [datetime.datetime(2001, 1, 2)],
+            },
+            decoded_result,
+        )
+        self.assertIs(datetime.date, type(decoded_result["birthday"]))
+        self.assertIsNone(decoded_result["event_times"][0].tzinfo)
+
+    def test_decode_invalid_values(self):
+        result_decoder = ResultDecoder(self.output_metadata)
+        invalid_results = [
+            # Booleans are not integers, even though bool is a subclass of int in Python.
+            {"child_count": True},
+            # Datetimes are not dates, even though datetime is a subclass of date in Python.
+            {"birthday": datetime.datetime(2000, 2, 29)},
+            {"child_ages": "3"},
+            {"is_alive": "maybe"},
+        ]
+        for result in invalid_results:
+            with self.assertRaises(ValueError):
+                result_decoder.decode_result(result)
+
+    def test_decode_mssql_folds(self):
+        result_decoder = ResultDecoder(self.output_metadata, fold_strategy=XML_PATH_FOLD_STRATEGY)
+        results = [
+            {
+                "birthday": datetime.date(2000, 2, 29),
+                "event_time": None,
+                "net_worth": Decimal("123.45"),
+                "uuid": "13d72846-1777-6c3a-5743-5d9ced3032ed",
+                "is_alive": True,
+                "child_names": "|Animal 1|~",
+                "child_ages": "|3|5",
+                "child_count": 2,
+            }
+        ]
+        result_iterator = result_decoder.stream_decode_results(iter(results))
+        self.assertEqual([self.expected_result], list(result_iterator))
+
+        result_decoder = ResultDecoder(self.output_metadata, fold_strategy=JSON_PATH_FOLD_STRATEGY)
+        results[0]["child_names"] = '[{"value":"Animal 1"},{"value":null}]'
+        results[0]["child_ages"] = '[{"value":3},{"value":5}]'
+        self.assertEqual([self.expected_result], result_decoder.decode_results(results))
+
+    def test_decoder_from_compilation_result(self):
+        compilation_result = compile_graphql_to_match(
+            get_common_schema_info(),
+            """{
+                Animal {
+                    name @output(out_name: "name")
+                    net_worth @output(out_name: "net_worth")
+                    out_Animal_ParentOf @fold {
+                        _x_count @output(out_name: "child_count")
+                        birthday @output(out_name: "child_birthdays")
+                    }
+                }
+            }""",
+        )
+        result_decoder = ResultDecoder(compilation_result.output_metadata)
+        self.assertEqual(
+            [
+                {
+                    "name": "Animal 1",
+                    "net_worth": Decimal("100"),
+                    "child_count": 1,
+                    "child_birthdays": [datetime.date(2020, 1, 1)],
+                }
+            ],
+            result_decoder.decode_results(
+                [
+                    {
+                        "name": "Animal 1",
+                        "net_worth": "100",
+                        "child_count": 1,
+                        "child_birthdays": ["2020-01-01"],
+                    }
+                ]
+            ),
+        )
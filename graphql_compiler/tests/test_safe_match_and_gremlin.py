@@ -1,15 +1,19 @@
 # Copyright 2017-present Kensho Technologies, LLC.
 from datetime import date, datetime
+from decimal import Decimal
 import unittest
 
 from graphql import GraphQLBoolean, GraphQLFloat, GraphQLID, GraphQLInt, GraphQLList, GraphQLString
 import six
 
+from .. import compile_graphql_to_gremlin
 from ..exceptions import GraphQLInvalidArgumentError
 from ..global_utils import is_same_type
+from ..query_formatting import insert_arguments_into_query
 from ..query_formatting.gremlin_formatting import _safe_gremlin_argument
 from ..query_formatting.match_formatting import _safe_match_argument
 from ..schema import GraphQLDate, GraphQLDateTime
+from .test_helpers import get_common_schema_info
 
 
 REPRESENTATIVE_DATA_FOR_EACH_TYPE = {
@@ -130,3 +134,58 @@ class SafeGremlinFormattingTests(unittest.TestCase):
 
         expected_output = "[[1,2,3],[4,5,6]]"
         self.assertEqual(expected_output, _safe_gremlin_argument(graphql_type, value))
+
+    def test_parameterized_gremlin_query(self) -> None:
+        graphql_query = """{
+            Animal {
+                name @filter(op_name: "in_collection", value: ["$names"])
+                     @output(out_name: "name")
+                net_worth @filter(op_name: ">=", value: ["$min_net_worth"])
+                birthday @filter(op_name: "<", value: ["$max_birthday"])
+                uuid @filter(op_name: "!=", value: ["$excluded_uuid"])
+            }
+        }"""
+        common_schema_info = get_common_schema_info()
+        compilation_result = compile_graphql_to_gremlin(common_schema_info, graphql_query)
+        parameterized_compilation_result = compile_graphql_to_gremlin(
+            common_schema_info, graphql_query, parameterized=True
+        )
+
+        expected_script = (
+            compilation_result.query.replace("$names", "graphql_arg_names")
+            .replace("$min_net_worth", "(new BigDecimal(graphql_arg_min_net_worth))")
+            .replace("$max_birthday", "graphql_arg_max_birthday")
+            .replace("$excluded_uuid", "graphql_arg_excluded_uuid")
+        )
+        self.assertEqual(expected_script, parameterized_compilation_result.query.script)
+
+        arguments = {
+            "names": ["Animal 1", "injection: ${ -> (2 + 2 == 4)}"],
+            "min_net_worth": Decimal("1234.50"),
+            "max_birthday": date(2017, 3, 22),
+            "excluded_uuid": "cfc6e625-8594-0927-468f-f53d864a7a51",
+        }
+        expected_bindings = {
+            "graphql_arg_names": ["Animal 1", "injection: ${ -> (2 + 2 == 4)}"],
+            "graphql_arg_min_net_worth": "1234.50",
+            "graphql_arg_max_birthday": "2017-03-22",
+            "graphql_arg_excluded_uuid": "cfc6e625-8594-0927-468f-f53d864a7a51",
+        }
+        self.assertEqual(
+            (expected_script, expected_bindings),
+            insert_arguments_into_query(parameterized_compilation_result, arguments),
+        )
+
+        # The script does not depend on the values of the arguments.
+        other_arguments = dict(arguments, names=[], max_birthday=date(2000, 1, 1))
+        script, bindings = insert_arguments_into_query(
+            parameterized_compilation_result, other_arguments
+        )
+        self.assertEqual(expected_script, script)
+        self.assertEqual([], bindings["graphql_arg_names"])
+        self.assertEqual("2000-01-01", bindings["graphql_arg_max_birthday"])
+
+        with self.assertRaises(GraphQLInvalidArgumentError):
+            insert_arguments_into_query(
+                parameterized_compilation_result, dict(arguments, max_birthday="2017-03-22")
+            )
@@ -3,8 +3,15 @@ import unittest
 
 import sqlalchemy
 import sqlalchemy.dialects.mssql as mssql
+from sqlalchemy.dialects.mssql import pyodbc
 
-from ..compiler.sqlalchemy_extensions import print_sqlalchemy_query_string
+from .. import compile_graphql_to_sql, get_sqlalchemy_schema_info as make_sqlalchemy_schema_info
+from ..compiler.sqlalchemy_extensions import (
+    precompile_sqlalchemy_query,
+    print_sqlalchemy_query_string,
+)
+from ..query_formatting.common import insert_arguments_into_query
+from ..query_formatting.sql_formatting import insert_arguments_into_precompiled_sql_query
 from .test_helpers import compare_sql, get_sqlalchemy_schema_info
 
 
@@ -48,3 +55,126 @@ class CommonIrLoweringTests(unittest.TestCase):
              WHERE [Animal_1].name IN :names
         """
         compare_sql(self, expected_text, text)
+
+    def test_precompile_query_named_paramstyle(self):
+        animal = self.sql_schema_info.vertex_name_to_table["Animal"].alias()
+        query = sqlalchemy.select([animal.c.name]).where(
+            sqlalchemy.and_(
+                animal.c.name.in_(sqlalchemy.bindparam("names", expanding=True)),
+                animal.c.uuid == sqlalchemy.bindparam("uuid", expanding=False),
+            )
+        )
+        precompiled_query = precompile_sqlalchemy_query(query, mssql.dialect())
+
+        text, parameters = insert_arguments_into_precompiled_sql_query(
+            precompiled_query, {"names": ["Bob", "Alice"], "uuid": "some-uuid"}
+        )
+        expected_text = """
+             SELECT [Animal_1].name
+             FROM db_1.schema_1.[Animal] AS [Animal_1]
+             WHERE [Animal_1].name IN (:names_1, :names_2) AND [Animal_1].uuid = :uuid
+        """
+        compare_sql(self, expected_text, text)
+        self.assertEqual({"names_1": "Bob", "names_2": "Alice", "uuid": "some-uuid"}, parameters)
+
+        text, parameters = insert_arguments_into_precompiled_sql_query(
+            precompiled_query, {"names": [], "uuid": "some-uuid"}
+        )
+        expected_text = """
+             SELECT [Animal_1].name
+             FROM db_1.schema_1.[Animal] AS [Animal_1]
+             WHERE [Animal_1].name IN (SELECT 1 WHERE 1!=1) AND [Animal_1].uuid = :uuid
+        """
+        compare_sql(self, expected_text, text)
+        self.assertEqual({"uuid": "some-uuid"}, parameters)
+
+    def test_precompile_query_element_names_do_not_collide(self):
+        animal = self.sql_schema_info.vertex_name_to_table["Animal"].alias()
+        query = sqlalchemy.select([animal.c.name]).where(
+            sqlalchemy.and_(
+                animal.c.name.in_(sqlalchemy.bindparam("names", expanding=True)),
+                animal.c.uuid == sqlalchemy.bindparam("names_1", expanding=False),
+            )
+        )
+        precompiled_query = precompile_sqlalchemy_query(query, mssql.dialect())
+
+        text, parameters = insert_arguments_into_precompiled_sql_query(
+            precompiled_query, {"names": ["a", "b"], "names_1": "zzz"}
+        )
+        expected_text = """
+             SELECT [Animal_1].name
+             FROM db_1.schema_1.[Animal] AS [Animal_1]
+             WHERE [Animal_1].name IN (:names__1, :names__2) AND [Animal_1].uuid = :names_1
+        """
+        compare_sql(self, expected_text, text)
+        self.assertEqual({"names__1": "a", "names__2": "b", "names_1": "zzz"}, parameters)
+
+    def test_precompile_query_positional_paramstyle(self):
+        animal = self.sql_schema_info.vertex_name_to_table["Animal"].alias()
+        query = sqlalchemy.select([animal.c.name]).where(
+            sqlalchemy.and_(
+                animal.c.name.in_(sqlalchemy.bindparam("names", expanding=True)),
+                animal.c.uuid == sqlalchemy.bindparam("uuid", expanding=False),
+            )
+        )
+        precompiled_query = precompile_sqlalchemy_query(query, pyodbc.dialect(paramstyle="qmark"))
+
+        text, parameters = insert_arguments_into_precompiled_sql_query(
+            precompiled_query, {"names": ["Bob", "Alice"], "uuid": "some-uuid"}
+        )
+        expected_text = """
+             SELECT [Animal_1].name
+             FROM db_1.schema_1.[Animal] AS [Animal_1]
+             WHERE [Animal_1].name IN (?, ?) AND [Animal_1].uuid = ?
+        """
+        compare_sql(self, expected_text, text)
+        self.assertEqual(("Bob", "Alice", "some-uuid"), parameters)
+
+    def test_execute_precompiled_query(self):
+        metadata = sqlalchemy.MetaData()
+        table = sqlalchemy.Table(
+            "Animal",
+            metadata,
+            sqlalchemy.Column("uuid", sqlalchemy.String(36), primary_key=True),
+            sqlalchemy.Column("name", sqlalchemy.String(40)),
+        )
+        engine = sqlalchemy.create_engine("sqlite://")
+        metadata.create_all(engine)
+        engine.execute(
+            table.insert(),
+            [
+                {"uuid": "1", "name": "Bob"},
+                {"uuid": "2", "name": "Alice"},
+                {"uuid": "3", "name": "Eve"},
+            ],
+        )
+        sql_schema_info = make_sqlalchemy_schema_info({"Animal": table}, {}, engine.dialect)
+        graphql_query = """{
+            Animal {
+                name @output(out_name: "name")
+                     @filter(op_name: "in_collection", value: ["$names"])
+            }
+        }"""
+
+        for names in (["Bob", "Eve", "Mallory"], []):
+            arguments = {"names": names}
+            compilation_result = compile_graphql_to_sql(sql_schema_info, graphql_query)
+            expected_rows = engine.execute(
+                insert_arguments_into_query(compilation_result, arguments)
+            ).fetchall()
+
+            precompiled_result = compile_graphql_to_sql(
+                sql_schema_info, graphql_query, precompile=True
+            )
+            text, parameters = insert_arguments_into_query(precompiled_result, arguments)
+            connection = engine.raw_connection()
+            try:
+                cursor = connection.cursor()
+                cursor.execute(text, parameters)
+                rows = cursor.fetchall()
+            finally:
+                connection.close()
+
+            self.assertEqual(
+                sorted(tuple(row) for row in expected_rows), sorted(tuple(row) for row in rows)
+            )
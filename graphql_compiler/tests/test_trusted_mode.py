@@ -0,0 +1,88 @@
+# Copyright 2020-present Kensho Technologies, LLC.
+import unittest
+
+from graphql import GraphQLString
+
+from .. import (
+    compile_graphql_to_gremlin,
+    compile_graphql_to_match,
+    set_trusted_ir_mode_default,
+    trusted_ir_mode,
+)
+from ..compiler.blocks import QueryRoot
+from ..compiler.expressions import Literal, Variable
+from ..compiler.ir_sanity_checks import sanity_check_ir_blocks_from_frontend
+from ..compiler.trusted_mode import is_trusted_ir_mode_enabled
+from ..exceptions import GraphQLCompilationError
+from .test_helpers import get_common_schema_info
+
+
+class TrustedModeTests(unittest.TestCase):
+    def tearDown(self):
+        """Ensure that no test leaves trusted IR mode enabled globally."""
+        set_trusted_ir_mode_default(False)
+
+    def test_trusted_mode_settings(self):
+        self.assertFalse(is_trusted_ir_mode_enabled())
+        with trusted_ir_mode():
+            self.assertTrue(is_trusted_ir_mode_enabled())
+            with trusted_ir_mode(enabled=False):
+                self.assertFalse(is_trusted_ir_mode_enabled())
+            self.assertTrue(is_trusted_ir_mode_enabled())
+        self.assertFalse(is_trusted_ir_mode_enabled())
+
+        set_trusted_ir_mode_default(True)
+        self.assertTrue(is_trusted_ir_mode_enabled())
+        with trusted_ir_mode(enabled=False):
+            self.assertFalse(is_trusted_ir_mode_enabled())
+        self.assertTrue(is_trusted_ir_mode_enabled())
+
+    def test_internal_checks_are_skipped(self):
+        with self.assertRaises(GraphQLCompilationError):
+            Literal(object())
+        with self.assertRaises(TypeError):
+            QueryRoot("Animal")
+        with self.assertRaises(AssertionError):
+            sanity_check_ir_blocks_from_frontend([], None)
+
+        with trusted_ir_mode():
+            Literal(object())
+            QueryRoot("Animal")
+            sanity_check_ir_blocks_from_frontend([], None)
+
+    def test_user_facing_checks_are_not_skipped(self):
+        with trusted_ir_mode():
+            with self.assertRaises(GraphQLCompilationError):
+                Variable("$matches", GraphQLString)
+
+            with self.assertRaises(GraphQLCompilationError):
+                compile_graphql_to_match(
+                    get_common_schema_info(),
+                    """{
+                        Animal {
+                            name @output(out_name: "___name")
+                        }
+                    }""",
+                )
+
+    def test_trusted_compilation_output_is_unchanged(self):
+        common_schema_info = get_common_schema_info()
+        graphql_query = """{
+            Animal {
+                name @output(out_name: "name")
+                out_Animal_ParentOf @optional {
+                    name @filter(op_name: "has_substring", value: ["$substring"])
+                         @output(out_name: "child_name")
+                }
+                in_Animal_ParentOf @fold {
+                    name @output(out_name: "parent_names")
+                }
+            }
+        }"""
+
+        for compilation_func in (compile_graphql_to_match, compile_graphql_to_gremlin):
+            self.assertEqual(
+                compilation_func(common_schema_info, graphql_query),
+                compilation_func(common_schema_info, graphql_query, trusted=True),
+            )
+        self.assertFalse(is_trusted_ir_mode_enabled())